@@ -11,27 +11,27 @@ panel_src = os.path.join(current_dir, 'panel', 'src')
 sys.path.insert(0, panel_src)
 
 # Importar streamlit y las dependencias necesarias
+# (pandas, plotly, PIL y requests se cargan con el módulo de la página que los usa)
 import streamlit as st
-import pandas as pd
-from dotenv import load_dotenv
+
+# Ahora importamos desde utils (ya está en el path)
+from utils.config import PAGE_CONFIG, cargar_variables_entorno
 
 # Cargar variables de entorno desde .env (API keys, etc.)
-# En Hugging Face Spaces, las variables se cargan automáticamente
-try:
-    load_dotenv()
-except:
-    pass  # No hay problema si no existe .env (ej: en Hugging Face)
+# En Hugging Face Spaces, las variables se cargan automáticamente y no hay .env
+cargar_variables_entorno(current_dir)
 
-# Ahora importamos desde utils (ya está en el path)
-import utils.data_loader as loader
-from utils.config import PAGE_CONFIG
+from utils.dataset import get_dataset, usar_dataset
+from utils.warmup import iniciar_calentamiento
+from utils.profiler import medir, medir_pagina, escribir_metricas
+from utils.memory import metricas_memoria
+from utils.slow_reruns import vigilar_rerun, selecciones_sesion
 
 st.set_page_config(**PAGE_CONFIG)
 
-# Limpiar caché al inicio SOLO si es la primera vez que se carga la app en esta sesión
-if 'cache_cleared' not in st.session_state:
-    st.cache_data.clear()
-    st.session_state.cache_cleared = True
+# Precalentar en segundo plano el dataset, los agregados y las figuras por defecto
+# (Streamlit no tiene gancho de arranque: solo la primera ejecución del proceso lanza el hilo)
+iniciar_calentamiento()
 
 IMAGE_URL = 'https://media.istockphoto.com/id/639387036/es/foto/hombre-de-jugador-de-f%C3%BAtbol-aislado.jpg?s=612x612&w=0&k=20&c=Kiwcqtuu9V1MrsSRj8UeorzJ_buvOCvGe5D4JfFEtSQ='
 st.markdown(
@@ -90,59 +90,71 @@ with st.sidebar:
             "👤 Análisis por Jugadores",
             "👕 Análisis por Equipo",
             "🏆 Análisis por Liga",
+            "🧬 Jugadores Similares",
+            "🔭 Scouting",
+            "🔗 Correlaciones",
             "🪄 IA Players",
         ),
     )
     
     st.markdown("<hr style='border: 1px solid #000000; margin: 10px 0;'>", unsafe_allow_html=True)
 
-@st.cache_data
-def get_data_cached():
-    """Cached wrapper around utils.data_loader.load_data to avoid recursion."""
-    return loader.load_data()
+def _version_datos():
+    """Versión del dataset en uso, para las capturas de re-ejecuciones lentas."""
+    return str(st.session_state.get('version_datos'))
 
 try:
-    result = get_data_cached()
-    
-    if isinstance(result, tuple):
-        df, load_info = result
-        st.session_state.load_info = load_info
-    else:
-        df = result
-        st.session_state.load_info = {
-            'csv_already_existed': None,
-            'processing_time': 0.0,
-            'timestamp': None
-        }
+    # Si la re-ejecución supera el umbral se guarda su perfil con la página y las selecciones
+    with vigilar_rerun(page, lambda: selecciones_sesion(st.session_state), _version_datos), medir_pagina(page):
+        # Dataset compartido por todas las sesiones (se carga una vez por proceso)
+        with medir("carga de datos"):
+            get_dataset()
     
-    st.session_state.df = df
+        # Toda la re-ejecución usa la misma versión del dataset aunque entretanto se
+        # publique una nueva; las versiones antiguas se retiran cuando nadie las usa
+        with usar_dataset() as dataset:
+            df = dataset.df
+            st.session_state.informe_carga = dataset.informe
+            st.session_state.version_datos = dataset.version
 
-    if page == "🏠 Inicio":
-        st.title("⚽ Jugadores de Fútbol - Temporada 2015-2016")
-        st.markdown("""
-            Esta aplicación interactiva te permite explorar y analizar datos de **jugadores profesionales de fútbol** 
-            de la temporada 2015-2016. Descubre los mejores talentos, compara atributos técnicos y descubre 
-            tendencias en las principales ligas europeas. \n
-            La estadistica se basa en un rango de valores que va entre 0 y 100, donde 100 representa la máxima habilidad o rendimiento en esa categoría específica. 
-            """)
-        st.markdown("---")
+            if page == "🏠 Inicio":
+                st.title("⚽ Jugadores de Fútbol - Temporada 2015-2016")
+                st.markdown("""
+                    Esta aplicación interactiva te permite explorar y analizar datos de **jugadores profesionales de fútbol** 
+                    de la temporada 2015-2016. Descubre los mejores talentos, compara atributos técnicos y descubre 
+                    tendencias en las principales ligas europeas. \n
+                    La estadistica se basa en un rango de valores que va entre 0 y 100, donde 100 representa la máxima habilidad o rendimiento en esa categoría específica. 
+                    """)
+                st.markdown("---")
         
-        from ui.home import render_home_page
-        render_home_page(df)
-    elif page == "👤 Análisis por Jugadores":
-        from ui.players import render_players_page
-        render_players_page(df)
-    elif page == "👕 Análisis por Equipo":
-        from ui.teams import render_teams_page
-        render_teams_page(df)
-    elif page == "🏆 Análisis por Liga":
-        from ui.leagues import render_leagues_page
-        render_leagues_page(df)
-    elif page == "🪄 IA Players":
-        from ui.iaPlayers import render_top_players_page
-        render_top_players_page()
+                from ui.home import render_home_page
+                render_home_page(df)
+            elif page == "👤 Análisis por Jugadores":
+                from ui.players import render_players_page
+                render_players_page(df)
+            elif page == "👕 Análisis por Equipo":
+                from ui.teams import render_teams_page
+                render_teams_page(df)
+            elif page == "🏆 Análisis por Liga":
+                from ui.leagues import render_leagues_page
+                render_leagues_page(df)
+            elif page == "🧬 Jugadores Similares":
+                from ui.similar import render_similar_players_page
+                render_similar_players_page(df)
+            elif page == "🔭 Scouting":
+                from ui.scouting import render_scouting_page
+                render_scouting_page(df)
+            elif page == "🔗 Correlaciones":
+                from ui.correlations import render_correlations_page
+                render_correlations_page(df)
+            elif page == "🪄 IA Players":
+                from ui.iaPlayers import render_top_players_page
+                render_top_players_page(df)
 
 except Exception as e:   
     st.error(f"Error al cargar los datos: {e}")
     st.exception(e)  # Mostrar el traceback completo para debugging
 
+
+# Volcar los tiempos por sección y la memoria al fichero de métricas (solo si SOCCER_METRICS_FILE está definido)
+escribir_metricas(extra=metricas_memoria)
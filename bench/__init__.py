@@ -0,0 +1,10 @@
+"""
+Herramientas de pruebas de rendimiento para Soccer Analytics.
+
+Módulos:
+- fake_hf_server: Servidor local que imita la API de inferencia de Hugging Face
+- bench_pages: Benchmark sin interfaz de todas las páginas con baseline JSON
+- synthetic_data: Generador de datasets sintéticos a escala (10×, 100×, 1000×)
+- import_report: Tiempos de importación del arranque en frío, por fase y módulo
+- load_test: Prueba de carga con sesiones concurrentes por el websocket de Streamlit
+"""
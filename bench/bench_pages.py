@@ -0,0 +1,302 @@
+"""
+Benchmark sin interfaz de todas las páginas de la aplicación.
+
+Ejecuta `app.py` con el arnés de pruebas de Streamlit (`streamlit.testing.v1.AppTest`)
+y mide, para cada página, la primera visita en una sesión nueva con las cachés
+vacías ("frío"), la re-ejecución sin cambios ("caliente") y las interacciones más
+habituales (cambio de equipo, cambio de página del ranking, cambio de liga).
+
+Los resultados se guardan en JSON y se comparan con un baseline: si la mediana de
+algún escenario empeora más que el umbral, o si se mide algún escenario que no está
+en el baseline (una página nueva), el script termina con código 1.
+
+Uso (desde la raíz del proyecto):
+    python -m bench.bench_pages --guardar-baseline          # crear/actualizar bench/baseline.json
+    python -m bench.bench_pages                             # comparar con el baseline
+    python -m bench.bench_pages --repeticiones 5 --umbral 0.5 --salida bench_output.json
+    python -m bench.bench_pages --dataset data/synthetic/data_x100.parquet --baseline bench/baseline_x100.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, 'app.py')
+RUTA_BASELINE = os.path.join(RAIZ, 'bench', 'baseline.json')
+
+# Umbral de regresión por defecto: +30% sobre la mediana del baseline...
+UMBRAL_REGRESION = 0.30
+# ...y al menos esta diferencia absoluta (evita falsos positivos en escenarios de pocos ms)
+MARGEN_MINIMO_MS = 25.0
+
+TIMEOUT_EJECUCION = 120
+
+PAGINAS = {
+    'inicio': "🏠 Inicio",
+    'jugadores': "👤 Análisis por Jugadores",
+    'equipos': "👕 Análisis por Equipo",
+    'ligas': "🏆 Análisis por Liga",
+    'similares': "🧬 Jugadores Similares",
+    'scouting': "🔭 Scouting",
+    'correlaciones': "🔗 Correlaciones",
+    'ia_players': "🪄 IA Players",
+}
+
+
+@dataclass
+class Interaccion:
+    """Interacción repetible sobre una página ya abierta."""
+
+    nombre: str
+    pagina: str
+    accion: Callable  # accion(at, repeticion) -> prepara el widget antes de ejecutar
+
+
+def _alternar_selectbox(clave: str, opcion_a: str, opcion_b: str):
+    """Cambia un selectbox entre dos opciones en cada repetición."""
+    def accion(at, repeticion):
+        selector = at.selectbox(key=clave)
+        valor = opcion_b if selector.value == opcion_a else opcion_a
+        selector.set_value(valor)
+    return accion
+
+
+def _siguiente_pagina_ranking(at, repeticion):
+    # Al llegar a la última página se vuelve a la primera (no cuenta como medida distinta)
+    if at.button(key='next_overall').disabled:
+        at.session_state['pagina_overall'] = 1
+        at.run()
+    at.button(key='next_overall').click()
+
+
+INTERACCIONES: List[Interaccion] = [
+    Interaccion(
+        'equipos.cambio_equipo', PAGINAS['equipos'],
+        _alternar_selectbox('equipo_selector', "FC Barcelona (Spain LIGA BBVA)", "Real Madrid CF (Spain LIGA BBVA)"),
+    ),
+    Interaccion('jugadores.pagina_ranking', PAGINAS['jugadores'], _siguiente_pagina_ranking),
+    Interaccion(
+        'ligas.cambio_liga', PAGINAS['ligas'],
+        _alternar_selectbox('liga_comparador', "Spain - Spain LIGA BBVA", "England - England Premier League"),
+    ),
+    Interaccion(
+        'similares.cambio_jugador', PAGINAS['similares'],
+        _alternar_selectbox('similar_jugador', "Lionel Messi", "Cristiano Ronaldo"),
+    ),
+]
+
+
+def _preparar_entorno() -> None:
+    """Entorno reproducible: sin API real y sin el ruido de los logs de Streamlit."""
+    os.environ.setdefault('HUGGINGFACE_API_KEY', 'hf_benchmark')
+    os.environ.setdefault('IMAGE_BACKEND', 'local')
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+    # Sin calentamiento en segundo plano: la visita en frío debe pagar la carga completa
+    os.environ.setdefault('SOCCER_WARMUP', '0')
+    for ruta in (RAIZ, os.path.join(RAIZ, 'panel', 'src')):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+
+
+def _ejecutar(at) -> float:
+    """Ejecuta el script una vez y devuelve la duración en ms (falla si la página lanza una excepción)."""
+    inicio = time.perf_counter()
+    at.run()
+    duracion = (time.perf_counter() - inicio) * 1000
+    if at.exception:
+        raise RuntimeError(f"La página lanzó una excepción: {at.exception[0].value}")
+    return duracion
+
+
+def _nueva_sesion():
+    """Sesión nueva con todas las cachés vacías (las de Streamlit y el dataset del proceso)."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from utils.dataset import descartar_dataset
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    descartar_dataset()
+    at = AppTest.from_file(RUTA_APP, default_timeout=TIMEOUT_EJECUCION)
+    # Streamlit fija el nivel de cada uno de sus loggers: silenciarlos todos
+    for nombre in list(logging.root.manager.loggerDict):
+        if nombre.startswith('streamlit'):
+            logging.getLogger(nombre).setLevel(logging.ERROR)
+    return at
+
+
+def _resumen(muestras: List[float]) -> Dict[str, float]:
+    ordenadas = sorted(muestras)
+    return {
+        'mediana_ms': round(statistics.median(ordenadas), 2),
+        'min_ms': round(ordenadas[0], 2),
+        'max_ms': round(ordenadas[-1], 2),
+        'n': len(ordenadas),
+    }
+
+
+def ejecutar_benchmark(repeticiones: int = 3, paginas: Optional[List[str]] = None,
+                       interacciones: bool = True, progreso: Callable[[str], None] = print) -> dict:
+    """
+    Mide todas las páginas (o las indicadas) y sus interacciones.
+
+    Args:
+        repeticiones: Veces que se repite cada medida (se guarda la mediana)
+        paginas: Claves de PAGINAS a medir (por defecto, todas)
+        interacciones: Si False, solo se miden las visitas en frío y en caliente
+        progreso: Función que recibe los mensajes de progreso
+
+    Returns:
+        dict: {'metadata': {...}, 'escenarios': {nombre: {'mediana_ms', 'min_ms', 'max_ms', 'n'}}}
+    """
+    _preparar_entorno()
+    paginas = paginas or list(PAGINAS)
+    muestras: Dict[str, List[float]] = {}
+
+    for clave in paginas:
+        titulo = PAGINAS[clave]
+        for _ in range(repeticiones):
+            at = _nueva_sesion()
+            primera = _ejecutar(at)  # La app arranca siempre en la página de inicio
+            if titulo != at.sidebar.radio[0].value:
+                at.sidebar.radio[0].set_value(titulo)
+                primera = _ejecutar(at)
+            muestras.setdefault(f"{clave}.frio", []).append(primera)
+            muestras.setdefault(f"{clave}.caliente", []).append(_ejecutar(at))
+        progreso(f"⏱️ {clave}: frío {statistics.median(muestras[f'{clave}.frio']):.0f} ms · "
+                 f"caliente {statistics.median(muestras[f'{clave}.caliente']):.0f} ms")
+
+    if interacciones:
+        titulos = {PAGINAS[c] for c in paginas}
+        for interaccion in INTERACCIONES:
+            if interaccion.pagina not in titulos:
+                continue
+            at = _nueva_sesion()
+            _ejecutar(at)
+            at.sidebar.radio[0].set_value(interaccion.pagina)
+            _ejecutar(at)
+            for repeticion in range(repeticiones):
+                interaccion.accion(at, repeticion)
+                muestras.setdefault(interaccion.nombre, []).append(_ejecutar(at))
+            progreso(f"⏱️ {interaccion.nombre}: {statistics.median(muestras[interaccion.nombre]):.0f} ms")
+
+    import pandas as pd
+    import streamlit as st
+    return {
+        'metadata': {
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'streamlit': st.__version__,
+            'pandas': pd.__version__,
+            'repeticiones': repeticiones,
+        },
+        'escenarios': {nombre: _resumen(valores) for nombre, valores in muestras.items()},
+    }
+
+
+def comparar_con_baseline(resultados: dict, baseline: dict, umbral: float = UMBRAL_REGRESION,
+                          margen_minimo_ms: float = MARGEN_MINIMO_MS) -> List[dict]:
+    """
+    Detecta regresiones frente al baseline.
+
+    Un escenario empeora si su mediana supera la del baseline en más de `umbral`
+    (proporción) y en más de `margen_minimo_ms`. Los escenarios que no están en
+    ambos ficheros no se comparan: ver escenarios_sin_referencia().
+
+    Returns:
+        list: Regresiones [{'escenario', 'baseline_ms', 'actual_ms', 'cambio'}]
+    """
+    regresiones = []
+    for nombre, actual in resultados['escenarios'].items():
+        anterior = baseline.get('escenarios', {}).get(nombre)
+        if anterior is None:
+            continue
+        base_ms, actual_ms = anterior['mediana_ms'], actual['mediana_ms']
+        if actual_ms > base_ms * (1 + umbral) and actual_ms - base_ms > margen_minimo_ms:
+            regresiones.append({
+                'escenario': nombre,
+                'baseline_ms': base_ms,
+                'actual_ms': actual_ms,
+                'cambio': actual_ms / base_ms - 1 if base_ms else float('inf'),
+            })
+    return regresiones
+
+
+def escenarios_sin_referencia(resultados: dict, baseline: dict) -> Dict[str, List[str]]:
+    """
+    Escenarios que comparar_con_baseline() no puede comparar.
+
+    Returns:
+        dict: {'nuevos': medidos pero sin baseline, 'ausentes': en el baseline pero no medidos}
+    """
+    medidos = set(resultados['escenarios'])
+    referencia = set(baseline.get('escenarios', {}))
+    return {'nuevos': sorted(medidos - referencia), 'ausentes': sorted(referencia - medidos)}
+
+
+def guardar_json(datos: dict, ruta: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sin interfaz de las páginas de la app")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--paginas', nargs='+', choices=sorted(PAGINAS), help="Páginas a medir (por defecto, todas)")
+    parser.add_argument('--sin-interacciones', action='store_true', help="Medir solo visitas en frío y en caliente")
+    parser.add_argument('--baseline', default=RUTA_BASELINE, help="Fichero JSON de referencia")
+    parser.add_argument('--guardar-baseline', action='store_true', help="Sobrescribir el baseline con estos resultados")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION, help="Regresión máxima tolerada (0.3 = +30%%)")
+    parser.add_argument('--salida', help="Guardar también los resultados en este fichero JSON")
+    parser.add_argument('--dataset', help="Fichero de datos a cargar (ej: un dataset sintético de bench/synthetic_data.py)")
+    args = parser.parse_args(argv)
+
+    if args.dataset:
+        os.environ['SOCCER_DATA_FILE'] = os.path.abspath(args.dataset)
+
+    resultados = ejecutar_benchmark(args.repeticiones, args.paginas, not args.sin_interacciones)
+    if args.salida:
+        guardar_json(resultados, args.salida)
+
+    if args.guardar_baseline:
+        guardar_json(resultados, args.baseline)
+        print(f"💾 Baseline guardado en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No existe el baseline {args.baseline}. Créalo con --guardar-baseline")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regresiones = comparar_con_baseline(resultados, baseline, args.umbral)
+    sin_referencia = escenarios_sin_referencia(resultados, baseline)
+    if sin_referencia['ausentes']:
+        # Normal con --paginas o --sin-interacciones; si no, el escenario ha desaparecido del benchmark
+        print(f"⚠️ {len(sin_referencia['ausentes'])} escenarios del baseline no se han medido: "
+              + ", ".join(sin_referencia['ausentes']))
+    if sin_referencia['nuevos']:
+        print(f"❌ {len(sin_referencia['nuevos'])} escenarios no tienen baseline (regenéralo con --guardar-baseline): "
+              + ", ".join(sin_referencia['nuevos']))
+    if regresiones:
+        print(f"❌ {len(regresiones)} escenarios empeoran más de un {args.umbral:.0%}:")
+        for r in regresiones:
+            print(f"   · {r['escenario']}: {r['baseline_ms']:.0f} ms → {r['actual_ms']:.0f} ms (+{r['cambio']:.0%})")
+    if regresiones or sin_referencia['nuevos']:
+        return 1
+    print(f"✅ Sin regresiones frente al baseline (umbral {args.umbral:.0%})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Servidor HTTP local que imita la API de inferencia de Hugging Face.
+
+Sirve para probar y medir la generación de imágenes sin conexión ni cuota:
+devuelve PNGs sintéticos y reproduce los códigos de la API real (200, 503 con
+'estimated_time', 401, 404) y respuestas lentas, según un perfil configurable.
+
+Uso como script (desde la raíz del proyecto):
+    python bench/fake_hf_server.py --perfil realista --port 8765
+
+y arrancar la app apuntando al servidor local:
+    IMAGE_BACKEND=local IMAGE_BACKEND_URL=http://127.0.0.1:8765/models/ streamlit run app.py
+
+Uso desde código (tests / benchmarks):
+    server, base_url = start_fake_server(PerfilServidor(latencia_media=0.1))
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class PerfilServidor:
+    """Comportamiento del servidor simulado."""
+
+    latencia_media: float = 0.5        # Segundos por imagen
+    latencia_jitter: float = 0.1       # Desviación uniforme (+/-) sobre la media
+    prob_lento: float = 0.0            # Probabilidad de respuesta lenta
+    latencia_lenta: float = 30.0       # Segundos de una respuesta lenta
+    prob_503: float = 0.0              # Probabilidad de "modelo cargándose"
+    arranque_en_frio: int = 0          # Primeras N peticiones de cada modelo responden 503
+    estimated_time: float = 20.0       # Valor de 'estimated_time' en los 503
+    modelos_404: List[str] = field(default_factory=list)  # Modelos "inexistentes"
+    token_valido: Optional[str] = None  # Si se define, cualquier otro token recibe 401
+    semilla: int = 42                  # Semilla para que el perfil sea reproducible
+
+
+# Perfiles predefinidos para benchmarks y pruebas de carga
+PERFILES: Dict[str, PerfilServidor] = {
+    'rapido': PerfilServidor(latencia_media=0.1, latencia_jitter=0.02),
+    'realista': PerfilServidor(
+        latencia_media=8.0, latencia_jitter=4.0, prob_lento=0.05, latencia_lenta=45.0,
+        prob_503=0.05, arranque_en_frio=1, estimated_time=20.0,
+    ),
+    'inestable': PerfilServidor(latencia_media=2.0, latencia_jitter=1.5, prob_503=0.3, estimated_time=1.0),
+    'principal_caido': PerfilServidor(latencia_media=0.5, modelos_404=['black-forest-labs/FLUX.1-schnell']),
+}
+
+
+def imagen_sintetica(prompt: str, seed, ancho: int, alto: int) -> bytes:
+    """PNG determinista (mismo prompt + semilla = misma imagen)."""
+    from PIL import Image, ImageDraw
+
+    huella = hashlib.sha1(f"{prompt}|{seed}".encode('utf-8')).digest()
+    fondo = tuple(huella[0:3])
+    acento = tuple(huella[3:6])
+
+    imagen = Image.new('RGB', (ancho, alto), fondo)
+    dibujo = ImageDraw.Draw(imagen)
+    paso = max(8, ancho // 12)
+    for i, byte in enumerate(huella):
+        x = (byte * 7) % max(1, ancho - paso)
+        y = (i * paso) % max(1, alto - paso)
+        dibujo.ellipse([x, y, x + paso, y + paso], fill=acento)
+
+    buffer = BytesIO()
+    imagen.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class _EstadoServidor:
+    """Estado compartido entre hilos del servidor: RNG, contadores y perfil."""
+
+    def __init__(self, perfil: PerfilServidor):
+        self.perfil = perfil
+        self.rng = random.Random(perfil.semilla)
+        self.lock = threading.Lock()
+        self.peticiones_por_modelo: Dict[str, int] = {}
+        self.respuestas: Dict[int, int] = {}
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    def decidir(self, modelo: str, autorizacion: str) -> Tuple[int, float]:
+        """Devuelve (código de estado, latencia) para una petición."""
+        perfil = self.perfil
+        with self.lock:
+            n = self.peticiones_por_modelo.get(modelo, 0)
+            self.peticiones_por_modelo[modelo] = n + 1
+            tirada_503 = self.rng.random()
+            tirada_lento = self.rng.random()
+            jitter = self.rng.uniform(-perfil.latencia_jitter, perfil.latencia_jitter)
+
+        if perfil.token_valido is not None and autorizacion != f"Bearer {perfil.token_valido}":
+            return 401, 0.01
+        if modelo in perfil.modelos_404:
+            return 404, 0.01
+        if n < perfil.arranque_en_frio or tirada_503 < perfil.prob_503:
+            return 503, 0.05
+        if tirada_lento < perfil.prob_lento:
+            return 200, perfil.latencia_lenta
+        return 200, max(0.0, perfil.latencia_media + jitter)
+
+    def registrar(self, status: int) -> None:
+        with self.lock:
+            self.respuestas[status] = self.respuestas.get(status, 0) + 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'peticiones_por_modelo': dict(self.peticiones_por_modelo),
+                'respuestas': {str(k): v for k, v in self.respuestas.items()},
+                'en_curso': self.en_curso,
+                'max_en_curso': self.max_en_curso,
+            }
+
+
+def _crear_handler(estado: _EstadoServidor):
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass  # Silencioso: los benchmarks no necesitan el log de cada petición
+
+        def _responder(self, status: int, cuerpo: bytes, tipo: str) -> None:
+            # Registrar antes de enviar: el cliente puede consultar /stats nada más recibir
+            estado.registrar(status)
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _responder_json(self, status: int, datos: dict) -> None:
+            self._responder(status, json.dumps(datos).encode('utf-8'), 'application/json')
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._responder_json(200, estado.stats())
+            else:
+                self._responder_json(404, {'error': 'Not Found'})
+
+        def do_POST(self):
+            longitud = int(self.headers.get('Content-Length', 0))
+            try:
+                payload = json.loads(self.rfile.read(longitud) or b'{}')
+            except ValueError:
+                self._responder_json(400, {'error': 'Invalid JSON'})
+                return
+
+            if not self.path.startswith('/models/'):
+                self._responder_json(404, {'error': 'Not Found'})
+                return
+            modelo = self.path[len('/models/'):]
+
+            with estado.lock:
+                estado.en_curso += 1
+                estado.max_en_curso = max(estado.max_en_curso, estado.en_curso)
+            try:
+                status, latencia = estado.decidir(modelo, self.headers.get('Authorization', ''))
+                time.sleep(latencia)
+
+                if status == 401:
+                    self._responder_json(401, {'error': 'Invalid credentials in Authorization header'})
+                elif status == 404:
+                    self._responder_json(404, {'error': f"Model {modelo} does not exist"})
+                elif status == 503:
+                    self._responder_json(503, {
+                        'error': f"Model {modelo} is currently loading",
+                        'estimated_time': estado.perfil.estimated_time,
+                    })
+                else:
+                    parametros = payload.get('parameters', {})
+                    png = imagen_sintetica(
+                        payload.get('inputs', ''),
+                        parametros.get('seed'),
+                        int(parametros.get('width', 768)),
+                        int(parametros.get('height', 768)),
+                    )
+                    self._responder(200, png, 'image/png')
+            finally:
+                with estado.lock:
+                    estado.en_curso -= 1
+
+    return _Handler
+
+
+def start_fake_server(perfil: Optional[PerfilServidor] = None, host: str = '127.0.0.1', port: int = 0):
+    """
+    Arranca el servidor en un hilo en segundo plano.
+
+    Args:
+        perfil: Comportamiento del servidor (por defecto, 'rapido')
+        host: Interfaz de escucha
+        port: Puerto (0 = uno libre cualquiera)
+
+    Returns:
+        tuple: (servidor, URL base de los modelos). Parar con `servidor.shutdown()`.
+    """
+    estado = _EstadoServidor(perfil or PERFILES['rapido'])
+    servidor = ThreadingHTTPServer((host, port), _crear_handler(estado))
+    servidor.daemon_threads = True
+    servidor.estado = estado
+    hilo = threading.Thread(target=servidor.serve_forever, name='fake_hf_server', daemon=True)
+    hilo.start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}/models/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de Hugging Face")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--perfil', choices=sorted(PERFILES), default='rapido')
+    parser.add_argument('--latencia', type=float, help="Sobrescribe la latencia media (s)")
+    parser.add_argument('--prob-503', type=float, help="Sobrescribe la probabilidad de 503")
+    parser.add_argument('--token', help="Único token aceptado (el resto recibe 401)")
+    parser.add_argument('--semilla', type=int, help="Semilla del perfil")
+    args = parser.parse_args()
+
+    perfil = PERFILES[args.perfil]
+    cambios = {
+        'latencia_media': args.latencia,
+        'prob_503': args.prob_503,
+        'token_valido': args.token,
+        'semilla': args.semilla,
+    }
+    perfil = replace(perfil, **{k: v for k, v in cambios.items() if v is not None})
+
+    servidor, base_url = start_fake_server(perfil, args.host, args.port)
+    print(f"✅ Servidor simulado de Hugging Face escuchando en {base_url} (perfil '{args.perfil}')")
+    print(f"   Estadísticas: http://{args.host}:{servidor.server_address[1]}/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+        print("🛑 Servidor detenido")
+
+
+if __name__ == '__main__':
+    main()
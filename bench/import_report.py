@@ -0,0 +1,163 @@
+"""
+Informe de tiempos de importación del arranque en frío.
+
+Cada medida se hace en un intérprete nuevo con `python -X importtime`, que
+imprime el coste de cada módulo importado (propio y acumulado). El arranque se
+divide en fases, igual que en el servidor:
+
+  - servidor: `import streamlit` (lo hace `streamlit run` antes de ejecutar la app)
+  - app: los imports de nivel de módulo de app.py (se leen del propio fichero)
+  - <página>: el módulo de cada página, que app.py importa en su primera visita
+
+Para cada fase se informa del tiempo total y de los módulos más caros, lo que
+permite comparar el arranque antes y después de un cambio (por ejemplo, en el
+contenedor de Spaces recién arrancado).
+
+Uso (desde la raíz del proyecto):
+    python -m bench.import_report
+    python -m bench.import_report --repeticiones 5 --top 10 --salida imports.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, 'app.py')
+
+PAGINAS = {
+    'inicio': 'ui.home',
+    'jugadores': 'ui.players',
+    'equipos': 'ui.teams',
+    'ligas': 'ui.leagues',
+    'ia_players': 'ui.iaPlayers',
+}
+
+MARCA_FASE = '### fase:'
+
+
+def imports_de_la_app(ruta: str = RUTA_APP) -> List[str]:
+    """Sentencias import de nivel de módulo de app.py (en orden), como código fuente."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    arbol = ast.parse(codigo)
+    return [ast.get_source_segment(codigo, nodo) for nodo in arbol.body
+            if isinstance(nodo, (ast.Import, ast.ImportFrom))]
+
+
+def _script(pagina: str) -> str:
+    """Programa que importa las fases en orden, marcando en stderr el inicio de cada una."""
+    lineas = [
+        'import sys',
+        f'sys.path.insert(0, {os.path.join(RAIZ, "panel", "src")!r})',
+        f'sys.stderr.write("{MARCA_FASE}servidor\\n")',
+        'import streamlit',
+        f'sys.stderr.write("{MARCA_FASE}app\\n")',
+        *imports_de_la_app(),
+        f'sys.stderr.write("{MARCA_FASE}{pagina}\\n")',
+        f'import {PAGINAS[pagina]}',
+    ]
+    return '\n'.join(lineas)
+
+
+def parsear_importtime(salida: str) -> Dict[str, List[dict]]:
+    """
+    Convierte la salida de -X importtime en {fase: [{'modulo', 'propio_ms', 'acumulado_ms', 'nivel'}]}.
+
+    Solo se conservan las líneas de cada fase (los módulos ya importados en una
+    fase anterior no vuelven a aparecer).
+    """
+    fases: Dict[str, List[dict]] = {}
+    fase = None
+    for linea in salida.splitlines():
+        if linea.startswith(MARCA_FASE):
+            fase = linea[len(MARCA_FASE):].strip()
+            fases[fase] = []
+            continue
+        if fase is None or not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        fases[fase].append({
+            'modulo': nombre.strip(),
+            'propio_ms': int(propio) / 1000,
+            'acumulado_ms': int(acumulado) / 1000,
+            # -X importtime sangra dos espacios por nivel de anidamiento
+            'nivel': (len(nombre) - len(nombre.lstrip()) - 1) // 2,
+        })
+    return fases
+
+
+def medir_pagina(pagina: str) -> Dict[str, List[dict]]:
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _script(pagina)],
+        capture_output=True, text=True, cwd=RAIZ, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Error importando la página {pagina}:\n{proceso.stderr[-2000:]}")
+    return parsear_importtime(proceso.stderr)
+
+
+def informe(repeticiones: int = 3, top: int = 10, paginas: List[str] = None) -> dict:
+    """
+    Tiempos de importación por fase (medianas de `repeticiones` intérpretes nuevos).
+
+    Returns:
+        dict: {fase: {'total_ms', 'modulos': [{'modulo', 'propio_ms', 'acumulado_ms'}]}}
+    """
+    muestras: Dict[str, List[Dict[str, List[dict]]]] = {}
+    for pagina in paginas or list(PAGINAS):
+        for _ in range(repeticiones):
+            for fase, modulos in medir_pagina(pagina).items():
+                # Las fases comunes (servidor, app) se miden una vez por página
+                muestras.setdefault(fase, []).append(modulos)
+
+    resultado = {}
+    for fase, ejecuciones in muestras.items():
+        totales = [sum(m['acumulado_ms'] for m in modulos if m['nivel'] == 0) for modulos in ejecuciones]
+        propios: Dict[str, List[float]] = {}
+        acumulados: Dict[str, List[float]] = {}
+        for modulos in ejecuciones:
+            for m in modulos:
+                propios.setdefault(m['modulo'], []).append(m['propio_ms'])
+                acumulados.setdefault(m['modulo'], []).append(m['acumulado_ms'])
+        ranking = sorted(propios, key=lambda nombre: -statistics.median(propios[nombre]))[:top]
+        resultado[fase] = {
+            'total_ms': round(statistics.median(totales), 1),
+            'modulos': [{
+                'modulo': nombre,
+                'propio_ms': round(statistics.median(propios[nombre]), 1),
+                'acumulado_ms': round(statistics.median(acumulados[nombre]), 1),
+            } for nombre in ranking],
+        }
+    return resultado
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempos de importación del arranque, por fase y módulo")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10, help="Módulos más caros a mostrar por fase")
+    parser.add_argument('--paginas', nargs='+', choices=sorted(PAGINAS))
+    parser.add_argument('--salida', help="Guardar el informe en este fichero JSON")
+    args = parser.parse_args(argv)
+
+    resultado = informe(args.repeticiones, args.top, args.paginas)
+    for fase, datos in resultado.items():
+        print(f"\n📦 {fase}: {datos['total_ms']:.0f} ms")
+        for m in datos['modulos']:
+            print(f"   {m['propio_ms']:8.1f} ms propio · {m['acumulado_ms']:8.1f} ms acumulado · {m['modulo']}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\n💾 Informe guardado en {args.salida}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
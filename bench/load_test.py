@@ -0,0 +1,492 @@
+"""
+Prueba de carga con sesiones concurrentes.
+
+Arranca la app con `streamlit run` en un proceso aparte y simula N usuarios a la
+vez hablando el mismo protocolo que el navegador: mensajes BackMsg/ForwardMsg
+por el websocket `/_stcore/stream`. Cada usuario sigue un guion de navegación
+realista con pausas de lectura entre acciones: abre la app, va a Equipos y cambia
+de equipo, va a Jugadores y pasa páginas del ranking, va a Ligas y cambia de liga.
+
+Para cada nivel de concurrencia se mide:
+  - latencia de cada re-ejecución (p50/p95/p99), desde que se envía el cambio
+    de widget hasta que llega `script_finished`
+  - throughput: re-ejecuciones completadas por segundo
+  - memoria del servidor: RSS del proceso de streamlit (máximo y al terminar el nivel)
+  - errores: excepciones en la página, desconexiones y timeouts
+
+AppTest (el arnés de bench_pages.py) no sirve aquí: sustituye un Runtime global
+del proceso en cada ejecución y no admite varias a la vez.
+
+Requiere el paquete `websockets` (pip install websockets). La memoria se lee de
+/proc, así que solo se informa en Linux.
+
+Uso (desde la raíz del proyecto):
+    python -m bench.load_test --usuarios 1 5 10 20 --duracion 30
+    python -m bench.load_test --usuarios 10 --pausa 0 --salida load.json     # sin pausas: máximo throughput
+    python -m bench.load_test --dataset data/synthetic/data_x100.parquet
+    python -m bench.load_test --url http://127.0.0.1:8501 --pid 1234        # servidor ya arrancado
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .bench_pages import PAGINAS, RAIZ, RUTA_APP, guardar_json
+
+# Tiempo máximo de una re-ejecución antes de darla por perdida (segundos)
+TIMEOUT_RERUN = 120
+# Tiempo máximo de arranque del servidor (segundos)
+TIMEOUT_ARRANQUE = 60
+# Intervalo de muestreo de la memoria del servidor (segundos)
+INTERVALO_MEMORIA = 0.5
+
+PERCENTILES = (50, 95, 99)
+
+
+def _percentil(ordenadas: List[float], p: float) -> Optional[float]:
+    """Percentil por rango más cercano (sin interpolar) de una lista ordenada."""
+    if not ordenadas:
+        return None
+    return ordenadas[max(0, math.ceil(p / 100 * len(ordenadas)) - 1)]
+
+
+def _rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Memoria residente (RSS) del proceso según /proc (None fuera de Linux o sin pid)."""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# ============================
+# 🔌 Cliente del protocolo
+# ============================
+
+class SesionStreamlit:
+    """
+    Una sesión de navegador simulada sobre el websocket de Streamlit.
+
+    Como el navegador, envía en cada re-ejecución el valor de todos los widgets
+    visibles (los que el usuario no ha tocado no se envían y el servidor usa su
+    valor por defecto).
+    """
+
+    def __init__(self, url_ws: str):
+        self.url_ws = url_ws
+        self._ws = None
+        self.widgets: Dict[str, tuple] = {}       # id -> (tipo, proto) de la última re-ejecución
+        self._valores: Dict[str, object] = {}     # id -> WidgetState fijado por el usuario
+        self.excepciones = 0
+
+    async def conectar(self) -> None:
+        import websockets
+        self._ws = await websockets.connect(self.url_ws, subprotocols=['streamlit'], max_size=None)
+
+    async def cerrar(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+
+    def buscar(self, clave: Optional[str] = None, etiqueta: Optional[str] = None):
+        """Widget de la última re-ejecución por su key o, si no tiene, por su etiqueta."""
+        for id_widget, (tipo, proto) in self.widgets.items():
+            if clave is not None and id_widget.endswith(f'-{clave}'):
+                return id_widget, tipo, proto
+            if etiqueta is not None and proto.label == etiqueta:
+                return id_widget, tipo, proto
+        return None
+
+    def elegir(self, id_widget: str, proto, opcion: str) -> None:
+        """Fija la opción de un radio o selectbox (por texto en versiones recientes, por índice en las antiguas)."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        estado = WidgetState(id=id_widget)
+        if 'raw_value' in proto.DESCRIPTOR.fields_by_name:
+            estado.string_value = opcion
+        else:
+            estado.int_value = list(proto.options).index(opcion)
+        self._valores[id_widget] = estado
+
+    async def rerun(self, pulsar: Optional[str] = None) -> float:
+        """
+        Pide una re-ejecución (opcionalmente pulsando el botón `pulsar`) y espera a que termine.
+
+        Returns:
+            float: Duración en ms hasta el último script_finished (incluye los st.rerun() de la página)
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ''
+        mensaje.rerun_script.page_script_hash = ''
+        visibles = [estado for id_widget, estado in self._valores.items()
+                    if id_widget in self.widgets or not self.widgets]
+        mensaje.rerun_script.widget_states.widgets.extend(visibles)
+        if pulsar is not None:
+            mensaje.rerun_script.widget_states.widgets.append(WidgetState(id=pulsar, trigger_value=True))
+
+        relanzado = ForwardMsg.ScriptFinishedStatus.Value('FINISHED_EARLY_FOR_RERUN')
+        inicio = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+        widgets = {}
+        while True:
+            recibido = ForwardMsg()
+            recibido.ParseFromString(await asyncio.wait_for(self._ws.recv(), TIMEOUT_RERUN))
+            tipo = recibido.WhichOneof('type')
+            if tipo == 'delta' and recibido.delta.WhichOneof('type') == 'new_element':
+                elemento = recibido.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento == 'exception':
+                    self.excepciones += 1
+                elif tipo_elemento in ('radio', 'selectbox', 'button'):
+                    proto = getattr(elemento, tipo_elemento)
+                    widgets[proto.id] = (tipo_elemento, proto)
+            elif tipo == 'script_finished' and recibido.script_finished != relanzado:
+                break
+        self.widgets = widgets
+        return (time.perf_counter() - inicio) * 1000
+
+
+# ============================
+# 🧭 Guion de navegación
+# ============================
+
+@dataclass
+class Accion:
+    """Paso del guion: prepara los widgets de la sesión y devuelve el botón a pulsar (o None)."""
+
+    nombre: str
+    preparar: Callable  # preparar(sesion, aleatorio) -> Optional[str]
+
+
+def _ir_a(clave_pagina: str) -> Accion:
+    def preparar(sesion: SesionStreamlit, aleatorio: random.Random):
+        encontrado = sesion.buscar(etiqueta="Ir a")
+        if encontrado:
+            sesion.elegir(encontrado[0], encontrado[2], PAGINAS[clave_pagina])
+    return Accion(f"ir_a.{clave_pagina}", preparar)
+
+
+def _cambiar_selectbox(nombre: str, clave: str) -> Accion:
+    """Elige al azar otra opción del selectbox `clave` (como un usuario que explora)."""
+    def preparar(sesion: SesionStreamlit, aleatorio: random.Random):
+        encontrado = sesion.buscar(clave=clave)
+        if encontrado and encontrado[2].options:
+            sesion.elegir(encontrado[0], encontrado[2], aleatorio.choice(list(encontrado[2].options)))
+    return Accion(nombre, preparar)
+
+
+def _siguiente_pagina_ranking(sesion: SesionStreamlit, aleatorio: random.Random):
+    encontrado = sesion.buscar(clave='next_overall')
+    if encontrado and not encontrado[2].disabled:
+        return encontrado[0]
+    # En la última página se vuelve a la primera
+    encontrado = sesion.buscar(clave='prev_overall')
+    return encontrado[0] if encontrado and not encontrado[2].disabled else None
+
+
+GUION: List[Accion] = [
+    _ir_a('equipos'),
+    _cambiar_selectbox('equipos.cambio_equipo', 'equipo_selector'),
+    _cambiar_selectbox('equipos.cambio_comparado', 'equipo_comparar'),
+    _ir_a('jugadores'),
+    Accion('jugadores.pagina_ranking', _siguiente_pagina_ranking),
+    Accion('jugadores.pagina_ranking', _siguiente_pagina_ranking),
+    _ir_a('ligas'),
+    _cambiar_selectbox('ligas.cambio_liga', 'liga_comparador'),
+    _cambiar_selectbox('ligas.cambio_liga_equipos', 'liga_equipos'),
+    _ir_a('inicio'),
+]
+
+
+@dataclass
+class Muestra:
+    accion: str
+    duracion_ms: float
+    usuario: int
+
+
+@dataclass
+class ResultadoNivel:
+    usuarios: int
+    muestras: List[Muestra] = field(default_factory=list)
+    errores: List[str] = field(default_factory=list)
+    excepciones: int = 0
+    duracion_s: float = 0.0
+    rss_bytes: List[int] = field(default_factory=list)
+
+
+async def _usuario(indice: int, url_ws: str, fin: float, pausa: float, semilla: int,
+                   resultado: ResultadoNivel) -> None:
+    """Un usuario: abre la app y recorre el guion en bucle hasta `fin` (reloj de perf_counter)."""
+    aleatorio = random.Random(semilla * 1000 + indice)
+    # Los usuarios no llegan todos en el mismo milisegundo
+    await asyncio.sleep(aleatorio.uniform(0, max(pausa, 0.2)))
+    sesion = SesionStreamlit(url_ws)
+    try:
+        await sesion.conectar()
+        resultado.muestras.append(Muestra('abrir', await sesion.rerun(), indice))
+        paso = aleatorio.randrange(len(GUION))
+        while time.perf_counter() < fin:
+            if pausa > 0:
+                await asyncio.sleep(aleatorio.uniform(0.5, 1.5) * pausa)
+            accion = GUION[paso % len(GUION)]
+            paso += 1
+            pulsar = accion.preparar(sesion, aleatorio)
+            resultado.muestras.append(Muestra(accion.nombre, await sesion.rerun(pulsar), indice))
+    except Exception as e:
+        resultado.errores.append(f"usuario {indice}: {type(e).__name__}: {e}")
+    finally:
+        resultado.excepciones += sesion.excepciones
+        try:
+            await sesion.cerrar()
+        except Exception:
+            pass
+
+
+async def _vigilar_memoria(pid: Optional[int], resultado: ResultadoNivel, parar: asyncio.Event) -> None:
+    while not parar.is_set():
+        rss = _rss_bytes(pid)
+        if rss is not None:
+            resultado.rss_bytes.append(rss)
+        try:
+            await asyncio.wait_for(parar.wait(), INTERVALO_MEMORIA)
+        except asyncio.TimeoutError:
+            pass
+    rss = _rss_bytes(pid)
+    if rss is not None:
+        resultado.rss_bytes.append(rss)
+
+
+async def _ejecutar_nivel(usuarios: int, url_ws: str, duracion: float, pausa: float,
+                          semilla: int, pid: Optional[int]) -> ResultadoNivel:
+    resultado = ResultadoNivel(usuarios)
+    parar = asyncio.Event()
+    vigilante = asyncio.create_task(_vigilar_memoria(pid, resultado, parar))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _usuario(i, url_ws, inicio + duracion, pausa, semilla, resultado) for i in range(usuarios)
+    ))
+    resultado.duracion_s = time.perf_counter() - inicio
+    parar.set()
+    await vigilante
+    return resultado
+
+
+def _resumen_latencias(duraciones: List[float]) -> dict:
+    ordenadas = sorted(duraciones)
+    resumen = {'n': len(ordenadas)}
+    for p in PERCENTILES:
+        valor = _percentil(ordenadas, p)
+        resumen[f'p{p}_ms'] = round(valor, 1) if valor is not None else None
+    resumen['max_ms'] = round(ordenadas[-1], 1) if ordenadas else None
+    return resumen
+
+
+def resumir_nivel(resultado: ResultadoNivel) -> dict:
+    """
+    Resumen de un nivel de concurrencia.
+
+    Returns:
+        dict: {'usuarios', 'reruns', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+               'errores', 'excepciones', 'rss_max_mb', 'rss_final_mb', 'por_accion': {accion: {...}}}
+    """
+    por_accion: Dict[str, List[float]] = {}
+    for muestra in resultado.muestras:
+        por_accion.setdefault(muestra.accion, []).append(muestra.duracion_ms)
+    latencias = _resumen_latencias([m.duracion_ms for m in resultado.muestras])
+    return {
+        'usuarios': resultado.usuarios,
+        'reruns': latencias.pop('n'),
+        'throughput_rps': round(len(resultado.muestras) / resultado.duracion_s, 2) if resultado.duracion_s else 0.0,
+        **latencias,
+        'errores': len(resultado.errores),
+        'detalle_errores': resultado.errores[:10],
+        'excepciones': resultado.excepciones,
+        'rss_max_mb': round(max(resultado.rss_bytes) / 1024**2, 1) if resultado.rss_bytes else None,
+        'rss_final_mb': round(resultado.rss_bytes[-1] / 1024**2, 1) if resultado.rss_bytes else None,
+        'por_accion': {accion: _resumen_latencias(valores) for accion, valores in sorted(por_accion.items())},
+    }
+
+
+# ============================
+# 🚀 Servidor y ejecución
+# ============================
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(url: str, proceso: Optional[subprocess.Popen] = None) -> None:
+    limite = time.time() + TIMEOUT_ARRANQUE
+    while time.time() < limite:
+        if proceso is not None and proceso.poll() is not None:
+            raise RuntimeError(f"El servidor de streamlit terminó al arrancar (código {proceso.returncode})")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as respuesta:
+                if respuesta.read().strip() == b'ok':
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {TIMEOUT_ARRANQUE}s ({url})")
+
+
+def arrancar_servidor(puerto: int, dataset: Optional[str] = None) -> subprocess.Popen:
+    """Lanza `streamlit run app.py` en segundo plano, sin API real de imágenes ni recarga al guardar."""
+    entorno = dict(os.environ)
+    entorno.setdefault('HUGGINGFACE_API_KEY', 'hf_benchmark')
+    entorno.setdefault('IMAGE_BACKEND', 'local')
+    if dataset:
+        entorno['SOCCER_DATA_FILE'] = os.path.abspath(dataset)
+    comando = [
+        sys.executable, '-m', 'streamlit', 'run', RUTA_APP,
+        '--server.headless', 'true',
+        '--server.address', '127.0.0.1',
+        '--server.port', str(puerto),
+        '--server.runOnSave', 'false',
+        '--server.fileWatcherType', 'none',
+        '--server.enableXsrfProtection', 'false',
+        '--browser.gatherUsageStats', 'false',
+        '--logger.level', 'error',
+    ]
+    return subprocess.Popen(comando, cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def ejecutar_prueba(niveles: List[int], duracion: float = 30.0, pausa: float = 1.0, semilla: int = 42,
+                    url: Optional[str] = None, pid: Optional[int] = None, dataset: Optional[str] = None,
+                    progreso: Callable[[str], None] = print) -> dict:
+    """
+    Ejecuta la prueba de carga para cada nivel de concurrencia (en orden).
+
+    Args:
+        niveles: Usuarios simultáneos de cada nivel (ej: [1, 5, 10, 20])
+        duracion: Segundos que dura cada nivel
+        pausa: Tiempo medio de lectura entre dos acciones de un usuario (0 = sin pausas)
+        semilla: Semilla de los guiones (misma semilla, mismas elecciones)
+        url: Servidor ya arrancado (si no, se arranca uno en un puerto libre)
+        pid: Proceso del servidor ya arrancado, para medir su memoria
+        dataset: Fichero de datos para el servidor que se arranca (SOCCER_DATA_FILE)
+        progreso: Función que recibe los mensajes de progreso
+
+    Returns:
+        dict: {'metadata': {...}, 'primera_carga_ms', 'niveles': [resumen de cada nivel]}
+    """
+    proceso = None
+    if url is None:
+        puerto = _puerto_libre()
+        url = f"http://127.0.0.1:{puerto}"
+        proceso = arrancar_servidor(puerto, dataset)
+        pid = proceso.pid
+    url = url.rstrip('/')
+    url_ws = url.replace('http', 'ws', 1) + '/_stcore/stream'
+
+    try:
+        _esperar_servidor(url, proceso)
+        progreso(f"🚀 Servidor listo en {url}")
+
+        # Una visita previa paga la carga del dataset, que no debe contar en el primer nivel
+        async def primera_visita() -> float:
+            sesion = SesionStreamlit(url_ws)
+            await sesion.conectar()
+            try:
+                return await sesion.rerun()
+            finally:
+                await sesion.cerrar()
+        primera_carga = asyncio.run(primera_visita())
+        progreso(f"📥 Primera visita (carga de datos): {primera_carga:.0f} ms")
+
+        resumenes = []
+        for usuarios in niveles:
+            resultado = asyncio.run(_ejecutar_nivel(usuarios, url_ws, duracion, pausa, semilla, pid))
+            resumen = resumir_nivel(resultado)
+            resumenes.append(resumen)
+            memoria = f" · RSS {resumen['rss_max_mb']:.0f} MB" if resumen['rss_max_mb'] is not None else ""
+            progreso(f"👥 {usuarios:>3} usuarios: {resumen['reruns']} reruns · {resumen['throughput_rps']:.1f}/s · "
+                     f"p50 {resumen['p50_ms'] or 0:.0f} ms · p95 {resumen['p95_ms'] or 0:.0f} ms · "
+                     f"p99 {resumen['p99_ms'] or 0:.0f} ms{memoria} · {resumen['errores']} errores")
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+
+    import streamlit as st
+    return {
+        'metadata': {
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'streamlit': st.__version__,
+            'duracion_nivel_s': duracion,
+            'pausa_s': pausa,
+            'semilla': semilla,
+            'dataset': dataset or os.getenv('SOCCER_DATA_FILE'),
+        },
+        'primera_carga_ms': round(primera_carga, 1),
+        'niveles': resumenes,
+    }
+
+
+def imprimir_tabla(resultados: dict) -> None:
+    print(f"\n{'usuarios':>8} {'reruns':>7} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'RSS MB':>8} {'errores':>8}")
+    for nivel in resultados['niveles']:
+        rss = f"{nivel['rss_max_mb']:.0f}" if nivel['rss_max_mb'] is not None else '-'
+        print(f"{nivel['usuarios']:>8} {nivel['reruns']:>7} {nivel['throughput_rps']:>7.1f} "
+              f"{nivel['p50_ms'] or 0:>8.0f} {nivel['p95_ms'] or 0:>8.0f} {nivel['p99_ms'] or 0:>8.0f} "
+              f"{rss:>8} {nivel['errores'] + nivel['excepciones']:>8}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes de Streamlit")
+    parser.add_argument('--usuarios', type=int, nargs='+', default=[1, 5, 10, 20],
+                        help="Usuarios simultáneos de cada nivel")
+    parser.add_argument('--duracion', type=float, default=30.0, help="Segundos por nivel")
+    parser.add_argument('--pausa', type=float, default=1.0,
+                        help="Tiempo medio de lectura entre acciones en segundos (0 = sin pausas)")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--url', help="Servidor ya arrancado (ej: http://127.0.0.1:8501)")
+    parser.add_argument('--pid', type=int, help="PID del servidor ya arrancado, para medir su memoria")
+    parser.add_argument('--dataset', help="Fichero de datos del servidor que se arranca (SOCCER_DATA_FILE)")
+    parser.add_argument('--salida', help="Guardar los resultados en este fichero JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        print("❌ La prueba de carga necesita el paquete 'websockets': pip install websockets")
+        return 1
+
+    resultados = ejecutar_prueba(args.usuarios, args.duracion, args.pausa, args.semilla,
+                                 args.url, args.pid, args.dataset)
+    imprimir_tabla(resultados)
+    if args.salida:
+        guardar_json(resultados, args.salida)
+        print(f"💾 Resultados guardados en {args.salida}")
+    fallos = sum(n['errores'] + n['excepciones'] for n in resultados['niveles'])
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Generador de datasets sintéticos a escala para pruebas de rendimiento.
+
+`data/data.csv` tiene unos 4.000 jugadores, un tamaño que esconde cualquier
+recorrido O(n²) o copia innecesaria en las páginas. Este módulo crea versiones
+sintéticas con el mismo esquema (mismas columnas y tipos) y 10×, 100× o 1000×
+filas, conservando las propiedades que importan para medir:
+
+  - Atributos: remuestreo de filas reales con un pequeño ruido gaussiano (un KDE
+    con ancho de banda estrecho). Se conservan las distribuciones de cada columna
+    y las correlaciones entre atributos, incluida la separación porteros/campo.
+  - Cardinalidades: cada liga se replica tantas veces como la escala, con sus
+    mismos equipos ("Spain LIGA BBVA 2", "Real Madrid CF 2"...). Así se mantienen
+    los equipos por liga, los jugadores por equipo y el nivel relativo de cada liga.
+  - Nombres: combinaciones de nombres y apellidos reales (con sus tildes) para que
+    la búsqueda por nombre se mida con datos parecidos a los reales.
+
+Uso (desde la raíz del proyecto):
+    python -m bench.synthetic_data --escalas 10 100 1000 --formatos csv parquet
+
+Los ficheros se escriben en data/synthetic/ y se cargan en la app con
+    SOCCER_DATA_FILE=data/synthetic/data_x100.parquet streamlit run app.py
+"""
+
+import argparse
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_BASE = os.path.join(RAIZ, 'data', 'data.csv')
+DIRECTORIO_SALIDA = os.path.join(RAIZ, 'data', 'synthetic')
+
+# Atributos enteros 0-100 a los que se aplica el ruido
+COLUMNAS_ATRIBUTOS = [
+    'overall_rating', 'ball_control', 'dribbling', 'finishing', 'free_kick_accuracy',
+    'heading_accuracy', 'short_passing', 'shot_power', 'penalties', 'acceleration',
+    'sprint_speed', 'agility', 'stamina', 'jumping', 'aggression', 'gk_diving', 'gk_reflexes',
+]
+
+# Desviación del ruido, como fracción de la desviación típica de cada columna
+RUIDO_POR_DEFECTO = 0.05
+
+# Formatos soportados y su extensión
+FORMATOS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'pickle': '.pkl',
+}
+
+
+def _parquet_disponible() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _separar_nombres(nombres: pd.Series):
+    """Devuelve (nombres de pila, apellidos, nombres de una sola palabra)."""
+    partes = nombres.str.split(' ', n=1)
+    compuestos = partes[partes.str.len() == 2]
+    simples = nombres[partes.str.len() == 1]
+    return (
+        compuestos.str[0].to_numpy(dtype=object),
+        compuestos.str[1].to_numpy(dtype=object),
+        simples.to_numpy(dtype=object),
+    )
+
+
+def generar_dataset(n_jugadores: int, df_base: Optional[pd.DataFrame] = None, semilla: int = 42,
+                    ruido: float = RUIDO_POR_DEFECTO) -> pd.DataFrame:
+    """
+    Genera un dataset sintético con el esquema de `data.csv`.
+
+    Args:
+        n_jugadores: Número de filas a generar
+        df_base: Dataset real de referencia (por defecto, data/data.csv)
+        semilla: Semilla del generador (mismo valor = mismo dataset)
+        ruido: Desviación del ruido de los atributos (fracción de su desviación típica)
+
+    Returns:
+        pd.DataFrame: Dataset sintético con las mismas columnas y tipos que el base
+    """
+    if df_base is None:
+        df_base = pd.read_csv(RUTA_BASE)
+    rng = np.random.default_rng(semilla)
+    n_base = len(df_base)
+
+    # 1) Remuestreo de filas reales (conserva correlaciones y categorías de cada jugador)
+    filas = rng.integers(0, n_base, size=n_jugadores)
+    df = df_base.iloc[filas].reset_index(drop=True)
+
+    # 2) Ruido gaussiano sobre los atributos, redondeado y acotado al rango observado
+    columnas = [c for c in COLUMNAS_ATRIBUTOS + ['weight'] if c in df.columns]
+    valores = df[columnas].to_numpy(dtype=np.float32)
+    desviaciones = df_base[columnas].std().to_numpy(dtype=np.float32) * ruido
+    valores += rng.standard_normal(valores.shape, dtype=np.float32) * desviaciones
+    minimos = df_base[columnas].min().to_numpy(dtype=np.float32)
+    maximos = df_base[columnas].max().to_numpy(dtype=np.float32)
+    valores = np.clip(np.rint(valores), minimos, maximos)
+    for i, columna in enumerate(columnas):
+        df[columna] = valores[:, i].astype(df_base[columna].dtype)
+
+    # 3) Réplicas de ligas y equipos: cada jugador va a una copia aleatoria de su liga
+    copias = max(1, math.ceil(n_jugadores / n_base))
+    copia = rng.integers(0, copias, size=n_jugadores)
+    if copias > 1:
+        sufijo = pd.Series(np.where(copia > 0, ' ' + (copia + 1).astype(str).astype(object), ''), dtype=object)
+        df['team_long_name'] = df['team_long_name'].astype(object) + sufijo
+        df['league_name'] = df['league_name'].astype(object) + sufijo
+
+    # 4) Nombres: nombre de pila + apellido de jugadores distintos (o un nombre único)
+    nombres_pila, apellidos, simples = _separar_nombres(df_base['player_name'].astype(str))
+    es_simple = rng.random(n_jugadores) < len(simples) / n_base
+    compuestos = (
+        pd.Series(rng.choice(nombres_pila, n_jugadores), dtype=object) + ' '
+        + pd.Series(rng.choice(apellidos, n_jugadores), dtype=object)
+    )
+    df['player_name'] = np.where(es_simple, rng.choice(simples, n_jugadores), compuestos)
+
+    # 5) Fechas de nacimiento con +/- 6 meses de variación
+    nacimientos = pd.to_datetime(df['birthday'], errors='coerce')
+    nacimientos += pd.to_timedelta(rng.integers(-182, 183, size=n_jugadores), unit='D')
+    df['birthday'] = nacimientos.dt.strftime('%Y-%m-%d 00:00:00')
+
+    df['player_api_id'] = np.arange(1, n_jugadores + 1, dtype=df_base['player_api_id'].dtype)
+    return df[df_base.columns].astype(df_base.dtypes.to_dict())
+
+
+def escribir_dataset(df: pd.DataFrame, ruta_sin_extension: str, formatos: List[str]) -> Dict[str, dict]:
+    """
+    Escribe el dataset en los formatos pedidos.
+
+    Returns:
+        dict: formato -> {'ruta', 'bytes', 'segundos'}
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(ruta_sin_extension)), exist_ok=True)
+    escritos = {}
+    for formato in formatos:
+        if formato == 'parquet' and not _parquet_disponible():
+            print("⚠️ pyarrow no está instalado: se omite el formato parquet")
+            continue
+        ruta = ruta_sin_extension + FORMATOS[formato]
+        inicio = time.time()
+        if formato == 'csv':
+            df.to_csv(ruta, index=False)
+        elif formato == 'parquet':
+            df.to_parquet(ruta, index=False)
+        else:
+            df.to_pickle(ruta)
+        escritos[formato] = {
+            'ruta': ruta,
+            'bytes': os.path.getsize(ruta),
+            'segundos': time.time() - inicio,
+        }
+    return escritos
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Genera datasets sintéticos a escala para benchmarks")
+    parser.add_argument('--escalas', type=float, nargs='+', default=[10, 100],
+                        help="Múltiplos del tamaño de data.csv (ej: 10 100 1000)")
+    parser.add_argument('--formatos', nargs='+', choices=sorted(FORMATOS), default=['csv', 'parquet'])
+    parser.add_argument('--salida', default=DIRECTORIO_SALIDA, help="Directorio de salida")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--ruido', type=float, default=RUIDO_POR_DEFECTO)
+    args = parser.parse_args(argv)
+
+    df_base = pd.read_csv(RUTA_BASE)
+    for escala in args.escalas:
+        n = int(round(len(df_base) * escala))
+        inicio = time.time()
+        df = generar_dataset(n, df_base, args.semilla, args.ruido)
+        print(f"✅ Escala x{escala:g}: {n:,} jugadores, {df['team_long_name'].nunique():,} equipos, "
+              f"{df['league_name'].nunique():,} ligas ({time.time() - inicio:.1f}s)")
+        nombre = f"data_x{escala:g}"
+        for formato, info in escribir_dataset(df, os.path.join(args.salida, nombre), args.formatos).items():
+            print(f"   💾 {formato}: {info['ruta']} ({info['bytes'] / 1024**2:.1f} MB, {info['segundos']:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,31 @@
 import streamlit as st
-import pandas as pd
 import sys
 import os
-from dotenv import load_dotenv
 
 # Añadir el directorio actual al path de Python para poder importar los módulos
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Cargar variables de entorno desde .env (API keys, etc.)
-load_dotenv()
+# pandas, plotly, PIL y requests se cargan con el módulo de la página que los usa
+from utils.config import PAGE_CONFIG, cargar_variables_entorno
 
-import utils.data_loader as loader
-from utils.config import PAGE_CONFIG
+# Cargar variables de entorno desde .env (API keys, etc.), solo si existe el fichero
+cargar_variables_entorno(current_dir)
+
+from utils.dataset import get_dataset, usar_dataset
+from utils.warmup import iniciar_calentamiento
+from utils.profiler import medir, medir_pagina, escribir_metricas
+from utils.memory import metricas_memoria
+from utils.slow_reruns import vigilar_rerun, selecciones_sesion
 
 
  
 st.set_page_config(**PAGE_CONFIG)
 
-# Limpiar caché al inicio SOLO si es la primera vez que se carga la app en esta sesión
-# Esto fuerza a recargar los datos frescos desde load_data()
-if 'cache_cleared' not in st.session_state:
-    st.cache_data.clear()
-    st.session_state.cache_cleared = True
+# Precalentar en segundo plano el dataset, los agregados y las figuras por defecto
+# (Streamlit no tiene gancho de arranque: solo la primera ejecución del proceso lanza el hilo)
+iniciar_calentamiento()
 
 IMAGE_URL = 'https://media.istockphoto.com/id/639387036/es/foto/hombre-de-jugador-de-f%C3%BAtbol-aislado.jpg?s=612x612&w=0&k=20&c=Kiwcqtuu9V1MrsSRj8UeorzJ_buvOCvGe5D4JfFEtSQ='
 st.markdown(
@@ -106,6 +108,9 @@ with st.sidebar:
             "👤 Análisis por Jugadores",
             "👕 Análisis por Equipo",
             "🏆 Análisis por Liga",
+            "🧬 Jugadores Similares",
+            "🔭 Scouting",
+            "🔗 Correlaciones",
             "🪄 IA Players",
         ),
     )
@@ -115,62 +120,64 @@ with st.sidebar:
     
 
     
-# Función para cargar datos con caché
-# @st.cache_data: decorador que almacena en caché el resultado de la función
-# Evita recargar los datos en cada interacción, mejorando el rendimiento
-@st.cache_data
-def get_data_cached():
-    """Cached wrapper around utils.data_loader.load_data to avoid recursion."""
-    return loader.load_data()
+def _version_datos():
+    """Versión del dataset en uso, para las capturas de re-ejecuciones lentas."""
+    return str(st.session_state.get('version_datos'))
 
 try:
-    # load_data() ahora retorna (df, load_info)
-    result = get_data_cached()
+    # Si la re-ejecución supera el umbral se guarda su perfil con la página y las selecciones
+    with vigilar_rerun(page, lambda: selecciones_sesion(st.session_state), _version_datos), medir_pagina(page):
+        # Dataset compartido por todas las sesiones (se carga una vez por proceso)
+        with medir("carga de datos"):
+            get_dataset()
     
-    # Manejar tanto el formato antiguo (solo df) como el nuevo (df, load_info)
-    if isinstance(result, tuple):
-        df, load_info = result
-        # Guardamos load_info en session_state para que esté disponible globalmente
-        st.session_state.load_info = load_info
-    else:
-        # Compatibilidad con caché antiguo
-        df = result
-        st.session_state.load_info = {
-            'csv_already_existed': None,
-            'processing_time': 0.0,
-            'timestamp': None
-        }
+        # Toda la re-ejecución usa la misma versión del dataset aunque entretanto se
+        # publique una nueva; las versiones antiguas se retiran cuando nadie las usa
+        with usar_dataset() as dataset:
+            df = dataset.df
+            st.session_state.informe_carga = dataset.informe
+            st.session_state.version_datos = dataset.version
     
-    # Guardar df en session_state para acceso global (necesario para iaPlayers.py)
-    st.session_state.df = df
-
-    if page == "🏠 Inicio":
-        # Mostrar título y descripción solo en la página de inicio
-        st.title("⚽ Jugadores de Fútbol - Temporada 2015-2016")
-        st.markdown("""
-            Esta aplicación interactiva te permite explorar y analizar datos de **jugadores profesionales de fútbol** 
-            de la temporada 2015-2016. Descubre los mejores talentos, compara atributos técnicos y descubre 
-            tendencias en las principales ligas europeas. \n
-            La estadistica se basa en un rango de valores que va entre 0 y 100, donde 100 representa la máxima habilidad o rendimiento en esa categoría específica. 
-            """)
-        st.markdown("---")
+
+            if page == "🏠 Inicio":
+                # Mostrar título y descripción solo en la página de inicio
+                st.title("⚽ Jugadores de Fútbol - Temporada 2015-2016")
+                st.markdown("""
+                    Esta aplicación interactiva te permite explorar y analizar datos de **jugadores profesionales de fútbol** 
+                    de la temporada 2015-2016. Descubre los mejores talentos, compara atributos técnicos y descubre 
+                    tendencias en las principales ligas europeas. \n
+                    La estadistica se basa en un rango de valores que va entre 0 y 100, donde 100 representa la máxima habilidad o rendimiento en esa categoría específica. 
+                    """)
+                st.markdown("---")
         
-        from ui.home import render_home_page
-        render_home_page(df)
-    elif page == "👤 Análisis por Jugadores":
-        from ui.players import render_players_page
-        render_players_page(df)
-    elif page == "👕 Análisis por Equipo":
-        from ui.teams import render_teams_page
-        render_teams_page(df)
-    elif page == "🏆 Análisis por Liga":
-        from ui.leagues import render_leagues_page
-        render_leagues_page(df)
-    elif page == "🪄 IA Players":
-        from ui.iaPlayers import render_top_players_page
-        render_top_players_page()
+                from ui.home import render_home_page
+                render_home_page(df)
+            elif page == "👤 Análisis por Jugadores":
+                from ui.players import render_players_page
+                render_players_page(df)
+            elif page == "👕 Análisis por Equipo":
+                from ui.teams import render_teams_page
+                render_teams_page(df)
+            elif page == "🏆 Análisis por Liga":
+                from ui.leagues import render_leagues_page
+                render_leagues_page(df)
+            elif page == "🧬 Jugadores Similares":
+                from ui.similar import render_similar_players_page
+                render_similar_players_page(df)
+            elif page == "🔭 Scouting":
+                from ui.scouting import render_scouting_page
+                render_scouting_page(df)
+            elif page == "🔗 Correlaciones":
+                from ui.correlations import render_correlations_page
+                render_correlations_page(df)
+            elif page == "🪄 IA Players":
+                from ui.iaPlayers import render_top_players_page
+                render_top_players_page(df)
 
 
 
 except Exception as e:   
-    st.error(f"Error al cargar los datos: {e}")
\ No newline at end of file
+    st.error(f"Error al cargar los datos: {e}")
+
+# Volcar los tiempos por sección y la memoria al fichero de métricas (solo si SOCCER_METRICS_FILE está definido)
+escribir_metricas(extra=metricas_memoria)
@@ -6,8 +6,12 @@ Módulos de páginas:
 - players: Análisis de jugadores
 - teams: Análisis de equipos
 - leagues: Análisis de ligas
+- similar: Búsqueda de jugadores similares
+- scouting: Búsqueda de jugadores por rangos de atributos
+- correlations: Correlaciones entre atributos
+- search: Selectores de jugador con búsqueda por nombre
 - dashboard: Dashboard general
 - iaPlayers: Generación de imágenes con IA
 """
 
-__all__ = ['home', 'players', 'teams', 'leagues', 'dashboard', 'iaPlayers']
+__all__ = ['home', 'players', 'teams', 'leagues', 'similar', 'scouting', 'correlations', 'search', 'dashboard', 'iaPlayers']
@@ -0,0 +1,114 @@
+import streamlit as st
+import plotly.express as px
+import pandas as pd
+import numpy as np
+from utils.profiler import medir
+from utils.aggregates import get_agregados
+from utils.correlation import get_motor_correlaciones
+from utils.const import NOMBRES_ATRIBUTOS
+
+TODAS_LAS_LIGAS = "Todas las ligas"
+TODOS_LOS_EQUIPOS = "Todos los equipos"
+
+
+# Parejas que se muestran en la tabla de relaciones más fuertes
+PAREJAS_TOP = 10
+
+
+def _parejas(matriz, columnas, n=PAREJAS_TOP):
+    """Las n parejas de atributos distintos con mayor correlación en valor absoluto."""
+    i, j = np.triu_indices(len(columnas), k=1)
+    valores = matriz[i, j]
+    validas = ~np.isnan(valores)
+    i, j, valores = i[validas], j[validas], valores[validas]
+    orden = np.argsort(-np.abs(valores), kind='stable')[:n]
+    return pd.DataFrame({
+        'Atributo 1': [NOMBRES_ATRIBUTOS.get(columnas[k], columnas[k]) for k in i[orden]],
+        'Atributo 2': [NOMBRES_ATRIBUTOS.get(columnas[k], columnas[k]) for k in j[orden]],
+        'Correlación': valores[orden].round(3),
+    })
+
+
+def render_correlations_page(df):
+    """
+    Página de correlaciones entre atributos, de todo el dataset, de una liga o de un equipo.
+    """
+
+    agregados = get_agregados(df)
+
+    st.markdown("## 🔗 Correlaciones entre Atributos")
+    st.markdown("¿Qué atributos van juntos? Explora cómo se relacionan (por ejemplo, aceleración y velocidad, "
+                "o finalización y potencia de tiro) en todo el dataset, en una liga o en un equipo.")
+
+    st.markdown("---")
+
+    # ========== FILTROS ==========
+    with medir("Filtros de correlaciones"):
+        col1, col2, col3 = st.columns([2, 2, 1])
+
+        with col1:
+            liga_display = st.selectbox(
+                "🏆 Liga:",
+                options=[TODAS_LAS_LIGAS] + agregados.lista_ligas,
+                key='correlaciones_liga'
+            )
+            liga = None if liga_display == TODAS_LAS_LIGAS else agregados.liga_por_display[liga_display]
+
+        with col2:
+            if liga is None:
+                equipos = agregados.lista_equipos
+            else:
+                info = agregados.equipos_con_info
+                equipos = info.loc[info['league_name'] == liga, 'display_name'].tolist()
+            # Al cambiar de liga, el equipo elegido puede no estar en la nueva lista
+            if st.session_state.get('correlaciones_equipo') not in [TODOS_LOS_EQUIPOS] + equipos:
+                st.session_state.correlaciones_equipo = TODOS_LOS_EQUIPOS
+            equipo_display = st.selectbox(
+                "⚽ Equipo:",
+                options=[TODOS_LOS_EQUIPOS] + equipos,
+                key='correlaciones_equipo'
+            )
+            equipo = None if equipo_display == TODOS_LOS_EQUIPOS else agregados.equipo_por_display[equipo_display]
+
+        with col3:
+            medida = st.radio("📐 Medida:", ["Correlación", "Covarianza"], key='correlaciones_medida')
+
+    # ========== MATRIZ ==========
+    with medir("Matriz de correlaciones"):
+        resultado = get_motor_correlaciones(df).correlaciones(df, liga=liga, equipo=equipo)
+        st.caption(f"⚡ {resultado.jugadores:,} jugadores, {len(resultado.columnas)} atributos en "
+                   f"{resultado.tiempo_ms:.1f} ms" + (" (en caché)" if resultado.en_cache else ""))
+
+        if resultado.jugadores < 2:
+            st.warning("No hay jugadores suficientes con los filtros seleccionados.")
+            return
+
+        columnas = resultado.columnas
+        nombres = [NOMBRES_ATRIBUTOS.get(c, c) for c in columnas]
+        if medida == "Correlación":
+            matriz = resultado.correlacion
+            escala = dict(color_continuous_scale='RdBu_r', zmin=-1, zmax=1, text_auto='.2f')
+        else:
+            matriz = resultado.covarianza
+            limite = float(np.nanmax(np.abs(matriz))) or 1.0
+            escala = dict(color_continuous_scale='RdBu_r', zmin=-limite, zmax=limite, text_auto='.0f')
+
+        with medir("heatmap de correlaciones"):
+            fig = px.imshow(
+                pd.DataFrame(matriz, index=nombres, columns=nombres),
+                aspect='auto',
+                labels=dict(x="Atributo", y="Atributo", color=medida),
+                **escala
+            )
+            fig.update_layout(height=700)
+            fig.update_xaxes(side="top")
+            st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("---")
+
+    # ========== RELACIONES MÁS FUERTES ==========
+    with medir("Relaciones más fuertes"):
+        st.markdown(f"### 🔝 Las {PAREJAS_TOP} relaciones más fuertes")
+        parejas = _parejas(resultado.correlacion, columnas)
+        parejas.index = parejas.index + 1
+        st.dataframe(parejas, use_container_width=True)
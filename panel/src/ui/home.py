@@ -1,14 +1,195 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from utils.data_loader import get_data_info, delete_csv
+from utils.data_loader import get_data_info
+from utils.aggregates import get_agregados
+from utils.image_store import get_image_store_stats
+from utils.profiler import get_profiler, exportar_metricas, SECCION_TOTAL
+from utils.slow_reruns import leer_capturas, directorio_capturas
+from utils.dataset import recargar_dataset, estado_datos
+from utils.warmup import estado_calentamiento, preparar_version
+from utils.memory import informe_memoria, exportar_memoria, memoria_proceso
+import datetime
+import json
 import pandas as pd
-import numpy as np
+
+
+def _render_profiler_panel():
+    """Tiempos de render por sección, agregados por página para todas las sesiones del proceso."""
+    with st.container(border=True):
+        st.markdown("#### ⏱️ Profiler de Secciones")
+        if not st.toggle("Mostrar tiempos por sección", key='mostrar_profiler'):
+            st.caption("Mide cada sección, la carga de datos y cada gráfico de todas las páginas.")
+            return
+
+        profiler = get_profiler()
+        paginas = profiler.paginas()
+        if not paginas:
+            st.info("Todavía no hay tiempos registrados. Visita alguna página.")
+            return
+
+        pagina = st.selectbox("Página:", paginas, key='profiler_pagina')
+        resumen = pd.DataFrame(profiler.resumen(pagina)).drop(columns='pagina')
+        total = resumen[resumen['seccion'] == SECCION_TOTAL]
+        if not total.empty:
+            st.caption(
+                f"Re-ejecuciones: {int(total['llamadas'].iloc[0])} · "
+                f"p50 {total['p50_ms'].iloc[0]:.0f} ms · p95 {total['p95_ms'].iloc[0]:.0f} ms"
+            )
+        st.dataframe(
+            resumen.sort_values('media_ms', ascending=False).round(1),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        col_descarga, col_reiniciar = st.columns(2)
+        with col_descarga:
+            st.download_button(
+                "📥 Métricas (Prometheus)",
+                data=exportar_metricas(profiler),
+                file_name="soccer_metrics.prom",
+                mime="text/plain",
+                use_container_width=True,
+            )
+        with col_reiniciar:
+            if st.button("🧹 Reiniciar tiempos", use_container_width=True):
+                profiler.reiniciar()
+                st.rerun()
+
+        _render_capturas_lentas()
+
+
+def _render_capturas_lentas():
+    """Últimas re-ejecuciones lentas capturadas (ver utils/slow_reruns.py)."""
+    capturas = leer_capturas(20)
+    with st.expander(f"🐢 Re-ejecuciones lentas ({len(capturas)})"):
+        if not capturas:
+            st.caption("Ninguna re-ejecución ha superado el umbral.")
+            return
+        st.dataframe(
+            pd.DataFrame([{
+                'fecha': c['fecha'],
+                'pagina': c['pagina'],
+                'duracion_ms': c['duracion_ms'],
+                'seccion_mas_lenta': max(c['secciones'], key=lambda s: s[1] if s[0] != SECCION_TOTAL else -1)[0] if c['secciones'] else None,
+                'selecciones': ', '.join(f"{k}={v}" for k, v in c['selecciones'].items()),
+                'perfil': c.get('perfil'),
+            } for c in capturas]),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption(f"Perfiles en `{directorio_capturas()}` (.folded: flamegraph/speedscope · .prof: pstats/snakeviz)")
+
+
+def _render_estado_calentamiento():
+    """Estado del precalentamiento de cachés del proceso (ver utils/warmup.py)."""
+    estado = estado_calentamiento()
+    if estado['estado'] == 'listo':
+        st.caption(
+            f"🔥 Cachés precalentadas en **{estado['duracion_s']:.2f}s** "
+            f"(datos, agregados y {estado['figuras']} figuras por defecto)",
+            help="\n".join(f"{paso}: {ms:.0f} ms" for paso, ms in estado['pasos'])
+        )
+    elif estado['estado'] == 'calentando':
+        st.caption("⏳ Precalentando cachés en segundo plano...")
+    elif estado['estado'] == 'error':
+        st.caption(f"⚠️ No se pudieron precalentar las cachés: {estado['error']}")
+
+
+def _mb(valor):
+    return round(valor / 1024**2, 2) if valor is not None else None
+
+
+def _render_memoria():
+    """Contabilidad de memoria: dataset por columna, cachés, esta sesión y el proceso (ver utils/memory.py)."""
+    st.markdown("**🧮 Memoria:**")
+    if not st.toggle("Mostrar desglose de memoria", key='mostrar_memoria'):
+        rss = memoria_proceso()['rss_bytes']
+        if rss is not None:
+            st.caption(f"· RSS del proceso: {_mb(rss):.0f} MB")
+        return
+
+    # Se mide en cada re-ejecución con el desglose abierto; el botón solo fuerza una nueva
+    st.button("🔄 Actualizar", key='actualizar_memoria')
+    informe = informe_memoria(st.session_state)
+    proceso = informe['proceso']
+    actual = next((d for d in informe['dataset'] if d['actual']), None)
+
+    col_rss, col_datos, col_sesion = st.columns(3)
+    with col_rss:
+        st.metric("RSS", f"{_mb(proceso['rss_bytes']):.0f} MB" if proceso['rss_bytes'] is not None else "-",
+                  help=f"Pico: {_mb(proceso['rss_pico_bytes'])} MB" if proceso['rss_pico_bytes'] is not None else None)
+    with col_datos:
+        st.metric("Dataset", f"{_mb(actual['bytes']):.1f} MB" if actual else "-",
+                  help=f"Versión {actual['version']}, {actual['filas']:,} filas" if actual else None)
+    with col_sesion:
+        st.metric("Esta sesión", f"{_mb(informe['sesion_bytes']):.2f} MB",
+                  help="st.session_state de esta sesión (las imágenes, por lo que ocupan en el almacén)")
+
+    for dataset in informe['dataset']:
+        with st.expander(f"📊 Dataset v{dataset['version']}{' (actual)' if dataset['actual'] else ''} por columna"):
+            columnas = pd.DataFrame(dataset['columnas'])
+            columnas['MB'] = columnas['bytes'] / 1024**2
+            st.dataframe(columnas[['columna', 'dtype', 'MB', 'bytes_por_fila', 'pct']].round(3),
+                         use_container_width=True, hide_index=True)
+
+    with st.expander("🗄️ Cachés del proceso"):
+        caches = pd.DataFrame(informe['caches'])
+        caches['MB'] = caches['bytes'].map(_mb)
+        st.dataframe(caches[['cache', 'entradas', 'MB']], use_container_width=True, hide_index=True)
+
+    with st.expander("👤 Esta sesión (st.session_state)"):
+        sesion = pd.DataFrame(informe['sesion'], columns=['clave', 'tipo', 'bytes', 'imagenes_bytes', 'nota'])
+        sesion['KB'] = (sesion['bytes'] / 1024).round(1)
+        sesion['imágenes KB'] = (sesion['imagenes_bytes'] / 1024).round(1)
+        st.dataframe(sesion[['clave', 'tipo', 'KB', 'imágenes KB', 'nota']], use_container_width=True, hide_index=True)
+
+    st.caption(f"Medido en {informe['duracion_ms']:.0f} ms")
+    col_prom, col_json = st.columns(2)
+    with col_prom:
+        st.download_button("📥 Memoria (Prometheus)", data=exportar_memoria(informe),
+                           file_name="soccer_memoria.prom", mime="text/plain", use_container_width=True)
+    with col_json:
+        st.download_button("📥 Memoria (JSON)", data=json.dumps(informe, ensure_ascii=False, indent=2, default=str),
+                           file_name="soccer_memoria.json", mime="application/json", use_container_width=True)
+
+
+def _render_informe_carga(informe):
+    """Telemetría de la carga de la versión del dataset en uso (utils.data_loader.InformeCarga)."""
+    st.caption(
+        f"📄 {informe.filas:,} filas × {informe.columnas} columnas · "
+        f"{informe.bytes_leidos / 1024**2:.1f} MB leídos · {informe.memoria_bytes / 1024**2:.1f} MB en memoria",
+        help=(f"Lectura y parseo: {informe.tiempo_lectura_s * 1000:.0f} ms\n\n"
+              f"Conversión de tipos: {informe.tiempo_tipos_s * 1000:.0f} ms\n\n"
+              f"Clasificación por posición: {informe.tiempo_posiciones_s * 1000:.0f} ms\n\n"
+              f"Fichero: {informe.ruta}")
+    )
+
+
+def _render_estado_recarga():
+    """Versión del dataset en servicio, recarga en curso y versiones antiguas aún en uso (ver utils/dataset.py)."""
+    estado = estado_datos()
+    if estado['recargando']:
+        st.caption(f"🔄 Recargando datos en segundo plano; la versión {estado['version_actual']} sigue en servicio...")
+
+    ultima = estado['ultima_recarga']
+    if ultima is not None:
+        hora = datetime.datetime.fromtimestamp(ultima['fecha']).strftime('%H:%M:%S')
+        if ultima['ok']:
+            st.caption(f"✅ Recarga de las {hora}: versión {ultima['version']} publicada en {ultima['duracion_s']:.2f}s")
+        else:
+            st.caption(f"⚠️ Recarga de las {hora} descartada ({ultima['error']}); se mantiene la versión actual")
+
+    versiones = [
+        f"v{v['version']}" + (" (actual)" if v['actual'] else "") + f": {v['filas']:,} jugadores, {v['referencias']} en uso"
+        for v in estado['versiones']
+    ]
+    if versiones:
+        st.caption("🗂️ Versiones en memoria: " + " · ".join(versiones))
+
 
 def render_home_page(df):
 
-    # Obtener información del dataset
-    info = get_data_info(df)
+    # Obtener información del dataset (una vez por versión)
+    info = get_agregados(df).indice('info_dataset', lambda: get_data_info(df))
 
     # Métricas principales con diseño deportivo
     col1, col2, col3 = st.columns(3)
@@ -70,67 +251,81 @@ def render_home_page(df):
     st.markdown("---")
 
     # Función callback que se ejecuta ANTES del render
+    # La versión nueva se construye y precalienta en segundo plano mientras la actual sigue sirviendo
     def handle_regenerate():
-        delete_csv()
-        st.cache_data.clear()
-        # Limpiar también load_info del session_state para forzar recarga
-        if 'load_info' in st.session_state:
-            del st.session_state.load_info
-        st.session_state.show_regen_msg = True
+        st.session_state.show_regen_msg = recargar_dataset(preparar=preparar_version)
     
-    # Contenedor con borde simple
-    with st.container(border=True):
-        # Información del Sistema
-        st.markdown("#### 🔧 Información del Sistema")
+    # Información del Sistema y, a su lado, el profiler de secciones
+    col_sistema, col_profiler = st.columns(2)
+
+    with col_sistema:
+        with st.container(border=True):
+            # Información del Sistema
+            st.markdown("#### 🔧 Información del Sistema")
         
-        # Obtener load_info desde session_state (ya fue guardado en app.py)
-        load_info = st.session_state.get('load_info', {
-            'csv_already_existed': None,
-            'processing_time': 0.0,
-            'timestamp': None
-        })
+            # Informe de la carga de la versión en uso (ya fue guardado en app.py)
+            informe = st.session_state.get('informe_carga')
+
+            # Determinar qué mensaje mostrar
+            if 'show_regen_msg' in st.session_state:
+                # Acabamos de pedir una recarga manualmente
+                if st.session_state.show_regen_msg:
+                    st.success("🔄 **Recarga Iniciada** - Los datos actuales siguen disponibles hasta que la nueva versión esté lista")
+                else:
+                    st.info("⏳ Ya hay una recarga en curso")
+                # Limpiar el flag
+                del st.session_state.show_regen_msg
+            elif informe is None:
+                # Caso inesperado (versión sin informe de carga)
+                st.warning("⚠️ Estado de carga desconocido")
+            elif not informe.fichero_existia:
+                st.error(f"❌ **Fichero de datos no encontrado** - {informe.ruta}")
+            else:
+                st.info(f"🚀 **Carga Rápida** - {informe.origen.upper()} cargado en **{informe.tiempo_total_s:.3f}s**")
+                st.caption("✨ Los datos están listos para usar.")
+
+            if informe is not None and informe.fichero_existia:
+                _render_informe_carga(informe)
         
+            _render_estado_calentamiento()
+            _render_estado_recarga()
 
-        # Determinar qué mensaje mostrar
-        if 'show_regen_msg' in st.session_state and st.session_state.show_regen_msg:
-            # Acabamos de regenerar manualmente
-            st.success(f"✅ **CSV Cargado Exitosamente** - Procesado en **{load_info['processing_time']:.2f}s**")
-            # Limpiar el flag
-            del st.session_state.show_regen_msg
-        elif load_info['csv_already_existed'] == False:
-            # Primera generación del CSV (app inició sin CSV)
-            # Usamos == False en lugar de not para distinguir de None
-            st.success(f"⚙️ **Procesamiento Completo** - CSV cargado en **{load_info['processing_time']:.2f}s**")
-        elif load_info['csv_already_existed'] == True:
-            # CSV ya existía - carga normal
-            st.info(f"🚀 **Carga Rápida** - CSV cargado en **{load_info['processing_time']:.3f}s**")
-            st.caption("✨ Los datos están listos para usar.")
-        else:
-            # Caso inesperado (csv_already_existed == None)
-            st.warning("⚠️ Estado de carga desconocido")
+            st.markdown("**📥 Fuente de Datos:**")
+            st.write("· Archivo CSV consolidado\n · Datos de jugadores 2016\n · Información completa de equipos, ligas y países")
         
-        st.markdown("**📥 Fuente de Datos:**")
-        st.write("· Archivo CSV consolidado\n · Datos de jugadores 2016\n · Información completa de equipos, ligas y países")
+            # Memoria ocupada por las imágenes IA de todas las sesiones (para dimensionar el contenedor)
+            stats_imagenes = get_image_store_stats()
+            st.markdown("**🖼️ Imágenes IA en el servidor:**")
+            st.write(
+                f"· En memoria: {stats_imagenes['bytes_memoria'] / 1024**2:.1f} MB de "
+                f"{stats_imagenes['max_memoria_bytes'] / 1024**2:.0f} MB ({stats_imagenes['entradas_memoria']} imágenes)\n"
+                f" · En disco: {stats_imagenes['bytes_disco'] / 1024**2:.1f} MB ({stats_imagenes['entradas_disco']} imágenes)"
+            )
+
+            _render_memoria()
         
-        st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown("<br>", unsafe_allow_html=True)
         
-        # Botón con callback - el callback se ejecuta ANTES de que el script se re-ejecute
-        st.markdown("""
-            <style>
-            /* Estilos para el botón de regenerar */
-            .stButton > button {
-                background-color: #E8E8E8 !important;
-                box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.3) !important;
-            }
-            .stButton > button:hover {
-                background-color: #D0D0D0 !important;
-                box-shadow: 3px 3px 10px rgba(0, 0, 0, 0.4) !important;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+            # Botón con callback - el callback se ejecuta ANTES de que el script se re-ejecute
+            st.markdown("""
+                <style>
+                /* Estilos para el botón de regenerar */
+                .stButton > button {
+                    background-color: #E8E8E8 !important;
+                    box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.3) !important;
+                }
+                .stButton > button:hover {
+                    background-color: #D0D0D0 !important;
+                    box-shadow: 3px 3px 10px rgba(0, 0, 0, 0.4) !important;
+                }
+                </style>
+            """, unsafe_allow_html=True)
         
-        st.button(
-            "🔄 Borrar CSV → Limpiar Caché → Recargar Página", 
-            type="secondary",
-            on_click=handle_regenerate
-        )
+            st.button(
+                "🔄 Recargar Datos (sin cortes)", 
+                type="secondary",
+                on_click=handle_regenerate
+            )
+
+    with col_profiler:
+        _render_profiler_panel()
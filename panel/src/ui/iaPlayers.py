@@ -6,43 +6,168 @@ Descripción: Crea escenas únicas combinando hasta 3 jugadores con descripcione
 
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import requests
 from io import BytesIO
 import os
-from dotenv import load_dotenv
+import random
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Cargar variables de entorno
-load_dotenv()
+from utils.image_store import get_image_store
+from utils.image_backend import get_image_backend
+from utils.singleflight import SingleFlight, request_key
+from utils.rate_limiter import get_rate_limiter, PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE
+from utils.profiler import medir
+from ui.search import multiselector_jugadores
+from utils.const import (
+    HUGGINGFACE_MODEL,
+    HUGGINGFACE_FALLBACK_MODELS,
+    HUGGINGFACE_MAX_RETRY_WAIT,
+    HUGGINGFACE_MAX_ATTEMPTS,
+    HUGGINGFACE_BATCH_MAX_CONCURRENCY,
+    HUGGINGFACE_BATCH_MAX_SEEDS,
+    HUGGINGFACE_QUEUE_MAX_WAIT,
+    HUGGINGFACE_RATE_LIMIT_BACKOFF,
+    ERROR_MESSAGES,
+    IMAGE_PREVIEW_MAX_SIDE,
+    IMAGE_PREVIEW_QUALITY,
+)
+
+# NOTA: PIL y requests se importan dentro de las funciones que los usan: la página
+# se muestra sin ellos y solo se cargan al generar la primera imagen.
+# Las variables de entorno (.env) ya las carga app.py al arrancar.
+
+
+# Escenas predefinidas en castellano y su traducción al inglés
+# (el modelo genera mejores resultados con prompts en inglés)
+TRADUCCIONES_ESCENAS = {
+    "Los jugadores están jugando al fútbol en una hermosa playa al atardecer, divirtiéndose y riendo juntos": 
+        "The players are playing soccer on a beautiful beach at sunset, having fun and laughing together",
+    "Dos legendarios jugadores de fútbol jugando al ajedrez en una sala elegante, concentrados y estratégicos, competencia amistosa": 
+        "Two legendary soccer players playing chess in a elegant room, focused and strategic, friendly competition",
+    "Jugadores de fútbol entrenando juntos en un gimnasio moderno, motivándose mutuamente, sesión de entrenamiento intenso": 
+        "Soccer players training together in a modern gym, motivating each other, intense workout session",
+    "Jugadores celebrando una victoria de campeonato con fuegos artificiales en el fondo, pura alegría y emoción": 
+        "Players celebrating a championship victory with fireworks in the background, pure joy and emotion",
+    "Estrellas del fútbol disfrutando de una barbacoa relajada en un jardín, ropa casual, ambiente amigable": 
+        "Soccer stars having a relaxed barbecue in a backyard, casual clothes, friendly atmosphere"
+}
+
+ESCENAS_PREDEFINIDAS = list(TRADUCCIONES_ESCENAS.keys())
+
+# Peticiones idénticas en curso compartidas por todas las sesiones del proceso:
+# si varias sesiones piden lo mismo a la vez, solo se envía una petición a la API
+PETICIONES_EN_CURSO = SingleFlight()
+
+@lru_cache(maxsize=1)
+def formato_preview():
+    """Formato de la vista previa: WebP si Pillow lo soporta, JPEG en caso contrario."""
+    from PIL import features
+    return 'WEBP' if features.check('webp') else 'JPEG'
+
+
+def codificar_imagen(imagen):
+    """
+    Codifica una única vez la imagen recibida de la API.
+    
+    Se generan el PNG completo (para la descarga) y una vista previa reducida en
+    WebP/JPEG (para mostrar en pantalla). Las re-ejecuciones de la página solo
+    reutilizan estos bytes, sin volver a codificar nada.
+    
+    Args:
+        imagen: Image object de PIL
+        
+    Returns:
+        dict: {'png', 'preview', 'ancho', 'alto'}
+    """
+    buffer_png = BytesIO()
+    imagen.save(buffer_png, format='PNG')
+    
+    # Vista previa: reducir manteniendo proporción y comprimir con pérdida
+    preview = imagen.convert('RGB')
+    preview.thumbnail((IMAGE_PREVIEW_MAX_SIDE, IMAGE_PREVIEW_MAX_SIDE))
+    buffer_preview = BytesIO()
+    preview.save(buffer_preview, format=formato_preview(), quality=IMAGE_PREVIEW_QUALITY)
+    
+    return {
+        'png': buffer_png.getvalue(),
+        'preview': buffer_preview.getvalue(),
+        'ancho': imagen.width,
+        'alto': imagen.height,
+    }
+
+
+def _espera_modelo_cargando(response):
+    """Segundos a esperar tras un 503: 'estimated_time' de la API, acotado."""
+    try:
+        estimado = float(response.json().get('estimated_time', HUGGINGFACE_MAX_RETRY_WAIT))
+    except (ValueError, AttributeError):
+        estimado = HUGGINGFACE_MAX_RETRY_WAIT
+    return max(0.0, min(estimado, HUGGINGFACE_MAX_RETRY_WAIT))
+
+
+# Errores del limitador: no tiene sentido probar los modelos de respaldo
+ERRORES_LIMITADOR = (ERROR_MESSAGES['queue_timeout'], ERROR_MESSAGES['quota_exhausted'], ERROR_MESSAGES['rate_limited'])
+
+
+def _id_sesion():
+    """Identificador de la sesión de Streamlit actual (para el reparto equitativo de la cola)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return "sin_sesion"
 
 
 class SceneImageGenerator:
     """Generador de escenas con IA usando múltiples jugadores"""
     
-    def __init__(self):
-        """Inicializa el generador con la API key de Hugging Face"""
+    def __init__(self, backend=None, sesion_id=None, limiter=None):
+        """
+        Inicializa el generador con la API key de Hugging Face
+        
+        Args:
+            backend: Backend de peticiones (opcional, por defecto el configurado en
+                     IMAGE_BACKEND; ver utils.image_backend)
+            sesion_id: Sesión a la que se cargan las peticiones en el limitador global
+                       (por defecto, la sesión de Streamlit actual)
+            limiter: Limitador de peticiones (opcional, por defecto el global del proceso;
+                     ver utils.rate_limiter)
+        """
         self.api_key = os.getenv("HUGGINGFACE_API_KEY")
-        self.model_url = "https://api-inference.huggingface.co/models/black-forest-labs/FLUX.1-schnell"
-        self.fallback_models = [
-            "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0",
-            "https://api-inference.huggingface.co/models/black-forest-labs/FLUX.1-dev"
-        ]
+        self.sesion_id = sesion_id or _id_sesion()
+        self.limiter = limiter if limiter is not None else get_rate_limiter()
+        self._ultimo_error = None
+        self.backend = backend if backend is not None else get_image_backend()
+        self.model_url = self.backend.model_url(HUGGINGFACE_MODEL)
+        self.fallback_models = [self.backend.model_url(modelo) for modelo in HUGGINGFACE_FALLBACK_MODELS]
     
-    def _generar_imagen(self, prompt, modelo_url=None, timeout=60):
+    def _solicitar_imagen(self, prompt, modelo_url=None, timeout=60, seed=None, avisar=None,
+                          prioridad=PRIORIDAD_INTERACTIVA):
         """
-        Genera una imagen usando la API de Hugging Face con sistema de fallback
+        Realiza la petición a la API de Hugging Face sin escribir en la interfaz.
+        
+        Al no llamar a Streamlit se puede ejecutar desde hilos secundarios
+        (generación en lote). Las peticiones idénticas (mismo modelo, prompt
+        normalizado y parámetros) que coinciden en el tiempo se agrupan en una sola
+        llamada a la API y todas reciben el mismo resultado.
         
         Args:
             prompt: Descripción de la imagen a generar
             modelo_url: URL del modelo a usar (opcional, usa el principal por defecto)
             timeout: Tiempo máximo de espera en segundos
+            seed: Semilla para obtener variantes reproducibles (opcional)
+            avisar: Función opcional que recibe los mensajes de aviso (ej: st.warning)
+            prioridad: Prioridad en la cola del limitador global
             
         Returns:
-            Image object de PIL o None si falla
+            tuple: (Image object de PIL o None, mensaje de error o None)
         """
         if not self.api_key:
-            st.error("❌ API Key de Hugging Face no configurada")
-            return None
+            return None, "❌ API Key de Hugging Face no configurada"
         
         # Usar modelo principal o el especificado
         url_to_use = modelo_url if modelo_url else self.model_url
@@ -61,83 +186,169 @@ class SceneImageGenerator:
                 "height": 768
             }
         }
+        if seed is not None:
+            payload["parameters"]["seed"] = seed
         
+        clave = request_key(url_to_use, payload, self.api_key)
+        (contenido, error), _ = PETICIONES_EN_CURSO.do(
+            clave,
+            lambda: self._enviar_con_reintentos(url_to_use, headers, payload, timeout, avisar, prioridad)
+        )
+        if error:
+            return None, error
+        
+        # Cada sesión decodifica su propia copia (los objetos PIL no se comparten entre hilos).
+        # load() fuerza la decodificación aquí: PIL es perezoso y un cuerpo truncado
+        # fallaría más tarde, al codificar la imagen
+        from PIL import Image
+
         try:
-            response = requests.post(url_to_use, headers=headers, json=payload, timeout=timeout)
+            imagen = Image.open(BytesIO(contenido))
+            imagen.load()
+            return imagen, None
+        except Exception as e:
+            return None, f"❌ Error al generar imagen: {str(e)}"
+    
+    def _enviar_con_reintentos(self, url, headers, payload, timeout, avisar=None, prioridad=PRIORIDAD_INTERACTIVA):
+        """
+        Envía la petición al backend reintentando mientras el modelo se carga (503)
+        o la API limita el ritmo (429), hasta HUGGINGFACE_MAX_ATTEMPTS intentos.
+        Cada intento espera turno en el limitador global.
+        
+        Returns:
+            tuple: (bytes de la imagen o None, mensaje de error o None)
+        """
+        import requests
+
+        error_reintento = None
+        for intento in range(1, HUGGINGFACE_MAX_ATTEMPTS + 1):
+            ultimo_intento = intento == HUGGINGFACE_MAX_ATTEMPTS
+            if not self.limiter.acquire(self.sesion_id, prioridad, timeout=HUGGINGFACE_QUEUE_MAX_WAIT):
+                stats = self.limiter.stats()
+                if stats['cuota_diaria'] and stats['cuota_restante'] <= 0:
+                    return None, ERROR_MESSAGES['quota_exhausted']
+                return None, ERROR_MESSAGES['queue_timeout']
             
-            if response.status_code == 200:
-                image = Image.open(BytesIO(response.content))
-                return image
-            elif response.status_code == 503:
-                st.warning(f"⏳ Modelo cargándose... Reintentando en 20 segundos...")
-                import time
-                time.sleep(20)
-                return self._generar_imagen(prompt, url_to_use, timeout)
-            elif response.status_code == 404:
-                st.error(f"❌ Modelo no encontrado o requiere aceptar licencia")
-                return None
-            elif response.status_code == 401:
-                st.error(f"❌ Error de autenticación. Verifica tu API Key")
-                return None
-            else:
-                st.error(f"❌ Error {response.status_code}: {response.text}")
-                return None
+            try:
+                response = self.backend.post(url, headers=headers, json=payload, timeout=timeout)
+                self.limiter.record_response(response.status_code)
                 
-        except requests.exceptions.Timeout:
-            st.error("⏱️ Timeout: La generación tardó demasiado")
-            return None
-        except Exception as e:
-            st.error(f"❌ Error al generar imagen: {str(e)}")
-            return None
+                if response.status_code == 200:
+                    return response.content, None
+                elif response.status_code == 503:
+                    error_reintento = ERROR_MESSAGES['model_loading']
+                    if ultimo_intento:
+                        break
+                    espera = _espera_modelo_cargando(response)
+                    if avisar:
+                        avisar(f"⏳ Modelo cargándose... Reintentando en {espera:.0f} segundos...")
+                    time.sleep(espera)
+                    continue
+                elif response.status_code == 429:
+                    # La API nos limita: pausar a todas las sesiones y volver a la cola
+                    self.limiter.pause(HUGGINGFACE_RATE_LIMIT_BACKOFF)
+                    error_reintento = ERROR_MESSAGES['rate_limited']
+                    if ultimo_intento:
+                        break
+                    if avisar:
+                        avisar(f"🚦 Límite de la API alcanzado. Reintentando en {HUGGINGFACE_RATE_LIMIT_BACKOFF} segundos...")
+                    continue
+                elif response.status_code == 404:
+                    return None, f"❌ Modelo no encontrado o requiere aceptar licencia"
+                elif response.status_code == 401:
+                    return None, f"❌ Error de autenticación. Verifica tu API Key"
+                else:
+                    return None, f"❌ Error {response.status_code}: {response.text}"
+                    
+            except requests.exceptions.Timeout:
+                return None, "⏱️ Timeout: La generación tardó demasiado"
+            except Exception as e:
+                return None, f"❌ Error al generar imagen: {str(e)}"
+        
+        return None, error_reintento
     
-    def generar_escena_personalizada(self, jugadores, descripcion_escena):
+    def _generar_imagen(self, prompt, modelo_url=None, timeout=60, seed=None):
         """
-        Genera una escena personalizada con múltiples jugadores
+        Genera una imagen usando la API de Hugging Face con sistema de fallback
         
         Args:
-            jugadores: Lista de nombres de jugadores (1-3)
-            descripcion_escena: Descripción personalizada de la escena (puede estar en español)
+            prompt: Descripción de la imagen a generar
+            modelo_url: URL del modelo a usar (opcional, usa el principal por defecto)
+            timeout: Tiempo máximo de espera en segundos
+            seed: Semilla para obtener variantes reproducibles (opcional)
             
         Returns:
-            tuple: (Image object de PIL o None si falla, prompt generado)
+            Image object de PIL o None si falla
         """
-        if not jugadores:
-            st.error("❌ Debes seleccionar al menos un jugador")
-            return None, None
+        imagen, error = self._solicitar_imagen(prompt, modelo_url, timeout, seed, avisar=st.warning)
+        self._ultimo_error = error
+        if error:
+            st.error(error)
+        return imagen
+    
+    def _generar_con_respaldo(self, prompt, seed=None, prioridad=PRIORIDAD_INTERACTIVA):
+        """
+        Genera una imagen probando el modelo principal y después los de respaldo,
+        sin escribir en la interfaz (apto para hilos).
         
-        # Mapeo de descripciones en español a inglés para mejor calidad de generación
-        traducciones = {
-            "Los jugadores están jugando al fútbol en una hermosa playa al atardecer, divirtiéndose y riendo juntos": 
-                "The players are playing soccer on a beautiful beach at sunset, having fun and laughing together",
-            "Dos legendarios jugadores de fútbol jugando al ajedrez en una sala elegante, concentrados y estratégicos, competencia amistosa": 
-                "Two legendary soccer players playing chess in a elegant room, focused and strategic, friendly competition",
-            "Jugadores de fútbol entrenando juntos en un gimnasio moderno, motivándose mutuamente, sesión de entrenamiento intenso": 
-                "Soccer players training together in a modern gym, motivating each other, intense workout session",
-            "Jugadores celebrando una victoria de campeonato con fuegos artificiales en el fondo, pura alegría y emoción": 
-                "Players celebrating a championship victory with fireworks in the background, pure joy and emotion",
-            "Estrellas del fútbol disfrutando de una barbacoa relajada en un jardín, ropa casual, ambiente amigable": 
-                "Soccer stars having a relaxed barbecue in a backyard, casual clothes, friendly atmosphere"
-        }
+        Returns:
+            tuple: (Image object de PIL o None, último mensaje de error o None)
+        """
+        imagen, error = self._solicitar_imagen(prompt, seed=seed, prioridad=prioridad)
+        for fallback_url in self.fallback_models:
+            if imagen is not None or error in ERRORES_LIMITADOR:
+                break
+            imagen, error = self._solicitar_imagen(prompt, fallback_url, seed=seed, prioridad=prioridad)
+        return imagen, (None if imagen is not None else error)
+    
+    def construir_prompt(self, jugadores, descripcion_escena):
+        """
+        Construye el prompt en inglés para una escena y una lista de jugadores.
         
+        Args:
+            jugadores: Lista de nombres de jugadores (1-3)
+            descripcion_escena: Descripción de la escena (puede estar en español)
+            
+        Returns:
+            str: Prompt optimizado para el modelo
+        """
         # Traducir a inglés si está en el diccionario, sino usar la descripción original
-        descripcion_en_ingles = traducciones.get(descripcion_escena, descripcion_escena)
+        descripcion_en_ingles = TRADUCCIONES_ESCENAS.get(descripcion_escena, descripcion_escena)
         
         # Construir prompt optimizado con especificaciones técnicas
-        jugadores_str = ", ".join(jugadores)
+        # (orden alfabético: el mismo grupo de jugadores produce siempre el mismo prompt)
+        jugadores_str = ", ".join(sorted(jugadores))
         
         # Prompt mejorado con énfasis en que aparezcan los jugadores específicos
-        prompt = f"""Professional high-quality sports photography: {descripcion_en_ingles}
+        return f"""Professional high-quality sports photography: {descripcion_en_ingles}
 The scene MUST feature these specific soccer players: {jugadores_str}.
 Make sure all selected players are clearly visible and recognizable in the image.
 Cinematic lighting, photorealistic, ultra detailed, 8K resolution, dynamic composition, dramatic atmosphere.
 Professional sports photography style, natural poses, authentic soccer environment.
 Sharp focus on the players, vibrant colors, perfect composition."""
+    
+    def generar_escena_personalizada(self, jugadores, descripcion_escena):
+        """
+        Genera una escena personalizada con múltiples jugadores
+        
+        Args:
+            jugadores: Lista de nombres de jugadores (1-3)
+            descripcion_escena: Descripción personalizada de la escena (puede estar en español)
+            
+        Returns:
+            tuple: (Image object de PIL o None si falla, prompt generado)
+        """
+        if not jugadores:
+            st.error("❌ Debes seleccionar al menos un jugador")
+            return None, None
+        
+        prompt = self.construir_prompt(jugadores, descripcion_escena)
         
         # Intentar con modelo principal
         imagen = self._generar_imagen(prompt)
         
-        # Si falla, intentar con modelos de respaldo
-        if imagen is None:
+        # Si falla, intentar con modelos de respaldo (salvo que el límite de peticiones lo impida)
+        if imagen is None and self._ultimo_error not in ERRORES_LIMITADOR:
             for idx, fallback_url in enumerate(self.fallback_models):
                 st.info(f"🔄 Intentando con modelo alternativo {idx + 1}...")
                 imagen = self._generar_imagen(prompt, fallback_url)
@@ -145,21 +356,123 @@ Sharp focus on the players, vibrant colors, perfect composition."""
                     break
         
         return imagen, prompt
+    
+    def generar_escenas_en_lote(self, jugadores, trabajos, max_concurrencia=HUGGINGFACE_BATCH_MAX_CONCURRENCY):
+        """
+        Genera varias escenas en paralelo con un límite de concurrencia.
+        
+        Las peticiones se lanzan en un pool de hilos acotado, de modo que el tiempo
+        total se aproxima al de la petición más lenta (y no a la suma de todas).
+        Los resultados se devuelven a medida que terminan, no en orden.
+        
+        Args:
+            jugadores: Lista de nombres de jugadores (1-3)
+            trabajos: Lista de tuplas (descripcion_escena, seed) a generar
+            max_concurrencia: Número máximo de peticiones simultáneas
+            
+        Yields:
+            dict: {'indice', 'descripcion', 'seed', 'handle', 'prompt', 'error', 'duracion'}
+                  donde 'handle' identifica la imagen codificada en el almacén
+                  compartido (ver utils.image_store) o es None si falló
+        """
+        if not jugadores or not trabajos:
+            return
+        
+        def _trabajo(indice, descripcion, seed):
+            inicio = time.time()
+            prompt = self.construir_prompt(jugadores, descripcion)
+            imagen, error = self._generar_con_respaldo(prompt, seed, PRIORIDAD_LOTE)
+            
+            # Codificar en el propio hilo: la sesión solo recibe el handle
+            handle = None
+            if imagen is not None:
+                try:
+                    handle = get_image_store().put(codificar_imagen(imagen))
+                except Exception as e:
+                    error = f"❌ Error al procesar la imagen: {str(e)}"
+            
+            return {
+                'indice': indice,
+                'descripcion': descripcion,
+                'seed': seed,
+                'handle': handle,
+                'prompt': prompt,
+                'error': error,
+                'duracion': time.time() - inicio,
+            }
+        
+        def _liberar_resultado(futuro):
+            if not futuro.cancelled() and futuro.exception() is None:
+                get_image_store().release(futuro.result()['handle'])
+        
+        num_hilos = max(1, min(max_concurrencia, len(trabajos)))
+        pool = ThreadPoolExecutor(max_workers=num_hilos, thread_name_prefix="escena_ia")
+        futuros = [
+            pool.submit(_trabajo, indice, descripcion, seed)
+            for indice, (descripcion, seed) in enumerate(trabajos)
+        ]
+        pendientes = set(futuros)
+        try:
+            for futuro in as_completed(futuros):
+                pendientes.discard(futuro)
+                yield futuro.result()
+        finally:
+            # Si Streamlit interrumpe el script (rerun o stop) el generador se cierra en el
+            # yield: no esperar a los trabajos pendientes y liberar las imágenes que ya
+            # nadie va a mostrar (las que están en curso, en cuanto terminen)
+            pool.shutdown(wait=False, cancel_futures=True)
+            for futuro in pendientes:
+                futuro.add_done_callback(_liberar_resultado)
 
 
-def render_top_players_page():
-    """Función principal para renderizar la página de IA Players"""
+def _mostrar_elemento_galeria(resultado, jugadores):
+    """Muestra una imagen de la galería del lote (o su error) con su botón de descarga."""
+    titulo = f"Escena {resultado['indice'] + 1}"
+    if resultado['seed'] is not None:
+        titulo += f" · semilla {resultado['seed']}"
+    
+    if resultado['handle'] is None:
+        st.error(f"**{titulo}**: {resultado['error']}")
+        return
+    
+    escena = get_image_store().get(resultado['handle'])
+    if escena is None:
+        st.info(f"**{titulo}**: imagen liberada por el límite de memoria del servidor.")
+        return
+    
+    st.image(escena['preview'], caption=f"{titulo} ({resultado['duracion']:.1f}s)", use_container_width=True)
+    
+    jugadores_filename = "_".join([j.replace(" ", "_") for j in jugadores])
+    st.download_button(
+        label="💾 Descargar",
+        data=escena['png'],
+        file_name=f"escena_ia_{jugadores_filename}_{resultado['indice'] + 1}.png",
+        mime="image/png",
+        use_container_width=True,
+        key=f"download_lote_{resultado['indice']}"
+    )
+
+
+def render_top_players_page(df=None):
+    """
+    Función principal para renderizar la página de IA Players
+    
+    Args:
+        df: DataFrame con los datos de jugadores (versión del dataset de esta re-ejecución);
+            si no se pasa, se usa st.session_state.df
+    """
     
     st.title("🤖 IA Players - Generador de Escenas con IA")
     st.markdown("---")
     
+    if df is None:
+        df = st.session_state.get('df')
+    
     # Verificar que existan datos
-    if 'df' not in st.session_state or st.session_state.df is None:
+    if df is None:
         st.error("❌ No hay datos cargados. Por favor, vuelve a la página de inicio.")
         return
     
-    df = st.session_state.df
-    
     
     # Obtener top 10 por overall rating
     top_10 = df.nlargest(10, 'overall_rating')[['player_name', 'overall_rating']].copy()
@@ -171,222 +484,330 @@ def render_top_players_page():
     # ========================================
     # SECCIÓN 2: GENERADOR DE ESCENAS CON IA
     # ========================================
-    st.header("🎨 Generador de Escenas Personalizadas")
-    
-    # Información sobre la tecnología utilizada
-    with st.expander("ℹ️ Sobre la tecnología de IA", expanded=False):
-        st.markdown("""
-        ### 🤖 Hugging Face - Plataforma de IA
-        
-        Esta funcionalidad utiliza **Hugging Face**, la plataforma líder en inteligencia artificial y machine learning.
-        Hugging Face aloja miles de modelos de IA de código abierto y facilita su integración en aplicaciones.
-        
-        ### ⚡ Modelo: FLUX.1-schnell
-        
-        **FLUX.1-schnell** es un modelo de generación de imágenes de última generación desarrollado por Black Forest Labs.
-        
-        **Características principales:**
-        - 🚀 **Ultra-rápido**: Genera imágenes en 10-30 segundos
-        - 🎨 **Alta calidad**: Resolución profesional y detalles fotorrealistas
-        - ✅ **Código abierto**: Disponible gratuitamente para uso general
-        - 🎯 **Especializado**: Optimizado para fotografía realista y escenas dinámicas
-        - 📊 **Eficiente**: Solo requiere 4 pasos de inferencia (vs 20-50 de otros modelos)
-        
-        **Alternativas disponibles:**
-        - Stable Diffusion XL Base (modelo de respaldo)
-        - FLUX.1-dev (modelo de respaldo con más detalle)
-        
-        *Si necesitas tu propia API key gratuita: [huggingface.co/settings/tokens](https://huggingface.co/settings/tokens)*
-        """)
-    
-    # Inicializar generador de imágenes
-    generator = SceneImageGenerator()
-    
-    # Comprobar si hay API key configurada
-    if not generator.api_key:
-        st.error("""
-        ❌ **API Key no configurada**
-        
-        Para usar esta funcionalidad:
-        1. Ve a https://huggingface.co/settings/tokens
-        2. Crea un token de acceso (Read)
-        3. Añádelo al archivo `.env` en la raíz del proyecto:
-           ```
-           HUGGINGFACE_API_KEY=hf_tu_token_aqui
-           ```
-        4. Reinicia la aplicación
-        """)
-        return
+    with medir("Sección 2: Generador de escenas"):
+        st.header("🎨 Generador de Escenas Personalizadas")
     
-    st.success("✅ API Key configurada correctamente")
+        # Información sobre la tecnología utilizada
+        with st.expander("ℹ️ Sobre la tecnología de IA", expanded=False):
+            st.markdown("""
+            ### 🤖 Hugging Face - Plataforma de IA
+        
+            Esta funcionalidad utiliza **Hugging Face**, la plataforma líder en inteligencia artificial y machine learning.
+            Hugging Face aloja miles de modelos de IA de código abierto y facilita su integración en aplicaciones.
+        
+            ### ⚡ Modelo: FLUX.1-schnell
+        
+            **FLUX.1-schnell** es un modelo de generación de imágenes de última generación desarrollado por Black Forest Labs.
+        
+            **Características principales:**
+            - 🚀 **Ultra-rápido**: Genera imágenes en 10-30 segundos
+            - 🎨 **Alta calidad**: Resolución profesional y detalles fotorrealistas
+            - ✅ **Código abierto**: Disponible gratuitamente para uso general
+            - 🎯 **Especializado**: Optimizado para fotografía realista y escenas dinámicas
+            - 📊 **Eficiente**: Solo requiere 4 pasos de inferencia (vs 20-50 de otros modelos)
+        
+            **Alternativas disponibles:**
+            - Stable Diffusion XL Base (modelo de respaldo)
+            - FLUX.1-dev (modelo de respaldo con más detalle)
+        
+            *Si necesitas tu propia API key gratuita: [huggingface.co/settings/tokens](https://huggingface.co/settings/tokens)*
+            """)
     
-    # PASO 1: Selección de jugadores (máximo 3)
-    st.subheader("1️⃣ Selecciona jugadores (máximo 3)")
+        # Inicializar generador de imágenes
+        generator = SceneImageGenerator()
     
-    # Obtener top 100 jugadores para el selector
-    top_100_players = df.nlargest(100, 'overall_rating')['player_name'].tolist()
+        # Comprobar si hay API key configurada
+        if not generator.api_key:
+            st.error("""
+            ❌ **API Key no configurada**
+        
+            Para usar esta funcionalidad:
+            1. Ve a https://huggingface.co/settings/tokens
+            2. Crea un token de acceso (Read)
+            3. Añádelo al archivo `.env` en la raíz del proyecto:
+               ```
+               HUGGINGFACE_API_KEY=hf_tu_token_aqui
+               ```
+            4. Reinicia la aplicación
+            """)
+            return
     
-    jugadores_seleccionados = st.multiselect(
-        "Arrastra y selecciona entre 1 y 3 jugadores:",
-        options=top_100_players,
-        max_selections=3,
-        placeholder="Selecciona jugadores...",
-        help="Puedes seleccionar de 1 a 3 jugadores para tu escena"
-    )
+        st.success("✅ API Key configurada correctamente")
     
-    # PASO 2: Descripción de la escena
-    st.subheader("2️⃣ Describe la escena que quieres crear")
-    
-    # Opciones predefinidas de escenas en castellano
-    escenas_predefinidas = [
-        "Los jugadores están jugando al fútbol en una hermosa playa al atardecer, divirtiéndose y riendo juntos",
-        "Dos legendarios jugadores de fútbol jugando al ajedrez en una sala elegante, concentrados y estratégicos, competencia amistosa",
-        "Jugadores de fútbol entrenando juntos en un gimnasio moderno, motivándose mutuamente, sesión de entrenamiento intenso",
-        "Jugadores celebrando una victoria de campeonato con fuegos artificiales en el fondo, pura alegría y emoción",
-        "Estrellas del fútbol disfrutando de una barbacoa relajada en un jardín, ropa casual, ambiente amigable"
-    ]
-    
-    descripcion_escena = st.selectbox(
-        "Selecciona una escena predefinida:",
-        options=escenas_predefinidas,
-        help="Elige una de las escenas prediseñadas para generar tu imagen"
-    )
+        # PASO 1: Selección de jugadores (máximo 3)
+        st.subheader("1️⃣ Selecciona jugadores (máximo 3)")
     
-    # PASO 3: Botón de generación
-    st.markdown("###")
+        # Búsqueda por nombre en todo el dataset (sin escribir nada, los de más rating)
+        jugadores_seleccionados = multiselector_jugadores(
+            df,
+            'ia_jugadores',
+            "Arrastra y selecciona entre 1 y 3 jugadores:",
+            max_selecciones=3,
+            placeholder="Selecciona jugadores...",
+            help="Puedes seleccionar de 1 a 3 jugadores para tu escena"
+        )
     
-    col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+        # PASO 2: Descripción de la escena
+        st.subheader("2️⃣ Describe la escena que quieres crear")
     
-    with col_btn2:
-        generar_escena = st.button(
-            "🎨 Generar Escena con IA",
-            type="primary",
-            use_container_width=True,
-            disabled=not jugadores_seleccionados
+        descripcion_escena = st.selectbox(
+            "Selecciona una escena predefinida:",
+            options=ESCENAS_PREDEFINIDAS,
+            help="Elige una de las escenas prediseñadas para generar tu imagen"
         )
     
-    if not jugadores_seleccionados:
-        st.info("👆 Selecciona al menos 1 jugador para continuar")
+        # PASO 3: Botón de generación
+        st.markdown("###")
     
-    # PASO 4: Generación y visualización
-    if generar_escena and jugadores_seleccionados:
-        
-        # Mostrar información de lo que se está generando
-        jugadores_str = ", ".join(jugadores_seleccionados)
-        st.info(f"🎬 Generando escena con: **{jugadores_str}**")
-        
-        # Generar imagen con spinner
-        with st.spinner(f"🎨 Generando escena... Esto puede tardar 10-30 segundos..."):
-            imagen, prompt_usado = generator.generar_escena_personalizada(jugadores_seleccionados, descripcion_escena)
-        
-        # PASO 5: Mostrar resultado y descarga
-        if imagen:
-            st.success("✅ ¡Escena generada con éxito!")
+        col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+    
+        with col_btn2:
+            generar_escena = st.button(
+                "🎨 Generar Escena con IA",
+                type="primary",
+                use_container_width=True,
+                disabled=not jugadores_seleccionados
+            )
+    
+        if not jugadores_seleccionados:
+            st.info("👆 Selecciona al menos 1 jugador para continuar")
+    
+        # Estado de la cola global de generación (compartida por todas las sesiones)
+        stats_cola = generator.limiter.stats(generator.sesion_id)
+        texto_cola = (
+            f"🚦 Cola de generación: **{stats_cola['en_cola']}** peticiones en espera · "
+            f"espera estimada **~{stats_cola['espera_estimada']:.0f}s**"
+        )
+        if stats_cola['cuota_diaria']:
+            texto_cola += f" · cuota restante hoy: **{stats_cola['cuota_restante']}**"
+        st.caption(texto_cola)
+    
+        # PASO 4: Generación y visualización
+        if generar_escena and jugadores_seleccionados:
+        
+            # Mostrar información de lo que se está generando
+            jugadores_str = ", ".join(jugadores_seleccionados)
+            st.info(f"🎬 Generando escena con: **{jugadores_str}**")
+        
+            # Generar imagen con spinner
+            espera_cola = generator.limiter.estimated_wait()
+            mensaje_espera = f" (en cola: ~{espera_cola:.0f}s de espera)" if espera_cola >= 1 else ""
+            with st.spinner(f"🎨 Generando escena... Esto puede tardar 10-30 segundos...{mensaje_espera}"):
+                imagen, prompt_usado = generator.generar_escena_personalizada(jugadores_seleccionados, descripcion_escena)
+        
+            # PASO 5: Mostrar resultado y descarga
+            if imagen:
+                st.success("✅ ¡Escena generada con éxito!")
             
-            # Guardar en session_state para persistencia
-            st.session_state.ultima_escena_generada = imagen
-            st.session_state.ultimos_jugadores_escena = jugadores_seleccionados
-            st.session_state.ultima_descripcion_escena = descripcion_escena
-            st.session_state.ultimo_prompt_usado = prompt_usado
+                # Codificar una sola vez (PNG para descarga + vista previa ligera)
+                escena = codificar_imagen(imagen)
             
-            # Mostrar imagen en tamaño reducido (centrada y más pequeña en pantalla)
-            col_img1, col_img2, col_img3 = st.columns([1, 2, 1])
+                # Guardar en el almacén compartido; la sesión solo guarda el handle
+                store = get_image_store()
+                store.release(st.session_state.get('ultima_escena_handle'))
+                st.session_state.ultima_escena_handle = store.put(escena)
+                st.session_state.ultimos_jugadores_escena = jugadores_seleccionados
+                st.session_state.ultima_descripcion_escena = descripcion_escena
+                st.session_state.ultimo_prompt_usado = prompt_usado
             
-            with col_img2:
-                st.image(imagen, caption=f"Escena generada: {jugadores_str}", use_container_width=True)
+                # Mostrar imagen en tamaño reducido (centrada y más pequeña en pantalla)
+                col_img1, col_img2, col_img3 = st.columns([1, 2, 1])
             
-            # Mostrar prompt usado (para debugging)
-            with st.expander("🔍 Ver prompt enviado a la IA"):
-                st.code(prompt_usado, language="text")
-                st.info("💡 El modelo de IA genera imágenes genéricas basadas en el prompt, no puede crear caras reales de personas específicas por cuestiones éticas y técnicas.")
+                with col_img2:
+                    st.image(escena['preview'], caption=f"Escena generada: {jugadores_str}", use_container_width=True)
             
-            # Preparar archivo para descarga
-            buffer = BytesIO()
-            imagen.save(buffer, format='PNG')
-            buffer.seek(0)
+                # Mostrar prompt usado (para debugging)
+                with st.expander("🔍 Ver prompt enviado a la IA"):
+                    st.code(prompt_usado, language="text")
+                    st.info("💡 El modelo de IA genera imágenes genéricas basadas en el prompt, no puede crear caras reales de personas específicas por cuestiones éticas y técnicas.")
             
-            # Crear nombre de archivo
-            jugadores_filename = "_".join([j.replace(" ", "_") for j in jugadores_seleccionados])
-            filename = f"escena_ia_{jugadores_filename}.png"
+                # Crear nombre de archivo
+                jugadores_filename = "_".join([j.replace(" ", "_") for j in jugadores_seleccionados])
+                filename = f"escena_ia_{jugadores_filename}.png"
             
-            # Botón de descarga centrado
-            col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+                # Botón de descarga centrado
+                col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
             
-            with col_dl2:
-                st.download_button(
-                    label="💾 Descargar Imagen",
-                    data=buffer,
-                    file_name=filename,
-                    mime="image/png",
-                    use_container_width=True
-                )
+                with col_dl2:
+                    st.download_button(
+                        label="💾 Descargar Imagen",
+                        data=escena['png'],
+                        file_name=filename,
+                        mime="image/png",
+                        use_container_width=True
+                    )
             
-            # Mostrar detalles
-            with st.expander("📋 Detalles de la generación"):
-                st.markdown(f"""
-                **Jugadores incluidos:** {jugadores_str}
+                # Mostrar detalles
+                with st.expander("📋 Detalles de la generación"):
+                    st.markdown(f"""
+                    **Jugadores incluidos:** {jugadores_str}
                 
-                **Descripción:** {descripcion_escena}
+                    **Descripción:** {descripcion_escena}
                 
-                **Modelo IA:** FLUX.1-schnell (black-forest-labs)
+                    **Modelo IA:** FLUX.1-schnell (black-forest-labs)
                 
-                **Resolución:** 768x768 pixels
+                    **Resolución:** 768x768 pixels
                 
-                **Configuración técnica:**
-                - Pasos de inferencia: 4
-                - Guidance scale: 3.5
-                - Estilo: Fotografía profesional fotorrealista
-                """)
+                    **Configuración técnica:**
+                    - Pasos de inferencia: 4
+                    - Guidance scale: 3.5
+                    - Estilo: Fotografía profesional fotorrealista
+                    """)
     
-    # Mostrar última escena generada (persistencia entre interacciones)
-    if 'ultima_escena_generada' in st.session_state and not generar_escena:
-        st.markdown("---")
-        st.markdown("### 🖼️ Última escena generada:")
+        # Mostrar última escena generada (persistencia entre interacciones)
+        escena_previa = get_image_store().get(st.session_state.get('ultima_escena_handle'))
+    
+        if 'ultima_escena_handle' in st.session_state and escena_previa is None and not generar_escena:
+            st.info("🧹 La última escena generada se liberó por el límite de memoria del servidor.")
+    
+        if escena_previa is not None and not generar_escena:
+            st.markdown("---")
+            st.markdown("### 🖼️ Última escena generada:")
         
-        jugadores_previos = ", ".join(st.session_state.ultimos_jugadores_escena)
+            jugadores_previos = ", ".join(st.session_state.ultimos_jugadores_escena)
         
-        # Mostrar imagen en tamaño reducido (centrada)
-        col_prev1, col_prev2, col_prev3 = st.columns([1, 2, 1])
+            # Mostrar imagen en tamaño reducido (centrada)
+            col_prev1, col_prev2, col_prev3 = st.columns([1, 2, 1])
         
-        with col_prev2:
-            st.image(
-                st.session_state.ultima_escena_generada,
-                caption=f"Escena con: {jugadores_previos}",
-                use_container_width=True
-            )
+            with col_prev2:
+                st.image(
+                    escena_previa['preview'],
+                    caption=f"Escena con: {jugadores_previos}",
+                    use_container_width=True
+                )
         
-        # Mostrar prompt usado (si existe)
-        if 'ultimo_prompt_usado' in st.session_state:
-            with st.expander("🔍 Ver prompt enviado a la IA"):
-                st.code(st.session_state.ultimo_prompt_usado, language="text")
-                st.info("💡 El modelo de IA genera imágenes genéricas basadas en el prompt, no puede crear caras reales de personas específicas por cuestiones éticas y técnicas.")
+            # Mostrar prompt usado (si existe)
+            if 'ultimo_prompt_usado' in st.session_state:
+                with st.expander("🔍 Ver prompt enviado a la IA"):
+                    st.code(st.session_state.ultimo_prompt_usado, language="text")
+                    st.info("💡 El modelo de IA genera imágenes genéricas basadas en el prompt, no puede crear caras reales de personas específicas por cuestiones éticas y técnicas.")
         
-        # Botón de descarga persistente
-        buffer_persistente = BytesIO()
-        st.session_state.ultima_escena_generada.save(buffer_persistente, format='PNG')
-        buffer_persistente.seek(0)
+            # Botón de descarga persistente (reutiliza el PNG ya codificado)
+            jugadores_filename_prev = "_".join([j.replace(" ", "_") for j in st.session_state.ultimos_jugadores_escena])
+            filename_prev = f"escena_ia_{jugadores_filename_prev}.png"
         
-        jugadores_filename_prev = "_".join([j.replace(" ", "_") for j in st.session_state.ultimos_jugadores_escena])
-        filename_prev = f"escena_ia_{jugadores_filename_prev}.png"
+            col_persist1, col_persist2, col_persist3 = st.columns([1, 2, 1])
         
-        col_persist1, col_persist2, col_persist3 = st.columns([1, 2, 1])
+            with col_persist2:
+                st.download_button(
+                    label="💾 Descargar Última Escena",
+                    data=escena_previa['png'],
+                    file_name=filename_prev,
+                    mime="image/png",
+                    use_container_width=True,
+                    key="download_persistent"
+                )
         
-        with col_persist2:
-            st.download_button(
-                label="💾 Descargar Última Escena",
-                data=buffer_persistente,
-                file_name=filename_prev,
-                mime="image/png",
+            with st.expander("📋 Detalles de esta escena"):
+                st.markdown(f"""
+                **Jugadores:** {jugadores_previos}
+            
+                **Descripción:** {st.session_state.ultima_descripcion_escena}
+                """)
+    
+    # ========================================
+    # SECCIÓN 3: GENERACIÓN EN LOTE
+    # ========================================
+    with medir("Sección 3: Generación en lote"):
+        st.markdown("---")
+        st.header("🎞️ Generación en Lote")
+        st.markdown(
+            f"Genera varias escenas a la vez para los jugadores seleccionados. Se lanzan hasta "
+            f"**{HUGGINGFACE_BATCH_MAX_CONCURRENCY} peticiones en paralelo** y cada imagen aparece "
+            f"en la galería en cuanto termina."
+        )
+    
+        modo_lote = st.radio(
+            "Modo de generación:",
+            options=["Todas las escenas predefinidas", "Variantes de la escena seleccionada"],
+            horizontal=True,
+            key="modo_lote"
+        )
+    
+        if modo_lote == "Variantes de la escena seleccionada":
+            num_variantes = st.number_input(
+                "Número de variantes (semillas distintas):",
+                min_value=2,
+                max_value=HUGGINGFACE_BATCH_MAX_SEEDS,
+                value=4,
+                step=1,
+                key="num_variantes_lote"
+            )
+            trabajos_lote = [(descripcion_escena, random.randrange(2**31)) for _ in range(int(num_variantes))]
+        else:
+            trabajos_lote = [(escena, None) for escena in ESCENAS_PREDEFINIDAS]
+    
+        col_lote1, col_lote2, col_lote3 = st.columns([1, 2, 1])
+    
+        with col_lote2:
+            generar_lote = st.button(
+                f"🎞️ Generar Lote ({len(trabajos_lote)} escenas)",
                 use_container_width=True,
-                key="download_persistent"
+                disabled=not jugadores_seleccionados,
+                key="generar_lote"
             )
+    
+        if generar_lote and jugadores_seleccionados:
+            # Liberar la galería anterior de esta sesión antes de generar la nueva
+            for resultado_previo in st.session_state.get('galeria_lote', {}).get('resultados', []):
+                get_image_store().release(resultado_previo['handle'])
+        
+            st.info(f"🎬 Generando {len(trabajos_lote)} escenas con: **{', '.join(jugadores_seleccionados)}**")
+        
+            # Huecos de la galería: se rellenan a medida que termina cada petición
+            columnas_galeria = st.columns(3)
+            huecos = []
+            for idx in range(len(trabajos_lote)):
+                with columnas_galeria[idx % 3]:
+                    hueco = st.empty()
+                    hueco.info(f"⏳ Escena {idx + 1} en cola...")
+                    huecos.append(hueco)
+        
+            barra_progreso = st.progress(0.0)
+            resultados_lote = [None] * len(trabajos_lote)
+            inicio_lote = time.time()
+        
+            for completados, resultado in enumerate(
+                generator.generar_escenas_en_lote(jugadores_seleccionados, trabajos_lote), 1
+            ):
+                with huecos[resultado['indice']].container():
+                    _mostrar_elemento_galeria(resultado, jugadores_seleccionados)
+                resultados_lote[resultado['indice']] = resultado
+                barra_progreso.progress(
+                    completados / len(trabajos_lote),
+                    text=f"{completados}/{len(trabajos_lote)} escenas completadas"
+                )
         
-        with st.expander("📋 Detalles de esta escena"):
-            st.markdown(f"""
-            **Jugadores:** {jugadores_previos}
-            
-            **Descripción:** {st.session_state.ultima_descripcion_escena}
-            """)
+            duracion_lote = time.time() - inicio_lote
+            st.session_state.galeria_lote = {
+                'jugadores': jugadores_seleccionados,
+                'resultados': resultados_lote,
+                'duracion': duracion_lote,
+            }
+        
+            correctas = sum(1 for r in resultados_lote if r['handle'] is not None)
+            st.success(f"✅ Lote completado: {correctas}/{len(resultados_lote)} escenas en **{duracion_lote:.1f}s**")
+    
+        elif 'galeria_lote' in st.session_state:
+            # Mostrar la última galería generada (persistencia entre interacciones)
+            galeria = st.session_state.galeria_lote
+            st.markdown(f"### 🖼️ Última galería ({', '.join(galeria['jugadores'])}) · {galeria['duracion']:.1f}s")
+        
+            columnas_galeria = st.columns(3)
+            for resultado in galeria['resultados']:
+                with columnas_galeria[resultado['indice'] % 3]:
+                    _mostrar_elemento_galeria(resultado, galeria['jugadores'])
     
     st.markdown("---")
+    stats_imagenes = get_image_store().stats()
+    st.caption(
+        f"🖼️ Imágenes en memoria del servidor: {stats_imagenes['bytes_memoria'] / 1024**2:.1f} MB "
+        f"de {stats_imagenes['max_memoria_bytes'] / 1024**2:.0f} MB ({stats_imagenes['entradas_memoria']}) · "
+        f"en disco: {stats_imagenes['bytes_disco'] / 1024**2:.1f} MB ({stats_imagenes['entradas_disco']})"
+    )
+    stats_peticiones = PETICIONES_EN_CURSO.stats()
+    st.caption(
+        f"🔗 Peticiones a la API: {stats_peticiones['ejecutadas']} enviadas · "
+        f"{stats_peticiones['compartidas']} agrupadas con otra idéntica en curso"
+    )
     st.markdown("*Escenas generadas con IA usando FLUX.1-schnell | Datos del dataset FIFA*")
@@ -3,6 +3,261 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from utils.profiler import medir
+from ui.search import selector_jugador
+from utils.aggregates import get_agregados
+from utils.composite import get_motor_puntuaciones
+from utils.pareto import get_motor_pareto
+from utils.percentiles import get_indice_percentiles
+from utils.const import RANKING_TOP, PARETO_PUNTOS_FONDO_MAX, NOMBRES_ATRIBUTOS
+from utils.positions import COLUMNA_POSICION, PORTERO
+
+# Perfiles predefinidos del ranking personalizado (atributo -> peso)
+PERFILES_PUNTUACION = {
+    "🏃 Extremo": {'sprint_speed': 1.0, 'dribbling': 1.0, 'acceleration': 1.0},
+    "🎯 Delantero centro": {'finishing': 2.0, 'shot_power': 1.0, 'heading_accuracy': 1.0, 'ball_control': 1.0},
+    "🧠 Mediocentro": {'short_passing': 2.0, 'ball_control': 1.0, 'dribbling': 1.0, 'stamina': 1.0},
+    "🛡️ Defensa": {'heading_accuracy': 1.0, 'jumping': 1.0, 'aggression': 1.0, 'stamina': 1.0},
+    "✏️ Personalizado": {},
+}
+PERFIL_POR_DEFECTO = "🏃 Extremo"
+
+# Escalas del comparador con radar: valor en bruto o percentil (global / en la liga del jugador)
+ESCALAS_RADAR = {"Valor (0-100)": None, "Percentil global": False, "Percentil en su liga": True}
+
+# Atributos del ranking personalizado y de la frontera de Pareto (altura y peso no son habilidades)
+ATRIBUTOS_HABILIDAD = [attr for attr in NOMBRES_ATRIBUTOS if attr not in ('height', 'weight')]
+
+# Atributos iniciales de la frontera de Pareto
+PARETO_POR_DEFECTO = ['finishing', 'sprint_speed']
+
+
+def _aplicar_perfil():
+    """Al elegir un perfil, sus atributos y pesos pasan a los controles del ranking personalizado."""
+    perfil = PERFILES_PUNTUACION.get(st.session_state.ranking_perfil, {})
+    if perfil:
+        st.session_state.ranking_atributos = list(perfil)
+        for atributo, peso in perfil.items():
+            st.session_state[f'ranking_peso_{atributo}'] = peso
+
+
+def _render_ranking_personalizado(df, candidatas, filtros, display_ranking):
+    """
+    Ranking por una media ponderada de atributos elegida por el usuario (ver utils/composite.py).
+
+    `candidatas` son las filas que dejan pasar `filtros` (liga, equipo, posición).
+    """
+    disponibles = [attr for attr in ATRIBUTOS_HABILIDAD if attr in df.columns]
+    if not disponibles:
+        st.warning("No hay datos disponibles para esta categoría.")
+        return
+
+    if 'ranking_perfil' not in st.session_state:
+        st.session_state.ranking_perfil = PERFIL_POR_DEFECTO
+        _aplicar_perfil()
+
+    st.markdown("Define tu propia puntuación como una media ponderada de atributos.")
+    col_perfil, col_atributos = st.columns([1, 3])
+    with col_perfil:
+        st.selectbox("📋 Perfil:", options=list(PERFILES_PUNTUACION), key='ranking_perfil', on_change=_aplicar_perfil)
+    with col_atributos:
+        atributos = st.multiselect(
+            "📊 Atributos:",
+            options=disponibles,
+            key='ranking_atributos',
+            format_func=lambda attr: NOMBRES_ATRIBUTOS.get(attr, attr)
+        )
+
+    if not atributos:
+        st.info("Elige al menos un atributo para calcular la puntuación.")
+        return
+
+    pesos = {}
+    cols_pesos = st.columns(len(atributos))
+    for col_peso, atributo in zip(cols_pesos, atributos):
+        with col_peso:
+            clave = f'ranking_peso_{atributo}'
+            if clave not in st.session_state:
+                st.session_state[clave] = 1.0
+            pesos[atributo] = st.slider(NOMBRES_ATRIBUTOS.get(atributo, atributo), 0.0, 5.0, step=0.5, key=clave)
+
+    if not any(pesos.values()):
+        st.info("Todos los pesos son 0: sube alguno para calcular la puntuación.")
+        return
+
+    # Con los mismos pesos y filtros se reutilizan el ranking y la tabla del rerun anterior
+    clave = (id(df), tuple(pesos.items()), filtros)
+    guardado = st.session_state.get('ranking_personalizado')
+    if guardado is not None and guardado[0] == clave:
+        _, resultado, df_top, formula = guardado
+        reutilizado = True
+    else:
+        # candidatas: filas de la liga, el equipo y la posición elegidos (None = todos)
+        resultado = get_motor_puntuaciones(df).top(pesos, RANKING_TOP, candidatas)
+        columnas = [c for c in ('player_name', 'team_long_name', 'league_name', 'country_name') if c in df.columns]
+        df_top = df.iloc[resultado.filas][columnas].reset_index(drop=True)
+        df_top['puntuacion'] = resultado.puntuacion
+        formula = ' + '.join(f"{peso:g}·{NOMBRES_ATRIBUTOS.get(attr, attr)}" for attr, peso in pesos.items() if peso)
+        st.session_state.ranking_personalizado = (clave, resultado, df_top, formula)
+        reutilizado = False
+
+    st.caption(
+        f"⚡ {resultado.candidatos:,} jugadores puntuados y ordenados en {resultado.tiempo_ms:.1f} ms"
+        + (" (ranking reutilizado)" if reutilizado else " (puntuaciones en caché)" if resultado.en_cache else "")
+    )
+
+    display_ranking(df_top, 'puntuacion', 'custom', filtros_extra=formula)
+
+
+def _texto_percentil(valor, global_, en_liga):
+    """'87 · P97 global · P95 en su liga' (sin los percentiles que falten)."""
+    partes = [f"{valor:.0f}"]
+    if not np.isnan(global_):
+        partes.append(f"P{global_:.0f} global")
+    if not np.isnan(en_liga):
+        partes.append(f"P{en_liga:.0f} en su liga")
+    return " · ".join(partes)
+
+
+def _valores_radar(df, jugador, atributos, escala):
+    """
+    Valores del radar de un jugador (los atributos o sus percentiles) y el texto de cada punto.
+
+    Args:
+        escala: None (valor en bruto), False (percentil global) o True (percentil en su liga)
+    """
+    fila = get_agregados(df).fila_de_jugador[jugador]
+    brutos = df.iloc[fila][atributos].to_numpy(dtype=float)
+    indice = get_indice_percentiles(df)
+    global_ = indice.percentiles([fila], atributos)[0]
+    en_liga = indice.percentiles([fila], atributos, por_liga=True)[0]
+    valores = brutos if escala is None else (en_liga if escala else global_)
+    return valores, [_texto_percentil(*trio) for trio in zip(brutos, global_, en_liga)]
+
+
+def _figura_pareto(df, atributos, liga, equipo, filas_frontera, frontera):
+    """Scatter de los jugadores filtrados con la frontera de Pareto superpuesta (2D o 3D)."""
+    # De fondo, el resto de jugadores (una muestra si son muchos: el scatter no los necesita todos)
+    candidatas = get_agregados(df).filas_filtradas(liga, equipo)
+    resto = np.setdiff1d(np.arange(len(df)) if candidatas is None else candidatas, filas_frontera, assume_unique=True)
+    if len(resto) > PARETO_PUNTOS_FONDO_MAX:
+        resto = np.sort(np.random.default_rng(0).choice(resto, PARETO_PUNTOS_FONDO_MAX, replace=False))
+
+    fondo = df.iloc[resto][frontera.columns].dropna(subset=atributos)
+    etiquetas = {attr: NOMBRES_ATRIBUTOS.get(attr, attr) for attr in atributos}
+    color = 'overall_rating' if 'overall_rating' in df.columns else None
+
+    if len(atributos) == 2:
+        fig = px.scatter(
+            fondo, x=atributos[0], y=atributos[1],
+            labels=etiquetas, opacity=0.5,
+            color=color, color_continuous_scale='Viridis',
+            hover_data={'player_name': True}
+        )
+        # La frontera como escalera: ninguno de los de fondo queda por encima y a la derecha
+        fig.add_trace(go.Scatter(
+            x=frontera[atributos[0]], y=frontera[atributos[1]],
+            mode='lines+markers',
+            line=dict(color='red', width=2, shape='hv'),
+            marker=dict(size=12, color='red', symbol='star', line=dict(color='white', width=1)),
+            text=frontera['player_name'],
+            name="Frontera de Pareto",
+            hovertemplate="<b>%{text}</b><br>%{x} / %{y}<extra></extra>"
+        ))
+    else:
+        fig = px.scatter_3d(
+            fondo, x=atributos[0], y=atributos[1], z=atributos[2],
+            labels=etiquetas, opacity=0.4,
+            color=color, color_continuous_scale='Viridis',
+            hover_data={'player_name': True}
+        )
+        fig.update_traces(marker=dict(size=3))
+        fig.add_trace(go.Scatter3d(
+            x=frontera[atributos[0]], y=frontera[atributos[1]], z=frontera[atributos[2]],
+            mode='markers',
+            marker=dict(size=7, color='red', symbol='diamond', line=dict(color='white', width=1)),
+            text=frontera['player_name'],
+            name="Frontera de Pareto",
+            hovertemplate="<b>%{text}</b><br>%{x} / %{y} / %{z}<extra></extra>"
+        ))
+    fig.update_layout(
+        title=f"Frontera de Pareto: {' vs '.join(etiquetas.values())}",
+        height=550,
+        legend=dict(orientation='h', y=-0.15)
+    )
+    return fig
+
+
+def _render_frontera_pareto(df):
+    """Frontera de Pareto de 2 o 3 atributos sobre el scatter de todos los jugadores (ver utils/pareto.py)."""
+    agregados = get_agregados(df)
+    disponibles = [attr for attr in ATRIBUTOS_HABILIDAD if attr in df.columns]
+    if len(disponibles) < 2:
+        st.warning("No hay datos disponibles para esta categoría.")
+        return
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        atributos = st.multiselect(
+            "📊 Atributos (2 o 3):",
+            options=disponibles,
+            default=[attr for attr in PARETO_POR_DEFECTO if attr in disponibles] or disponibles[:2],
+            max_selections=3,
+            format_func=lambda attr: NOMBRES_ATRIBUTOS.get(attr, attr),
+            key='pareto_atributos'
+        )
+    with col2:
+        liga_display = st.selectbox(
+            "🏆 Liga:",
+            options=["Todas las ligas"] + agregados.lista_ligas,
+            key='pareto_liga'
+        )
+        liga = None if liga_display == "Todas las ligas" else agregados.liga_por_display[liga_display]
+    with col3:
+        if liga is None:
+            equipos = agregados.lista_equipos
+        else:
+            info = agregados.equipos_con_info
+            equipos = info.loc[info['league_name'] == liga, 'display_name'].tolist()
+        # Al cambiar de liga, el equipo elegido puede no estar en la nueva lista
+        if st.session_state.get('pareto_equipo') not in ["Todos los equipos"] + equipos:
+            st.session_state.pareto_equipo = "Todos los equipos"
+        equipo_display = st.selectbox(
+            "⚽ Equipo:",
+            options=["Todos los equipos"] + equipos,
+            key='pareto_equipo'
+        )
+        equipo = None if equipo_display == "Todos los equipos" else agregados.equipo_por_display[equipo_display]
+
+    if len(atributos) < 2:
+        st.info("Elige al menos 2 atributos.")
+        return
+
+    resultado = get_motor_pareto(df).frontera(df, atributos, liga=liga, equipo=equipo)
+    st.caption(f"⚡ {len(resultado.filas):,} jugadores en la frontera de {resultado.candidatos:,} "
+               f"en {resultado.tiempo_ms:.1f} ms" + (" (en caché)" if resultado.en_cache else ""))
+    if len(resultado.filas) == 0:
+        st.warning("No hay jugadores que cumplan con los filtros seleccionados.")
+        return
+
+    columnas = ['player_name'] + atributos + [c for c in ('overall_rating', 'team_long_name') if c in df.columns and c not in atributos]
+    frontera = df.iloc[resultado.filas][columnas]
+
+    with medir("gráfico frontera de Pareto"):
+        # Una figura por (atributos, liga, equipo) y versión del dataset, compartida entre sesiones
+        fig = agregados.figura(
+            ('pareto', tuple(atributos), liga, equipo),
+            lambda: _figura_pareto(df, atributos, liga, equipo, resultado.filas, frontera)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    tabla = frontera.reset_index(drop=True)
+    tabla.index = tabla.index + 1
+    st.dataframe(
+        tabla.rename(columns={'player_name': 'Jugador', 'team_long_name': 'Equipo', **NOMBRES_ATRIBUTOS}),
+        use_container_width=True
+    )
+
 
 def render_players_page(df):
     """
@@ -15,589 +270,626 @@ def render_players_page(df):
     st.markdown("---")
     
     # ========== SECCIÓN 1: PICO DE RENDIMIENTO POR EDAD ==========
-    st.markdown("### 🎯 El Pico de Rendimiento: Edad vs Rating")
-    st.markdown("Con el gráfico de rangos de habilidad podemos observar que solo el **5.8% de todos los jugadores se consideran élite** (rating superior a 80).  \nEl análisis revela tambien que **a qué edad los futbolistas alcanzan su máximo nivel**, con el pico de rendimiento entre los 25-30 años.")
+    with medir("Sección 1: Pico de rendimiento por edad"):
+        st.markdown("### 🎯 El Pico de Rendimiento: Edad vs Rating")
+        st.markdown("Con el gráfico de rangos de habilidad podemos observar que solo el **5.8% de todos los jugadores se consideran élite** (rating superior a 80).  \nEl análisis revela tambien que **a qué edad los futbolistas alcanzan su máximo nivel**, con el pico de rendimiento entre los 25-30 años.")
     
-    if 'overall_rating' in df.columns and 'birthday' in df.columns:
-        # Calcular edad
-        df_edad = df.copy()
-        df_edad['birthday'] = pd.to_datetime(df_edad['birthday'], errors='coerce')
-        df_edad['edad'] = (pd.Timestamp('2016-12-31') - df_edad['birthday']).dt.days / 365.25
-        df_edad = df_edad.dropna(subset=['edad', 'overall_rating'])
-        
-        col1, col2 = st.columns([1, 2])
-        
-        with col1:
-            st.markdown("#### 📊 Rangos de Habilidad")
-            
-            # Crear categorías de habilidad
-            df_temp = df.copy()
-            df_temp['categoria'] = pd.cut(
-                df_temp['overall_rating'], 
-                bins=[0, 60, 70, 80, 100],
-                labels=['📉 Bajo (0-60)', '📊 Medio (60-70)', '📈 Alto (70-80)', '🌟 Elite (80+)']
-            )
+        if 'overall_rating' in df.columns and 'birthday' in df.columns:
+            # Calcular edad
+            df_edad = df.copy()
+            df_edad['birthday'] = pd.to_datetime(df_edad['birthday'], errors='coerce')
+            df_edad['edad'] = (pd.Timestamp('2016-12-31') - df_edad['birthday']).dt.days / 365.25
+            df_edad = df_edad.dropna(subset=['edad', 'overall_rating'])
+        
+            col1, col2 = st.columns([1, 2])
+        
+            with col1:
+                st.markdown("#### 📊 Rangos de Habilidad")
+            
+                # Crear categorías de habilidad
+                df_temp = df.copy()
+                df_temp['categoria'] = pd.cut(
+                    df_temp['overall_rating'], 
+                    bins=[0, 60, 70, 80, 100],
+                    labels=['📉 Bajo (0-60)', '📊 Medio (60-70)', '📈 Alto (70-80)', '🌟 Elite (80+)']
+                )
             
-            categoria_counts = df_temp['categoria'].value_counts().sort_index()
+                categoria_counts = df_temp['categoria'].value_counts().sort_index()
             
-            for cat, count in categoria_counts.items():
-                percentage = (count / len(df_temp)) * 100
-                st.markdown(f"**{cat}**")
-                st.progress(percentage / 100)
-                st.caption(f"{count:,} jugadores ({percentage:.1f}%)")
+                for cat, count in categoria_counts.items():
+                    percentage = (count / len(df_temp)) * 100
+                    st.markdown(f"**{cat}**")
+                    st.progress(percentage / 100)
+                    st.caption(f"{count:,} jugadores ({percentage:.1f}%)")
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
              
-            # Calcular estadísticas del pico con ponderación por número de jugadores
-            edad_int = df_edad['edad'].astype(int)
-            rating_por_edad = df_edad.groupby(edad_int).agg(
-                rating_medio=('overall_rating', 'mean'),
-                num_jugadores=('overall_rating', 'count')
-            )
-            
-            # Calcular score ponderado: rating_medio * log(num_jugadores + 1)
-            # Esto da más peso a edades con más jugadores sin eliminar las minoritarias
-            rating_por_edad['score_ponderado'] = rating_por_edad['rating_medio'] * np.log1p(rating_por_edad['num_jugadores'])
-            
-            edad_pico = rating_por_edad['score_ponderado'].idxmax()
-            rating_pico = rating_por_edad.loc[edad_pico, 'rating_medio']
-            num_jugadores_pico = rating_por_edad.loc[edad_pico, 'num_jugadores']
-            
-            st.markdown("#### 🏆 Pico de Rendimiento")
-            col_edad, col_rating = st.columns(2)
-            with col_edad:
-                st.metric("Edad del Pico", f"{int(edad_pico)} años")
-            with col_rating:
-                st.metric("Rating Promedio", f"{rating_pico:.1f}")
-        
-        with col2:
-            # Filtro para resaltar jugador (encima del gráfico)
-            # Ordenar jugadores por overall rating descendente
-            jugadores_ordenados = df_edad.sort_values('overall_rating', ascending=False)['player_name'].unique().tolist()
-            
-            jugador_resaltar = st.selectbox(
-                "🔍 Resaltar jugador en el gráfico:",
-                options=['Ninguno'] + jugadores_ordenados,
-                key='jugador_resaltar_edad'
-            )
-            # Scatter plot con línea de tendencia
-            fig_scatter = px.scatter(
-                df_edad,
-                x='edad',
-                y='overall_rating',
-                title='Rendimiento por Edad: ¿Cuándo alcanzan su pico los jugadores?',
-                labels={'edad': 'Edad (años)', 'overall_rating': 'Overall Rating'},
-                opacity=0.4,
-                color='overall_rating',
-                color_continuous_scale='RdYlGn',
-                trendline='lowess',
-                trendline_color_override='red',
-                hover_data={'player_name': True, 'edad': ':.1f', 'overall_rating': True}
-            )
-            
-            fig_scatter.update_layout(
-                height=450,
-                showlegend=False
-            )
-            
-            fig_scatter.add_hline(
-                y=80, 
-                line_dash="dash", 
-                line_color="gold",
-                annotation_text="Nivel Elite (80+)",
-                annotation_position="right"
-            )
-            
-            # Si hay un jugador seleccionado, resaltarlo
-            if jugador_resaltar and jugador_resaltar != 'Ninguno':
-                jugador_data = df_edad[df_edad['player_name'] == jugador_resaltar].iloc[0]
-                
-                # Añadir punto grande para el jugador resaltado
-                fig_scatter.add_trace(go.Scatter(
-                    x=[jugador_data['edad']],
-                    y=[jugador_data['overall_rating']],
-                    mode='markers',
-                    marker=dict(
-                        size=20,
-                        color='red',
-                        symbol='star',
-                        line=dict(color='white', width=2)
-                    ),
-                    name=jugador_resaltar,
-                    showlegend=False,
-                    hovertemplate=f"<b>{jugador_resaltar}</b><br>Edad: {jugador_data['edad']:.1f}<br>Rating: {jugador_data['overall_rating']}<extra></extra>"
-                ))
-                
-                # Añadir anotación
-                fig_scatter.add_annotation(
-                    x=jugador_data['edad'],
-                    y=jugador_data['overall_rating'],
-                    text=f"<b>{jugador_resaltar}</b><br>Edad: {jugador_data['edad']:.1f}<br>Rating: {jugador_data['overall_rating']}",
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1,
-                    arrowwidth=2,
-                    arrowcolor="#ff0000",
-                    ax=60,
-                    ay=-60,
-                    bgcolor="rgba(255, 255, 255, 0.9)",
-                    bordercolor="#ff0000",
-                    borderwidth=2
+                # Calcular estadísticas del pico con ponderación por número de jugadores
+                edad_int = df_edad['edad'].astype(int)
+                rating_por_edad = df_edad.groupby(edad_int).agg(
+                    rating_medio=('overall_rating', 'mean'),
+                    num_jugadores=('overall_rating', 'count')
+                )
+            
+                # Calcular score ponderado: rating_medio * log(num_jugadores + 1)
+                # Esto da más peso a edades con más jugadores sin eliminar las minoritarias
+                rating_por_edad['score_ponderado'] = rating_por_edad['rating_medio'] * np.log1p(rating_por_edad['num_jugadores'])
+            
+                edad_pico = rating_por_edad['score_ponderado'].idxmax()
+                rating_pico = rating_por_edad.loc[edad_pico, 'rating_medio']
+                num_jugadores_pico = rating_por_edad.loc[edad_pico, 'num_jugadores']
+            
+                st.markdown("#### 🏆 Pico de Rendimiento")
+                col_edad, col_rating = st.columns(2)
+                with col_edad:
+                    st.metric("Edad del Pico", f"{int(edad_pico)} años")
+                with col_rating:
+                    st.metric("Rating Promedio", f"{rating_pico:.1f}")
+        
+            with col2:
+                # Filtro para resaltar jugador (encima del gráfico), con búsqueda por nombre
+                jugador_resaltar = selector_jugador(
+                    df, 'jugador_resaltar_edad', "🔍 Resaltar jugador en el gráfico:", ninguno='Ninguno'
                 )
+                # Scatter plot con línea de tendencia
+                with medir("gráfico edad vs rating"):
+                    fig_scatter = px.scatter(
+                        df_edad,
+                        x='edad',
+                        y='overall_rating',
+                        title='Rendimiento por Edad: ¿Cuándo alcanzan su pico los jugadores?',
+                        labels={'edad': 'Edad (años)', 'overall_rating': 'Overall Rating'},
+                        opacity=0.4,
+                        color='overall_rating',
+                        color_continuous_scale='RdYlGn',
+                        trendline='lowess',
+                        trendline_color_override='red',
+                        hover_data={'player_name': True, 'edad': ':.1f', 'overall_rating': True}
+                    )
+            
+                    fig_scatter.update_layout(
+                        height=450,
+                        showlegend=False
+                    )
             
-            st.plotly_chart(fig_scatter, use_container_width=True)
+                    fig_scatter.add_hline(
+                        y=80, 
+                        line_dash="dash", 
+                        line_color="gold",
+                        annotation_text="Nivel Elite (80+)",
+                        annotation_position="right"
+                    )
+            
+                    # Si hay un jugador seleccionado, resaltarlo
+                    # (puede no estar en df_edad si le falta la fecha de nacimiento)
+                    resaltado = jugador_resaltar and jugador_resaltar != 'Ninguno'
+                    coincidencias = df_edad[df_edad['player_name'] == jugador_resaltar] if resaltado else df_edad.iloc[:0]
+                    if not coincidencias.empty:
+                        jugador_data = coincidencias.iloc[0]
+                
+                        # Añadir punto grande para el jugador resaltado
+                        fig_scatter.add_trace(go.Scatter(
+                            x=[jugador_data['edad']],
+                            y=[jugador_data['overall_rating']],
+                            mode='markers',
+                            marker=dict(
+                                size=20,
+                                color='red',
+                                symbol='star',
+                                line=dict(color='white', width=2)
+                            ),
+                            name=jugador_resaltar,
+                            showlegend=False,
+                            hovertemplate=f"<b>{jugador_resaltar}</b><br>Edad: {jugador_data['edad']:.1f}<br>Rating: {jugador_data['overall_rating']}<extra></extra>"
+                        ))
+                
+                        # Añadir anotación
+                        fig_scatter.add_annotation(
+                            x=jugador_data['edad'],
+                            y=jugador_data['overall_rating'],
+                            text=f"<b>{jugador_resaltar}</b><br>Edad: {jugador_data['edad']:.1f}<br>Rating: {jugador_data['overall_rating']}",
+                            showarrow=True,
+                            arrowhead=2,
+                            arrowsize=1,
+                            arrowwidth=2,
+                            arrowcolor="#ff0000",
+                            ax=60,
+                            ay=-60,
+                            bgcolor="rgba(255, 255, 255, 0.9)",
+                            bordercolor="#ff0000",
+                            borderwidth=2
+                        )
+            
+                    st.plotly_chart(fig_scatter, use_container_width=True)
 
     st.markdown("---")
     
     # ========== SECCIÓN 2: COMPARADOR DE JUGADORES CON RADAR ==========
-    st.markdown("### ⚡ Comparador de Atributos entre Jugadores")
+    with medir("Sección 2: Comparador con radar"):
+        st.markdown("### ⚡ Comparador de Atributos entre Jugadores")
     
-    # Crear 3 columnas: Selectores (más estrecha) | Radar Técnico | Radar Físico
-    col1, col2, col3 = st.columns([0.6, 1.9, 1.5])
+        # Crear 3 columnas: Selectores (más estrecha) | Radar Técnico | Radar Físico
+        col1, col2, col3 = st.columns([0.6, 1.9, 1.5])
     
-    # COLUMNA 1: Selectores de jugadores
-    with col1:
-        st.markdown("<br><br><br>", unsafe_allow_html=True)
-        # Ordenar jugadores por rating
-        jugadores_disponibles = sorted(df['player_name'].unique())
-        
-        # Inicializar valores por defecto en session_state
-        if 'radar_jugador_1' not in st.session_state:
-            st.session_state.radar_jugador_1 = 'Lionel Messi' if 'Lionel Messi' in jugadores_disponibles else jugadores_disponibles[0]
-        
-        if 'radar_jugador_2' not in st.session_state:
-            st.session_state.radar_jugador_2 = 'Cristiano Ronaldo' if 'Cristiano Ronaldo' in jugadores_disponibles else jugadores_disponibles[1]
-        
-        # Asegurar que los valores guardados existen en la lista
-        index_j1 = jugadores_disponibles.index(st.session_state.radar_jugador_1) if st.session_state.radar_jugador_1 in jugadores_disponibles else 0
-        index_j2 = jugadores_disponibles.index(st.session_state.radar_jugador_2) if st.session_state.radar_jugador_2 in jugadores_disponibles else 1
-        
-        jugador_1 = st.selectbox(
-            "🥇 Jugador 1:",
-            options=jugadores_disponibles,
-            index=index_j1,
-            key='radar_jugador_1'
-        )
+        # COLUMNA 1: Selectores de jugadores
+        with col1:
+            st.markdown("<br><br><br>", unsafe_allow_html=True)
+            # Búsqueda por nombre en lugar de la lista completa de jugadores
+            jugador_1 = selector_jugador(df, 'radar_jugador_1', "🥇 Jugador 1:", por_defecto='Lionel Messi')
         
-        st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown("<br>", unsafe_allow_html=True)
         
-        jugador_2 = st.selectbox(
-            "🥈 Jugador 2:",
-            options=jugadores_disponibles,
-            index=index_j2,
-            key='radar_jugador_2'
-        )
+            jugador_2 = selector_jugador(df, 'radar_jugador_2', "🥈 Jugador 2:", por_defecto='Cristiano Ronaldo')
+
+            st.markdown("<br>", unsafe_allow_html=True)
+
+            # Percentiles precalculados por versión del dataset (ver utils/percentiles.py)
+            escala = ESCALAS_RADAR[st.radio("📐 Escala:", options=list(ESCALAS_RADAR), key='radar_escala')]
+            rango_radar = [50, 100] if escala is None else [0, 100]
     
-    # COLUMNA 2: Gráfico Radar Técnico/Ofensivo
-    with col2:
-        st.markdown("#### ⚔️ Habilidades Técnicas/Ofensivas")
-        
-        # Atributos técnicos y ofensivos
-        atributos_tecnicos = ['dribbling', 'finishing', 'free_kick_accuracy', 'heading_accuracy', 'shot_power', 'penalties']
-        atributos_tecnicos_disponibles = [attr for attr in atributos_tecnicos if attr in df.columns]
-        
-        if atributos_tecnicos_disponibles and jugador_1 and jugador_2:
-            # Obtener datos de ambos jugadores
-            datos_j1_tec = df[df['player_name'] == jugador_1][atributos_tecnicos_disponibles].iloc[0]
-            datos_j2_tec = df[df['player_name'] == jugador_2][atributos_tecnicos_disponibles].iloc[0]
-            
-            nombres_tecnicos = {
-                'dribbling': 'Regate',
-                'finishing': 'Finalización',
-                'free_kick_accuracy': 'Tiros Libres',
-                'heading_accuracy': 'Juego Aéreo',
-                'shot_power': 'Potencia Tiro',
-                'penalties': 'Penaltis'
-            }
-            
-            fig_radar_tec = go.Figure()
-            
-            # Jugador 1
-            fig_radar_tec.add_trace(go.Scatterpolar(
-                r=datos_j1_tec.values,
-                theta=[nombres_tecnicos.get(attr, attr) for attr in atributos_tecnicos_disponibles],
-                fill='toself',
-                name=jugador_1,
-                line=dict(color='#1f77b4', width=2),
-                fillcolor='rgba(31, 119, 180, 0.3)'
-            ))
-            
-            # Jugador 2
-            fig_radar_tec.add_trace(go.Scatterpolar(
-                r=datos_j2_tec.values,
-                theta=[nombres_tecnicos.get(attr, attr) for attr in atributos_tecnicos_disponibles],
-                fill='toself',
-                name=jugador_2,
-                line=dict(color='#ff7f0e', width=2),
-                fillcolor='rgba(255, 127, 14, 0.3)'
-            ))
-            
-            fig_radar_tec.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[50, 100]
+        # COLUMNA 2: Gráfico Radar Técnico/Ofensivo
+        with col2:
+            st.markdown("#### ⚔️ Habilidades Técnicas/Ofensivas")
+        
+            # Atributos técnicos y ofensivos
+            atributos_tecnicos = ['dribbling', 'finishing', 'free_kick_accuracy', 'heading_accuracy', 'shot_power', 'penalties']
+            atributos_tecnicos_disponibles = [attr for attr in atributos_tecnicos if attr in df.columns]
+        
+            if atributos_tecnicos_disponibles and jugador_1 and jugador_2:
+                # Obtener datos de ambos jugadores
+                datos_j1_tec, texto_j1_tec = _valores_radar(df, jugador_1, atributos_tecnicos_disponibles, escala)
+                datos_j2_tec, texto_j2_tec = _valores_radar(df, jugador_2, atributos_tecnicos_disponibles, escala)
+            
+                nombres_tecnicos = {
+                    'dribbling': 'Regate',
+                    'finishing': 'Finalización',
+                    'free_kick_accuracy': 'Tiros Libres',
+                    'heading_accuracy': 'Juego Aéreo',
+                    'shot_power': 'Potencia Tiro',
+                    'penalties': 'Penaltis'
+                }
+            
+                with medir("radar técnico"):
+                    fig_radar_tec = go.Figure()
+            
+                    # Jugador 1
+                    fig_radar_tec.add_trace(go.Scatterpolar(
+                        r=datos_j1_tec,
+                        theta=[nombres_tecnicos.get(attr, attr) for attr in atributos_tecnicos_disponibles],
+                        text=texto_j1_tec,
+                        hovertemplate="<b>%{fullData.name}</b><br>%{theta}: %{text}<extra></extra>",
+                        fill='toself',
+                        name=jugador_1,
+                        line=dict(color='#1f77b4', width=2),
+                        fillcolor='rgba(31, 119, 180, 0.3)'
+                    ))
+            
+                    # Jugador 2
+                    fig_radar_tec.add_trace(go.Scatterpolar(
+                        r=datos_j2_tec,
+                        theta=[nombres_tecnicos.get(attr, attr) for attr in atributos_tecnicos_disponibles],
+                        text=texto_j2_tec,
+                        hovertemplate="<b>%{fullData.name}</b><br>%{theta}: %{text}<extra></extra>",
+                        fill='toself',
+                        name=jugador_2,
+                        line=dict(color='#ff7f0e', width=2),
+                        fillcolor='rgba(255, 127, 14, 0.3)'
+                    ))
+            
+                    fig_radar_tec.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True,
+                                range=rango_radar
+                            )
+                        ),
+                        showlegend=True,
+                        height=500
                     )
-                ),
-                showlegend=True,
-                height=500
-            )
             
-            st.plotly_chart(fig_radar_tec, use_container_width=True)
+                    st.plotly_chart(fig_radar_tec, use_container_width=True)
     
-    # COLUMNA 3: Gráfico Radar Físico
-    with col3:
-        st.markdown("#### 💪 Atributos Físicos")
-        
-        # Atributos físicos
-        atributos_fisicos = ['acceleration', 'sprint_speed', 'agility', 'jumping', 'stamina']
-        atributos_fisicos_disponibles = [attr for attr in atributos_fisicos if attr in df.columns]
-        
-        if atributos_fisicos_disponibles and jugador_1 and jugador_2:
-            # Obtener datos de ambos jugadores
-            datos_j1_fis = df[df['player_name'] == jugador_1][atributos_fisicos_disponibles].iloc[0]
-            datos_j2_fis = df[df['player_name'] == jugador_2][atributos_fisicos_disponibles].iloc[0]
-            
-            nombres_fisicos = {
-                'acceleration': 'Aceleración',
-                'sprint_speed': 'Velocidad',
-                'agility': 'Agilidad',
-                'jumping': 'Salto',
-                'stamina': 'Resistencia'
-            }
-            
-            fig_radar_fis = go.Figure()
-            
-            # Jugador 1
-            fig_radar_fis.add_trace(go.Scatterpolar(
-                r=datos_j1_fis.values,
-                theta=[nombres_fisicos.get(attr, attr) for attr in atributos_fisicos_disponibles],
-                fill='toself',
-                name=jugador_1,
-                line=dict(color='#1f77b4', width=2),
-                fillcolor='rgba(31, 119, 180, 0.3)'
-            ))
-            
-            # Jugador 2
-            fig_radar_fis.add_trace(go.Scatterpolar(
-                r=datos_j2_fis.values,
-                theta=[nombres_fisicos.get(attr, attr) for attr in atributos_fisicos_disponibles],
-                fill='toself',
-                name=jugador_2,
-                line=dict(color='#ff7f0e', width=2),
-                fillcolor='rgba(255, 127, 14, 0.3)'
-            ))
-            
-            fig_radar_fis.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[50, 100]
+        # COLUMNA 3: Gráfico Radar Físico
+        with col3:
+            st.markdown("#### 💪 Atributos Físicos")
+        
+            # Atributos físicos
+            atributos_fisicos = ['acceleration', 'sprint_speed', 'agility', 'jumping', 'stamina']
+            atributos_fisicos_disponibles = [attr for attr in atributos_fisicos if attr in df.columns]
+        
+            if atributos_fisicos_disponibles and jugador_1 and jugador_2:
+                # Obtener datos de ambos jugadores
+                datos_j1_fis, texto_j1_fis = _valores_radar(df, jugador_1, atributos_fisicos_disponibles, escala)
+                datos_j2_fis, texto_j2_fis = _valores_radar(df, jugador_2, atributos_fisicos_disponibles, escala)
+            
+                nombres_fisicos = {
+                    'acceleration': 'Aceleración',
+                    'sprint_speed': 'Velocidad',
+                    'agility': 'Agilidad',
+                    'jumping': 'Salto',
+                    'stamina': 'Resistencia'
+                }
+            
+                with medir("radar físico"):
+                    fig_radar_fis = go.Figure()
+            
+                    # Jugador 1
+                    fig_radar_fis.add_trace(go.Scatterpolar(
+                        r=datos_j1_fis,
+                        theta=[nombres_fisicos.get(attr, attr) for attr in atributos_fisicos_disponibles],
+                        text=texto_j1_fis,
+                        hovertemplate="<b>%{fullData.name}</b><br>%{theta}: %{text}<extra></extra>",
+                        fill='toself',
+                        name=jugador_1,
+                        line=dict(color='#1f77b4', width=2),
+                        fillcolor='rgba(31, 119, 180, 0.3)'
+                    ))
+            
+                    # Jugador 2
+                    fig_radar_fis.add_trace(go.Scatterpolar(
+                        r=datos_j2_fis,
+                        theta=[nombres_fisicos.get(attr, attr) for attr in atributos_fisicos_disponibles],
+                        text=texto_j2_fis,
+                        hovertemplate="<b>%{fullData.name}</b><br>%{theta}: %{text}<extra></extra>",
+                        fill='toself',
+                        name=jugador_2,
+                        line=dict(color='#ff7f0e', width=2),
+                        fillcolor='rgba(255, 127, 14, 0.3)'
+                    ))
+            
+                    fig_radar_fis.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True,
+                                range=rango_radar
+                            )
+                        ),
+                        showlegend=False,
+                        height=500
                     )
-                ),
-                showlegend=False,
-                height=500
-            )
             
-            st.plotly_chart(fig_radar_fis, use_container_width=True)
+                    st.plotly_chart(fig_radar_fis, use_container_width=True)
 
     st.markdown("---")
     
     # ========== SECCIÓN 3: DISTRIBUCIÓN DE EDADES ==========
-    st.markdown("### 📅 Distribución de Edades")
+    with medir("Sección 3: Distribución de edades"):
+        st.markdown("### 📅 Distribución de Edades")
   
-    if 'birthday' in df.columns:
-        df_edad = df.copy()
-        df_edad['birthday'] = pd.to_datetime(df_edad['birthday'], errors='coerce')
-        df_edad['edad'] = (pd.Timestamp('2016-12-31') - df_edad['birthday']).dt.days / 365.25
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            # Histograma de edades
-            fig_edad = px.histogram(
-                df_edad,
-                x='edad',
-                nbins=30,
-                title='Distribución de Edades',
-                labels={'edad': 'Edad (años)', 'count': 'Número de Jugadores'},
-                color_discrete_sequence=['#2ecc71']
-            )
-            fig_edad.update_layout(height=400)
-            st.plotly_chart(fig_edad, use_container_width=True)
+        if 'birthday' in df.columns:
+            df_edad = df.copy()
+            df_edad['birthday'] = pd.to_datetime(df_edad['birthday'], errors='coerce')
+            df_edad['edad'] = (pd.Timestamp('2016-12-31') - df_edad['birthday']).dt.days / 365.25
+        
+            col1, col2 = st.columns([2, 1])
+        
+            with col1:
+                # Histograma de edades
+                with medir("histograma de edades"):
+                    fig_edad = px.histogram(
+                        df_edad,
+                        x='edad',
+                        nbins=30,
+                        title='Distribución de Edades',
+                        labels={'edad': 'Edad (años)', 'count': 'Número de Jugadores'},
+                        color_discrete_sequence=['#2ecc71']
+                    )
+                    fig_edad.update_layout(height=400)
+                    st.plotly_chart(fig_edad, use_container_width=True)
         
-        with col2:
-            st.markdown("#### 📊 Rangos de Edad")
-            
-            # Categorías por edad
-            df_edad['categoria_edad'] = pd.cut(
-                df_edad['edad'],
-                bins=[0, 21, 25, 30, 100],
-                labels=['🌱 Sub-21', '🔥 21-25', '💪 26-30', '🎓 30+']
-            )
-            
-            edad_counts = df_edad['categoria_edad'].value_counts().sort_index()
-            
-            for cat, count in edad_counts.items():
-                percentage = (count / len(df_edad)) * 100
-                st.markdown(f"**{cat}**")
-                st.progress(percentage / 100)
-                st.caption(f"{count:,} jugadores ({percentage:.1f}%)")
+            with col2:
+                st.markdown("#### 📊 Rangos de Edad")
+            
+                # Categorías por edad
+                df_edad['categoria_edad'] = pd.cut(
+                    df_edad['edad'],
+                    bins=[0, 21, 25, 30, 100],
+                    labels=['🌱 Sub-21', '🔥 21-25', '💪 26-30', '🎓 30+']
+                )
+            
+                edad_counts = df_edad['categoria_edad'].value_counts().sort_index()
+            
+                for cat, count in edad_counts.items():
+                    percentage = (count / len(df_edad)) * 100
+                    st.markdown(f"**{cat}**")
+                    st.progress(percentage / 100)
+                    st.caption(f"{count:,} jugadores ({percentage:.1f}%)")
     
     st.markdown("---")
     
     # ========== SECCIÓN 4: ALTURA VS RATING ==========
-    st.markdown("### 📏 Relación Altura vs Rating")
+    with medir("Sección 4: Altura vs rating"):
+        st.markdown("### 📏 Relación Altura vs Rating")
     
-    if 'height' in df.columns and 'overall_rating' in df.columns:
-        # Scatter plot
-        fig_scatter = px.scatter(
-            df,
-            x='height',
-            y='overall_rating',
-            title='¿La altura influye en el rating?',
-            labels={'height': 'Altura (cm)', 'overall_rating': 'Overall Rating'},
-            opacity=0.5,
-            color='overall_rating',
-            color_continuous_scale='Viridis'
-        )
-        fig_scatter.update_layout(height=500)
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        if 'height' in df.columns and 'overall_rating' in df.columns:
+            # Scatter plot
+            with medir("gráfico altura vs rating"):
+                fig_scatter = px.scatter(
+                    df,
+                    x='height',
+                    y='overall_rating',
+                    title='¿La altura influye en el rating?',
+                    labels={'height': 'Altura (cm)', 'overall_rating': 'Overall Rating'},
+                    opacity=0.5,
+                    color='overall_rating',
+                    color_continuous_scale='Viridis'
+                )
+                fig_scatter.update_layout(height=500)
+                st.plotly_chart(fig_scatter, use_container_width=True)
         
-        # Calcular correlación
-        correlacion = df['height'].corr(df['overall_rating'])
-        if abs(correlacion) < 0.3:
-            st.info(f"📊 Correlación: {correlacion:.3f} - No hay una relación significativa entre altura y rating.")
-        else:
-            st.success(f"📊 Correlación: {correlacion:.3f} - Existe cierta relación entre altura y rating.")
+            # Calcular correlación
+            correlacion = df['height'].corr(df['overall_rating'])
+            if abs(correlacion) < 0.3:
+                st.info(f"📊 Correlación: {correlacion:.3f} - No hay una relación significativa entre altura y rating.")
+            else:
+                st.success(f"📊 Correlación: {correlacion:.3f} - Existe cierta relación entre altura y rating.")
     
     st.markdown("---")
 
+    # ========== SECCIÓN 5: FRONTERA DE PARETO ==========
+    with medir("Sección 5: Frontera de Pareto"):
+        st.markdown("### ⚖️ Frontera de Pareto: los mejores compromisos entre atributos")
+        st.markdown("Elige 2 o 3 atributos: en la frontera están los jugadores a los que **nadie supera en todos a la vez** "
+                    "(por ejemplo, el más rápido entre los que definen igual o mejor).")
+        _render_frontera_pareto(df)
+
+    st.markdown("---")
+
     # ========== TOP RANKING DE JUGADORES CON FILTROS ==========
-    st.markdown("### 🏅 Ranking de Mejores Jugadores")
-    st.markdown("Explora los mejores jugadores por diferentes categorías con filtros avanzados.")
+    with medir("Ranking de mejores jugadores"):
+        st.markdown("### 🏅 Ranking de Mejores Jugadores")
+        st.markdown("Explora los mejores jugadores por diferentes categorías con filtros avanzados.")
     
-    # Filtros en columnas (Equipo primero, luego Liga)
-    col1, col2 = st.columns(2)
+        # Filtros en columnas (Equipo primero, luego Liga y Posición)
+        col1, col2, col3 = st.columns(3)
     
-    # Primero: Filtro por Liga (para poder filtrar equipos dinámicamente)
-    with col2:
-        # Filtro por liga: "País - Liga"
-        if 'league_name' in df.columns and 'country_name' in df.columns:
-            # Crear diccionario con formato "País - Liga" -> nombre real liga
-            ligas_dict = {}
-            ligas_dict["Todas las ligas"] = "Todas las ligas"
-            
-            for _, row in df[['league_name', 'country_name']].drop_duplicates().iterrows():
-                liga = row['league_name']
-                pais = row['country_name']
-                display_text = f"{pais} - {liga}"
-                ligas_dict[display_text] = liga
-            
-            # Solo "Todas las ligas" + opciones ordenadas
-            ligas_display = ["Todas las ligas"] + sorted([k for k in ligas_dict.keys() if k != "Todas las ligas"])
-            
-            liga_display = st.selectbox(
-                "🏆 Liga",
-                ligas_display,
-                index=0,
-                key="liga_ranking"
-            )
-            liga_seleccionada = ligas_dict[liga_display]
-    
-    # Segundo: Filtro por Equipo (depende de la liga seleccionada)
-    with col1:
-        # Filtro por equipo: "Equipo - País"
-        if 'team_long_name' in df.columns and 'country_name' in df.columns:
-            # Si hay liga seleccionada, filtrar equipos por esa liga
-            if liga_seleccionada != "Todas las ligas":
-                df_equipos = df[df['league_name'] == liga_seleccionada]
-            else:
-                df_equipos = df
-            
-            # Crear diccionario con formato "Equipo - País" -> nombre real equipo
-            equipos_dict = {}
-            equipos_dict["Todos los equipos"] = "Todos los equipos"
-            
-            for _, row in df_equipos[['team_long_name', 'country_name']].drop_duplicates().iterrows():
-                equipo = row['team_long_name']
-                pais = row['country_name']
-                display_text = f"{equipo} - {pais}"
-                equipos_dict[display_text] = equipo
-            
-            # Solo "Todos los equipos" + opciones ordenadas
-            equipos_display = ["Todos los equipos"] + sorted([k for k in equipos_dict.keys() if k != "Todos los equipos"])
-            
-            equipo_display = st.selectbox(
-                "⚽ Equipo",
-                equipos_display,
-                index=0,
-                key="equipo_ranking"
-            )
-            equipo_seleccionado = equipos_dict[equipo_display]
+        # Primero: Filtro por Liga (para poder filtrar equipos dinámicamente)
+        with col2:
+            # Filtro por liga: "País - Liga"
+            if 'league_name' in df.columns and 'country_name' in df.columns:
+                # Crear diccionario con formato "País - Liga" -> nombre real liga
+                ligas_dict = {}
+                ligas_dict["Todas las ligas"] = "Todas las ligas"
+            
+                for _, row in df[['league_name', 'country_name']].drop_duplicates().iterrows():
+                    liga = row['league_name']
+                    pais = row['country_name']
+                    display_text = f"{pais} - {liga}"
+                    ligas_dict[display_text] = liga
+            
+                # Solo "Todas las ligas" + opciones ordenadas
+                ligas_display = ["Todas las ligas"] + sorted([k for k in ligas_dict.keys() if k != "Todas las ligas"])
+            
+                liga_display = st.selectbox(
+                    "🏆 Liga",
+                    ligas_display,
+                    index=0,
+                    key="liga_ranking"
+                )
+                liga_seleccionada = ligas_dict[liga_display]
     
-    # Aplicar filtros al DataFrame
-    df_filtrado = df.copy()
+        # Segundo: Filtro por Equipo (depende de la liga seleccionada)
+        with col1:
+            # Filtro por equipo: "Equipo - País"
+            if 'team_long_name' in df.columns and 'country_name' in df.columns:
+                # Si hay liga seleccionada, filtrar equipos por esa liga
+                if liga_seleccionada != "Todas las ligas":
+                    df_equipos = df[df['league_name'] == liga_seleccionada]
+                else:
+                    df_equipos = df
+            
+                # Crear diccionario con formato "Equipo - País" -> nombre real equipo
+                equipos_dict = {}
+                equipos_dict["Todos los equipos"] = "Todos los equipos"
+            
+                for _, row in df_equipos[['team_long_name', 'country_name']].drop_duplicates().iterrows():
+                    equipo = row['team_long_name']
+                    pais = row['country_name']
+                    display_text = f"{equipo} - {pais}"
+                    equipos_dict[display_text] = equipo
+            
+                # Solo "Todos los equipos" + opciones ordenadas
+                equipos_display = ["Todos los equipos"] + sorted([k for k in equipos_dict.keys() if k != "Todos los equipos"])
+            
+                equipo_display = st.selectbox(
+                    "⚽ Equipo",
+                    equipos_display,
+                    index=0,
+                    key="equipo_ranking"
+                )
+                equipo_seleccionado = equipos_dict[equipo_display]
     
-    if liga_seleccionada != "Todas las ligas":
-        df_filtrado = df_filtrado[df_filtrado['league_name'] == liga_seleccionada]
+        # Tercero: Filtro por posición (calculada al cargar los datos, ver utils/positions.py)
+        posicion_seleccionada = "Todas las posiciones"
+        with col3:
+            if COLUMNA_POSICION in df.columns:
+                posicion_seleccionada = st.selectbox(
+                    "🧭 Posición",
+                    ["Todas las posiciones"] + get_agregados(df).lista_posiciones,
+                    index=0,
+                    key="posicion_ranking"
+                )
     
-    if equipo_seleccionado != "Todos los equipos":
-        df_filtrado = df_filtrado[df_filtrado['team_long_name'] == equipo_seleccionado]
+        # Aplicar filtros: filas de la liga, el equipo y la posición (índices por versión del dataset)
+        agregados = get_agregados(df)
+        liga = None if liga_seleccionada == "Todas las ligas" else liga_seleccionada
+        equipo = None if equipo_seleccionado == "Todos los equipos" else equipo_seleccionado
+        posicion = None if posicion_seleccionada == "Todas las posiciones" else posicion_seleccionada
+        candidatas = agregados.filas_filtradas(liga, equipo, posicion)
+        df_filtrado = df if candidatas is None else df.iloc[candidatas]
+
+        # Pestaña de porteros: los de la posición Portero con la misma liga y equipo
+        # (ninguno si se ha elegido otra posición)
+        if COLUMNA_POSICION in df.columns:
+            filas_porteros = agregados.filas_filtradas(liga, equipo, PORTERO) if posicion in (None, PORTERO) else []
+            df_porteros = df.iloc[filas_porteros]
+        else:
+            df_porteros = df_filtrado
     
-    st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
     
-    # TABS para categorías (como antes)
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "⭐ Overall", 
-        "⚡ Velocidad", 
-        "🎯 Finalización", 
-        "⚽ Pases", 
-        "🕺 Regate",
-        "🧤 Porteros"
-    ])
+        # TABS para categorías (como antes)
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+            "⭐ Overall", 
+            "⚡ Velocidad", 
+            "🎯 Finalización", 
+            "⚽ Pases", 
+            "🕺 Regate",
+            "🧤 Porteros",
+            "🧪 Personalizado"
+        ])
     
-    # Función helper para mostrar ranking paginado
-    def display_ranking(df_data, stat_column, tab_key):
-        if stat_column not in df_data.columns:
-            st.warning(f"No hay datos disponibles para esta categoría.")
-            return
-        
-        # Filtro especial para porteros
-        if stat_column == 'gk_reflexes':
-            df_data = df_data[df_data['gk_reflexes'] > 10]
-        
-        # Ordenar y obtener top jugadores
-        df_top = df_data.nlargest(100, stat_column)[['player_name', stat_column, 'team_long_name', 'league_name', 'country_name']].reset_index(drop=True)
-        
-        if len(df_top) == 0:
-            st.warning("No hay jugadores que cumplan con los filtros seleccionados.")
-            return
-        
-        # Paginación
-        items_por_pagina = 20
-        total_paginas = (len(df_top) - 1) // items_por_pagina + 1
+        # Función helper para mostrar ranking paginado
+        @medir("tabla paginada")
+        def display_ranking(df_data, stat_column, tab_key, filtros_extra=''):
+            if stat_column not in df_data.columns:
+                st.warning(f"No hay datos disponibles para esta categoría.")
+                return
+        
+            # Ordenar y obtener top jugadores
+            df_top = df_data.nlargest(100, stat_column)[['player_name', stat_column, 'team_long_name', 'league_name', 'country_name']]
+            # Percentil de cada jugador en su liga (precalculado; las puntuaciones compuestas no lo tienen)
+            indice_percentiles = get_indice_percentiles(df)
+            if stat_column in indice_percentiles.atributos:
+                filas_top = df.index.get_indexer(df_top.index)
+                df_top = df_top.assign(percentil=indice_percentiles.percentiles(filas_top, [stat_column], por_liga=True)[:, 0])
+            df_top = df_top.reset_index(drop=True)
+        
+            if len(df_top) == 0:
+                st.warning("No hay jugadores que cumplan con los filtros seleccionados.")
+                return
+        
+            # Paginación
+            items_por_pagina = 20
+            total_paginas = (len(df_top) - 1) // items_por_pagina + 1
+        
+            # Control de paginación por tab
+            pagina_key = f'pagina_{tab_key}'
+            if pagina_key not in st.session_state:
+                st.session_state[pagina_key] = 1
+        
+            # Resetear página si cambian filtros
+            filtros_key = f"{tab_key}_{liga_seleccionada}_{equipo_seleccionado}_{posicion_seleccionada}_{filtros_extra}"
+            filtros_prev_key = f'filtros_{tab_key}'
+            if filtros_prev_key not in st.session_state or st.session_state[filtros_prev_key] != filtros_key:
+                st.session_state[pagina_key] = 1
+                st.session_state[filtros_prev_key] = filtros_key
+        
+            pagina_actual = st.session_state[pagina_key]
+        
+            # Botones de paginación
+            col_prev, col_info, col_next = st.columns([5, 20, 5])
+        
+            with col_prev:
+                if st.button("⬅️ Anterior", key=f"prev_{tab_key}", disabled=(pagina_actual == 1)):
+                    st.session_state[pagina_key] -= 1
+                    st.rerun()
+        
+            with col_info:
+                st.markdown(f"<div style='text-align: center; padding-top: 5px;'><b>Página {pagina_actual} de {total_paginas}</b> | Total: {len(df_top)} jugadores</div>", unsafe_allow_html=True)
+        
+            with col_next:
+                if st.button("Siguiente ➡️", key=f"next_{tab_key}", disabled=(pagina_actual == total_paginas)):
+                    st.session_state[pagina_key] += 1
+                    st.rerun()
+        
+            # Calcular índices para la página actual
+            inicio = (pagina_actual - 1) * items_por_pagina
+            fin = min(inicio + items_por_pagina, len(df_top))
+        
+            df_pagina = df_top.iloc[inicio:fin]
         
-        # Control de paginación por tab
-        pagina_key = f'pagina_{tab_key}'
-        if pagina_key not in st.session_state:
-            st.session_state[pagina_key] = 1
-        
-        # Resetear página si cambian filtros
-        filtros_key = f"{tab_key}_{liga_seleccionada}_{equipo_seleccionado}"
-        filtros_prev_key = f'filtros_{tab_key}'
-        if filtros_prev_key not in st.session_state or st.session_state[filtros_prev_key] != filtros_key:
-            st.session_state[pagina_key] = 1
-            st.session_state[filtros_prev_key] = filtros_key
-        
-        pagina_actual = st.session_state[pagina_key]
-        
-        # Botones de paginación
-        col_prev, col_info, col_next = st.columns([5, 20, 5])
-        
-        with col_prev:
-            if st.button("⬅️ Anterior", key=f"prev_{tab_key}", disabled=(pagina_actual == 1)):
-                st.session_state[pagina_key] -= 1
-                st.rerun()
-        
-        with col_info:
-            st.markdown(f"<div style='text-align: center; padding-top: 5px;'><b>Página {pagina_actual} de {total_paginas}</b> | Total: {len(df_top)} jugadores</div>", unsafe_allow_html=True)
-        
-        with col_next:
-            if st.button("Siguiente ➡️", key=f"next_{tab_key}", disabled=(pagina_actual == total_paginas)):
-                st.session_state[pagina_key] += 1
-                st.rerun()
-        
-        # Calcular índices para la página actual
-        inicio = (pagina_actual - 1) * items_por_pagina
-        fin = min(inicio + items_por_pagina, len(df_top))
-        
-        df_pagina = df_top.iloc[inicio:fin]
-        
-        st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown("<br>", unsafe_allow_html=True)
         
-        # Centrar el contenido usando columnas - tabla más estrecha
-        col_izq, col_centro, col_der = st.columns([1, 2, 1])
-        
-        with col_centro:
-            # Mostrar jugadores de la página actual
-            for idx, (i, player) in enumerate(df_pagina.iterrows(), inicio + 1):
-                # Color diferente para top 3
-                if idx == 1:
-                    medal = "🥇"
-                    color = "#FFD700"  # Oro
-                elif idx == 2:
-                    medal = "🥈"
-                    color = "#C0C0C0"  # Plata
-                elif idx == 3:
-                    medal = "🥉"
-                    color = "#CD7F32"  # Bronce
-                else:
-                    medal = f"{idx}."
-                    color = "#E8E8E8"  # Gris claro
+            # Centrar el contenido usando columnas - tabla más estrecha
+            col_izq, col_centro, col_der = st.columns([1, 2, 1])
+        
+            with col_centro:
+                # Mostrar jugadores de la página actual
+                for idx, (i, player) in enumerate(df_pagina.iterrows(), inicio + 1):
+                    # Color diferente para top 3
+                    if idx == 1:
+                        medal = "🥇"
+                        color = "#FFD700"  # Oro
+                    elif idx == 2:
+                        medal = "🥈"
+                        color = "#C0C0C0"  # Plata
+                    elif idx == 3:
+                        medal = "🥉"
+                        color = "#CD7F32"  # Bronce
+                    else:
+                        medal = f"{idx}."
+                        color = "#E8E8E8"  # Gris claro
                 
-                # Crear columnas para el diseño (más compacto)
-                col1, col2, col3 = st.columns([0.4, 3.5, 0.8])
+                    # Crear columnas para el diseño (más compacto)
+                    col1, col2, col3 = st.columns([0.4, 3.5, 0.8])
                 
-                with col1:
-                    st.markdown(f"<div style='font-size: 24px; font-weight: bold; padding-top: 3px;'>{medal}</div>", unsafe_allow_html=True)
+                    with col1:
+                        st.markdown(f"<div style='font-size: 24px; font-weight: bold; padding-top: 3px;'>{medal}</div>", unsafe_allow_html=True)
                 
-                with col2:
-                    # Nombre del jugador e info en la misma línea
-                    equipo = player['team_long_name'] if pd.notna(player['team_long_name']) else 'N/A'
-                    liga = player['league_name'] if pd.notna(player['league_name']) else 'N/A'
-                    pais = player['country_name'] if pd.notna(player['country_name']) else 'N/A'
+                    with col2:
+                        # Nombre del jugador e info en la misma línea
+                        equipo = player['team_long_name'] if pd.notna(player['team_long_name']) else 'N/A'
+                        liga = player['league_name'] if pd.notna(player['league_name']) else 'N/A'
+                        pais = player['country_name'] if pd.notna(player['country_name']) else 'N/A'
                     
-                    st.markdown(
-                        f"<div style='padding-top: 5px;'>"
-                        f"<span style='font-size: 18px; font-weight: bold;'>{player['player_name']}</span>"
-                        f"<span style='font-size: 16px; color: #999999 !important; margin-left: 12px;'>⚽ {equipo} | 🏆 {liga} - {pais}</span>"
-                        f"</div>", 
-                        unsafe_allow_html=True
-                    )
+                        st.markdown(
+                            f"<div style='padding-top: 5px;'>"
+                            f"<span style='font-size: 18px; font-weight: bold;'>{player['player_name']}</span>"
+                            f"<span style='font-size: 16px; color: #999999 !important; margin-left: 12px;'>⚽ {equipo} | 🏆 {liga} - {pais}</span>"
+                            f"</div>", 
+                            unsafe_allow_html=True
+                        )
                 
-                with col3:
-                    st.markdown(f"<div style='font-size: 26px; font-weight: bold; text-align: right; padding-top: 3px;'>{player[stat_column]:.0f}</div>", unsafe_allow_html=True)
+                    with col3:
+                        st.markdown(f"<div style='font-size: 26px; font-weight: bold; text-align: right; padding-top: 3px;'>{player[stat_column]:.0f}</div>", unsafe_allow_html=True)
+                        if pd.notna(player.get('percentil')):
+                            st.markdown(f"<div style='font-size: 12px; color: #999999; text-align: right;' title='Percentil en su liga'>P{player['percentil']:.0f} liga</div>", unsafe_allow_html=True)
                 
-                st.markdown(f"<hr style='margin: 6px 0; border: 0; border-top: 1px solid {color};'>", unsafe_allow_html=True)
+                    st.markdown(f"<hr style='margin: 6px 0; border: 0; border-top: 1px solid {color};'>", unsafe_allow_html=True)
         
-        # Botones de paginación al final también
-        st.markdown("<br>", unsafe_allow_html=True)
-        col_prev2, col_info2, col_next2 = st.columns([1, 5, 10])
+            # Botones de paginación al final también
+            st.markdown("<br>", unsafe_allow_html=True)
+            col_prev2, col_info2, col_next2 = st.columns([1, 5, 10])
         
-        with col_prev2:
-            if st.button("⬅️ Anterior ", key=f"prev2_{tab_key}", disabled=(pagina_actual == 1)):
-                st.session_state[pagina_key] -= 1
-                st.rerun()
+            with col_prev2:
+                if st.button("⬅️ Anterior ", key=f"prev2_{tab_key}", disabled=(pagina_actual == 1)):
+                    st.session_state[pagina_key] -= 1
+                    st.rerun()
         
-        with col_info2:
-            st.markdown(f"<div style='text-align: center; padding-top: 5px;'><b>Página {pagina_actual} de {total_paginas}</b></div>", unsafe_allow_html=True)
+            with col_info2:
+                st.markdown(f"<div style='text-align: center; padding-top: 5px;'><b>Página {pagina_actual} de {total_paginas}</b></div>", unsafe_allow_html=True)
         
-        with col_next2:
-            if st.button("Siguiente ➡️ ", key=f"next2_{tab_key}", disabled=(pagina_actual == total_paginas)):
-                st.session_state[pagina_key] += 1
-                st.rerun()
+            with col_next2:
+                if st.button("Siguiente ➡️ ", key=f"next2_{tab_key}", disabled=(pagina_actual == total_paginas)):
+                    st.session_state[pagina_key] += 1
+                    st.rerun()
     
-    # TAB 1: TOP Overall Rating
-    with tab1:
-        display_ranking(df_filtrado, 'overall_rating', 'overall')
+        # TAB 1: TOP Overall Rating
+        with tab1:
+            display_ranking(df_filtrado, 'overall_rating', 'overall')
     
-    # TAB 2: TOP Velocidad
-    with tab2:
-        display_ranking(df_filtrado, 'sprint_speed', 'speed')
+        # TAB 2: TOP Velocidad
+        with tab2:
+            display_ranking(df_filtrado, 'sprint_speed', 'speed')
     
-    # TAB 3: TOP Finalización
-    with tab3:
-        display_ranking(df_filtrado, 'finishing', 'finishing')
+        # TAB 3: TOP Finalización
+        with tab3:
+            display_ranking(df_filtrado, 'finishing', 'finishing')
     
-    # TAB 4: TOP Pases
-    with tab4:
-        display_ranking(df_filtrado, 'short_passing', 'passing')
+        # TAB 4: TOP Pases
+        with tab4:
+            display_ranking(df_filtrado, 'short_passing', 'passing')
     
-    # TAB 5: TOP Regate
-    with tab5:
-        display_ranking(df_filtrado, 'dribbling', 'dribbling')
+        # TAB 5: TOP Regate
+        with tab5:
+            display_ranking(df_filtrado, 'dribbling', 'dribbling')
     
-    # TAB 6: TOP Porteros
-    with tab6:
-        display_ranking(df_filtrado, 'gk_reflexes', 'gk')
+        # TAB 6: TOP Porteros
+        with tab6:
+            display_ranking(df_porteros, 'gk_reflexes', 'gk')
+
+        # TAB 7: Puntuación compuesta definida por el usuario
+        with tab7:
+            with medir("ranking personalizado"):
+                _render_ranking_personalizado(df, candidatas, (liga, equipo, posicion), display_ranking)
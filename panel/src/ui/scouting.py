@@ -0,0 +1,173 @@
+import time
+
+import streamlit as st
+import pandas as pd
+from utils.profiler import medir
+from utils.aggregates import get_agregados
+from utils.scouting import get_indice_scouting
+from utils.const import SCOUTING_RESULTADOS_MAX, FECHA_REFERENCIA_EDAD, NOMBRES_ATRIBUTOS
+from utils.positions import COLUMNA_POSICION
+
+TODAS_LAS_LIGAS = "Todas las ligas"
+TODOS_LOS_EQUIPOS = "Todos los equipos"
+TODAS_LAS_POSICIONES = "Todas las posiciones"
+
+
+# Búsqueda inicial: jóvenes rápidos con gol (atributo -> mínimo)
+MINIMOS_POR_DEFECTO = {'sprint_speed': 85, 'finishing': 75}
+EDAD_MAXIMA_POR_DEFECTO = 22
+
+
+def _comparar_con_pandas(df, rangos, categorias):
+    """Misma consulta filtrando el DataFrame predicado a predicado, para comparar tiempos."""
+    inicio = time.perf_counter()
+    mascara = pd.Series(True, index=df.index)
+    for columna, (minimo, maximo) in rangos.items():
+        if columna == 'edad':
+            valores = (pd.Timestamp(FECHA_REFERENCIA_EDAD) - pd.to_datetime(df['birthday'], errors='coerce')).dt.days // 365.25
+        else:
+            valores = df[columna]
+        mascara &= (valores >= minimo) & (valores <= maximo)
+    for columna, valor in categorias.items():
+        mascara &= df[columna] == valor
+    coincidencias = int(mascara.sum())
+    return coincidencias, (time.perf_counter() - inicio) * 1000
+
+
+def render_scouting_page(df):
+    """
+    Página de scouting: jugadores que cumplen a la vez varios rangos de atributos.
+    """
+
+    agregados = get_agregados(df)
+    indice = get_indice_scouting(df)
+
+    st.markdown("## 🔭 Scouting")
+    st.markdown("Combina rangos de edad y de atributos con la liga, el equipo y la posición para encontrar a los jugadores "
+                "que cumplen todas las condiciones a la vez (por ejemplo: menores de 23 años, velocidad ≥ 85 y finalización ≥ 75).")
+
+    st.markdown("---")
+
+    columnas = [c for c in indice.columnas() if c != 'edad']
+    if not columnas:
+        st.warning("No hay datos de jugadores disponibles.")
+        return
+
+    # ========== FILTROS ==========
+    with medir("Filtros de scouting"):
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            liga_display = st.selectbox(
+                "🏆 Liga:",
+                options=[TODAS_LAS_LIGAS] + agregados.lista_ligas,
+                key='scouting_liga'
+            )
+            liga = None if liga_display == TODAS_LAS_LIGAS else agregados.liga_por_display[liga_display]
+
+        with col2:
+            if liga is None:
+                equipos = agregados.lista_equipos
+            else:
+                info = agregados.equipos_con_info
+                equipos = info.loc[info['league_name'] == liga, 'display_name'].tolist()
+            # Al cambiar de liga, el equipo elegido puede no estar en la nueva lista
+            if st.session_state.get('scouting_equipo') not in [TODOS_LOS_EQUIPOS] + equipos:
+                st.session_state.scouting_equipo = TODOS_LOS_EQUIPOS
+            equipo_display = st.selectbox(
+                "⚽ Equipo:",
+                options=[TODOS_LOS_EQUIPOS] + equipos,
+                key='scouting_equipo'
+            )
+            equipo = None if equipo_display == TODOS_LOS_EQUIPOS else agregados.equipo_por_display[equipo_display]
+
+        posicion = None
+        with col3:
+            if COLUMNA_POSICION in indice.categorias:
+                posicion_display = st.selectbox(
+                    "🧭 Posición:",
+                    options=[TODAS_LAS_POSICIONES] + agregados.lista_posiciones,
+                    key='scouting_posicion'
+                )
+                posicion = None if posicion_display == TODAS_LAS_POSICIONES else posicion_display
+
+        rangos = {}
+        with col4:
+            if 'edad' in indice.codigos:
+                edad_min, edad_max = indice.limites('edad')
+                rangos['edad'] = st.slider(
+                    "🎂 Edad:",
+                    min_value=edad_min, max_value=edad_max,
+                    value=(edad_min, max(edad_min, min(EDAD_MAXIMA_POR_DEFECTO, edad_max))),
+                    key='scouting_edad'
+                )
+
+        atributos = st.multiselect(
+            "📊 Atributos a filtrar:",
+            options=columnas,
+            default=[c for c in MINIMOS_POR_DEFECTO if c in columnas],
+            format_func=lambda c: NOMBRES_ATRIBUTOS.get(c, c),
+            key='scouting_atributos'
+        )
+
+        cols_rango = st.columns(3)
+        for i, atributo in enumerate(atributos):
+            minimo, maximo = indice.limites(atributo)
+            desde = max(minimo, min(MINIMOS_POR_DEFECTO.get(atributo, minimo), maximo))
+            with cols_rango[i % 3]:
+                rangos[atributo] = st.slider(
+                    NOMBRES_ATRIBUTOS.get(atributo, atributo),
+                    min_value=minimo, max_value=max(maximo, minimo + 1),
+                    value=(desde, max(maximo, minimo + 1)),
+                    key=f'scouting_rango_{atributo}'
+                )
+
+    categorias = {}
+    if liga is not None:
+        categorias['league_name'] = liga
+    if equipo is not None:
+        categorias['team_long_name'] = equipo
+    if posicion is not None:
+        categorias[COLUMNA_POSICION] = posicion
+
+    st.markdown("---")
+
+    # ========== RESULTADOS ==========
+    with medir("Consulta de scouting"):
+        resultado = indice.consultar(rangos, categorias)
+
+        pasos = " → ".join(f"{candidatos:,}" for _, candidatos in resultado.pasos)
+        st.caption(f"⚡ {len(resultado.filas):,} jugadores de {indice.filas:,} en {resultado.tiempo_ms:.2f} ms"
+                   + (f" (candidatos por paso: {pasos})" if pasos else ""))
+
+        if st.checkbox("⏱️ Comparar con el filtrado de pandas", key='scouting_comparar'):
+            coincidencias, ms = _comparar_con_pandas(df, rangos, categorias)
+            st.caption(f"🐼 pandas: {coincidencias:,} jugadores en {ms:.1f} ms")
+
+        if len(resultado.filas) == 0:
+            st.warning("No hay jugadores que cumplan con los filtros seleccionados.")
+            return
+
+        columnas_tabla = [c for c in dict.fromkeys(['player_name', COLUMNA_POSICION, 'overall_rating', 'team_long_name', 'league_name'] + list(rangos))
+                          if c in df.columns]
+        tabla = df.iloc[resultado.filas][columnas_tabla]
+        if 'edad' in rangos:
+            tabla.insert(1, 'edad', indice.codigos['edad'][resultado.filas])
+        if 'overall_rating' in tabla.columns:
+            tabla = tabla.sort_values('overall_rating', ascending=False, kind='stable')
+        tabla = tabla.head(SCOUTING_RESULTADOS_MAX).reset_index(drop=True)
+        tabla.index = tabla.index + 1
+
+        st.markdown(f"### 🎯 {len(resultado.filas):,} jugadores encontrados"
+                    + (f" (los {SCOUTING_RESULTADOS_MAX} mejores)" if len(resultado.filas) > SCOUTING_RESULTADOS_MAX else ""))
+        st.dataframe(
+            tabla.rename(columns={
+                'player_name': 'Jugador',
+                'edad': 'Edad',
+                COLUMNA_POSICION: 'Posición',
+                'team_long_name': 'Equipo',
+                'league_name': 'Liga',
+                **NOMBRES_ATRIBUTOS,
+            }),
+            use_container_width=True
+        )
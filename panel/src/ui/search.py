@@ -0,0 +1,85 @@
+import streamlit as st
+from utils.aggregates import get_agregados
+from utils.name_search import get_indice_nombres, mejores_jugadores
+
+# Selectores de jugador con búsqueda por nombre (ver utils/name_search.py).
+# Sustituyen a los selectbox con la lista completa de nombres (o recortada a los
+# mejores): se ofrece la selección actual más las coincidencias de lo escrito, o
+# los jugadores con más rating mientras no se escribe nada. El índice de nombres
+# solo se construye cuando alguien escribe: las sugerencias iniciales no lo necesitan.
+
+
+def _opciones(df, texto, fijas):
+    """Opciones del selector: las fijas (sin repetir) y después las coincidencias de `texto`."""
+    resultado = get_indice_nombres(df).buscar(texto) if texto.strip() else None
+    sugerencias = resultado.nombres if resultado is not None else mejores_jugadores(df)
+    opciones = list(dict.fromkeys(fijas))
+    opciones += [nombre for nombre in sugerencias if nombre not in opciones]
+    return opciones, resultado
+
+
+def _mostrar_tiempo(resultado):
+    if resultado is not None:
+        st.caption(f"🔎 {len(resultado.nombres)} coincidencias en {resultado.tiempo_ms:.1f} ms")
+
+
+def selector_jugador(df, clave, etiqueta, por_defecto=None, ninguno=None):
+    """
+    Caja de búsqueda más selectbox de un jugador. Al buscar se selecciona la mejor coincidencia.
+
+    Args:
+        df: DataFrame de jugadores
+        clave: Clave del selectbox en session_state (la de la caja de búsqueda es `{clave}_buscar`)
+        etiqueta: Etiqueta de la caja de búsqueda
+        por_defecto: Jugador seleccionado al principio (si no existe, el de más rating)
+        ninguno: Si se indica, opción inicial para no seleccionar a nadie (p. ej. 'Ninguno')
+
+    Returns:
+        str: Nombre del jugador seleccionado (o `ninguno`)
+    """
+    agregados = get_agregados(df)
+    clave_texto = f"{clave}_buscar"
+
+    validos = agregados.fila_de_jugador
+    actual = st.session_state.get(clave)
+    if actual is None or (actual not in validos and actual != ninguno):
+        if ninguno is not None:
+            st.session_state[clave] = ninguno
+        else:
+            st.session_state[clave] = por_defecto if por_defecto in validos else (mejores_jugadores(df, 1) or [None])[0]
+
+    def _al_buscar():
+        resultado = get_indice_nombres(df).buscar(st.session_state[clave_texto], 1)
+        if resultado.nombres:
+            st.session_state[clave] = resultado.nombres[0]
+
+    texto = st.text_input(etiqueta, key=clave_texto, placeholder="🔎 Escribe un nombre...", on_change=_al_buscar)
+    fijas = ([ninguno] if ninguno is not None else []) + [st.session_state[clave]]
+    opciones, resultado = _opciones(df, texto, fijas)
+    jugador = st.selectbox(etiqueta, options=opciones, key=clave, label_visibility='collapsed')
+    _mostrar_tiempo(resultado)
+    return jugador
+
+
+def multiselector_jugadores(df, clave, etiqueta, max_selecciones=None, **kwargs):
+    """
+    Caja de búsqueda más multiselect de jugadores; los ya elegidos se conservan al buscar otros.
+
+    Args:
+        df: DataFrame de jugadores
+        clave: Clave del multiselect en session_state (la de la caja de búsqueda es `{clave}_buscar`)
+        etiqueta: Etiqueta del multiselect
+        max_selecciones: Máximo de jugadores
+        **kwargs: Resto de argumentos de st.multiselect (placeholder, help...)
+
+    Returns:
+        list: Nombres de los jugadores seleccionados
+    """
+    validos = get_agregados(df).fila_de_jugador
+    seleccionados = [nombre for nombre in st.session_state.get(clave, []) if nombre in validos]
+    st.session_state[clave] = seleccionados
+
+    texto = st.text_input("🔎 Buscar jugador:", key=f"{clave}_buscar", placeholder="Escribe un nombre...")
+    opciones, resultado = _opciones(df, texto, seleccionados)
+    _mostrar_tiempo(resultado)
+    return st.multiselect(etiqueta, options=opciones, key=clave, max_selections=max_selecciones, **kwargs)
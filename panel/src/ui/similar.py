@@ -0,0 +1,126 @@
+import streamlit as st
+import plotly.graph_objects as go
+from utils.profiler import medir
+from utils.aggregates import get_agregados
+from utils.similarity import get_buscador_similares
+from ui.search import selector_jugador
+from utils.const import SIMILARES_K_POR_DEFECTO, SIMILARES_K_MAX, NOMBRES_ATRIBUTOS
+
+TODAS_LAS_LIGAS = "Todas las ligas"
+TODOS_LOS_EQUIPOS = "Todos los equipos"
+
+# Atributos del radar (0-100; altura y peso no caben en la misma escala)
+ATRIBUTOS_RADAR = ['ball_control', 'dribbling', 'finishing', 'short_passing', 'shot_power',
+                   'acceleration', 'sprint_speed', 'agility', 'stamina', 'jumping', 'aggression']
+COLORES_RADAR = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+
+
+def _figura_radar(df_radar, atributos):
+    """Radar del jugador de referencia frente a sus jugadores más parecidos."""
+    fig = go.Figure()
+    for i, (_, jugador) in enumerate(df_radar.iterrows()):
+        fig.add_trace(go.Scatterpolar(
+            r=jugador[atributos].values,
+            theta=[NOMBRES_ATRIBUTOS.get(attr, attr) for attr in atributos],
+            fill='toself' if i == 0 else 'none',
+            name=jugador['player_name'],
+            line=dict(color=COLORES_RADAR[i % len(COLORES_RADAR)], width=3 if i == 0 else 2),
+        ))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=True,
+        height=500
+    )
+    return fig
+
+
+def render_similar_players_page(df):
+    """
+    Página de búsqueda de jugadores con un perfil de atributos parecido.
+    """
+
+    agregados = get_agregados(df)
+
+    st.markdown("## 🧬 Jugadores Similares")
+    st.markdown("¿Quién juega como este jugador? Compara todos los atributos de un jugador "
+                "(técnicos, físicos, de portero, altura y peso) con los del resto y encuentra los perfiles más parecidos.")
+
+    st.markdown("---")
+
+    if 'player_name' not in df.columns:
+        st.warning("No hay datos de jugadores disponibles.")
+        return
+
+    # ========== SELECCIÓN DEL JUGADOR Y FILTROS ==========
+    with medir("Selección y filtros"):
+        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+
+        with col1:
+            jugador = selector_jugador(df, 'similar_jugador', "👤 Jugador de referencia:", por_defecto='Lionel Messi')
+
+        with col2:
+            liga_display = st.selectbox(
+                "🏆 Buscar en la liga:",
+                options=[TODAS_LAS_LIGAS] + agregados.lista_ligas,
+                key='similar_liga'
+            )
+            liga = None if liga_display == TODAS_LAS_LIGAS else agregados.liga_por_display[liga_display]
+
+        with col3:
+            if liga is None:
+                equipos = agregados.lista_equipos
+            else:
+                info = agregados.equipos_con_info
+                equipos = info.loc[info['league_name'] == liga, 'display_name'].tolist()
+            # Al cambiar de liga, el equipo elegido puede no estar en la nueva lista
+            if st.session_state.get('similar_equipo') not in [TODOS_LOS_EQUIPOS] + equipos:
+                st.session_state.similar_equipo = TODOS_LOS_EQUIPOS
+            equipo_display = st.selectbox(
+                "⚽ Buscar en el equipo:",
+                options=[TODOS_LOS_EQUIPOS] + equipos,
+                key='similar_equipo'
+            )
+            equipo = None if equipo_display == TODOS_LOS_EQUIPOS else agregados.equipo_por_display[equipo_display]
+
+        with col4:
+            k = st.number_input("Resultados:", min_value=1, max_value=SIMILARES_K_MAX,
+                                value=SIMILARES_K_POR_DEFECTO, step=1, key='similar_k')
+
+    # ========== BÚSQUEDA ==========
+    with medir("Búsqueda de similares"):
+        fila = agregados.fila_de_jugador[jugador]
+        resultado = get_buscador_similares(df).similares_filtrados(df, fila, int(k), liga=liga, equipo=equipo)
+
+        st.caption(f"⚡ {resultado.candidatos:,} jugadores comparados en {resultado.tiempo_ms:.1f} ms")
+
+        if len(resultado.filas) == 0:
+            st.warning("No hay jugadores que cumplan con los filtros seleccionados.")
+            return
+
+        columnas = [c for c in ('player_name', 'overall_rating', 'team_long_name', 'league_name') if c in df.columns]
+        tabla = df.iloc[resultado.filas][columnas].reset_index(drop=True)
+        tabla.insert(1, 'similitud', resultado.similitud.round(1))
+        tabla.index = tabla.index + 1
+        st.markdown(f"### 🔎 Los {len(tabla)} jugadores más parecidos a {jugador}")
+        st.dataframe(
+            tabla.rename(columns={
+                'player_name': 'Jugador',
+                'similitud': 'Similitud (%)',
+                'overall_rating': 'Overall',
+                'team_long_name': 'Equipo',
+                'league_name': 'Liga',
+            }),
+            use_container_width=True
+        )
+
+    st.markdown("---")
+
+    # ========== RADAR: REFERENCIA FRENTE A LOS MÁS PARECIDOS ==========
+    with medir("Radar de similares"):
+        atributos = [attr for attr in ATRIBUTOS_RADAR if attr in df.columns]
+        if atributos:
+            st.markdown("### 🕸️ Perfil frente a los 3 más parecidos")
+            filas_radar = [fila] + resultado.filas[:3].tolist()
+            df_radar = df.iloc[filas_radar][['player_name'] + atributos]
+            with medir("radar de similares"):
+                st.plotly_chart(_figura_radar(df_radar, atributos), use_container_width=True)
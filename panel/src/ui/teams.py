@@ -3,6 +3,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from utils.profiler import medir
+from utils.aggregates import get_agregados
+from utils.percentiles import get_indice_percentiles
+from utils.lineups import FORMACIONES, NOMBRES_ROLES, get_motor_alineaciones
+from utils.positions import COLUMNA_POSICION
+from utils.const import FORMACION_POR_DEFECTO
 
 def get_team_logo_url(team_name):
     """
@@ -50,6 +56,262 @@ def get_team_logo_url(team_name):
     # URL genérica de respaldo (escudo neutral de fútbol)
     return 'https://upload.wikimedia.org/wikipedia/commons/6/6e/Football_%28soccer_ball%29.svg'
 
+# Atributos (y su nombre en español) de las secciones de pie preferido, heatmap y comparador
+ATRIBUTOS_PIE = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
+                 'shot_power', 'acceleration', 'sprint_speed', 'stamina']
+NOMBRES_PIE = {
+    'ball_control': 'Control',
+    'dribbling': 'Regate',
+    'finishing': 'Finalización',
+    'short_passing': 'Pase',
+    'shot_power': 'Potencia',
+    'acceleration': 'Aceleración',
+    'sprint_speed': 'Velocidad',
+    'stamina': 'Resistencia'
+}
+
+ATRIBUTOS_HEATMAP = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
+                     'shot_power', 'acceleration', 'sprint_speed']
+NOMBRES_HEATMAP = {
+    'ball_control': 'Control',
+    'dribbling': 'Regate',
+    'finishing': 'Finalización',
+    'short_passing': 'Pase',
+    'shot_power': 'Potencia',
+    'acceleration': 'Aceleración',
+    'sprint_speed': 'Velocidad'
+}
+
+ATRIBUTOS_RADAR = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
+                   'acceleration', 'sprint_speed', 'stamina', 'aggression']
+NOMBRES_RADAR = {
+    'ball_control': 'Control',
+    'dribbling': 'Regate',
+    'finishing': 'Finalización',
+    'short_passing': 'Pase Corto',
+    'acceleration': 'Aceleración',
+    'sprint_speed': 'Velocidad',
+    'stamina': 'Resistencia',
+    'aggression': 'Agresividad'
+}
+
+
+# ---------- Figuras ----------
+# Se construyen a través de Agregados.figura(): una vez por equipo y versión del
+# dataset, compartidas por todas las sesiones (y precalentadas al arrancar).
+
+def _comparacion_pie(df_equipo, atributos):
+    """
+    Zurdos y diestros del equipo (sin NaN) y su media en cada atributo.
+
+    Returns:
+        tuple: (df_pie, comparacion_pie); comparacion_pie es None si no hay datos
+    """
+    df_pie = df_equipo[df_equipo['preferred_foot'].isin(['left', 'right'])].copy()
+    df_pie['Pie Preferido'] = df_pie['preferred_foot'].map({'right': 'Diestro', 'left': 'Zurdo'})
+    if not atributos or len(df_pie) == 0:
+        return df_pie, None
+    return df_pie, df_pie.groupby('Pie Preferido')[atributos].mean()
+
+
+def _figura_pie_preferido(comparacion_pie):
+    """Barras agrupadas con la media de cada atributo de diestros y zurdos."""
+    df_plot = comparacion_pie.T.reset_index()
+    df_plot.columns = ['Atributo'] + list(comparacion_pie.index)
+    df_plot['Atributo'] = df_plot['Atributo'].map(NOMBRES_PIE)
+
+    fig_pie = go.Figure()
+
+    if 'Diestro' in df_plot.columns:
+        fig_pie.add_trace(go.Bar(
+            name='Diestros',
+            x=df_plot['Atributo'],
+            y=df_plot['Diestro'],
+            marker_color='#3498db',
+            text=df_plot['Diestro'].round(1),
+            textposition='outside'
+        ))
+
+    if 'Zurdo' in df_plot.columns:
+        fig_pie.add_trace(go.Bar(
+            name='Zurdos',
+            x=df_plot['Atributo'],
+            y=df_plot['Zurdo'],
+            marker_color='#e74c3c',
+            text=df_plot['Zurdo'].round(1),
+            textposition='outside'
+        ))
+
+    fig_pie.update_layout(
+        title='Comparación de Atributos: Diestros vs Zurdos',
+        barmode='group',
+        height=400,
+        yaxis_title='Nivel del Atributo',
+        xaxis_title='',
+        yaxis=dict(range=[0, 100])
+    )
+    return fig_pie
+
+
+def _figura_3d(df_equipo, equipo):
+    """Scatter 3D de agilidad, velocidad y aceleración (escala amarillo claro -> rojo)."""
+    fig_3d = px.scatter_3d(
+        df_equipo,
+        x='agility',
+        y='sprint_speed',
+        z='acceleration',
+        color='overall_rating',
+        size='overall_rating',
+        hover_name='player_name',
+        color_continuous_scale=[[0, '#ffffcc'], [0.5, '#ff7f00'], [1, '#cc0000']],  # Amarillo claro -> Naranja -> Rojo
+        title=f'Atributos Físicos 3D: {equipo}',
+        labels={
+            'agility': 'Agilidad',
+            'sprint_speed': 'Velocidad',
+            'acceleration': 'Aceleración',
+            'overall_rating': 'Rating'
+        }
+    )
+
+    # Actualizar el estilo del gráfico con cuadrícula azul claro
+    fig_3d.update_layout(
+        height=600,
+        scene=dict(
+            xaxis=dict(
+                backgroundcolor="rgb(230, 240, 250)",
+                gridcolor="rgb(173, 216, 230)",
+                showbackground=True,
+                zerolinecolor="rgb(173, 216, 230)"
+            ),
+            yaxis=dict(
+                backgroundcolor="rgb(230, 240, 250)",
+                gridcolor="rgb(173, 216, 230)",
+                showbackground=True,
+                zerolinecolor="rgb(173, 216, 230)"
+            ),
+            zaxis=dict(
+                backgroundcolor="rgb(230, 240, 250)",
+                gridcolor="rgb(173, 216, 230)",
+                showbackground=True,
+                zerolinecolor="rgb(173, 216, 230)"
+            )
+        )
+    )
+    return fig_3d
+
+
+def _figura_heatmap(df_equipo, equipo, atributos_disponibles):
+    """Heatmap de atributos de los 15 mejores jugadores del equipo."""
+    # Seleccionar top 15 jugadores por rating
+    df_top = df_equipo.nlargest(15, 'overall_rating').copy()
+
+    # Crear matriz con jugadores en filas y atributos en columnas
+    df_heatmap = df_top[['player_name'] + atributos_disponibles].set_index('player_name')
+    df_heatmap.columns = [NOMBRES_HEATMAP.get(col, col) for col in df_heatmap.columns]
+
+    # Crear heatmap
+    fig_heatmap = px.imshow(
+        df_heatmap,
+        color_continuous_scale='RdYlGn',
+        aspect='auto',
+        title=f'Top 15 Jugadores - Perfil de Atributos: {equipo}',
+        zmin=0,
+        zmax=100,
+        text_auto='.0f',
+        labels=dict(x="Atributo", y="Jugador", color="Nivel")
+    )
+
+    fig_heatmap.update_layout(height=600)
+    fig_heatmap.update_xaxes(side="top")
+    return fig_heatmap
+
+
+def _promedios_calificados(df_equipo, atributos):
+    """Media de cada atributo contando solo los jugadores con 70+ en él (0 si nadie llega a 70)."""
+    valores = df_equipo[atributos]
+    return valores.where(valores >= 70).mean().fillna(0)
+
+
+def _figura_radar_comparativo(prom_1, prom_2, equipo_1, equipo_2, atributos):
+    """Radar con los promedios de los dos equipos."""
+    fig_radar_comp = go.Figure()
+
+    # Equipo 1
+    fig_radar_comp.add_trace(go.Scatterpolar(
+        r=prom_1.values,
+        theta=[NOMBRES_RADAR.get(attr, attr) for attr in atributos],
+        fill='toself',
+        name=equipo_1,
+        line=dict(color='#3498db', width=3),
+        fillcolor='rgba(52, 152, 219, 0.3)'
+    ))
+
+    # Equipo 2
+    fig_radar_comp.add_trace(go.Scatterpolar(
+        r=prom_2.values,
+        theta=[NOMBRES_RADAR.get(attr, attr) for attr in atributos],
+        fill='toself',
+        name=equipo_2,
+        line=dict(color='#e74c3c', width=3),
+        fillcolor='rgba(231, 76, 60, 0.3)'
+    ))
+
+    fig_radar_comp.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[69, 91]
+            )
+        ),
+        showlegend=True,
+        height=500,
+        title=f"Comparación de Atributos Promedio"
+    )
+    return fig_radar_comp
+
+
+def precalentar(df):
+    """
+    Construye las figuras de la selección por defecto (FC Barcelona frente al Real Madrid)
+    para que la primera visita a la página no tenga que hacerlo (ver utils/warmup.py).
+
+    Returns:
+        list: Claves de las figuras construidas
+    """
+    agregados = get_agregados(df)
+    if 'team_long_name' not in df.columns or not agregados.lista_equipos:
+        return []
+    equipo = agregados.equipo_por_display[agregados.lista_equipos[agregados.indice_equipo_defecto]]
+    df_equipo = agregados.jugadores_equipo(equipo)
+    columnas = df.columns
+
+    claves = []
+    if 'preferred_foot' in columnas:
+        _, comparacion_pie = _comparacion_pie(df_equipo, [attr for attr in ATRIBUTOS_PIE if attr in columnas])
+        if comparacion_pie is not None:
+            claves.append(('pie_preferido', equipo))
+            agregados.figura(claves[-1], lambda: _figura_pie_preferido(comparacion_pie))
+
+    if all(attr in columnas for attr in ['agility', 'sprint_speed', 'acceleration', 'overall_rating']):
+        claves.append(('3d', equipo))
+        agregados.figura(claves[-1], lambda: _figura_3d(df_equipo, equipo))
+
+    atributos_heatmap = [attr for attr in ATRIBUTOS_HEATMAP if attr in columnas]
+    if len(atributos_heatmap) > 1:
+        claves.append(('heatmap', equipo))
+        agregados.figura(claves[-1], lambda: _figura_heatmap(df_equipo, equipo, atributos_heatmap))
+
+    opciones = agregados.equipos_comparables(equipo)
+    atributos_radar = [attr for attr in ATRIBUTOS_RADAR if attr in columnas]
+    if opciones and atributos_radar:
+        comparar = agregados.equipo_por_display[opciones[agregados.indice_comparar_defecto(opciones)]]
+        prom_1 = _promedios_calificados(df_equipo, atributos_radar)
+        prom_2 = _promedios_calificados(agregados.jugadores_equipo(comparar), atributos_radar)
+        claves.append(('radar', equipo, comparar))
+        agregados.figura(claves[-1], lambda: _figura_radar_comparativo(prom_1, prom_2, equipo, comparar, atributos_radar))
+    return claves
+
+
 def render_teams_page(df):
     """
     Página de análisis por equipo con visualizaciones mejoradas y comparación.
@@ -64,524 +326,391 @@ def render_teams_page(df):
     st.markdown("### 🎯 Selecciona un Equipo")
     
     if 'team_long_name' in df.columns:
-        # Crear lista de equipos con liga y país
-        equipos_con_info = df[['team_long_name', 'league_name', 'country_name']].drop_duplicates()
-        equipos_con_info['display_name'] = equipos_con_info['team_long_name'] + ' (' + equipos_con_info['league_name'] + ')'
-        equipos_con_info = equipos_con_info.sort_values('team_long_name')
+        with medir("Sección 1: Selector de equipo"):
+            # Lista de equipos con liga y país (calculada una vez por versión del dataset)
+            agregados = get_agregados(df)
+            lista_equipos = agregados.lista_equipos
         
-        # Buscar FC Barcelona como default
-        lista_equipos = equipos_con_info['display_name'].tolist()
-        default_index = 0
-        for idx, nombre in enumerate(lista_equipos):
-            if 'FC Barcelona' in nombre or 'Barcelona' in nombre:
-                default_index = idx
-                break
+            col1, col2, col3 = st.columns([1, 1, 1])
         
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col1:
-            equipo_display = st.selectbox(
-                "🏟️ Busca tu equipo:",
-                options=lista_equipos,
-                index=default_index,
-                key='equipo_selector'
-            )
+            with col1:
+                equipo_display = st.selectbox(
+                    "🏟️ Busca tu equipo:",
+                    options=lista_equipos,
+                    index=agregados.indice_equipo_defecto,  # FC Barcelona
+                    key='equipo_selector'
+                )
             
-            # Extraer nombre del equipo
-            equipo_seleccionado = equipos_con_info[equipos_con_info['display_name'] == equipo_display]['team_long_name'].iloc[0]
+                # Extraer nombre del equipo
+                equipo_seleccionado = agregados.equipo_por_display[equipo_display]
         
         if equipo_seleccionado:
-            df_equipo = df[df['team_long_name'] == equipo_seleccionado]
-            liga_equipo = df_equipo['league_name'].iloc[0]
-            pais_equipo = df_equipo['country_name'].iloc[0]
-            
-            with col2:
-                st.metric("🌍 País", pais_equipo)
-            
-            with col3:
-                st.metric("🏆 Liga", liga_equipo)
-            
-            # Aplicar fondo con escudo del equipo
-            logo_url = get_team_logo_url(equipo_seleccionado)
-            st.markdown(
-                f"""
-                <style>
-                /* Fondo con escudo del equipo */
-                .stApp {{
-                    background: linear-gradient(rgba(255, 255, 255, 0.92), rgba(255, 255, 255, 0.92)), 
-                                url("{logo_url}") !important;
-                    background-size: 400px 400px !important;
-                    background-position: center center !important;
-                    background-repeat: no-repeat !important;
-                    background-attachment: fixed !important;
-                }}
-                </style>
-                """,
-                unsafe_allow_html=True
-            )
+            with medir("Cabecera del equipo"):
+                df_equipo = agregados.jugadores_equipo(equipo_seleccionado)
+                liga_equipo = df_equipo['league_name'].iloc[0]
+                pais_equipo = df_equipo['country_name'].iloc[0]
+            
+                with col2:
+                    st.metric("🌍 País", pais_equipo)
+            
+                with col3:
+                    st.metric("🏆 Liga", liga_equipo)
+            
+                # Aplicar fondo con escudo del equipo
+                logo_url = get_team_logo_url(equipo_seleccionado)
+                st.markdown(
+                    f"""
+                    <style>
+                    /* Fondo con escudo del equipo */
+                    .stApp {{
+                        background: linear-gradient(rgba(255, 255, 255, 0.92), rgba(255, 255, 255, 0.92)), 
+                                    url("{logo_url}") !important;
+                        background-size: 400px 400px !important;
+                        background-position: center center !important;
+                        background-repeat: no-repeat !important;
+                        background-attachment: fixed !important;
+                    }}
+                    </style>
+                    """,
+                    unsafe_allow_html=True
+                )
             
             st.markdown("---")
             
             # ========== SECCIÓN 2: MÉTRICAS GENERALES DEL EQUIPO ==========
-            st.markdown(f"### 📊 Estadísticas Generales: {equipo_seleccionado}")
-            st.markdown("Aquí puedes ver un resumen del nivel global del equipo y sus jugadores más destacados.")
+            with medir("Sección 2: Métricas generales"):
+                st.markdown(f"### 📊 Estadísticas Generales: {equipo_seleccionado}")
+                st.markdown("Aquí puedes ver un resumen del nivel global del equipo y sus jugadores más destacados.")
             
-            col1, col2, col3, col4, col5 = st.columns(5)
+                col1, col2, col3, col4, col5 = st.columns(5)
             
-            with col1:
-                num_jugadores = len(df_equipo)
-                st.metric("👥 Plantilla", num_jugadores)
+                with col1:
+                    num_jugadores = len(df_equipo)
+                    st.metric("👥 Plantilla", num_jugadores)
             
-            with col2:
-                rating_medio = df_equipo['overall_rating'].mean()
-                st.metric("⭐ Rating Medio", f"{rating_medio:.1f}")
+                with col2:
+                    rating_medio = df_equipo['overall_rating'].mean()
+                    st.metric("⭐ Rating Medio", f"{rating_medio:.1f}")
             
-            with col3:
-                mejor_jugador = df_equipo.nlargest(1, 'overall_rating')['player_name'].iloc[0]
-                mejor_rating = df_equipo['overall_rating'].max()
-                st.metric("🌟 Mejor Jugador", mejor_jugador)
-                st.caption(f"Rating: {mejor_rating}")
+                with col3:
+                    mejor_jugador = df_equipo.nlargest(1, 'overall_rating')['player_name'].iloc[0]
+                    mejor_rating = df_equipo['overall_rating'].max()
+                    st.metric("🌟 Mejor Jugador", mejor_jugador)
+                    st.caption(f"Rating: {mejor_rating}")
             
-            with col4:
-                elite_count = (df_equipo['overall_rating'] >= 80).sum()
-                elite_pct = (elite_count / num_jugadores) * 100
-                st.metric("💎 Jugadores Elite", elite_count)
-                st.caption(f"{elite_pct:.1f}% del equipo")
+                with col4:
+                    elite_count = (df_equipo['overall_rating'] >= 80).sum()
+                    elite_pct = (elite_count / num_jugadores) * 100
+                    st.metric("💎 Jugadores Elite", elite_count)
+                    st.caption(f"{elite_pct:.1f}% del equipo")
             
-            with col5:
-                edad_media = (pd.Timestamp('2016-12-31') - pd.to_datetime(df_equipo['birthday'])).dt.days.mean() / 365.25
-                st.metric("📅 Edad Media", f"{edad_media:.1f}")
+                with col5:
+                    edad_media = (pd.Timestamp('2016-12-31') - pd.to_datetime(df_equipo['birthday'])).dt.days.mean() / 365.25
+                    st.metric("📅 Edad Media", f"{edad_media:.1f}")
             
             st.markdown("---")
             
             # ========== SECCIÓN 3: ANÁLISIS POR PIE PREFERIDO ==========
-            st.markdown("### 🦶 Análisis: ¿Zurdos vs Diestros?")
-            st.markdown("Descubre si existe una diferencia de rendimiento o especialización entre los jugadores según su pie preferido.")
-            
-            if 'preferred_foot' in df.columns:
-                # Filtrar solo zurdos y diestros (sin NaN)
-                df_pie = df_equipo[df_equipo['preferred_foot'].isin(['left', 'right'])].copy()
-                df_pie['Pie Preferido'] = df_pie['preferred_foot'].map({'right': 'Diestro', 'left': 'Zurdo'})
-                
-                # Comparar atributos entre zurdos y diestros
-                atributos_comp = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
-                                 'shot_power', 'acceleration', 'sprint_speed', 'stamina']
-                atributos_comp_disp = [attr for attr in atributos_comp if attr in df.columns]
+            with medir("Sección 3: Pie preferido"):
+                st.markdown("### 🦶 Análisis: ¿Zurdos vs Diestros?")
+                st.markdown("Descubre si existe una diferencia de rendimiento o especialización entre los jugadores según su pie preferido.")
+            
+                if 'preferred_foot' in df.columns:
+                    # Comparar atributos entre zurdos y diestros
+                    atributos_comp_disp = [attr for attr in ATRIBUTOS_PIE if attr in df.columns]
+                    df_pie, comparacion_pie = _comparacion_pie(df_equipo, atributos_comp_disp)
                 
-                if atributos_comp_disp and len(df_pie) > 0:
-                    # Calcular promedios por pie
-                    comparacion_pie = df_pie.groupby('Pie Preferido')[atributos_comp_disp].mean()
-                    
-                    # Crear DataFrame para visualización
-                    nombres_atributos = {
-                        'ball_control': 'Control',
-                        'dribbling': 'Regate',
-                        'finishing': 'Finalización',
-                        'short_passing': 'Pase',
-                        'shot_power': 'Potencia',
-                        'acceleration': 'Aceleración',
-                        'sprint_speed': 'Velocidad',
-                        'stamina': 'Resistencia'
-                    }
+                    if comparacion_pie is not None:
+                        col1, col2 = st.columns([2, 1])
                     
-                    col1, col2 = st.columns([2, 1])
+                        with col1:
+                            # Gráfico de barras agrupadas
+                            with medir("gráfico zurdos vs diestros"):
+                                fig_pie = agregados.figura(
+                                    ('pie_preferido', equipo_seleccionado),
+                                    lambda: _figura_pie_preferido(comparacion_pie)
+                                )
+                                st.plotly_chart(fig_pie, use_container_width=True)
                     
-                    with col1:
-                        # Gráfico de barras agrupadas
-                        df_plot = comparacion_pie.T.reset_index()
-                        df_plot.columns = ['Atributo'] + list(comparacion_pie.index)
-                        df_plot['Atributo'] = df_plot['Atributo'].map(nombres_atributos)
-                        
-                        fig_pie = go.Figure()
-                        
-                        if 'Diestro' in df_plot.columns:
-                            fig_pie.add_trace(go.Bar(
-                                name='Diestros',
-                                x=df_plot['Atributo'],
-                                y=df_plot['Diestro'],
-                                marker_color='#3498db',
-                                text=df_plot['Diestro'].round(1),
-                                textposition='outside'
-                            ))
-                        
-                        if 'Zurdo' in df_plot.columns:
-                            fig_pie.add_trace(go.Bar(
-                                name='Zurdos',
-                                x=df_plot['Atributo'],
-                                y=df_plot['Zurdo'],
-                                marker_color='#e74c3c',
-                                text=df_plot['Zurdo'].round(1),
-                                textposition='outside'
-                            ))
+                        with col2:
+                            st.markdown("#### 💡 Conclusiones")
                         
-                        fig_pie.update_layout(
-                            title='Comparación de Atributos: Diestros vs Zurdos',
-                            barmode='group',
-                            height=400,
-                            yaxis_title='Nivel del Atributo',
-                            xaxis_title='',
-                            yaxis=dict(range=[0, 100])
-                        )
-                        
-                        st.plotly_chart(fig_pie, use_container_width=True)
-                    
-                    with col2:
-                        st.markdown("#### 💡 Conclusiones")
+                            # Contar jugadores
+                            num_diestros = len(df_pie[df_pie['Pie Preferido'] == 'Diestro'])
+                            num_zurdos = len(df_pie[df_pie['Pie Preferido'] == 'Zurdo'])
                         
-                        # Contar jugadores
-                        num_diestros = len(df_pie[df_pie['Pie Preferido'] == 'Diestro'])
-                        num_zurdos = len(df_pie[df_pie['Pie Preferido'] == 'Zurdo'])
+                            st.markdown(f"**👥 Plantilla:**")
+                            st.caption(f"Diestros: {num_diestros} | Zurdos: {num_zurdos}")
                         
-                        st.markdown(f"**👥 Plantilla:**")
-                        st.caption(f"Diestros: {num_diestros} | Zurdos: {num_zurdos}")
-                        
-                        if 'Diestro' in comparacion_pie.index and 'Zurdo' in comparacion_pie.index:
-                            # Calcular diferencias
-                            diferencias = comparacion_pie.loc['Zurdo'] - comparacion_pie.loc['Diestro']
+                            if 'Diestro' in comparacion_pie.index and 'Zurdo' in comparacion_pie.index:
+                                # Calcular diferencias
+                                diferencias = comparacion_pie.loc['Zurdo'] - comparacion_pie.loc['Diestro']
                             
-                            # Encontrar mayores fortalezas de zurdos
-                            mejor_zurdo = diferencias.nlargest(2)
-                            # Encontrar mayores fortalezas de diestros
-                            mejor_diestro = diferencias.nsmallest(2)
+                                # Encontrar mayores fortalezas de zurdos
+                                mejor_zurdo = diferencias.nlargest(2)
+                                # Encontrar mayores fortalezas de diestros
+                                mejor_diestro = diferencias.nsmallest(2)
                             
-                            st.markdown("**🔴 Zurdos destacan en:**")
-                            for attr, diff in mejor_zurdo.items():
-                                if diff > 0.5:
-                                    st.caption(f"• {nombres_atributos.get(attr, attr)} (+{diff:.1f})")
+                                st.markdown("**🔴 Zurdos destacan en:**")
+                                for attr, diff in mejor_zurdo.items():
+                                    if diff > 0.5:
+                                        st.caption(f"• {NOMBRES_PIE.get(attr, attr)} (+{diff:.1f})")
                             
-                            st.markdown("**🔵 Diestros destacan en:**")
-                            for attr, diff in mejor_diestro.items():
-                                if diff < -0.5:
-                                    st.caption(f"• {nombres_atributos.get(attr, attr)} ({diff:.1f})")
+                                st.markdown("**🔵 Diestros destacan en:**")
+                                for attr, diff in mejor_diestro.items():
+                                    if diff < -0.5:
+                                        st.caption(f"• {NOMBRES_PIE.get(attr, attr)} ({diff:.1f})")
                             
-                            # Rating promedio
-                            rating_diestro = df_pie[df_pie['Pie Preferido'] == 'Diestro']['overall_rating'].mean()
-                            rating_zurdo = df_pie[df_pie['Pie Preferido'] == 'Zurdo']['overall_rating'].mean()
+                                # Rating promedio
+                                rating_diestro = df_pie[df_pie['Pie Preferido'] == 'Diestro']['overall_rating'].mean()
+                                rating_zurdo = df_pie[df_pie['Pie Preferido'] == 'Zurdo']['overall_rating'].mean()
                             
-                            st.markdown(f"**⭐ Rating Promedio:**")
-                            st.caption(f"Diestros: {rating_diestro:.1f} | Zurdos: {rating_zurdo:.1f}")
+                                st.markdown(f"**⭐ Rating Promedio:**")
+                                st.caption(f"Diestros: {rating_diestro:.1f} | Zurdos: {rating_zurdo:.1f}")
             
             st.markdown("---")
             
             # ========== SECCIÓN 4: SCATTER 3D - ATRIBUTOS FÍSICOS (MEJORADO) ==========
-            st.markdown("### 🚀 Análisis 3D de Atributos Físicos")
-            st.markdown("Explora la relación entre agilidad, velocidad y aceleración de cada jugador. **Bolas rojas y grandes = jugadores élite. Bolas amarillas y pequeñas = jugadores con menor rendimiento.**")
-            
-            if all(attr in df.columns for attr in ['agility', 'sprint_speed', 'acceleration', 'overall_rating']):
-                # Escala personalizada: amarillo claro para bajos, rojo para altos
-                fig_3d = px.scatter_3d(
-                    df_equipo,
-                    x='agility',
-                    y='sprint_speed',
-                    z='acceleration',
-                    color='overall_rating',
-                    size='overall_rating',
-                    hover_name='player_name',
-                    color_continuous_scale=[[0, '#ffffcc'], [0.5, '#ff7f00'], [1, '#cc0000']],  # Amarillo claro -> Naranja -> Rojo
-                    title=f'Atributos Físicos 3D: {equipo_seleccionado}',
-                    labels={
-                        'agility': 'Agilidad',
-                        'sprint_speed': 'Velocidad',
-                        'acceleration': 'Aceleración',
-                        'overall_rating': 'Rating'
-                    }
-                )
-                
-                # Actualizar el estilo del gráfico con cuadrícula azul claro
-                fig_3d.update_layout(
-                    height=600,
-                    scene=dict(
-                        xaxis=dict(
-                            backgroundcolor="rgb(230, 240, 250)",
-                            gridcolor="rgb(173, 216, 230)",
-                            showbackground=True,
-                            zerolinecolor="rgb(173, 216, 230)"
-                        ),
-                        yaxis=dict(
-                            backgroundcolor="rgb(230, 240, 250)",
-                            gridcolor="rgb(173, 216, 230)",
-                            showbackground=True,
-                            zerolinecolor="rgb(173, 216, 230)"
-                        ),
-                        zaxis=dict(
-                            backgroundcolor="rgb(230, 240, 250)",
-                            gridcolor="rgb(173, 216, 230)",
-                            showbackground=True,
-                            zerolinecolor="rgb(173, 216, 230)"
+            with medir("Sección 4: Scatter 3D"):
+                st.markdown("### 🚀 Análisis 3D de Atributos Físicos")
+                st.markdown("Explora la relación entre agilidad, velocidad y aceleración de cada jugador. **Bolas rojas y grandes = jugadores élite. Bolas amarillas y pequeñas = jugadores con menor rendimiento.**")
+            
+                if all(attr in df.columns for attr in ['agility', 'sprint_speed', 'acceleration', 'overall_rating']):
+                    # Escala personalizada: amarillo claro para bajos, rojo para altos
+                    with medir("gráfico 3D"):
+                        fig_3d = agregados.figura(
+                            ('3d', equipo_seleccionado),
+                            lambda: _figura_3d(df_equipo, equipo_seleccionado)
                         )
-                    )
-                )
-                st.plotly_chart(fig_3d, use_container_width=True)
+                        st.plotly_chart(fig_3d, use_container_width=True)
             
             st.markdown("---")
             
             # ========== SECCIÓN 5: HEATMAP - PERFIL DE JUGADORES ==========
-            st.markdown("### 🔥 Mapa de Calor: Perfil de Atributos por Jugador")
-            st.markdown("Visualiza las fortalezas y debilidades de cada jugador del equipo. **Verde = excelente, Amarillo = promedio, Rojo = débil.**")
-            
-            # Atributos clave para analizar
-            atributos_analisis = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
-                                 'shot_power', 'acceleration', 'sprint_speed']
-            atributos_disponibles = [attr for attr in atributos_analisis if attr in df.columns]
-            
-            if atributos_disponibles and len(atributos_disponibles) > 1:
-                # Nombres en español
-                nombres_es = {
-                    'ball_control': 'Control',
-                    'dribbling': 'Regate',
-                    'finishing': 'Finalización',
-                    'short_passing': 'Pase',
-                    'shot_power': 'Potencia',
-                    'acceleration': 'Aceleración',
-                    'sprint_speed': 'Velocidad'
-                }
-                
-                # Seleccionar top 15 jugadores por rating
-                df_top = df_equipo.nlargest(15, 'overall_rating').copy()
-                
-                # Crear matriz con jugadores en filas y atributos en columnas
-                df_heatmap = df_top[['player_name'] + atributos_disponibles].set_index('player_name')
-                df_heatmap.columns = [nombres_es.get(col, col) for col in df_heatmap.columns]
-                
-                # Crear heatmap
-                fig_heatmap = px.imshow(
-                    df_heatmap,
-                    color_continuous_scale='RdYlGn',
-                    aspect='auto',
-                    title=f'Top 15 Jugadores - Perfil de Atributos: {equipo_seleccionado}',
-                    zmin=0,
-                    zmax=100,
-                    text_auto='.0f',
-                    labels=dict(x="Atributo", y="Jugador", color="Nivel")
-                )
-                
-                fig_heatmap.update_layout(height=600)
-                fig_heatmap.update_xaxes(side="top")
-                st.plotly_chart(fig_heatmap, use_container_width=True)
+            with medir("Sección 5: Heatmap"):
+                st.markdown("### 🔥 Mapa de Calor: Perfil de Atributos por Jugador")
+                st.markdown("Visualiza las fortalezas y debilidades de cada jugador del equipo. **Verde = excelente, Amarillo = promedio, Rojo = débil.**")
+            
+                atributos_disponibles = [attr for attr in ATRIBUTOS_HEATMAP if attr in df.columns]
+            
+                if atributos_disponibles and len(atributos_disponibles) > 1:
+                    # Top 15 jugadores por rating: jugadores en filas y atributos en columnas
+                    with medir("heatmap"):
+                        fig_heatmap = agregados.figura(
+                            ('heatmap', equipo_seleccionado),
+                            lambda: _figura_heatmap(df_equipo, equipo_seleccionado, atributos_disponibles)
+                        )
+                        st.plotly_chart(fig_heatmap, use_container_width=True)
             
             st.markdown("---")
             
             # ========== SECCIÓN 6: TOP Y BOTTOM JUGADORES ==========
-            st.markdown("### ⭐ Mejores y Peores Jugadores del Equipo")
-            st.markdown("Conoce a las estrellas y a los jugadores con menor rendimiento de la plantilla.")
+            with medir("Sección 6: Top y bottom"):
+                st.markdown("### ⭐ Mejores y Peores Jugadores del Equipo")
+                st.markdown("Conoce a las estrellas y a los jugadores con menor rendimiento de la plantilla.")
             
-            col1, col2 = st.columns(2)
+                col1, col2 = st.columns(2)
+
+                # Percentil del rating de cada jugador en su liga (precalculado, ver utils/percentiles.py)
+                indice_percentiles = get_indice_percentiles(df)
+
+                def _linea_jugador(fila, row):
+                    percentil = indice_percentiles.percentil(fila, 'overall_rating', por_liga=True)
+                    texto_percentil = f" (P{percentil} en su liga)" if percentil is not None else ""
+                    return f"**{row['player_name']}** - Rating: {row['overall_rating']}{texto_percentil}"
             
-            with col1:
-                st.markdown("#### 🏆 Top 5 Mejores")
-                top_5 = df_equipo.nlargest(5, 'overall_rating')[['player_name', 'overall_rating']]
+                with col1:
+                    st.markdown("#### 🏆 Top 5 Mejores")
+                    top_5 = df_equipo.nlargest(5, 'overall_rating')[['player_name', 'overall_rating']]
                 
-                for idx, row in top_5.iterrows():
-                    st.markdown(f"**{row['player_name']}** - Rating: {row['overall_rating']}")
+                    for fila, (idx, row) in zip(df.index.get_indexer(top_5.index), top_5.iterrows()):
+                        st.markdown(_linea_jugador(fila, row))
             
-            with col2:
-                st.markdown("#### 📉 Top 5 Flojos")
-                bottom_5 = df_equipo.nsmallest(5, 'overall_rating')[['player_name', 'overall_rating']]
+                with col2:
+                    st.markdown("#### 📉 Top 5 Flojos")
+                    bottom_5 = df_equipo.nsmallest(5, 'overall_rating')[['player_name', 'overall_rating']]
                 
-                for idx, row in bottom_5.iterrows():
-                    st.markdown(f"**{row['player_name']}** - Rating: {row['overall_rating']}")
+                    for fila, (idx, row) in zip(df.index.get_indexer(bottom_5.index), bottom_5.iterrows()):
+                        st.markdown(_linea_jugador(fila, row))
             
             st.markdown("---")
             
-            # ========== SECCIÓN 7: COMPARADOR DE EQUIPOS ==========
-            st.markdown("### ⚔️ Comparador de Equipos")
-            st.markdown("Compara tu equipo seleccionado con otro equipo para ver diferencias en nivel, composición y estadísticas clave.")
+            # ========== SECCIÓN 7: MEJOR ONCE ==========
+            with medir("Sección 7: Mejor once"):
+                st.markdown("### 📋 Mejor Once Posible")
+                st.markdown("El once que más suma para la formación elegida: cada jugador puntúa según los "
+                            "atributos de cada puesto y se busca el reparto óptimo entre los puestos de su "
+                            "posición (un delantero puede jugar de extremo si así el equipo rinde más).")
+
+                formaciones = list(FORMACIONES)
+                formacion = st.selectbox(
+                    "🧩 Formación:",
+                    options=formaciones,
+                    index=formaciones.index(FORMACION_POR_DEFECTO),
+                    key='alineacion_formacion'
+                )
+
+                motor_alineaciones = get_motor_alineaciones(df)
+                once = motor_alineaciones.alineacion(equipo_seleccionado, formacion)
+                if once is not None:
+                    ocupados = once.filas >= 0
+                    filas = once.filas[ocupados]
+                    tabla_once = pd.DataFrame({
+                        'Puesto': [NOMBRES_ROLES[rol] for rol, ocupado in zip(once.roles, ocupados) if ocupado],
+                        'Jugador': df['player_name'].iloc[filas].to_numpy(),
+                        'Puntuación en el puesto': once.puntuacion[ocupados].astype(float).round(1),
+                        'Rol natural': [NOMBRES_ROLES[motor_alineaciones.roles[r]]
+                                        for r in motor_alineaciones.rol_natural[filas]],
+                    })
+                    if COLUMNA_POSICION in df.columns:
+                        tabla_once.insert(2, 'Posición', df[COLUMNA_POSICION].iloc[filas].to_numpy())
+                    tabla_once.index = tabla_once.index + 1
+                    st.dataframe(tabla_once, use_container_width=True)
+
+                    vacios = int((~ocupados).sum())
+                    if vacios:
+                        st.warning(f"La plantilla no llega a 11 jugadores: quedan {vacios} puestos sin cubrir.")
+                    st.caption(f"⚡ Puntuación media del once: {np.nanmean(once.puntuacion):.1f} · "
+                               f"{once.tiempo_ms:.1f} ms" + (" (precalculado)" if once.en_cache else ""))
+
+            st.markdown("---")
+
+            # ========== SECCIÓN 8: COMPARADOR DE EQUIPOS ==========
+            with medir("Sección 8: Comparador de equipos"):
+                st.markdown("### ⚔️ Comparador de Equipos")
+                st.markdown("Compara tu equipo seleccionado con otro equipo para ver diferencias en nivel, composición y estadísticas clave.")
             
-            col1, col2 = st.columns([1, 3])
+                col1, col2 = st.columns([1, 3])
             
-            with col1:
-                # Selector del equipo a comparar
-                equipos_comparar = [e for e in lista_equipos if equipos_con_info[equipos_con_info['display_name'] == e]['team_long_name'].iloc[0] != equipo_seleccionado]
-                
-                # Buscar Real Madrid como default
-                default_comp_index = 0
-                for idx, nombre in enumerate(equipos_comparar):
-                    if 'Real Madrid' in nombre:
-                        default_comp_index = idx
-                        break
+                with col1:
+                    # Selector del equipo a comparar (Real Madrid por defecto)
+                    equipos_comparar = agregados.equipos_comparables(equipo_seleccionado)
                 
-                equipo_comp_display = st.selectbox(
-                    "🔎 Comparar con:",
-                    options=equipos_comparar,
-                    index=default_comp_index,
-                    key='equipo_comparar'
-                )
+                    equipo_comp_display = st.selectbox(
+                        "🔎 Comparar con:",
+                        options=equipos_comparar,
+                        index=agregados.indice_comparar_defecto(equipos_comparar),
+                        key='equipo_comparar'
+                    )
                 
-                equipo_comparar = equipos_con_info[equipos_con_info['display_name'] == equipo_comp_display]['team_long_name'].iloc[0]
+                    equipo_comparar = agregados.equipo_por_display[equipo_comp_display]
             
-            if equipo_comparar:
-                df_comparar = df[df['team_long_name'] == equipo_comparar]
+                if equipo_comparar:
+                    df_comparar = agregados.jugadores_equipo(equipo_comparar)
                 
-                # Métricas comparativas con nombres de equipos acortados
-                equipo_1_corto = equipo_seleccionado.split()[0] if len(equipo_seleccionado) > 15 else equipo_seleccionado
-                equipo_2_corto = equipo_comparar.split()[0] if len(equipo_comparar) > 15 else equipo_comparar
+                    # Métricas comparativas con nombres de equipos acortados
+                    equipo_1_corto = equipo_seleccionado.split()[0] if len(equipo_seleccionado) > 15 else equipo_seleccionado
+                    equipo_2_corto = equipo_comparar.split()[0] if len(equipo_comparar) > 15 else equipo_comparar
                 
-                st.markdown(f"#### 📊 Comparación de Rendimiento")
-                st.markdown(f"**🔵 {equipo_seleccionado}** vs **🔴 {equipo_comparar}**")
+                    st.markdown(f"#### 📊 Comparación de Rendimiento")
+                    st.markdown(f"**🔵 {equipo_seleccionado}** vs **🔴 {equipo_comparar}**")
                 
-                col1, col2, col3, col4 = st.columns(4)
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                with col1:
-                    rating_1 = df_equipo['overall_rating'].mean()
-                    rating_2 = df_comparar['overall_rating'].mean()
-                    diff = rating_1 - rating_2
+                    with col1:
+                        rating_1 = df_equipo['overall_rating'].mean()
+                        rating_2 = df_comparar['overall_rating'].mean()
+                        diff = rating_1 - rating_2
                     
-                    if diff > 0:
-                        ganador = f"✅ {equipo_1_corto}"
-                        delta_label = f"+{diff:.1f}"
-                    elif diff < 0:
-                        ganador = f"✅ {equipo_2_corto}"
-                        delta_label = f"{diff:.1f}"
-                    else:
-                        ganador = "⚖️ Empate"
-                        delta_label = "0.0"
+                        if diff > 0:
+                            ganador = f"✅ {equipo_1_corto}"
+                            delta_label = f"+{diff:.1f}"
+                        elif diff < 0:
+                            ganador = f"✅ {equipo_2_corto}"
+                            delta_label = f"{diff:.1f}"
+                        else:
+                            ganador = "⚖️ Empate"
+                            delta_label = "0.0"
                     
-                    st.metric("⭐ Rating Medio", f"{rating_1:.1f} vs {rating_2:.1f}", delta_label)
-                    st.markdown(f"**{ganador}**")
+                        st.metric("⭐ Rating Medio", f"{rating_1:.1f} vs {rating_2:.1f}", delta_label)
+                        st.markdown(f"**{ganador}**")
                 
-                with col2:
-                    plantilla_1 = len(df_equipo)
-                    plantilla_2 = len(df_comparar)
-                    diff_plant = plantilla_1 - plantilla_2
+                    with col2:
+                        plantilla_1 = len(df_equipo)
+                        plantilla_2 = len(df_comparar)
+                        diff_plant = plantilla_1 - plantilla_2
                     
-                    if diff_plant > 0:
-                        ganador = f"✅ {equipo_1_corto}"
-                        delta_label = f"+{diff_plant}"
-                    elif diff_plant < 0:
-                        ganador = f"✅ {equipo_2_corto}"
-                        delta_label = f"{diff_plant}"
-                    else:
-                        ganador = "⚖️ Empate"
-                        delta_label = "0"
+                        if diff_plant > 0:
+                            ganador = f"✅ {equipo_1_corto}"
+                            delta_label = f"+{diff_plant}"
+                        elif diff_plant < 0:
+                            ganador = f"✅ {equipo_2_corto}"
+                            delta_label = f"{diff_plant}"
+                        else:
+                            ganador = "⚖️ Empate"
+                            delta_label = "0"
                     
-                    st.metric("👥 Plantilla", f"{plantilla_1} vs {plantilla_2}", delta_label)
-                    st.markdown(f"**{ganador}**")
+                        st.metric("👥 Plantilla", f"{plantilla_1} vs {plantilla_2}", delta_label)
+                        st.markdown(f"**{ganador}**")
                 
-                with col3:
-                    elite_1 = (df_equipo['overall_rating'] >= 80).sum()
-                    elite_2 = (df_comparar['overall_rating'] >= 80).sum()
-                    diff_elite = elite_1 - elite_2
+                    with col3:
+                        elite_1 = (df_equipo['overall_rating'] >= 80).sum()
+                        elite_2 = (df_comparar['overall_rating'] >= 80).sum()
+                        diff_elite = elite_1 - elite_2
                     
-                    if diff_elite > 0:
-                        ganador = f"✅ {equipo_1_corto}"
-                        delta_label = f"+{diff_elite}"
-                    elif diff_elite < 0:
-                        ganador = f"✅ {equipo_2_corto}"
-                        delta_label = f"{diff_elite}"
-                    else:
-                        ganador = "⚖️ Empate"
-                        delta_label = "0"
+                        if diff_elite > 0:
+                            ganador = f"✅ {equipo_1_corto}"
+                            delta_label = f"+{diff_elite}"
+                        elif diff_elite < 0:
+                            ganador = f"✅ {equipo_2_corto}"
+                            delta_label = f"{diff_elite}"
+                        else:
+                            ganador = "⚖️ Empate"
+                            delta_label = "0"
                     
-                    st.metric("💎 Jugadores Elite", f"{elite_1} vs {elite_2}", delta_label)
-                    st.markdown(f"**{ganador}**")
+                        st.metric("💎 Jugadores Elite", f"{elite_1} vs {elite_2}", delta_label)
+                        st.markdown(f"**{ganador}**")
                 
-                with col4:
-                    max_1 = df_equipo['overall_rating'].max()
-                    max_2 = df_comparar['overall_rating'].max()
-                    diff_max = max_1 - max_2
+                    with col4:
+                        max_1 = df_equipo['overall_rating'].max()
+                        max_2 = df_comparar['overall_rating'].max()
+                        diff_max = max_1 - max_2
                     
-                    if diff_max > 0:
-                        ganador = f"✅ {equipo_1_corto}"
-                        delta_label = f"+{diff_max:.0f}"
-                    elif diff_max < 0:
-                        ganador = f"✅ {equipo_2_corto}"
-                        delta_label = f"{diff_max:.0f}"
-                    else:
-                        ganador = "⚖️ Empate"
-                        delta_label = "0"
+                        if diff_max > 0:
+                            ganador = f"✅ {equipo_1_corto}"
+                            delta_label = f"+{diff_max:.0f}"
+                        elif diff_max < 0:
+                            ganador = f"✅ {equipo_2_corto}"
+                            delta_label = f"{diff_max:.0f}"
+                        else:
+                            ganador = "⚖️ Empate"
+                            delta_label = "0"
                     
-                    st.metric("🌟 Rating Máximo", f"{max_1:.0f} vs {max_2:.0f}", delta_label)
-                    st.markdown(f"**{ganador}**")
+                        st.metric("🌟 Rating Máximo", f"{max_1:.0f} vs {max_2:.0f}", delta_label)
+                        st.markdown(f"**{ganador}**")
                 
-                st.markdown("<br>", unsafe_allow_html=True)
+                    st.markdown("<br>", unsafe_allow_html=True)
                 
-                # Radar comparativo
-                st.markdown("#### 🎯 Comparación de Atributos")
+                    # Radar comparativo
+                    st.markdown("#### 🎯 Comparación de Atributos")
                 
-                atributos_radar = ['ball_control', 'dribbling', 'finishing', 'short_passing', 
-                                  'acceleration', 'sprint_speed', 'stamina', 'aggression']
-                atributos_radar_disp = [attr for attr in atributos_radar if attr in df.columns]
+                    atributos_radar_disp = [attr for attr in ATRIBUTOS_RADAR if attr in df.columns]
                 
-                if atributos_radar_disp:
-                    # Calcular promedios solo con jugadores que tienen 70+ en cada atributo
-                    prom_1 = pd.Series(dtype=float)
-                    prom_2 = pd.Series(dtype=float)
-                    
-                    for attr in atributos_radar_disp:
-                        # Para equipo 1: solo promediar jugadores con 70+ en este atributo
-                        jugadores_calificados_1 = df_equipo[df_equipo[attr] >= 70]
-                        if len(jugadores_calificados_1) > 0:
-                            prom_1[attr] = jugadores_calificados_1[attr].mean()
-                        else:
-                            prom_1[attr] = 0  # Si nadie llega a 70, poner 0
-                        
-                        # Para equipo 2: solo promediar jugadores con 70+ en este atributo
-                        jugadores_calificados_2 = df_comparar[df_comparar[attr] >= 70]
-                        if len(jugadores_calificados_2) > 0:
-                            prom_2[attr] = jugadores_calificados_2[attr].mean()
-                        else:
-                            prom_2[attr] = 0  # Si nadie llega a 70, poner 0
-                    
-                    nombres_radar = {
-                        'ball_control': 'Control',
-                        'dribbling': 'Regate',
-                        'finishing': 'Finalización',
-                        'short_passing': 'Pase Corto',
-                        'acceleration': 'Aceleración',
-                        'sprint_speed': 'Velocidad',
-                        'stamina': 'Resistencia',
-                        'aggression': 'Agresividad'
-                    }
-                    
-                    fig_radar_comp = go.Figure()
+                    if atributos_radar_disp:
+                        # Calcular promedios solo con jugadores que tienen 70+ en cada atributo
+                        prom_1 = _promedios_calificados(df_equipo, atributos_radar_disp)
+                        prom_2 = _promedios_calificados(df_comparar, atributos_radar_disp)
                     
-                    # Equipo 1
-                    fig_radar_comp.add_trace(go.Scatterpolar(
-                        r=prom_1.values,
-                        theta=[nombres_radar.get(attr, attr) for attr in atributos_radar_disp],
-                        fill='toself',
-                        name=equipo_seleccionado,
-                        line=dict(color='#3498db', width=3),
-                        fillcolor='rgba(52, 152, 219, 0.3)'
-                    ))
-                    
-                    # Equipo 2
-                    fig_radar_comp.add_trace(go.Scatterpolar(
-                        r=prom_2.values,
-                        theta=[nombres_radar.get(attr, attr) for attr in atributos_radar_disp],
-                        fill='toself',
-                        name=equipo_comparar,
-                        line=dict(color='#e74c3c', width=3),
-                        fillcolor='rgba(231, 76, 60, 0.3)'
-                    ))
-                    
-                    fig_radar_comp.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[69, 91]
+                        with medir("radar comparativo"):
+                            fig_radar_comp = agregados.figura(
+                                ('radar', equipo_seleccionado, equipo_comparar),
+                                lambda: _figura_radar_comparativo(prom_1, prom_2, equipo_seleccionado, equipo_comparar, atributos_radar_disp)
                             )
-                        ),
-                        showlegend=True,
-                        height=500,
-                        title=f"Comparación de Atributos Promedio"
-                    )
-                    
-                    st.plotly_chart(fig_radar_comp, use_container_width=True)
+                            st.plotly_chart(fig_radar_comp, use_container_width=True)
                 
-                # Tabla comparativa detallada
-                st.markdown("#### 📋 Tabla Comparativa de Atributos")
+                    # Tabla comparativa detallada
+                    st.markdown("#### 📋 Tabla Comparativa de Atributos")
                 
-                if atributos_radar_disp:
-                    comparacion_tabla = pd.DataFrame({
-                        'Atributo': [nombres_radar.get(attr, attr) for attr in atributos_radar_disp],
-                        equipo_seleccionado: prom_1.values.round(1),
-                        equipo_comparar: prom_2.values.round(1)
-                    })
+                    if atributos_radar_disp:
+                        comparacion_tabla = pd.DataFrame({
+                            'Atributo': [NOMBRES_RADAR.get(attr, attr) for attr in atributos_radar_disp],
+                            equipo_seleccionado: prom_1.values.round(1),
+                            equipo_comparar: prom_2.values.round(1)
+                        })
                     
-                    comparacion_tabla['Diferencia'] = (comparacion_tabla[equipo_seleccionado] - comparacion_tabla[equipo_comparar]).round(1)
-                    comparacion_tabla['Ventaja'] = comparacion_tabla['Diferencia'].apply(
-                        lambda x: '✅ ' + equipo_seleccionado if x > 0 else ('🔶 ' + equipo_comparar if x < 0 else '➖ Empate')
-                    )
+                        comparacion_tabla['Diferencia'] = (comparacion_tabla[equipo_seleccionado] - comparacion_tabla[equipo_comparar]).round(1)
+                        comparacion_tabla['Ventaja'] = comparacion_tabla['Diferencia'].apply(
+                            lambda x: '✅ ' + equipo_seleccionado if x > 0 else ('🔶 ' + equipo_comparar if x < 0 else '➖ Empate')
+                        )
                     
-                    st.dataframe(comparacion_tabla, use_container_width=True, hide_index=True)
+                        st.dataframe(comparacion_tabla, use_container_width=True, hide_index=True)
@@ -5,6 +5,23 @@ Módulos disponibles:
 - data_loader: Carga y procesamiento de datos
 - const: Constantes y configuraciones
 - config: Configuración de la aplicación
+- image_store: Almacén compartido de imágenes generadas con IA
+- profiler: Tiempos de render por sección de página
+- slow_reruns: Captura de re-ejecuciones lentas con su perfil
+- dataset: Dataset compartido por todas las sesiones del proceso, con recarga sin cortes
+- aggregates: Agregados por liga/equipo y figuras, una vez por versión del dataset
+- warmup: Calentamiento de cachés al arrancar
+- attribute_matrix: Matriz de atributos (float32, en bruto y estandarizada) por versión del dataset
+- similarity: Búsqueda de jugadores similares (vecinos más cercanos por bloques)
+- composite: Rankings por puntuación compuesta (media ponderada de atributos)
+- name_search: Búsqueda de jugadores por nombre (tildes, prefijos y trigramas)
+- scouting: Consultas por rangos de atributos (códigos uint8 e índices ordenados por columna)
+- pareto: Frontera de Pareto entre 2 o 3 atributos (barrido en O(n log n))
+- percentiles: Percentiles por atributo, globales y por liga (uint8, precalculados)
+- correlation: Correlación y covarianza entre atributos, por liga y por equipo
+- lineups: Mejor once de cada equipo por formación (asignación óptima vectorizada)
+- positions: Posición de cada jugador (reglas y k-means), calculada al cargar el dataset
+- memory: Contabilidad de memoria (dataset por columna, cachés, sesión y RSS)
 """
 
 # Hacer disponibles las funciones principales
@@ -0,0 +1,327 @@
+"""
+Agregados por liga y por equipo, calculados una vez por versión del dataset.
+
+Las páginas de equipos y ligas recalculaban en cada re-ejecución las mismas
+listas de selectores, las estadísticas por liga y por equipo y las figuras de
+Plotly. Aquí se calculan la primera vez que se piden y se comparten entre todas
+las sesiones mientras el DataFrame sea el mismo objeto (una versión nueva del
+dataset es un DataFrame nuevo y recibe agregados nuevos).
+
+Cada agregado se calcula al primer acceso, así que un DataFrame sin alguna de
+las columnas solo falla si la página pide el agregado que la necesita (las
+páginas comprueban las columnas antes).
+
+API pública:
+  - Agregados
+  - Agregados.indice(nombre, construir) (índices y motores de la versión, ver attribute_matrix.py)
+  - get_agregados(df) -> Agregados
+  - descartar_agregados(df) (al retirar una versión del dataset)
+  - agregados_en_memoria() -> List[Agregados]
+"""
+
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .const import (
+    EQUIPO_POR_DEFECTO, EQUIPO_COMPARAR_POR_DEFECTO, LIGA_POR_DEFECTO,
+    AGREGADOS_MAX_VERSIONES, FIGURAS_CACHE_MAX,
+)
+from .positions import COLUMNA_POSICION, POSICIONES
+
+
+def _indice_de(opciones: List[str], texto: str) -> int:
+    """Posición de la primera opción que contiene `texto` (0 si ninguna)."""
+    for indice, nombre in enumerate(opciones):
+        if texto in nombre:
+            return indice
+    return 0
+
+
+class Agregados:
+    """Agregados y figuras de una versión del dataset, compartidos por todas las sesiones."""
+
+    def __init__(self, df: pd.DataFrame, max_figuras: int = FIGURAS_CACHE_MAX):
+        self.df = df
+        self.max_figuras = max_figuras
+        self._figuras: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._figuras_lock = threading.Lock()
+        self._indices: Dict[str, Any] = {}
+        self._indices_locks: Dict[str, threading.Lock] = {}
+        self._indices_lock = threading.Lock()
+
+    # ---------- Ligas ----------
+
+    @cached_property
+    def ligas(self) -> pd.DataFrame:
+        """Estadísticas por liga (rating medio y máximo, jugadores, élite), ordenadas por rating medio."""
+        df = self.df
+        stats_liga = df.groupby('league_name').agg(
+            rating_medio=('overall_rating', 'mean'),
+            rating_max=('overall_rating', 'max'),
+            num_jugadores=('player_name', 'count'),
+        )
+        stats_liga['jugadores_elite'] = (df['overall_rating'] >= 80).groupby(df['league_name']).sum()
+        stats_liga = stats_liga.reset_index()
+        stats_liga['pct_elite'] = (stats_liga['jugadores_elite'] / stats_liga['num_jugadores']) * 100
+        return stats_liga.sort_values('rating_medio', ascending=False)
+
+    @cached_property
+    def ligas_con_pais(self) -> pd.DataFrame:
+        """Ligas con su país y el nombre que se muestra en los selectores ("País - Liga")."""
+        ligas = self.df[['country_name', 'league_name']].drop_duplicates()
+        ligas['display_name'] = ligas['country_name'] + ' - ' + ligas['league_name']
+        return ligas.sort_values('display_name')
+
+    @cached_property
+    def lista_ligas(self) -> List[str]:
+        return self.ligas_con_pais['display_name'].tolist()
+
+    @cached_property
+    def liga_por_display(self) -> Dict[str, str]:
+        return dict(zip(self.ligas_con_pais['display_name'], self.ligas_con_pais['league_name']))
+
+    @cached_property
+    def indice_liga_defecto(self) -> int:
+        return _indice_de(self.lista_ligas, LIGA_POR_DEFECTO)
+
+    @cached_property
+    def _filas_liga(self) -> Dict[str, Any]:
+        return self.df.groupby('league_name').indices
+
+    def filas_de_liga(self, liga: str) -> np.ndarray:
+        """Posiciones (iloc) de los jugadores de una liga, ordenadas."""
+        return self._filas_liga.get(liga, np.empty(0, dtype=np.intp))
+
+    def jugadores_liga(self, liga: str) -> pd.DataFrame:
+        """Jugadores de una liga (equivale a df[df['league_name'] == liga])."""
+        filas = self._filas_liga.get(liga)
+        return self.df.iloc[filas] if filas is not None else self.df.iloc[:0]
+
+    @cached_property
+    def _equipos_por_liga(self) -> Dict[str, pd.DataFrame]:
+        df = self.df
+        claves = ['league_name', 'team_long_name']
+        stats = df.groupby(claves).agg(
+            rating_medio=('overall_rating', 'mean'),
+            num_jugadores=('player_name', 'count'),
+            rating_max=('overall_rating', 'max'),
+        )
+        # Mejor jugador de cada equipo: el primero con el rating máximo
+        mejores = (df.sort_values('overall_rating', ascending=False, kind='stable')
+                   .drop_duplicates(claves).set_index(claves)['player_name'])
+        stats['mejor_jugador'] = mejores.reindex(stats.index).fillna('')
+        stats = stats.reset_index()
+        return {
+            liga: grupo.drop(columns='league_name').sort_values('rating_medio', ascending=False).reset_index(drop=True)
+            for liga, grupo in stats.groupby('league_name')
+        }
+
+    def equipos_de_liga(self, liga: str) -> pd.DataFrame:
+        """Estadísticas por equipo de una liga (rating medio y máximo, jugadores, mejor jugador)."""
+        return self._equipos_por_liga.get(liga, pd.DataFrame(
+            columns=['team_long_name', 'rating_medio', 'num_jugadores', 'rating_max', 'mejor_jugador']))
+
+    # ---------- Equipos ----------
+
+    @cached_property
+    def equipos_con_info(self) -> pd.DataFrame:
+        """Equipos con su liga y país y el nombre que se muestra en los selectores ("Equipo (Liga)")."""
+        equipos = self.df[['team_long_name', 'league_name', 'country_name']].drop_duplicates()
+        equipos['display_name'] = equipos['team_long_name'] + ' (' + equipos['league_name'] + ')'
+        return equipos.sort_values('team_long_name')
+
+    @cached_property
+    def lista_equipos(self) -> List[str]:
+        return self.equipos_con_info['display_name'].tolist()
+
+    @cached_property
+    def equipo_por_display(self) -> Dict[str, str]:
+        return dict(zip(self.equipos_con_info['display_name'], self.equipos_con_info['team_long_name']))
+
+    @cached_property
+    def indice_equipo_defecto(self) -> int:
+        return _indice_de(self.lista_equipos, EQUIPO_POR_DEFECTO)
+
+    def equipos_comparables(self, equipo: str) -> List[str]:
+        """Opciones del comparador: todos los equipos menos `equipo`."""
+        return [nombre for nombre in self.lista_equipos if self.equipo_por_display[nombre] != equipo]
+
+    @staticmethod
+    def indice_comparar_defecto(opciones: List[str]) -> int:
+        return _indice_de(opciones, EQUIPO_COMPARAR_POR_DEFECTO)
+
+    @cached_property
+    def _filas_equipo(self) -> Dict[str, Any]:
+        return self.df.groupby('team_long_name').indices
+
+    def filas_de_equipo(self, equipo: str) -> np.ndarray:
+        """Posiciones (iloc) de los jugadores de un equipo, ordenadas."""
+        return self._filas_equipo.get(equipo, np.empty(0, dtype=np.intp))
+
+    def jugadores_equipo(self, equipo: str) -> pd.DataFrame:
+        """Jugadores de un equipo (equivale a df[df['team_long_name'] == equipo])."""
+        filas = self._filas_equipo.get(equipo)
+        return self.df.iloc[filas] if filas is not None else self.df.iloc[:0]
+
+    # ---------- Posiciones (columna calculada al cargar, ver positions.py) ----------
+
+    @cached_property
+    def _filas_posicion(self) -> Dict[str, Any]:
+        return self.df.groupby(COLUMNA_POSICION, observed=True).indices
+
+    @cached_property
+    def lista_posiciones(self) -> List[str]:
+        """Posiciones con algún jugador, en el orden de POSICIONES."""
+        return [posicion for posicion in POSICIONES if posicion in self._filas_posicion]
+
+    def filas_de_posicion(self, posicion: str) -> np.ndarray:
+        """Posiciones (iloc) de los jugadores de una posición (portero, defensa...), ordenadas."""
+        return self._filas_posicion.get(posicion, np.empty(0, dtype=np.intp))
+
+    def filas_filtradas(self, liga: Optional[str] = None, equipo: Optional[str] = None,
+                        posicion: Optional[str] = None) -> Optional[np.ndarray]:
+        """Posiciones (iloc) ordenadas de los jugadores de una liga, un equipo y/o una posición (None si no hay filtro)."""
+        filas = None
+        for filtro, filas_de in ((liga, self.filas_de_liga), (equipo, self.filas_de_equipo),
+                                 (posicion, self.filas_de_posicion)):
+            if filtro is not None:
+                filas_filtro = filas_de(filtro)
+                filas = filas_filtro if filas is None else np.intersect1d(filas, filas_filtro, assume_unique=True)
+        return filas
+
+    # ---------- Jugadores ----------
+
+    @cached_property
+    def fila_de_jugador(self) -> Dict[str, int]:
+        """Nombre -> posición (iloc) del primer jugador con ese nombre."""
+        nombres = self.df['player_name']
+        primeras = (~nombres.duplicated() & nombres.notna()).to_numpy()
+        return dict(zip(nombres.to_numpy()[primeras], np.flatnonzero(primeras).tolist()))
+
+    @cached_property
+    def lista_jugadores(self) -> List[str]:
+        """Nombres de los jugadores, sin repetir y en orden alfabético."""
+        return sorted(self.fila_de_jugador)
+
+    def calcular_todo(self) -> None:
+        """Calcula ya todos los agregados que permiten las columnas del DataFrame (calentamiento)."""
+        columnas = set(self.df.columns)
+        if {'league_name', 'overall_rating', 'player_name'} <= columnas:
+            self.ligas
+            if 'team_long_name' in columnas:
+                self._equipos_por_liga
+        if {'league_name', 'country_name'} <= columnas:
+            self.liga_por_display, self.indice_liga_defecto, self._filas_liga
+        if {'team_long_name', 'league_name', 'country_name'} <= columnas:
+            self.equipo_por_display, self.indice_equipo_defecto, self._filas_equipo
+        if COLUMNA_POSICION in columnas:
+            self._filas_posicion
+
+    # ---------- Índices ----------
+
+    def indice(self, nombre: str, construir: Callable[[], Any]) -> Any:
+        """
+        Índice o motor de esta versión del dataset (matriz de atributos, jugadores
+        similares...), construido una sola vez por nombre.
+
+        A diferencia de las figuras, los índices no se descartan hasta que se
+        retira la versión, y si dos sesiones piden a la vez uno que no existe, la
+        segunda espera a que termine la primera en lugar de construirlo otra vez.
+        """
+        valor = self._indices.get(nombre)
+        if valor is not None:
+            return valor
+        with self._indices_lock:
+            lock = self._indices_locks.setdefault(nombre, threading.Lock())
+        with lock:
+            valor = self._indices.get(nombre)
+            if valor is None:
+                valor = construir()
+                with self._indices_lock:
+                    self._indices[nombre] = valor
+        return valor
+
+    def indices_construidos(self) -> List[str]:
+        with self._indices_lock:
+            return list(self._indices)
+
+    # ---------- Figuras ----------
+
+    def figura(self, clave: Hashable, construir: Callable[[], Any]) -> Any:
+        """
+        Figura de Plotly construida una sola vez por clave (p. ej. ('radar', equipo_1, equipo_2)).
+
+        Las figuras se comparten entre sesiones: quien las recibe solo debe
+        pasarlas a st.plotly_chart, nunca modificarlas. Si dos sesiones piden a la
+        vez una figura que no existe, ambas la construyen y se guarda la primera.
+        """
+        with self._figuras_lock:
+            fig = self._figuras.get(clave)
+            if fig is not None:
+                self._figuras.move_to_end(clave)
+                return fig
+
+        fig = construir()
+
+        with self._figuras_lock:
+            fig = self._figuras.setdefault(clave, fig)
+            self._figuras.move_to_end(clave)
+            while len(self._figuras) > self.max_figuras:
+                self._figuras.popitem(last=False)
+        return fig
+
+    def figuras_en_cache(self) -> List[Hashable]:
+        with self._figuras_lock:
+            return list(self._figuras)
+
+    def contenido(self) -> Tuple[Dict[str, Any], List[Any]]:
+        """Agregados e índices ya calculados (nombre -> valor) y figuras en caché, para medir su memoria."""
+        with self._figuras_lock:
+            figuras = list(self._figuras.values())
+        calculados = {nombre: valor for nombre, valor in self.__dict__.items()
+                      if nombre not in ('df', 'max_figuras')
+                      and not nombre.startswith(('_figuras', '_indices'))}
+        with self._indices_lock:
+            calculados.update({f"índice {nombre}": valor for nombre, valor in self._indices.items()})
+        return calculados, figuras
+
+
+# Agregados de las últimas versiones del dataset (el más reciente al final)
+_agregados: List[Agregados] = []
+_agregados_lock = threading.Lock()
+
+
+def get_agregados(df: pd.DataFrame) -> Agregados:
+    """
+    Agregados del DataFrame `df` (se crean la primera vez que se piden para ese objeto).
+
+    Se identifican por el propio objeto DataFrame, no por su contenido: todas las
+    sesiones reciben el mismo DataFrame de utils/dataset.py y, por tanto, los
+    mismos agregados.
+    """
+    with _agregados_lock:
+        for agregados in _agregados:
+            if agregados.df is df:
+                return agregados
+        agregados = Agregados(df)
+        _agregados.append(agregados)
+        # Las versiones más antiguas se descartan (y con ellas sus figuras)
+        del _agregados[:-AGREGADOS_MAX_VERSIONES]
+        return agregados
+
+
+def descartar_agregados(df: pd.DataFrame) -> None:
+    """Suelta los agregados (y las figuras) del DataFrame `df`, si los hay."""
+    with _agregados_lock:
+        _agregados[:] = [agregados for agregados in _agregados if agregados.df is not df]
+
+
+def agregados_en_memoria() -> List[Agregados]:
+    """Agregados de las versiones del dataset que siguen en memoria (del más antiguo al más reciente)."""
+    with _agregados_lock:
+        return list(_agregados)
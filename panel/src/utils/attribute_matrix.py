@@ -0,0 +1,72 @@
+"""
+Matriz de atributos de una versión del dataset.
+
+Los motores que comparan jugadores por sus atributos (jugadores similares y los
+que vienen detrás) necesitan los mismos números en forma de matriz: una fila
+por jugador, una columna por atributo, en float32 y guardada por columnas
+(orden de Fortran: cada atributo es contiguo, que es lo que recorren los
+productos matriz-vector y los filtros por atributo; con la matriz por filas el
+producto matriz-vector de un millón de jugadores tarda el triple). Se construye
+una sola vez por versión del dataset (ver Agregados.indice) y no guarda ninguna
+referencia al DataFrame.
+
+Los valores que faltan se sustituyen por la media de su columna, de modo que en
+la matriz estandarizada valen 0 y no acercan ni alejan a nadie.
+
+API pública:
+  - MatrizAtributos
+  - get_matriz_atributos(df) -> MatrizAtributos
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .const import ATRIBUTOS_JUGADOR
+
+
+class MatrizAtributos:
+    """Atributos numéricos de todos los jugadores, en bruto y estandarizados (z-scores), en float32."""
+
+    def __init__(self, df: pd.DataFrame, columnas: Optional[Sequence[str]] = None):
+        columnas = [c for c in (columnas or ATRIBUTOS_JUGADOR) if c in df.columns]
+        if not columnas:
+            raise ValueError("el DataFrame no tiene ninguno de los atributos numéricos")
+        self.columnas: List[str] = columnas
+        self.posicion = {columna: i for i, columna in enumerate(columnas)}
+
+        valores = np.empty((len(df), len(columnas)), dtype=np.float32, order='F')
+        for i, columna in enumerate(columnas):
+            valores[:, i] = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+        faltantes = np.isnan(valores)
+
+        with np.errstate(invalid='ignore'):
+            self.media = np.nanmean(valores, axis=0).astype(np.float32)
+            self.desviacion = np.nanstd(valores, axis=0).astype(np.float32)
+        self.media = np.nan_to_num(self.media)
+        # Columnas constantes o vacías: desviación 1 para no dividir por cero (su z-score es 0)
+        self.desviacion[~(self.desviacion > 0)] = 1.0
+
+        if faltantes.any():
+            filas, cols = np.nonzero(faltantes)
+            valores[filas, cols] = self.media[cols]
+        self.valores = valores
+
+        self.z = np.asfortranarray((valores - self.media) / self.desviacion)
+        # Norma al cuadrado de cada fila, para las distancias euclídeas por bloques
+        self.norma2 = np.einsum('ij,ij->i', self.z, self.z)
+
+    @property
+    def filas(self) -> int:
+        return self.valores.shape[0]
+
+    def indices_de(self, columnas: Sequence[str]) -> List[int]:
+        """Posición de cada columna en la matriz (KeyError si alguna no está)."""
+        return [self.posicion[columna] for columna in columnas]
+
+
+def get_matriz_atributos(df: pd.DataFrame) -> MatrizAtributos:
+    """Matriz de atributos de `df` (se construye una vez por versión del dataset)."""
+    return get_agregados(df).indice('matriz_atributos', lambda: MatrizAtributos(df))
@@ -0,0 +1,132 @@
+"""
+Rankings por puntuación compuesta: una media ponderada de atributos.
+
+Un ojeador puede definir su propia puntuación ("extremo" = velocidad, regate y
+aceleración) y ver el ranking igual de rápido que el de un atributo suelto:
+
+  - La puntuación de todos los jugadores es un único producto matriz-vector
+    entre la matriz de atributos (utils/attribute_matrix.py) y el vector de
+    pesos normalizado (ceros en los atributos que no cuentan). El resultado
+    está en la misma escala 0-100 que los atributos.
+  - El vector de puntuaciones se guarda por combinación de pesos (LRU): repetir
+    el ranking o cambiar solo los filtros de liga y equipo no lo recalcula.
+  - El top-k sale de argpartition sobre las filas candidatas (O(n)) y solo se
+    ordenan esas k.
+
+API pública:
+  - ResultadoRanking
+  - MotorPuntuaciones
+  - get_motor_puntuaciones(df) -> MotorPuntuaciones
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .attribute_matrix import MatrizAtributos, get_matriz_atributos
+from .const import PUNTUACIONES_CACHE_MAX, RANKING_TOP
+
+
+@dataclass(frozen=True)
+class ResultadoRanking:
+    """Mejores jugadores según una puntuación compuesta, de mayor a menor."""
+
+    filas: np.ndarray       # Posiciones (iloc) en el DataFrame
+    puntuacion: np.ndarray  # 0-100
+    candidatos: int         # Jugadores ordenados tras aplicar los filtros
+    en_cache: bool          # Si el vector de puntuaciones ya estaba calculado
+    tiempo_ms: float
+
+
+class MotorPuntuaciones:
+    """Puntuaciones compuestas sobre la matriz de atributos de una versión del dataset."""
+
+    def __init__(self, matriz: MatrizAtributos, max_cache: int = PUNTUACIONES_CACHE_MAX):
+        self.matriz = matriz
+        self.max_cache = max_cache
+        self._cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _clave(self, pesos: Dict[str, float]) -> Tuple[Tuple[str, float], ...]:
+        """Pesos normalizados (suman 1), sin los nulos y en orden: misma puntuación, misma clave."""
+        pesos = {columna: float(peso) for columna, peso in pesos.items() if peso}
+        faltan = set(pesos) - set(self.matriz.posicion)
+        if faltan:
+            raise KeyError(f"atributos desconocidos: {', '.join(sorted(faltan))}")
+        total = sum(pesos.values())
+        if not pesos or total <= 0:
+            raise ValueError("la puntuación necesita al menos un peso positivo")
+        return tuple(sorted((columna, round(peso / total, 6)) for columna, peso in pesos.items()))
+
+    def puntuaciones(self, pesos: Dict[str, float]) -> Tuple[np.ndarray, bool]:
+        """
+        Puntuación de todos los jugadores (media ponderada de sus atributos).
+
+        Returns:
+            (puntuaciones, en_cache): vector float32 compartido (no modificarlo) y si ya estaba calculado
+        """
+        clave = self._clave(pesos)
+        with self._lock:
+            vector = self._cache.get(clave)
+            if vector is not None:
+                self._cache.move_to_end(clave)
+                return vector, True
+
+        w = np.zeros(len(self.matriz.columnas), dtype=np.float32)
+        for columna, peso in clave:
+            w[self.matriz.posicion[columna]] = peso
+        vector = self.matriz.valores @ w
+        vector.flags.writeable = False
+
+        with self._lock:
+            vector = self._cache.setdefault(clave, vector)
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+        return vector, False
+
+    def top(self, pesos: Dict[str, float], k: int = RANKING_TOP,
+            candidatas: Optional[np.ndarray] = None) -> ResultadoRanking:
+        """
+        Los k jugadores con más puntuación.
+
+        Args:
+            pesos: Atributo -> peso (se normalizan; los nulos no cuentan)
+            k: Número de jugadores
+            candidatas: Posiciones entre las que elegir (None = todos)
+
+        Returns:
+            ResultadoRanking
+        """
+        inicio = time.perf_counter()
+        vector, en_cache = self.puntuaciones(pesos)
+        filas = np.arange(len(vector)) if candidatas is None else np.asarray(candidatas)
+        valores = vector if candidatas is None else vector[filas]
+        if len(valores) > k:
+            elegidas = np.argpartition(-valores, k - 1)[:k]
+            filas, valores = filas[elegidas], valores[elegidas]
+        # Mayor puntuación primero; a igualdad, el que va antes en el DataFrame (como nlargest)
+        orden = np.lexsort((filas, -valores))
+        return ResultadoRanking(
+            filas=filas[orden],
+            puntuacion=valores[orden],
+            candidatos=len(vector) if candidatas is None else len(candidatas),
+            en_cache=en_cache,
+            tiempo_ms=(time.perf_counter() - inicio) * 1000,
+        )
+
+    def en_cache(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+def get_motor_puntuaciones(df: pd.DataFrame) -> MotorPuntuaciones:
+    """Motor de puntuaciones compuestas de `df` (uno por versión del dataset)."""
+    matriz = get_matriz_atributos(df)
+    return get_agregados(df).indice('puntuaciones', lambda: MotorPuntuaciones(matriz))
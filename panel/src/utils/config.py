@@ -1,6 +1,31 @@
+import os
+
 PAGE_CONFIG = {
     "page_title": "Análisis de Ventas de Videojuegos",
     "page_icon": "📊",
     "layout": "wide",
     "initial_sidebar_state": "expanded", # sidebar visible by default
-}
\ No newline at end of file
+}
+
+
+def cargar_variables_entorno(directorio):
+    """
+    Carga el primer fichero .env que encuentre subiendo desde `directorio`
+    (la misma búsqueda que hace load_dotenv()).
+
+    Si no hay .env (por ejemplo en Hugging Face Spaces, donde las variables ya
+    vienen definidas) ni siquiera se importa python-dotenv.
+
+    Returns:
+        str: Ruta del .env cargado, o None si no existe
+    """
+    while True:
+        ruta = os.path.join(directorio, '.env')
+        if os.path.isfile(ruta):
+            from dotenv import load_dotenv
+            load_dotenv(ruta)
+            return ruta
+        padre = os.path.dirname(directorio)
+        if padre == directorio:
+            return None
+        directorio = padre
@@ -7,6 +7,89 @@ Centraliza todas las configuraciones y valores fijos usados en la aplicación.
 SQL_FILE_NAME = "data.sqlite"
 CSV_FILE_NAME = "data.csv"
 
+# Variable de entorno para cargar otro fichero de datos (CSV, Parquet o pickle),
+# por ejemplo un dataset sintético a escala generado con bench/synthetic_data.py
+ENV_DATA_FILE = "SOCCER_DATA_FILE"
+
+# ========== AGREGADOS Y CALENTAMIENTO ==========
+# Selecciones por defecto de las páginas (se busca el texto en el nombre mostrado)
+EQUIPO_POR_DEFECTO = "Barcelona"
+EQUIPO_COMPARAR_POR_DEFECTO = "Real Madrid"
+LIGA_POR_DEFECTO = "LIGA BBVA"
+
+# Agregados por liga/equipo y figuras ya construidas (ver utils/aggregates.py)
+AGREGADOS_MAX_VERSIONES = 2      # Versiones del dataset con agregados en memoria a la vez
+FIGURAS_CACHE_MAX = 128          # Figuras guardadas por versión (se descartan las menos usadas)
+
+# Atributos numéricos de cada jugador con los que se construye la matriz de
+# atributos de cada versión del dataset (ver utils/attribute_matrix.py)
+ATRIBUTOS_JUGADOR = [
+    'overall_rating', 'ball_control', 'dribbling', 'finishing', 'free_kick_accuracy',
+    'heading_accuracy', 'short_passing', 'shot_power', 'penalties', 'acceleration',
+    'sprint_speed', 'agility', 'stamina', 'jumping', 'aggression', 'gk_diving', 'gk_reflexes',
+    'height', 'weight',
+]
+
+# Nombre de cada atributo en la interfaz (el mismo en todas las páginas)
+NOMBRES_ATRIBUTOS = {
+    'overall_rating': 'Overall',
+    'ball_control': 'Control',
+    'dribbling': 'Regate',
+    'finishing': 'Finalización',
+    'free_kick_accuracy': 'Tiros Libres',
+    'heading_accuracy': 'Juego Aéreo',
+    'short_passing': 'Pase Corto',
+    'shot_power': 'Potencia Tiro',
+    'penalties': 'Penaltis',
+    'acceleration': 'Aceleración',
+    'sprint_speed': 'Velocidad',
+    'agility': 'Agilidad',
+    'stamina': 'Resistencia',
+    'jumping': 'Salto',
+    'aggression': 'Agresividad',
+    'gk_diving': 'Estirada (POR)',
+    'gk_reflexes': 'Reflejos (POR)',
+    'height': 'Altura (cm)',
+    'weight': 'Peso (lbs)',
+}
+
+# Búsqueda de jugadores similares (ver utils/similarity.py)
+SIMILARES_K_POR_DEFECTO = 10     # Jugadores parecidos que se muestran
+SIMILARES_K_MAX = 50
+SIMILARES_FILAS_POR_BLOQUE = 131072  # Filas por bloque al calcular distancias (acota la memoria temporal)
+
+# Rankings por puntuación compuesta (ver utils/composite.py)
+PUNTUACIONES_CACHE_MAX = 16      # Vectores de puntuación guardados por versión (uno por combinación de pesos)
+RANKING_TOP = 100                # Jugadores que muestran las pestañas del ranking
+
+# Búsqueda de jugadores por rangos de atributos (ver utils/scouting.py)
+FECHA_REFERENCIA_EDAD = '2016-12-31'   # Fin de la temporada 2015-2016: la edad se calcula a esta fecha
+SCOUTING_RESULTADOS_MAX = 200          # Jugadores que se muestran (los de más rating)
+
+# Frontera de Pareto entre atributos (ver utils/pareto.py)
+PARETO_CACHE_MAX = 32            # Fronteras guardadas por versión (una por atributos, liga y equipo)
+PARETO_PUNTOS_FONDO_MAX = 5000   # Resto de jugadores que se dibujan de fondo (como mucho; muestra aleatoria)
+
+# Correlaciones entre atributos (ver utils/correlation.py)
+CORRELACION_EQUIPOS_CACHE_MAX = 64       # Matrices por equipo guardadas por versión (LRU); las de liga se guardan todas
+CORRELACION_FILAS_POR_BLOQUE = 131072    # Filas por bloque al acumular en float64 (acota la memoria temporal)
+
+# Mejor once de cada equipo (ver utils/lineups.py)
+FORMACION_POR_DEFECTO = '4-3-3'   # Formación que se precalcula para todos los equipos
+ALINEACIONES_EQUIPOS_POR_BLOQUE = 4096   # Equipos que se resuelven a la vez al precalcular una formación
+
+# Posición de cada jugador, calculada al cargar el dataset (ver utils/positions.py)
+POSICIONES_SEPARACION_PORTEROS = 20   # Puntos mínimos entre el centro de porteros y el de campo en los atributos GK
+POSICIONES_MUESTRA_MAX = 200000       # Jugadores de campo con los que se ajusta el k-means (luego se asigna a todos)
+POSICIONES_ITERACIONES_MAX = 100
+
+# Búsqueda de jugadores por nombre (ver utils/name_search.py)
+BUSQUEDA_LIMITE_POR_DEFECTO = 20   # Resultados que se ofrecen al buscar
+BUSQUEDA_SIMILITUD_MINIMA = 0.3    # Similitud de trigramas (Jaccard) mínima para las erratas
+
+# Calentamiento de cachés al arrancar el proceso (ver utils/warmup.py)
+ENV_WARMUP = "SOCCER_WARMUP"     # '0' desactiva el calentamiento en segundo plano
+
 # ========== CONFIGURACIÓN DE API DE HUGGING FACE ==========
 # URL base de la API de Inference
 HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/"
@@ -43,6 +126,62 @@ ENV_HUGGINGFACE_KEY = "HUGGINGFACE_API_KEY"
 # Timeout para requests a la API (segundos)
 HUGGINGFACE_TIMEOUT = 60
 
+# Espera máxima antes de reintentar cuando el modelo se está cargando (503)
+# Si la API devuelve 'estimated_time' se usa ese valor, acotado a este máximo
+HUGGINGFACE_MAX_RETRY_WAIT = 20
+
+# Intentos máximos por petición (reintentos tras 503 o 429 incluidos)
+HUGGINGFACE_MAX_ATTEMPTS = 4
+
+# Generación en lote: número máximo de peticiones simultáneas a la API
+# (limita el uso de cuota y evita saturar el endpoint con cada clic)
+HUGGINGFACE_BATCH_MAX_CONCURRENCY = 3
+
+# Número máximo de variantes (semillas) que se pueden pedir en un lote
+HUGGINGFACE_BATCH_MAX_SEEDS = 8
+
+# Limitador global de llamadas a la API (compartido por todas las sesiones, ver utils/rate_limiter.py)
+HUGGINGFACE_RATE_LIMIT_PER_MINUTE = 20   # Ritmo sostenido de peticiones
+HUGGINGFACE_RATE_LIMIT_BURST = 5         # Peticiones que pueden salir de golpe
+HUGGINGFACE_DAILY_QUOTA = 0              # Máximo de peticiones por día (0 = sin límite)
+HUGGINGFACE_QUEUE_MAX_WAIT = 120         # Espera máxima en cola antes de desistir (segundos)
+HUGGINGFACE_RATE_LIMIT_BACKOFF = 30      # Pausa global tras recibir un 429 (segundos)
+HUGGINGFACE_RATE_LIMIT_MAX_SESSIONS = 1000  # Sesiones de las que se guardan contadores (LRU)
+
+# Vista previa de las imágenes generadas (se codifica una sola vez al recibirla)
+# El PNG original (768x768) solo se usa para la descarga
+IMAGE_PREVIEW_MAX_SIDE = 512   # Lado máximo en píxeles
+IMAGE_PREVIEW_QUALITY = 80     # Calidad WebP/JPEG (0-100)
+
+# Almacén compartido de imágenes generadas (ver utils/image_store.py)
+# Presupuesto global para todo el proceso, no por sesión
+IMAGE_STORE_MAX_MEMORY_MB = 64    # Por encima se vuelcan a disco las menos usadas
+IMAGE_STORE_MAX_DISK_MB = 512     # Por encima se eliminan definitivamente
+
+# ========== BACKEND DE GENERACIÓN DE IMÁGENES ==========
+# Permite sustituir la API real por un servidor local o una grabación (ver utils/image_backend.py)
+ENV_IMAGE_BACKEND = "IMAGE_BACKEND"                    # 'huggingface' | 'local' | 'record' | 'replay'
+ENV_IMAGE_BACKEND_URL = "IMAGE_BACKEND_URL"            # URL base del servidor local
+ENV_IMAGE_BACKEND_CASSETTE = "IMAGE_BACKEND_CASSETTE"  # Fichero de grabación JSONL
+
+# URL por defecto del servidor local que imita la API (bench/fake_hf_server.py)
+LOCAL_BACKEND_DEFAULT_URL = "http://127.0.0.1:8765/models/"
+
+# ========== MEDICIÓN DE RENDIMIENTO ==========
+# Tiempos por sección de página (ver utils/profiler.py)
+PROFILER_MAX_SAMPLES = 256             # Últimas muestras por sección para calcular percentiles
+ENV_METRICS_FILE = "SOCCER_METRICS_FILE"  # Fichero .prom donde volcar las métricas (opcional)
+METRICS_FILE_MIN_INTERVAL = 15         # Segundos mínimos entre dos escrituras del fichero
+
+# Captura de re-ejecuciones lentas (ver utils/slow_reruns.py)
+ENV_SLOW_RERUN_MODE = "SOCCER_SLOW_RERUN_MODE"            # 'muestreo' | 'cprofile' | 'off'
+ENV_SLOW_RERUN_THRESHOLD_MS = "SOCCER_SLOW_RERUN_THRESHOLD_MS"
+ENV_SLOW_RERUN_DIR = "SOCCER_SLOW_RERUN_DIR"              # Directorio de las capturas
+SLOW_RERUN_THRESHOLD_MS = 2000         # Re-ejecuciones más lentas que esto se capturan
+SLOW_RERUN_SAMPLE_INTERVAL = 0.01      # Segundos entre dos muestras de pila (modo 'muestreo')
+SLOW_RERUN_MAX_CAPTURES = 200          # Capturas que se conservan (las más antiguas se borran)
+SLOW_RERUN_MAX_DEPTH = 96              # Niveles de pila por muestra
+
 # ========== PROMPTS PARA GENERACIÓN DE IMÁGENES ==========
 # Prompts optimizados para FLUX.1-schnell (genera imágenes realistas)
 PROMPT_TEMPLATES = {
@@ -81,5 +220,8 @@ ERROR_MESSAGES = {
     'model_loading': "⏳ El modelo se está cargando. Intenta de nuevo en 20-30 segundos.",
     'invalid_token': "❌ Token inválido o sin permisos de Inference",
     'timeout': "⏱️ Timeout: La generación tomó demasiado tiempo",
-    'generation_failed': "❌ Error al generar imagen"
+    'generation_failed': "❌ Error al generar imagen",
+    'queue_timeout': "🚦 Demasiadas peticiones en cola. Inténtalo de nuevo en unos minutos.",
+    'quota_exhausted': "🚦 Se ha agotado la cuota diaria de generación de imágenes.",
+    'rate_limited': "🚦 La API de Hugging Face sigue limitando las peticiones. Inténtalo de nuevo en unos minutos."
 }
\ No newline at end of file
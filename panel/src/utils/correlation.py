@@ -0,0 +1,150 @@
+"""
+Matrices de correlación y covarianza entre atributos ("¿la aceleración va con
+la velocidad?", "¿finalización frente a potencia de tiro?").
+
+Todas salen del mismo cálculo vectorizado sobre la matriz de atributos
+(utils/attribute_matrix.py): la suma de los valores y el producto XᵀX de las
+filas elegidas, acumulados en float64 por bloques, dan la covarianza
+(XᵀX - n·μμᵀ) / (n - 1) y de ella la correlación. Un solo producto de matrices
+sustituye a las d² correlaciones columna a columna de pandas.
+
+Se guardan por versión del dataset:
+  - la de todo el dataset y la de cada liga, la primera vez que se piden;
+  - las de equipo también al pedirlas, pero en un LRU de
+    CORRELACION_EQUIPOS_CACHE_MAX: hay muchos equipos y cada uno se calcula
+    en un instante, así que se guardan solo los últimos consultados.
+
+Los valores que faltan en la matriz de atributos ya se sustituyeron por la
+media de su columna en todo el dataset.
+
+API pública:
+  - ResultadoCorrelacion
+  - MotorCorrelaciones
+  - get_motor_correlaciones(df) -> MotorCorrelaciones
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .attribute_matrix import MatrizAtributos, get_matriz_atributos
+from .const import CORRELACION_EQUIPOS_CACHE_MAX, CORRELACION_FILAS_POR_BLOQUE
+
+
+@dataclass(frozen=True)
+class ResultadoCorrelacion:
+    """Correlación y covarianza entre los atributos de un grupo de jugadores."""
+
+    columnas: List[str]
+    correlacion: np.ndarray  # (d, d); NaN en los atributos sin variación en el grupo
+    covarianza: np.ndarray   # (d, d)
+    jugadores: int
+    en_cache: bool           # Si las matrices ya estaban calculadas
+    tiempo_ms: float
+
+
+def _matrices(valores: np.ndarray, filas: Optional[np.ndarray],
+              filas_por_bloque: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Covarianza y correlación de las filas elegidas (todas si filas es None).
+
+    Returns:
+        (covarianza, correlacion, jugadores)
+    """
+    n = valores.shape[0] if filas is None else len(filas)
+    d = valores.shape[1]
+    suma = np.zeros(d)
+    producto = np.zeros((d, d))
+    for inicio in range(0, n, filas_por_bloque):
+        if filas is None:
+            bloque = valores[inicio:inicio + filas_por_bloque]
+        else:
+            bloque = valores[filas[inicio:inicio + filas_por_bloque]]
+        bloque = bloque.astype(np.float64)
+        suma += bloque.sum(axis=0)
+        producto += bloque.T @ bloque
+
+    if n < 2:
+        vacia = np.full((d, d), np.nan)
+        return vacia, vacia.copy(), n
+    media = suma / n
+    covarianza = (producto - n * np.outer(media, media)) / (n - 1)
+    desviacion = np.sqrt(np.clip(np.diag(covarianza), 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlacion = covarianza / np.outer(desviacion, desviacion)
+    correlacion[~np.isfinite(correlacion)] = np.nan
+    np.clip(correlacion, -1, 1, out=correlacion)
+    for matriz in (covarianza, correlacion):
+        matriz.flags.writeable = False
+    return covarianza, correlacion, n
+
+
+class MotorCorrelaciones:
+    """Correlaciones entre atributos de una versión del dataset, por liga y por equipo."""
+
+    def __init__(self, matriz: MatrizAtributos, max_equipos: int = CORRELACION_EQUIPOS_CACHE_MAX,
+                 filas_por_bloque: int = CORRELACION_FILAS_POR_BLOQUE):
+        self.matriz = matriz
+        self.max_equipos = max_equipos
+        self.filas_por_bloque = filas_por_bloque
+        # Clave (liga, equipo) -> (covarianza, correlacion, jugadores)
+        self._grupos: Dict[Tuple, Tuple[np.ndarray, np.ndarray, int]] = {}
+        self._equipos: "OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def correlaciones(self, df: pd.DataFrame, liga: Optional[str] = None,
+                      equipo: Optional[str] = None) -> ResultadoCorrelacion:
+        """
+        Matrices de los jugadores de todo el dataset, de una liga o de un equipo.
+
+        Args:
+            df: DataFrame de la versión del motor
+            liga, equipo: Filtros (None = sin filtro)
+
+        Returns:
+            ResultadoCorrelacion
+        """
+        inicio = time.perf_counter()
+        clave = (liga, equipo)
+        cache = self._grupos if equipo is None else self._equipos
+        with self._lock:
+            guardado = cache.get(clave)
+            if guardado is not None and equipo is not None:
+                self._equipos.move_to_end(clave)
+
+        en_cache = guardado is not None
+        if not en_cache:
+            filas = get_agregados(df).filas_filtradas(liga, equipo)
+            guardado = _matrices(self.matriz.valores, filas, self.filas_por_bloque)
+            with self._lock:
+                guardado = cache.setdefault(clave, guardado)
+                if equipo is not None:
+                    self._equipos.move_to_end(clave)
+                    while len(self._equipos) > self.max_equipos:
+                        self._equipos.popitem(last=False)
+
+        covarianza, correlacion, jugadores = guardado
+        return ResultadoCorrelacion(
+            columnas=self.matriz.columnas,
+            correlacion=correlacion,
+            covarianza=covarianza,
+            jugadores=jugadores,
+            en_cache=en_cache,
+            tiempo_ms=(time.perf_counter() - inicio) * 1000,
+        )
+
+    def en_cache(self) -> Dict[str, int]:
+        with self._lock:
+            return {'grupos': len(self._grupos), 'equipos': len(self._equipos)}
+
+
+def get_motor_correlaciones(df: pd.DataFrame) -> MotorCorrelaciones:
+    """Motor de correlaciones de `df` (uno por versión del dataset)."""
+    matriz = get_matriz_atributos(df)
+    return get_agregados(df).indice('correlaciones', lambda: MotorCorrelaciones(matriz))
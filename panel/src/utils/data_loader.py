@@ -5,19 +5,23 @@ NOTA: Este módulo ahora carga directamente desde CSV porque SQLite pesa demasia
 Todo el código de procesamiento SQLite está comentado al final del archivo.
 
 API pública:
+  - InformeCarga (informe inmutable de una carga)
   - main() -> pd.DataFrame
-  - load_data() -> Tuple[pd.DataFrame, dict]
+  - load_data() -> Tuple[pd.DataFrame, InformeCarga]
   - get_data_info(), get_load_info(), delete_csv()
+  - ruta_datos() -> str (fichero a cargar; configurable con SOCCER_DATA_FILE)
 """
 
 import os
 import time
-from typing import Dict, Tuple
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
-from .const import SQL_FILE_NAME, CSV_FILE_NAME
+from .const import SQL_FILE_NAME, CSV_FILE_NAME, ENV_DATA_FILE
+from .positions import COLUMNA_POSICION, PORTERO, clasificar_posiciones
 
 # === Importaciones SQLite COMENTADAS (no se usan) ===
 # import sqlite3
@@ -35,41 +39,93 @@ from .const import SQL_FILE_NAME, CSV_FILE_NAME
 DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 RUTA_ABSOLUTA_CSV = os.path.join(DATA_DIR, 'data', 'data.csv')
 
-<<<<<<< Updated upstream
+
+def ruta_datos() -> str:
+    """Fichero de datos a cargar: el de SOCCER_DATA_FILE si está definida, si no data/data.csv."""
+    ruta = os.getenv(ENV_DATA_FILE)
+    if not ruta:
+        return RUTA_ABSOLUTA_CSV
+    # Las rutas relativas se interpretan desde la raíz del proyecto
+    return ruta if os.path.isabs(ruta) else os.path.join(DATA_DIR, ruta)
+
+
+def _origen(ruta: str) -> str:
+    """Formato del fichero según su extensión: 'csv', o los binarios 'parquet' y 'pickle'."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.parquet':
+        return 'parquet'
+    if extension in ('.pkl', '.pickle'):
+        return 'pickle'
+    return 'csv'
+
+
+def _leer_fichero(ruta: str) -> pd.DataFrame:
+    """Lee el dataset según su extensión (.csv, .parquet o .pkl)."""
+    origen = _origen(ruta)
+    if origen == 'parquet':
+        return pd.read_parquet(ruta)
+    if origen == 'pickle':
+        return pd.read_pickle(ruta)
+    return pd.read_csv(ruta)
+
+
+def _convertir_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conversiones de tipo que se hacen una sola vez al cargar.
+
+    - birthday: texto -> datetime64 (las páginas calculaban la edad convirtiéndola
+      en cada re-ejecución; pd.to_datetime sobre una columna ya convertida no hace nada)
+    """
+    if 'birthday' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['birthday']):
+        df['birthday'] = pd.to_datetime(df['birthday'], errors='coerce')
+    return df
+
+
+def _anadir_posiciones(df: pd.DataFrame) -> pd.DataFrame:
+    """Columna categórica con la posición de cada jugador, calculada una vez por carga (ver utils/positions.py)."""
+    if COLUMNA_POSICION not in df.columns:
+        posiciones = clasificar_posiciones(df)
+        if posiciones is not None:
+            df[COLUMNA_POSICION] = posiciones
+    return df
+
+
+@dataclass(frozen=True)
+class InformeCarga:
+    """
+    Telemetría de una carga del dataset.
+
+    Cada carga devuelve su propio informe inmutable junto al DataFrame, así que
+    dos cargas simultáneas (sesiones en hilos distintos, una recarga en segundo
+    plano) nunca mezclan sus datos.
+    """
+
+    origen: str              # 'csv' | 'parquet' | 'pickle'
+    ruta: str
+    fichero_existia: bool
+    bytes_leidos: int = 0
+    filas: int = 0
+    columnas: int = 0
+    tiempo_lectura_s: float = 0.0   # Lectura y parseo del fichero
+    tiempo_tipos_s: float = 0.0     # Conversiones de tipo (_convertir_tipos)
+    tiempo_posiciones_s: float = 0.0  # Clasificación por posición (_anadir_posiciones)
+    memoria_bytes: int = 0          # Memoria del DataFrame resultante (deep)
+    tiempo_total_s: float = 0.0
+    fecha: Optional[float] = None
+
+
 # Verificar en runtime (útil para debug)
 # print(f"DEBUG: __file__ = {__file__}")
 # print(f"DEBUG: DATA_DIR = {DATA_DIR}")
 # print(f"DEBUG: RUTA_ABSOLUTA_CSV = {RUTA_ABSOLUTA_CSV}")
-=======
-# Intentar encontrar la carpeta 'data' en múltiples ubicaciones
-def _find_data_dir():
-    """Encuentra el directorio 'data' en diferentes entornos (local, Hugging Face, etc.)"""
-    # Opción 1: Relativa al script (panel/src/utils -> ../../.. -> data)
-    option1 = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..', '..', 'data'))
-    # Opción 2: Relativa al directorio de trabajo actual (para Hugging Face Spaces)
-    option2 = os.path.abspath(os.path.join(os.getcwd(), 'data'))
-    # Opción 3: En el mismo nivel que el script (legacy)
-    option3 = os.path.abspath(os.path.join(SCRIPT_DIR, 'data'))
-    
-    # Retornar la primera que contenga el archivo CSV o DB
-    for path in [option1, option2, option3]:
-        if os.path.exists(os.path.join(path, 'data.csv')) or os.path.exists(os.path.join(path, 'data.sqlite')):
-            return path
-    
-    # Si ninguna existe, usar la primera opción por defecto
-    return option1
->>>>>>> Stashed changes
 
 # === CÓDIGO SQLite COMENTADO (pesa demasiado) ===
 # DATA_DIR_OLD = 'C:/Users/Joaquim/OneDrive/UPGRADE/PROYECTO1_Soccer/data'
 # RUTA_ABSOLUTA_DB = os.path.join(DATA_DIR_OLD, 'data.sqlite')
 
-# Variable global para almacenar información de carga
-_load_info = {
-    'csv_already_existed': None,  # None = no inicializado todavía
-    'processing_time': 0.0,
-    'timestamp': None,
-}
+# Informe de la última carga del proceso (solo para get_load_info(); el de cada
+# carga viaja con su DataFrame). Se sustituye de una vez, nunca se modifica.
+_ultimo_informe: Optional[InformeCarga] = None
 
 # === CÓDIGO SQLite COMENTADO (pesa demasiado) ===
 # # Nombres de tablas en SQLite
@@ -252,28 +308,56 @@ _load_info = {
 #     df_final.to_sql('jugadores_2016', engine, index=False, if_exists='replace')
 
 
-def main() -> pd.DataFrame:
-    """Carga los datos directamente desde el archivo CSV."""
-    global _load_info
-    start_time = time.time()
+def _cargar() -> Tuple[pd.DataFrame, InformeCarga]:
+    """Carga los datos directamente desde el fichero y mide cada fase."""
+    global _ultimo_informe
+    inicio = time.perf_counter()
 
     # Cargar CSV directamente (SQLite comentado porque pesa demasiado)
-    if os.path.exists(RUTA_ABSOLUTA_CSV):
-        print(f"✅ Cargando datos desde '{CSV_FILE_NAME}'...")
-        df_final = pd.read_csv(RUTA_ABSOLUTA_CSV)
-        _load_info['csv_already_existed'] = True
-        print(f"✅ Datos cargados correctamente: {len(df_final)} jugadores.")
-    else:
-        print(f"❌ ERROR: No se encontró el archivo '{CSV_FILE_NAME}' en la ruta: {RUTA_ABSOLUTA_CSV}")
+    ruta = ruta_datos()
+    nombre_fichero = os.path.basename(ruta)
+    if not os.path.exists(ruta):
+        print(f"❌ ERROR: No se encontró el archivo '{nombre_fichero}' en la ruta: {ruta}")
         print("   Por favor, asegúrate de que el archivo data.csv existe en la carpeta data/")
-        _load_info['csv_already_existed'] = False
-        return pd.DataFrame()
+        informe = InformeCarga(origen=_origen(ruta), ruta=ruta, fichero_existia=False, fecha=time.time())
+        _ultimo_informe = informe
+        return pd.DataFrame(), informe
+
+    print(f"✅ Cargando datos desde '{nombre_fichero}'...")
+    bytes_leidos = os.path.getsize(ruta)
+    df_final = _leer_fichero(ruta)
+    tiempo_lectura = time.perf_counter() - inicio
+
+    inicio_tipos = time.perf_counter()
+    df_final = _convertir_tipos(df_final)
+    tiempo_tipos = time.perf_counter() - inicio_tipos
+
+    inicio_posiciones = time.perf_counter()
+    df_final = _anadir_posiciones(df_final)
+    tiempo_posiciones = time.perf_counter() - inicio_posiciones
+    print(f"✅ Datos cargados correctamente: {len(df_final)} jugadores.")
+
+    informe = InformeCarga(
+        origen=_origen(ruta),
+        ruta=ruta,
+        fichero_existia=True,
+        bytes_leidos=bytes_leidos,
+        filas=len(df_final),
+        columnas=len(df_final.columns),
+        tiempo_lectura_s=tiempo_lectura,
+        tiempo_tipos_s=tiempo_tipos,
+        tiempo_posiciones_s=tiempo_posiciones,
+        memoria_bytes=int(df_final.memory_usage(deep=True).sum()),
+        tiempo_total_s=time.perf_counter() - inicio,
+        fecha=time.time(),
+    )
+    _ultimo_informe = informe
+    return df_final, informe
 
-    # Info de procesamiento
-    _load_info['processing_time'] = time.time() - start_time
-    _load_info['timestamp'] = time.time()
 
-    return df_final
+def main() -> pd.DataFrame:
+    """Carga los datos directamente desde el archivo CSV."""
+    return _cargar()[0]
 
 
 # === CÓDIGO SQLite COMENTADO (pesa demasiado) ===
@@ -348,15 +432,13 @@ def main() -> pd.DataFrame:
 #     return df_final
 
 
-def load_data():
+def load_data() -> Tuple[pd.DataFrame, InformeCarga]:
     """
     Función principal para cargar datos de jugadores de fútbol 2016.
     Retorna un DataFrame con información consolidada de jugadores, atributos, equipos, ligas y países,
-    y también retorna la información de carga.
+    y también el informe de esa carga (InformeCarga).
     """
-    df = main()
-    # Devolvemos tanto el DataFrame como la información de carga
-    return df, _load_info.copy()
+    return _cargar()
 
 
 def get_data_info(df):
@@ -382,11 +464,8 @@ def get_data_info(df):
     
     # Calcular edad promedio si tenemos birthday
     if 'birthday' in df.columns:
-        from datetime import datetime
-        df_temp = df.copy()
-        df_temp['birthday'] = pd.to_datetime(df_temp['birthday'], errors='coerce')
-        df_temp['edad'] = (pd.Timestamp('2016-12-31') - df_temp['birthday']).dt.days / 365.25
-        info['edad_promedio'] = df_temp['edad'].mean()
+        nacimientos = pd.to_datetime(df['birthday'], errors='coerce')
+        info['edad_promedio'] = ((pd.Timestamp('2016-12-31') - nacimientos).dt.days / 365.25).mean()
     
     # Calcular altura promedio (ya está en cm)
     if 'height' in df.columns:
@@ -400,28 +479,28 @@ def get_data_info(df):
     if 'short_passing' in df.columns:
         info['pase_promedio'] = df['short_passing'].mean()
     
-    # Calcular altura de porteros vs jugadores de campo
-    if 'height' in df.columns and 'gk_reflexes' in df.columns:
-        # Porteros tienen gk_reflexes > 0 (no nulo y mayor que 0)
-        porteros = df[df['gk_reflexes'] > 10]  # Umbral para identificar porteros
-        jugadores = df[df['gk_reflexes'] <= 10]
+    # Calcular altura de porteros vs jugadores de campo (posición calculada al cargar)
+    if 'height' in df.columns and COLUMNA_POSICION in df.columns:
+        codigos = df[COLUMNA_POSICION].cat.codes.to_numpy()
+        es_portero = codigos == df[COLUMNA_POSICION].cat.categories.get_loc(PORTERO)
+        alturas = df['height']
         
-        if len(porteros) > 0:
-            info['altura_porteros'] = porteros['height'].mean()
-        if len(jugadores) > 0:
-            info['altura_jugadores'] = jugadores['height'].mean()
+        if es_portero.any():
+            info['altura_porteros'] = alturas[es_portero].mean()
+        if ((codigos >= 0) & ~es_portero).any():
+            info['altura_jugadores'] = alturas[(codigos >= 0) & ~es_portero].mean()
     
     return info
 
 
-def get_load_info():
+def get_load_info() -> Optional[InformeCarga]:
     """
-    Obtiene información sobre el proceso de carga del CSV.
+    Obtiene el informe de la última carga del proceso.
     
     Returns:
-        dict: Diccionario con información de carga (si ya existía, tiempo de procesamiento, etc.)
+        InformeCarga: Informe inmutable de la última carga (None si aún no se ha cargado nada)
     """
-    return _load_info.copy()
+    return _ultimo_informe
 
 
 def delete_csv():
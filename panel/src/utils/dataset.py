@@ -0,0 +1,240 @@
+"""
+Dataset compartido por todas las sesiones del proceso, con recarga sin cortes.
+
+El fichero se carga una sola vez por proceso y todas las sesiones comparten el
+mismo DataFrame: las páginas no lo modifican (solo filtran y agregan), así que
+compartirlo es seguro.
+
+Recarga con doble búfer: `recargar_dataset()` construye la versión nueva en un
+hilo en segundo plano mientras la actual sigue sirviendo. Solo si la carga
+termina bien y el resultado es válido (no vacío y con todas las columnas de la
+versión actual) se publica, cambiando la referencia compartida de una vez. Si
+falla, la versión actual sigue en servicio: nadie ve un dataset vacío ni a
+medio cargar.
+
+Cada re-ejecución usa una única versión de principio a fin (`usar_dataset()`).
+Las versiones antiguas se retiran (se sueltan el DataFrame y sus agregados) en
+cuanto ninguna re-ejecución en curso las usa.
+
+API pública:
+  - Dataset, AlmacenDatos
+  - get_almacen() -> AlmacenDatos (instancia compartida del proceso)
+  - get_dataset() -> Dataset (versión actual; se carga la primera vez)
+  - usar_dataset() (context manager: versión actual, retenida mientras dure el bloque)
+  - recargar_dataset(preparar) -> bool
+  - estado_datos() -> dict
+  - AlmacenDatos.versiones() -> List[Dataset] (versiones en memoria)
+  - descartar_dataset() (olvida todas las versiones; la siguiente llamada vuelve a cargar)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from . import data_loader
+from .aggregates import descartar_agregados
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Una versión cargada del dataset."""
+
+    df: pd.DataFrame = field(repr=False)
+    informe: Optional[data_loader.InformeCarga]  # Telemetría de la carga de esta versión
+    version: int  # 1, 2, ... dentro del proceso
+    cargado: float = field(default_factory=time.time)
+
+
+class AlmacenDatos:
+    """Versión actual del dataset y versiones antiguas que alguna re-ejecución sigue usando."""
+
+    def __init__(self, cargar: Callable[[], Tuple[pd.DataFrame, data_loader.InformeCarga]] = None):
+        self._cargar = cargar or data_loader.load_data
+        self._lock = threading.Lock()
+        self._carga_lock = threading.Lock()  # Una sola carga a la vez (la primera o una recarga)
+        self._actual: Optional[Dataset] = None
+        self._retenidas: Dict[int, Dataset] = {}  # Versiones antiguas todavía en uso
+        self._referencias: Dict[int, int] = {}    # Re-ejecuciones en curso por versión
+        self._ultima_version = 0
+        self._recargando = False
+        self._ultima_recarga: Optional[dict] = None
+
+    def _construir(self, validar_contra: Optional[Dataset] = None) -> Dataset:
+        df, informe = self._cargar()
+        if validar_contra is not None:
+            if df is None or df.empty:
+                raise ValueError("la carga no ha devuelto ningún jugador")
+            faltan = set(validar_contra.df.columns) - set(df.columns)
+            if faltan:
+                raise ValueError(f"faltan columnas: {', '.join(sorted(faltan))}")
+        with self._lock:
+            self._ultima_version += 1
+            return Dataset(df=df, informe=informe, version=self._ultima_version)
+
+    def actual(self) -> Dataset:
+        """Versión actual (se carga la primera vez; las llamadas concurrentes esperan a esa carga)."""
+        dataset = self._actual
+        if dataset is None:
+            with self._carga_lock:
+                if self._actual is None:
+                    nuevo = self._construir()
+                    with self._lock:
+                        self._actual = nuevo
+                dataset = self._actual
+        return dataset
+
+    @contextmanager
+    def usar(self) -> Iterator[Dataset]:
+        """Versión actual, retenida (no se retira) hasta salir del bloque."""
+        self.actual()
+        with self._lock:
+            dataset = self._actual
+            self._referencias[dataset.version] = self._referencias.get(dataset.version, 0) + 1
+        try:
+            yield dataset
+        finally:
+            with self._lock:
+                self._referencias[dataset.version] -= 1
+                retirar = not self._referencias[dataset.version] and dataset.version in self._retenidas
+                if not self._referencias[dataset.version]:
+                    del self._referencias[dataset.version]
+                if retirar:
+                    del self._retenidas[dataset.version]
+            if retirar:
+                self._retirar(dataset)
+
+    def recargar(self, preparar: Optional[Callable[[Dataset], None]] = None,
+                 en_segundo_plano: bool = True) -> bool:
+        """
+        Construye una versión nueva y, si es válida, la publica en lugar de la actual.
+
+        Args:
+            preparar: Trabajo a hacer con la versión nueva antes de publicarla
+                      (agregados, figuras...), para que las sesiones la reciban ya caliente
+            en_segundo_plano: Si False, recarga en el hilo que llama
+
+        Returns:
+            bool: False si ya había una recarga en curso
+        """
+        with self._lock:
+            if self._recargando:
+                return False
+            self._recargando = True
+        if en_segundo_plano:
+            threading.Thread(target=self._recargar, args=(preparar,), name="soccer-reload", daemon=True).start()
+        else:
+            self._recargar(preparar)
+        return True
+
+    def _recargar(self, preparar: Optional[Callable[[Dataset], None]]) -> None:
+        inicio = time.perf_counter()
+        resultado = {'fecha': time.time(), 'ok': False, 'version': None, 'duracion_s': None, 'error': None}
+        try:
+            actual = self.actual()
+            print(f"🔄 Recargando datos (la versión {actual.version} sigue en servicio)...")
+            with self._carga_lock:
+                nuevo = self._construir(validar_contra=actual)
+            if preparar is not None:
+                preparar(nuevo)
+            self._publicar(nuevo)
+            resultado.update(ok=True, version=nuevo.version)
+            print(f"✅ Versión {nuevo.version} del dataset publicada ({len(nuevo.df)} jugadores)")
+        except Exception as e:
+            resultado['error'] = str(e)
+            print(f"❌ Recarga descartada, se mantiene la versión actual: {e}")
+        finally:
+            resultado['duracion_s'] = time.perf_counter() - inicio
+            with self._lock:
+                self._recargando = False
+                self._ultima_recarga = resultado
+
+    def _publicar(self, nuevo: Dataset) -> None:
+        with self._lock:
+            anterior = self._actual
+            self._actual = nuevo
+            retirar = anterior is not None and not self._referencias.get(anterior.version)
+            if anterior is not None and not retirar:
+                self._retenidas[anterior.version] = anterior
+        if retirar:
+            self._retirar(anterior)
+
+    def _retirar(self, dataset: Dataset) -> None:
+        descartar_agregados(dataset.df)
+        print(f"♻️ Versión {dataset.version} del dataset retirada")
+
+    def _versiones(self) -> List[Dataset]:
+        # Llamar con self._lock adquirido
+        versiones = ([self._actual] if self._actual is not None else []) + list(self._retenidas.values())
+        return sorted(versiones, key=lambda d: d.version)
+
+    def versiones(self) -> List[Dataset]:
+        """Versiones en memoria (la actual y las antiguas aún en uso), de la más antigua a la más reciente."""
+        with self._lock:
+            return self._versiones()
+
+    def estado(self) -> dict:
+        """
+        Versiones en memoria y estado de la recarga.
+
+        Returns:
+            dict: {'version_actual', 'recargando', 'ultima_recarga',
+                   'versiones': [{'version', 'actual', 'referencias', 'filas', 'cargado'}]}
+        """
+        with self._lock:
+            return {
+                'version_actual': self._actual.version if self._actual is not None else None,
+                'recargando': self._recargando,
+                'ultima_recarga': dict(self._ultima_recarga) if self._ultima_recarga else None,
+                'versiones': [{
+                    'version': d.version,
+                    'actual': d is self._actual,
+                    'referencias': self._referencias.get(d.version, 0),
+                    'filas': len(d.df),
+                    'cargado': d.cargado,
+                } for d in self._versiones()],
+            }
+
+
+# Instancia compartida por todas las sesiones del proceso
+_almacen: Optional[AlmacenDatos] = None
+_almacen_lock = threading.Lock()
+
+
+def get_almacen() -> AlmacenDatos:
+    """Devuelve el almacén de datos compartido del proceso (se crea la primera vez)."""
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                _almacen = AlmacenDatos()
+    return _almacen
+
+
+def get_dataset() -> Dataset:
+    """Versión actual del dataset (se carga la primera vez)."""
+    return get_almacen().actual()
+
+
+def usar_dataset():
+    """Context manager con la versión actual, retenida mientras dure el bloque (una re-ejecución)."""
+    return get_almacen().usar()
+
+
+def recargar_dataset(preparar: Optional[Callable[[Dataset], None]] = None) -> bool:
+    """Lanza en segundo plano la recarga sin cortes (ver AlmacenDatos.recargar)."""
+    return get_almacen().recargar(preparar)
+
+
+def estado_datos() -> dict:
+    return get_almacen().estado()
+
+
+def descartar_dataset() -> None:
+    """Olvida todas las versiones; la siguiente llamada a get_dataset() vuelve a leer el fichero."""
+    global _almacen
+    with _almacen_lock:
+        _almacen = None
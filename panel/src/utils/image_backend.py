@@ -0,0 +1,247 @@
+"""
+Backends intercambiables para las peticiones de generación de imágenes.
+
+`SceneImageGenerator` no llama directamente a `requests.post`: delega en un
+backend con la misma interfaz (`post(url, headers, json, timeout)` que devuelve
+un objeto con `status_code`, `content`, `text` y `json()`). Así se puede
+sustituir la API real de Hugging Face por un servidor local de pruebas o por
+una grabación, y probar reintentos, fallbacks y concurrencia sin conexión.
+
+Backends disponibles (variable de entorno IMAGE_BACKEND):
+  - 'huggingface' (por defecto): API real de Hugging Face
+  - 'local': servidor HTTP local que imita la API (ver bench/fake_hf_server.py)
+  - 'record': usa la API real (o la local) y graba cada respuesta en un fichero
+  - 'replay': reproduce un fichero grabado, respetando las latencias originales
+
+API pública:
+  - ImageBackend, HTTPBackend, RecordingBackend, ReplayBackend, BackendResponse
+  - create_image_backend(tipo) -> ImageBackend (instancia nueva)
+  - get_image_backend() -> ImageBackend (instancia compartida del proceso)
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+from .const import (
+    HUGGINGFACE_API_URL,
+    ENV_IMAGE_BACKEND,
+    ENV_IMAGE_BACKEND_URL,
+    ENV_IMAGE_BACKEND_CASSETTE,
+    LOCAL_BACKEND_DEFAULT_URL,
+)
+
+
+class BackendResponse:
+    """Respuesta mínima compatible con `requests.Response` (la parte que usamos)."""
+
+    def __init__(self, status_code: int, content: bytes = b'', elapsed: float = 0.0):
+        self.status_code = status_code
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class ImageBackend(ABC):
+    """Interfaz base de un backend de generación de imágenes."""
+
+    # URL base de los modelos (se le añade el nombre del modelo)
+    base_url = HUGGINGFACE_API_URL
+
+    def model_url(self, modelo: str) -> str:
+        """URL completa de un modelo para este backend."""
+        return self.base_url + modelo
+
+    @abstractmethod
+    def post(self, url: str, headers: Dict[str, str], json: dict, timeout: float) -> BackendResponse:
+        """
+        Envía una petición de generación.
+
+        Raises:
+            requests.exceptions.Timeout: si se supera el timeout
+            requests.exceptions.RequestException: otros errores de red
+        """
+
+
+class HTTPBackend(ImageBackend):
+    """Backend HTTP real (API de Hugging Face o servidor local que la imita)."""
+
+    def __init__(self, base_url: str = HUGGINGFACE_API_URL):
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self._local = threading.local()
+
+    def _session(self):
+        # Una sesión por hilo: reutiliza conexiones sin compartir estado entre hilos
+        import requests
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def post(self, url, headers, json, timeout):
+        inicio = time.time()
+        response = self._session().post(url, headers=headers, json=json, timeout=timeout)
+        return BackendResponse(response.status_code, response.content, time.time() - inicio)
+
+
+def _modelo_de_url(url: str, base_url: str) -> str:
+    """Nombre del modelo a partir de su URL (independiente del servidor)."""
+    return url[len(base_url):] if url.startswith(base_url) else url
+
+
+def _clave_peticion(modelo: str, payload: dict) -> str:
+    """Clave estable de una petición: modelo + payload normalizado."""
+    normalizado = json.dumps({'modelo': modelo, 'payload': payload}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(normalizado.encode('utf-8')).hexdigest()
+
+
+class RecordingBackend(ImageBackend):
+    """Envuelve otro backend y graba cada intercambio en un fichero JSONL."""
+
+    def __init__(self, inner: ImageBackend, ruta: str):
+        self.inner = inner
+        self.base_url = inner.base_url
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+
+    def post(self, url, headers, json, timeout):
+        import requests
+        inicio = time.time()
+        modelo = _modelo_de_url(url, self.base_url)
+        registro = {
+            'clave': _clave_peticion(modelo, json),
+            'modelo': modelo,
+            'inicio': inicio,
+        }
+        try:
+            response = self.inner.post(url, headers=headers, json=json, timeout=timeout)
+        except requests.exceptions.Timeout:
+            registro.update({'timeout': True, 'latencia': time.time() - inicio})
+            self._escribir(registro)
+            raise
+        registro.update({
+            'status_code': response.status_code,
+            'content_b64': base64.b64encode(response.content).decode('ascii'),
+            'latencia': time.time() - inicio,
+        })
+        self._escribir(registro)
+        return response
+
+    def _escribir(self, registro: dict) -> None:
+        linea = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            with open(self.ruta, 'a', encoding='utf-8') as f:
+                f.write(linea + '\n')
+
+
+class ReplayBackend(ImageBackend):
+    """
+    Reproduce un fichero grabado por RecordingBackend.
+
+    Cada petición se empareja por su clave (modelo + payload). Si la clave no está
+    grabada se usa la siguiente respuesta grabada para el mismo modelo, y si
+    tampoco hay, la siguiente de la grabación completa. Las respuestas de cada
+    grupo se sirven en orden y de forma cíclica.
+    """
+
+    def __init__(self, ruta: str, velocidad: float = 1.0, base_url: str = HUGGINGFACE_API_URL):
+        """
+        Args:
+            ruta: Fichero JSONL grabado
+            velocidad: Factor de aceleración de las latencias (2.0 = el doble de rápido,
+                       0 = sin esperas)
+            base_url: URL base con la que se grabó
+        """
+        self.base_url = base_url
+        self.velocidad = velocidad
+        self._lock = threading.Lock()
+        self._por_clave = defaultdict(deque)
+        self._por_modelo = defaultdict(deque)
+        self._todas = deque()
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if linea.strip():
+                    registro = json.loads(linea)
+                    self._por_clave[registro['clave']].append(registro)
+                    self._por_modelo[registro['modelo']].append(registro)
+                    self._todas.append(registro)
+        if not self._todas:
+            raise ValueError(f"La grabación '{ruta}' está vacía")
+
+    def _siguiente(self, url: str, payload: dict) -> dict:
+        modelo = _modelo_de_url(url, self.base_url)
+        with self._lock:
+            for cola in (self._por_clave.get(_clave_peticion(modelo, payload)), self._por_modelo.get(modelo), self._todas):
+                if cola:
+                    registro = cola[0]
+                    cola.rotate(-1)
+                    return registro
+
+    def post(self, url, headers, json, timeout):
+        import requests
+        registro = self._siguiente(url, json)
+        latencia = registro['latencia'] / self.velocidad if self.velocidad else 0.0
+
+        if registro.get('timeout') or latencia > timeout:
+            time.sleep(min(latencia, timeout))
+            raise requests.exceptions.Timeout(f"Timeout reproducido ({registro['latencia']:.1f}s)")
+
+        time.sleep(latencia)
+        return BackendResponse(
+            registro['status_code'],
+            base64.b64decode(registro['content_b64']),
+            latencia,
+        )
+
+
+def create_image_backend(tipo: Optional[str] = None) -> ImageBackend:
+    """
+    Crea un backend nuevo según las variables de entorno.
+
+    Variables:
+        IMAGE_BACKEND: 'huggingface' (defecto), 'local', 'record' o 'replay'
+        IMAGE_BACKEND_URL: URL base del servidor local (modo 'local', y 'record' si se define)
+        IMAGE_BACKEND_CASSETTE: fichero de grabación (modos 'record' y 'replay')
+    """
+    tipo = (tipo or os.getenv(ENV_IMAGE_BACKEND) or 'huggingface').lower()
+    url_local = os.getenv(ENV_IMAGE_BACKEND_URL)
+    cassette = os.getenv(ENV_IMAGE_BACKEND_CASSETTE, 'image_backend_cassette.jsonl')
+
+    if tipo == 'huggingface':
+        return HTTPBackend(HUGGINGFACE_API_URL)
+    if tipo == 'local':
+        return HTTPBackend(url_local or LOCAL_BACKEND_DEFAULT_URL)
+    if tipo == 'record':
+        return RecordingBackend(HTTPBackend(url_local or HUGGINGFACE_API_URL), cassette)
+    if tipo == 'replay':
+        return ReplayBackend(cassette)
+    raise ValueError(f"Backend de imágenes desconocido: '{tipo}'")
+
+
+# Instancia compartida por todas las sesiones del proceso: conserva las conexiones
+# HTTP abiertas y la posición de la grabación entre re-ejecuciones de la página
+_backend: Optional[ImageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_image_backend() -> ImageBackend:
+    """Devuelve el backend compartido del proceso (se crea la primera vez)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_image_backend()
+    return _backend
@@ -0,0 +1,300 @@
+"""
+Almacén de imágenes generadas con IA con presupuesto global de memoria.
+
+Las sesiones de Streamlit no guardan las imágenes en `st.session_state`: solo
+guardan un *handle* (cadena) que se resuelve contra este almacén compartido por
+todo el proceso.
+
+Funcionamiento:
+  - Las imágenes (ya codificadas: PNG + vista previa) se guardan en memoria.
+  - Si se supera el presupuesto de memoria, las menos usadas recientemente (LRU)
+    se vuelcan a disco. Las entradas a volcar se eligen con el lock adquirido,
+    pero los ficheros se escriben fuera de él: el resto de sesiones puede leer
+    y guardar imágenes mientras tanto.
+  - Si se supera el presupuesto de disco, las menos usadas se eliminan y su
+    handle deja de ser válido (`get()` devuelve None).
+
+API pública:
+  - ImageStore
+  - get_image_store() -> ImageStore (instancia compartida del proceso)
+  - get_image_store_stats() -> dict (sin crear el almacén si aún no existe)
+  - tamano_imagen(handle) -> int (sin crear el almacén si aún no existe)
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .const import IMAGE_STORE_MAX_MEMORY_MB, IMAGE_STORE_MAX_DISK_MB
+
+
+class ImageStore:
+    """Almacén LRU de imágenes codificadas con volcado a disco."""
+
+    def __init__(self, max_memoria_bytes: int, max_disco_bytes: int, directorio: Optional[str] = None):
+        """
+        Args:
+            max_memoria_bytes: Presupuesto global de memoria para imágenes residentes
+            max_disco_bytes: Presupuesto de disco para imágenes volcadas
+            directorio: Carpeta para el volcado (por defecto, una carpeta temporal del proceso)
+        """
+        self.max_memoria_bytes = max_memoria_bytes
+        self.max_disco_bytes = max_disco_bytes
+        self.directorio = directorio or tempfile.mkdtemp(prefix='soccer_imagenes_')
+        os.makedirs(self.directorio, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # handle -> dict con 'png', 'preview' y metadatos (orden = recencia de uso)
+        self._memoria: "OrderedDict[str, dict]" = OrderedDict()
+        # handle -> (metadatos, bytes en disco)
+        self._disco: "OrderedDict[str, tuple]" = OrderedDict()
+        # handle -> dict de las entradas que se están escribiendo en disco
+        self._volcando: Dict[str, dict] = {}
+        self._bytes_memoria = 0
+        self._bytes_disco = 0
+        self._volcados = 0
+        self._desalojos = 0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def put(self, escena: dict) -> str:
+        """
+        Guarda una imagen codificada y devuelve su handle.
+
+        Args:
+            escena: dict con 'png', 'preview' y metadatos (ver ui.iaPlayers.codificar_imagen)
+
+        Returns:
+            str: Handle para recuperar la imagen más tarde
+        """
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._guardar_en_memoria(handle, dict(escena))
+            a_volcar = self._elegir_volcados()
+        self._volcar(a_volcar)
+        return handle
+
+    def get(self, handle: Optional[str]) -> Optional[dict]:
+        """
+        Recupera una imagen por su handle (la marca como usada recientemente).
+
+        Returns:
+            dict con la imagen codificada, o None si el handle no existe o fue desalojado.
+        """
+        if not handle:
+            return None
+        with self._lock:
+            if handle in self._memoria:
+                self._memoria.move_to_end(handle)
+                return self._memoria[handle]
+            if handle in self._volcando:
+                return self._volcando[handle]
+            if handle not in self._disco:
+                return None
+            escena = self._leer_de_disco(handle)
+            if escena is None:
+                return None
+            self._guardar_en_memoria(handle, escena)
+            a_volcar = self._elegir_volcados()
+        self._volcar(a_volcar)
+        return escena
+
+    def release(self, handle: Optional[str]) -> None:
+        """Elimina una imagen del almacén (memoria o disco) si existe."""
+        if not handle:
+            return
+        with self._lock:
+            if handle in self._memoria:
+                self._bytes_memoria -= _tamano(self._memoria.pop(handle))
+            # Si se está volcando, quien la escribe borra los ficheros al terminar
+            self._volcando.pop(handle, None)
+            if handle in self._disco:
+                self._borrar_de_disco(handle)
+
+    def tamano(self, handle: Optional[str]) -> int:
+        """Bytes que ocupa una imagen en memoria o en disco (0 si no existe), sin marcarla como usada."""
+        with self._lock:
+            if handle in self._memoria:
+                return _tamano(self._memoria[handle])
+            if handle in self._volcando:
+                return _tamano(self._volcando[handle])
+            if handle in self._disco:
+                return self._disco[handle][1]
+        return 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve el uso actual del almacén.
+
+        Returns:
+            dict: Entradas y bytes en memoria y en disco, presupuestos y contadores.
+        """
+        with self._lock:
+            return {
+                'entradas_memoria': len(self._memoria),
+                'bytes_memoria': self._bytes_memoria,
+                'max_memoria_bytes': self.max_memoria_bytes,
+                'entradas_disco': len(self._disco),
+                'bytes_disco': self._bytes_disco,
+                'max_disco_bytes': self.max_disco_bytes,
+                'volcados_a_disco': self._volcados,
+                'desalojos': self._desalojos,
+            }
+
+    def clear(self) -> None:
+        """Vacía el almacén y borra los ficheros volcados."""
+        with self._lock:
+            for handle in list(self._disco):
+                self._borrar_de_disco(handle)
+            self._memoria.clear()
+            self._volcando.clear()
+            self._bytes_memoria = 0
+
+    # ------------------------------------------------------------------
+    # Volcado a disco (sin el lock mientras se escriben los ficheros)
+    # ------------------------------------------------------------------
+    def _volcar(self, a_volcar: List[Tuple[str, dict]]) -> None:
+        """Escribe en disco las entradas elegidas por _elegir_volcados y aplica el presupuesto de disco."""
+        for handle, escena in a_volcar:
+            escrita = self._escribir_en_disco(handle, escena)
+            with self._lock:
+                if self._volcando.pop(handle, None) is None:
+                    # Liberada mientras se escribía: los ficheros sobran
+                    if escrita:
+                        self._borrar_ficheros(handle)
+                    continue
+                if not escrita:
+                    self._desalojos += 1
+                    continue
+                metadatos = {k: v for k, v in escena.items() if k not in ('png', 'preview')}
+                self._disco[handle] = (metadatos, _tamano(escena))
+                self._bytes_disco += _tamano(escena)
+                self._volcados += 1
+
+                while self._bytes_disco > self.max_disco_bytes and self._disco:
+                    self._borrar_de_disco(next(iter(self._disco)))
+                    self._desalojos += 1
+
+    def _escribir_en_disco(self, handle: str, escena: dict) -> bool:
+        """Escribe los ficheros de una entrada; False si no se pudo."""
+        try:
+            with open(self._ruta(handle, 'png'), 'wb') as f:
+                f.write(escena['png'])
+            with open(self._ruta(handle, 'preview'), 'wb') as f:
+                f.write(escena['preview'])
+        except OSError as e:
+            print(f"❌ Error al volcar imagen a disco: {e}")
+            self._borrar_ficheros(handle)
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Internos (llamar siempre con el lock adquirido)
+    # ------------------------------------------------------------------
+    def _guardar_en_memoria(self, handle: str, escena: dict) -> None:
+        self._memoria[handle] = escena
+        self._memoria.move_to_end(handle)
+        self._bytes_memoria += _tamano(escena)
+
+    def _elegir_volcados(self) -> List[Tuple[str, dict]]:
+        """
+        Saca de memoria las entradas LRU que exceden el presupuesto.
+
+        Quedan en `_volcando` (get() las sigue sirviendo) hasta que _volcar las
+        escribe, ya sin el lock.
+        """
+        a_volcar = []
+        # Siempre dejamos al menos la entrada más reciente en memoria
+        while self._bytes_memoria > self.max_memoria_bytes and len(self._memoria) > 1:
+            handle, escena = self._memoria.popitem(last=False)
+            self._bytes_memoria -= _tamano(escena)
+            self._volcando[handle] = escena
+            a_volcar.append((handle, escena))
+        return a_volcar
+
+    def _ruta(self, handle: str, parte: str) -> str:
+        return os.path.join(self.directorio, f"{handle}.{parte}")
+
+    def _leer_de_disco(self, handle: str) -> Optional[dict]:
+        metadatos, _ = self._disco[handle]
+        try:
+            with open(self._ruta(handle, 'png'), 'rb') as f:
+                png = f.read()
+            with open(self._ruta(handle, 'preview'), 'rb') as f:
+                preview = f.read()
+        except OSError as e:
+            print(f"❌ Error al leer imagen de disco: {e}")
+            self._borrar_de_disco(handle)
+            return None
+        # Al volver a memoria deja de ocupar disco
+        self._borrar_de_disco(handle)
+        return {'png': png, 'preview': preview, **metadatos}
+
+    def _borrar_de_disco(self, handle: str) -> None:
+        _, tamano = self._disco.pop(handle)
+        self._bytes_disco -= tamano
+        self._borrar_ficheros(handle)
+
+    def _borrar_ficheros(self, handle: str) -> None:
+        for parte in ('png', 'preview'):
+            try:
+                os.remove(self._ruta(handle, parte))
+            except OSError:
+                pass
+
+
+def _tamano(escena: dict) -> int:
+    """Bytes ocupados por una imagen codificada (PNG + vista previa)."""
+    return len(escena.get('png', b'')) + len(escena.get('preview', b''))
+
+
+# Instancia compartida por todas las sesiones del proceso
+_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Devuelve el almacén de imágenes compartido del proceso (se crea la primera vez)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ImageStore(
+                    max_memoria_bytes=IMAGE_STORE_MAX_MEMORY_MB * 1024 * 1024,
+                    max_disco_bytes=IMAGE_STORE_MAX_DISK_MB * 1024 * 1024,
+                )
+                # Borrar la carpeta temporal al cerrar el proceso
+                atexit.register(shutil.rmtree, _store.directorio, True)
+    return _store
+
+
+def get_image_store_stats() -> Dict[str, int]:
+    """
+    Uso del almacén compartido sin crearlo.
+
+    Las páginas que solo informan (ej: inicio) no deben crear la carpeta temporal
+    ni registrar su limpieza si nadie ha generado todavía ninguna imagen.
+    """
+    if _store is not None:
+        return _store.stats()
+    return {
+        'entradas_memoria': 0,
+        'bytes_memoria': 0,
+        'max_memoria_bytes': IMAGE_STORE_MAX_MEMORY_MB * 1024 * 1024,
+        'entradas_disco': 0,
+        'bytes_disco': 0,
+        'max_disco_bytes': IMAGE_STORE_MAX_DISK_MB * 1024 * 1024,
+        'volcados_a_disco': 0,
+        'desalojos': 0,
+    }
+
+
+def tamano_imagen(handle: Optional[str]) -> int:
+    """Bytes de la imagen `handle` en el almacén compartido, sin crearlo (0 si no existe)."""
+    return _store.tamano(handle) if _store is not None else 0
@@ -0,0 +1,335 @@
+"""
+Mejor once de cada equipo para una formación (4-3-3, 4-4-2, 3-5-2).
+
+El top 5 por overall de la página de Equipos no sabe de posiciones. Aquí:
+
+  - Cada jugador tiene una puntuación para cada rol (portero, central,
+    lateral, mediocentro, extremo, delantero centro), una media ponderada de
+    los atributos de ese rol (ROLES) que sale de un único producto matriz por
+    matriz sobre la matriz de atributos. Su rol "natural" es, entre los de su
+    posición, aquel en el que más destaca: la misma media sobre los atributos
+    estandarizados y sin el overall, para que la escala de cada atributo o el
+    nivel del jugador no lo decidan (como las posiciones de utils/positions.py).
+    Sin posición conocida es portero si esa es su mayor puntuación (los
+    atributos de portero separan los dos grupos por nivel).
+  - Cada rol pertenece a una posición (POSICION_DE_ROL: central y lateral son
+    de defensa, extremo y delantero centro de delantero...) y los jugadores
+    solo juegan, y solo tienen como rol natural, roles de su posición
+    (utils/positions.py). Si al equipo le faltan jugadores de una posición, el
+    puesto lo ocupa un jugador de otra antes que quedar vacío.
+  - El once es un problema de asignación: cada puesto de la formación recibe
+    un jugador distinto y se maximiza la suma de las puntuaciones de cada
+    jugador en su puesto (un delantero puede acabar de extremo si así el
+    equipo suma más).
+  - El problema se resuelve para todos los equipos a la vez con el algoritmo
+    húngaro vectorizado con NumPy (asignar): cada paso avanza la búsqueda del
+    camino de aumento de todos los equipos, así que el número de pasos solo
+    depende de los puestos (11), no de cuántos equipos haya.
+
+Las alineaciones de FORMACION_POR_DEFECTO de todos los equipos se calculan una
+vez por versión del dataset (en el calentamiento); las de otra formación se
+calculan por equipo al pedirlas, en milisegundos, y se guardan.
+
+API pública:
+  - ROLES, NOMBRES_ROLES, POSICION_DE_ROL, FORMACIONES
+  - asignar(beneficio) -> np.ndarray
+  - ResultadoAlineacion
+  - MotorAlineaciones
+  - get_motor_alineaciones(df) -> MotorAlineaciones
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .attribute_matrix import MatrizAtributos, get_matriz_atributos
+from .const import ALINEACIONES_EQUIPOS_POR_BLOQUE, FORMACION_POR_DEFECTO
+from .positions import COLUMNA_POSICION, PORTERO, POSICIONES
+
+# Roles y atributos que cuentan en cada uno (atributo -> peso; se normalizan)
+ROLES = {
+    'POR': {'gk_diving': 1.0, 'gk_reflexes': 1.0},
+    'DFC': {'heading_accuracy': 1.0, 'jumping': 1.0, 'aggression': 1.0, 'stamina': 0.5, 'overall_rating': 1.0},
+    'LAT': {'sprint_speed': 1.0, 'acceleration': 1.0, 'stamina': 1.0, 'short_passing': 0.5, 'overall_rating': 1.0},
+    'MC': {'short_passing': 2.0, 'ball_control': 1.0, 'stamina': 1.0, 'dribbling': 0.5, 'overall_rating': 1.0},
+    'EXT': {'sprint_speed': 1.0, 'acceleration': 1.0, 'dribbling': 1.0, 'agility': 1.0, 'overall_rating': 1.0},
+    'DC': {'finishing': 2.0, 'shot_power': 1.0, 'heading_accuracy': 0.5, 'ball_control': 0.5, 'overall_rating': 1.0},
+}
+NOMBRES_ROLES = {
+    'POR': 'Portero',
+    'DFC': 'Central',
+    'LAT': 'Lateral',
+    'MC': 'Mediocentro',
+    'EXT': 'Extremo',
+    'DC': 'Delantero centro',
+}
+# Posición (utils/positions.py) a la que pertenece cada rol
+POSICION_DE_ROL = {
+    'POR': PORTERO,
+    'DFC': 'Defensa',
+    'LAT': 'Defensa',
+    'MC': 'Centrocampista',
+    'EXT': 'Delantero',
+    'DC': 'Delantero',
+}
+
+# Puestos de cada formación (rol -> número de jugadores), de la portería hacia delante
+FORMACIONES = {
+    '4-3-3': {'POR': 1, 'DFC': 2, 'LAT': 2, 'MC': 3, 'EXT': 2, 'DC': 1},
+    '4-4-2': {'POR': 1, 'DFC': 2, 'LAT': 2, 'MC': 2, 'EXT': 2, 'DC': 2},
+    '3-5-2': {'POR': 1, 'DFC': 3, 'LAT': 2, 'MC': 3, 'DC': 2},
+}
+
+# Beneficio de dejar un puesto vacío (equipos con menos de 11 jugadores): peor que cualquier jugador
+_PUESTO_VACIO = -1e6
+# Coste de los huecos de relleno de las plantillas más cortas (nunca se eligen)
+_COSTE_RELLENO = 1e9
+# Penalización de un jugador fuera de su posición: peor que cualquiera de la posición (0-100)
+# pero mejor que dejar el puesto vacío
+_FUERA_DE_POSICION = 1e3
+
+
+def asignar(beneficio: np.ndarray) -> np.ndarray:
+    """
+    Asignación óptima de puestos a jugadores de muchos equipos a la vez.
+
+    Algoritmo húngaro (caminos de aumento más cortos con potenciales): se añade un puesto
+    cada vez y se busca el camino de aumento de menor coste, para todos los equipos en el
+    mismo paso de NumPy. Con p puestos son como mucho p·(p+1)/2 pasos de búsqueda, más los
+    de aumento, cada uno sobre la tabla (equipos x jugadores) completa.
+
+    Args:
+        beneficio: (equipos, puestos, jugadores); -inf donde el jugador no existe (relleno).
+                   Cada equipo necesita al menos tantos jugadores válidos como puestos (ver
+                   MotorAlineaciones, que añade puestos vacíos)
+
+    Returns:
+        np.ndarray: (equipos, puestos) con el jugador de cada puesto
+    """
+    equipos, puestos, jugadores = beneficio.shape
+    asignado = np.full((equipos, puestos), -1, dtype=np.intp)
+    if equipos == 0 or puestos == 0:
+        return asignado
+
+    # Minimización con índices desde 1: la fila y la columna 0 son auxiliares
+    coste = np.zeros((equipos, puestos + 1, jugadores + 1))
+    coste[:, 1:, 1:] = np.where(np.isfinite(beneficio), -beneficio, _COSTE_RELLENO)
+    u = np.zeros((equipos, puestos + 1))
+    v = np.zeros((equipos, jugadores + 1))
+    dueno = np.zeros((equipos, jugadores + 1), dtype=np.intp)  # Puesto de cada jugador (0 = ninguno)
+    camino = np.zeros((equipos, jugadores + 1), dtype=np.intp)
+    todos = np.arange(equipos)
+
+    for puesto in range(1, puestos + 1):
+        dueno[:, 0] = puesto
+        j0 = np.zeros(equipos, dtype=np.intp)
+        minimo = np.full((equipos, jugadores + 1), np.inf)
+        usado = np.zeros((equipos, jugadores + 1), dtype=bool)
+
+        # Búsqueda del camino de aumento más corto (los equipos que ya lo tienen no avanzan)
+        activos = todos
+        while len(activos):
+            usado[activos, j0[activos]] = True
+            i0 = dueno[activos, j0[activos]]
+            reducido = coste[activos, i0] - u[activos, i0][:, None] - v[activos]
+            libres = ~usado[activos]
+            mejora = libres & (reducido < minimo[activos])
+            minimo_a = np.where(mejora, reducido, minimo[activos])
+            camino[activos] = np.where(mejora, j0[activos][:, None], camino[activos])
+
+            candidatos = np.where(libres, minimo_a, np.inf)
+            candidatos[:, 0] = np.inf
+            j1 = np.argmin(candidatos, axis=1)
+            delta = candidatos[np.arange(len(activos)), j1]
+
+            # Potenciales: los usados bajan delta (sus puestos suben), los demás acercan su mínimo
+            usados_a = usado[activos]
+            e, j = np.nonzero(usados_a)
+            u[activos[e], dueno[activos[e], j]] += delta[e]
+            v[activos] -= np.where(usados_a, delta[:, None], 0.0)
+            minimo[activos] = np.where(usados_a, minimo_a, minimo_a - delta[:, None])
+
+            j0[activos] = j1
+            activos = activos[dueno[activos, j1] != 0]
+
+        # Aumento: se recorre el camino hacia atrás cambiando cada jugador de puesto
+        activos = todos
+        while len(activos):
+            j1 = camino[activos, j0[activos]]
+            dueno[activos, j0[activos]] = dueno[activos, j1]
+            j0[activos] = j1
+            activos = activos[j1 != 0]
+
+    e, j = np.nonzero(dueno[:, 1:])
+    asignado[e, dueno[e, j + 1] - 1] = j
+    return asignado
+
+
+def _pesos_roles(matriz: MatrizAtributos, excluir=()) -> np.ndarray:
+    """Pesos (atributos x roles) de ROLES normalizados a suma 1 sobre los atributos presentes."""
+    pesos = np.zeros((len(matriz.columnas), len(ROLES)), dtype=np.float32)
+    for r, rol in enumerate(ROLES):
+        presentes = {attr: peso for attr, peso in ROLES[rol].items()
+                     if attr in matriz.posicion and attr not in excluir}
+        total = sum(presentes.values())
+        for attr, peso in presentes.items():
+            pesos[matriz.posicion[attr], r] = peso / total
+    return pesos
+
+
+def _roles_compatibles(df: pd.DataFrame, roles: List[str]) -> np.ndarray:
+    """(jugadores x roles): True si el rol es de la posición del jugador (todos si no se conoce)."""
+    compatibles = np.ones((len(df), len(roles)), dtype=bool)
+    if COLUMNA_POSICION not in df.columns:
+        return compatibles
+    codigos = pd.Categorical(df[COLUMNA_POSICION], categories=POSICIONES).codes
+    por_posicion = np.array([[POSICION_DE_ROL[rol] == posicion for rol in roles] for posicion in POSICIONES])
+    conocida = codigos >= 0
+    compatibles[conocida] = por_posicion[codigos[conocida]]
+    return compatibles
+
+
+@dataclass(frozen=True)
+class ResultadoAlineacion:
+    """Once de un equipo: un jugador por puesto, en el orden de la formación."""
+
+    formacion: str
+    roles: List[str]          # Rol de cada puesto
+    filas: np.ndarray         # Posición (iloc) del jugador de cada puesto; -1 si el puesto queda vacío
+    puntuacion: np.ndarray    # Puntuación del jugador en el rol de su puesto (0-100; NaN si vacío)
+    en_cache: bool
+    tiempo_ms: float
+
+
+class MotorAlineaciones:
+    """Puntuaciones por rol de todos los jugadores y mejores onces de cada equipo."""
+
+    def __init__(self, df: pd.DataFrame, matriz: MatrizAtributos,
+                 equipos_por_bloque: int = ALINEACIONES_EQUIPOS_POR_BLOQUE):
+        self.equipos_por_bloque = equipos_por_bloque
+        # Puntuación de cada jugador en cada rol: un producto (jugadores x atributos) @ (atributos x roles)
+        self.roles = list(ROLES)
+        self.puntuacion_roles = matriz.valores @ _pesos_roles(matriz)
+        self.compatibles = _roles_compatibles(df, self.roles)
+        self.rol_natural = self._rol_natural(matriz)
+
+        # Jugadores de cada equipo, en una tabla (equipos x máximo de jugadores) con -1 de relleno
+        codigos, nombres = pd.factorize(df['team_long_name'])
+        self.equipos = {nombre: i for i, nombre in enumerate(nombres)}
+        con_equipo = np.flatnonzero(codigos >= 0)
+        orden = con_equipo[np.argsort(codigos[con_equipo], kind='stable')]
+        por_equipo = np.bincount(codigos[con_equipo], minlength=len(nombres))
+        inicio = np.concatenate(([0], np.cumsum(por_equipo)[:-1]))
+        posicion = np.arange(len(orden)) - np.repeat(inicio, por_equipo)
+        self.plantillas = np.full((len(nombres), int(por_equipo.max(initial=0))), -1, dtype=np.intp)
+        self.plantillas[codigos[orden], posicion] = orden
+
+        # Formación -> (filas, puntuación) de todos los equipos; (formación, equipo) -> lo mismo de uno
+        self._formaciones: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._por_equipo: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _rol_natural(self, matriz: MatrizAtributos) -> np.ndarray:
+        """Índice en self.roles del rol natural de cada jugador."""
+        portero = self.roles.index('POR')
+        # Jugadores de campo: sobre los valores estandarizados (matriz.z) y sin el overall, que
+        # premia al buen jugador en cualquier rol. Quitar la media de cada jugador no cambiaría
+        # nada: los pesos de cada rol suman 1
+        pesos = _pesos_roles(matriz, excluir=('overall_rating',))
+        perfil = matriz.z @ pesos
+        perfil[:, (pesos.sum(axis=0) == 0) | (np.arange(len(self.roles)) == portero)] = -np.inf
+        perfil[~self.compatibles] = -np.inf
+        natural = np.argmax(perfil, axis=1)
+        # Porteros: los de esa posición y, si no se conoce, los que más puntúan como porteros
+        portero_posible = self.compatibles[:, portero]
+        solo_portero = portero_posible & ~np.isfinite(perfil).any(axis=1)
+        natural[solo_portero | (portero_posible & (np.argmax(self.puntuacion_roles, axis=1) == portero))] = portero
+        return natural.astype(np.int8)
+
+    def roles_de(self, formacion: str) -> List[str]:
+        """Rol de cada puesto de la formación, en orden."""
+        return [rol for rol, cuantos in FORMACIONES[formacion].items() for _ in range(cuantos)]
+
+    def _resolver(self, formacion: str, equipos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Mejores onces de los equipos indicados: (filas, puntuación), ambos (equipos, puestos)."""
+        columnas_roles = [self.roles.index(rol) for rol in self.roles_de(formacion)]
+        puestos = len(columnas_roles)
+        plantillas = self.plantillas[equipos]
+        validos = plantillas >= 0
+        # Sin las columnas de relleno que no usa ningún equipo del bloque
+        plantillas = plantillas[:, :int(validos.sum(axis=1).max(initial=0))]
+        validos = validos[:, :plantillas.shape[1]]
+
+        # Beneficio (equipo, puesto, jugador); cada puesto puede quedar vacío
+        jugadores = np.where(validos, plantillas, 0)
+        puntuaciones = self.puntuacion_roles[jugadores][:, :, columnas_roles]
+        puntuaciones = puntuaciones - np.where(self.compatibles[jugadores][:, :, columnas_roles], 0, _FUERA_DE_POSICION)
+        beneficio = np.where(validos[:, :, None], puntuaciones, -np.inf).transpose(0, 2, 1)
+        vacios = np.full((len(equipos), puestos, puestos), _PUESTO_VACIO)
+        beneficio = np.concatenate([beneficio, vacios], axis=2)
+
+        elegidos = asignar(beneficio)
+        vacio = elegidos >= plantillas.shape[1]
+        filas = np.where(vacio, -1, np.take_along_axis(plantillas, np.minimum(elegidos, plantillas.shape[1] - 1), axis=1))
+        puntuacion = self.puntuacion_roles[np.maximum(filas, 0), np.array(columnas_roles)[None, :]]
+        return filas, np.where(vacio, np.nan, puntuacion).astype(np.float32)
+
+    def calcular(self, formacion: str = FORMACION_POR_DEFECTO) -> float:
+        """Mejores onces de todos los equipos para una formación. Devuelve los ms."""
+        inicio = time.perf_counter()
+        with self._lock:
+            if formacion in self._formaciones:
+                return 0.0
+        # Por bloques de equipos de tamaño parecido, para que las plantillas cortas no
+        # arrastren el relleno de las más largas
+        orden = np.argsort((self.plantillas >= 0).sum(axis=1), kind='stable')
+        puestos = sum(FORMACIONES[formacion].values())
+        filas = np.full((len(orden), puestos), -1, dtype=np.intp)
+        puntuacion = np.full((len(orden), puestos), np.nan, dtype=np.float32)
+        for desde in range(0, len(orden), self.equipos_por_bloque):
+            bloque = orden[desde:desde + self.equipos_por_bloque]
+            filas[bloque], puntuacion[bloque] = self._resolver(formacion, bloque)
+        resultado = (filas, puntuacion)
+        with self._lock:
+            self._formaciones.setdefault(formacion, resultado)
+        return (time.perf_counter() - inicio) * 1000
+
+    def alineacion(self, equipo: str, formacion: str = FORMACION_POR_DEFECTO) -> Optional[ResultadoAlineacion]:
+        """
+        Mejor once de un equipo (None si el equipo no existe).
+
+        Si la formación ya está calculada para todos los equipos se lee de ahí; si no, se
+        resuelve solo este equipo y se guarda.
+        """
+        inicio = time.perf_counter()
+        indice = self.equipos.get(equipo)
+        if indice is None:
+            return None
+        with self._lock:
+            todos = self._formaciones.get(formacion)
+            guardado = (todos[0][indice], todos[1][indice]) if todos is not None else self._por_equipo.get((formacion, indice))
+        en_cache = guardado is not None
+        if not en_cache:
+            filas, puntuacion = self._resolver(formacion, np.array([indice]))
+            guardado = (filas[0], puntuacion[0])
+            with self._lock:
+                self._por_equipo[(formacion, indice)] = guardado
+        return ResultadoAlineacion(
+            formacion=formacion,
+            roles=self.roles_de(formacion),
+            filas=guardado[0],
+            puntuacion=guardado[1],
+            en_cache=en_cache,
+            tiempo_ms=(time.perf_counter() - inicio) * 1000,
+        )
+
+
+def get_motor_alineaciones(df: pd.DataFrame) -> MotorAlineaciones:
+    """Motor de alineaciones de `df` (uno por versión del dataset)."""
+    matriz = get_matriz_atributos(df)
+    return get_agregados(df).indice('alineaciones', lambda: MotorAlineaciones(df, matriz))
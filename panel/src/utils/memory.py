@@ -0,0 +1,359 @@
+"""
+Contabilidad de memoria del proceso: dataset, cachés, sesión y RSS.
+
+Sirve para dimensionar el contenedor con datos en lugar de a ojo. Se mide:
+
+  - dataset: memoria profunda (deep) de cada columna de cada versión en memoria
+  - cachés: agregados y figuras por versión (utils/aggregates.py), imágenes IA
+    (utils/image_store.py) y las cachés de Streamlit (st.cache_data /
+    st.cache_resource y el session_state de todas las sesiones, según las
+    estadísticas del propio runtime)
+  - sesión: lo que ocupa cada clave del st.session_state de la sesión actual;
+    las referencias al dataset compartido no cuentan (no son memoria de la
+    sesión) y las imágenes se cuentan por su handle en el almacén
+  - proceso: RSS actual y pico
+
+Todo se mide bajo demanda salvo el desglose por columnas de cada versión del
+dataset, que no cambia y se calcula una sola vez.
+
+API pública:
+  - tamano_profundo(valor) -> int
+  - memoria_dataset(df) -> pd.DataFrame
+  - memoria_sesion(session_state) -> List[dict]
+  - memoria_caches(figuras) -> List[dict]
+  - memoria_proceso() -> dict
+  - informe_memoria(session_state, figuras) -> dict
+  - exportar_memoria(informe) -> str (formato de texto de Prometheus)
+  - metricas_memoria() -> str (informe sin sesión ni figuras, para el fichero de métricas)
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import agregados_en_memoria
+from .dataset import get_almacen
+from .image_store import get_image_store_stats, tamano_imagen
+
+# Profundidad máxima al recorrer contenedores anidados (evita recorrer grafos enormes)
+PROFUNDIDAD_MAXIMA = 32
+
+_RE_HANDLE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def tamano_profundo(valor: Any, _vistos: Optional[set] = None, _nivel: int = 0) -> int:
+    """
+    Bytes que ocupa `valor` contando lo que contiene (cada objeto se cuenta una vez).
+
+    DataFrames y Series se miden con memory_usage(deep=True) y los arrays de
+    NumPy por sus datos; el resto con sys.getsizeof recorriendo contenedores y
+    atributos.
+    """
+    vistos = _vistos if _vistos is not None else set()
+    if id(valor) in vistos or _nivel > PROFUNDIDAD_MAXIMA:
+        return 0
+    vistos.add(id(valor))
+
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return sys.getsizeof(valor) + (0 if valor.base is not None else valor.nbytes)
+    if isinstance(valor, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(valor)
+
+    tamano = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        for clave, contenido in valor.items():
+            tamano += tamano_profundo(clave, vistos, _nivel + 1) + tamano_profundo(contenido, vistos, _nivel + 1)
+    elif isinstance(valor, (list, tuple, set, frozenset)):
+        for contenido in valor:
+            tamano += tamano_profundo(contenido, vistos, _nivel + 1)
+    elif hasattr(valor, '__dict__') and not isinstance(valor, type):
+        tamano += tamano_profundo(vars(valor), vistos, _nivel + 1)
+    return tamano
+
+
+# ---------- Dataset ----------
+
+# Desglose por columnas de cada DataFrame ya medido (las versiones no cambian)
+_columnas: Dict[int, tuple] = {}  # id(df) -> (df, desglose)
+_columnas_lock = threading.Lock()
+
+
+def memoria_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memoria profunda por columna (el índice incluido), de mayor a menor.
+
+    Returns:
+        pd.DataFrame: columnas 'columna', 'dtype', 'bytes', 'bytes_por_fila', 'pct'
+    """
+    with _columnas_lock:
+        guardado = _columnas.get(id(df))
+        if guardado is not None and guardado[0] is df:
+            return guardado[1]
+
+    por_columna = df.memory_usage(deep=True, index=True)
+    desglose = pd.DataFrame({
+        'columna': por_columna.index.astype(str),
+        'dtype': ['index' if nombre == 'Index' else str(df[nombre].dtype) for nombre in por_columna.index],
+        'bytes': por_columna.to_numpy(dtype=np.int64),
+    })
+    desglose['bytes_por_fila'] = (desglose['bytes'] / max(len(df), 1)).round(1)
+    desglose['pct'] = (desglose['bytes'] / max(int(desglose['bytes'].sum()), 1) * 100).round(1)
+    desglose = desglose.sort_values('bytes', ascending=False, kind='stable').reset_index(drop=True)
+
+    with _columnas_lock:
+        # Solo se guardan las versiones que siguen en memoria
+        vivos = {id(d.df) for d in get_almacen().versiones()} | {id(df)}
+        for clave in [c for c in _columnas if c not in vivos]:
+            del _columnas[clave]
+        _columnas[id(df)] = (df, desglose)
+    return desglose
+
+
+# ---------- Cachés ----------
+
+def _estadisticas_streamlit() -> List[dict]:
+    """Bytes por caché de Streamlit según su runtime (vacío si no hay runtime, ej: en pruebas)."""
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return []
+        estadisticas = Runtime.instance().stats_mgr.get_stats()
+    except Exception:
+        return []
+    # Versiones recientes agrupan por familia de métricas; las antiguas devuelven una lista
+    if hasattr(estadisticas, 'values'):
+        estadisticas = [e for familia in estadisticas.values() for e in familia]
+
+    por_cache: Dict[tuple, dict] = {}
+    for estadistica in estadisticas:
+        bytes_ = getattr(estadistica, 'byte_length', None)
+        categoria = getattr(estadistica, 'category_name', None)
+        if not isinstance(bytes_, int) or not isinstance(categoria, str):
+            continue
+        nombre = getattr(estadistica, 'cache_name', '') or ''
+        fila = por_cache.setdefault((categoria, nombre), {'entradas': 0, 'bytes': 0})
+        fila['entradas'] += 1
+        fila['bytes'] += bytes_
+    return [{
+        'cache': f"streamlit: {categoria}" + (f" ({nombre})" if nombre else ""),
+        'entradas': fila['entradas'],
+        'bytes': fila['bytes'],
+    } for (categoria, nombre), fila in sorted(por_cache.items())]
+
+
+def memoria_caches(figuras: bool = True) -> List[dict]:
+    """
+    Entradas y bytes de cada caché del proceso.
+
+    Args:
+        figuras: Si False no se mide el tamaño de las figuras (solo se cuentan);
+                 medirlas recorre cada figura y puede tardar con muchas en caché
+
+    Returns:
+        list: [{'cache', 'entradas', 'bytes'}] (bytes None si no se ha medido)
+    """
+    filas = []
+    for dataset in get_almacen().versiones():
+        filas.append({
+            'cache': f"dataset v{dataset.version}",
+            'entradas': len(dataset.df),
+            'bytes': int(memoria_dataset(dataset.df)['bytes'].sum()),
+        })
+    versiones = {id(d.df): d.version for d in get_almacen().versiones()}
+    for agregados in agregados_en_memoria():
+        version = versiones.get(id(agregados.df), '?')
+        calculados, en_cache = agregados.contenido()
+        vistos: set = set()  # Las figuras comparten plantillas: se cuentan una vez
+        filas.append({
+            'cache': f"agregados v{version}",
+            'entradas': len(calculados),
+            'bytes': tamano_profundo(calculados),
+        })
+        filas.append({
+            'cache': f"figuras v{version}",
+            'entradas': len(en_cache),
+            'bytes': sum(tamano_profundo(fig, vistos) for fig in en_cache) if figuras else None,
+        })
+    imagenes = get_image_store_stats()
+    filas.append({'cache': "imágenes IA (memoria)", 'entradas': imagenes['entradas_memoria'],
+                  'bytes': imagenes['bytes_memoria']})
+    filas.append({'cache': "imágenes IA (disco)", 'entradas': imagenes['entradas_disco'],
+                  'bytes': imagenes['bytes_disco']})
+    return filas + _estadisticas_streamlit()
+
+
+# ---------- Sesión ----------
+
+def _imagenes_referenciadas(valor: Any, handles: set, _nivel: int = 0) -> None:
+    """Handles de imágenes del almacén que aparecen en `valor` (recorriendo contenedores)."""
+    if _nivel > PROFUNDIDAD_MAXIMA:
+        return
+    if isinstance(valor, str):
+        if _RE_HANDLE.match(valor):
+            handles.add(valor)
+    elif isinstance(valor, dict):
+        for contenido in valor.values():
+            _imagenes_referenciadas(contenido, handles, _nivel + 1)
+    elif isinstance(valor, (list, tuple, set, frozenset)):
+        for contenido in valor:
+            _imagenes_referenciadas(contenido, handles, _nivel + 1)
+
+
+def memoria_sesion(session_state) -> List[dict]:
+    """
+    Memoria de cada clave del st.session_state de una sesión, de mayor a menor.
+
+    Las referencias al dataset compartido se indican pero no cuentan (0 bytes) y
+    las imágenes se cuentan por lo que ocupan en el almacén.
+
+    Returns:
+        list: [{'clave', 'tipo', 'bytes', 'imagenes_bytes', 'nota'}]
+    """
+    compartidos = {}
+    for dataset in get_almacen().versiones():
+        compartidos[id(dataset.df)] = f"referencia al dataset compartido v{dataset.version}"
+        compartidos[id(dataset.informe)] = f"informe de carga compartido de la v{dataset.version}"
+    filas = []
+    for clave in list(session_state.keys()):
+        try:
+            valor = session_state[clave]
+        except KeyError:
+            continue
+        handles: set = set()
+        _imagenes_referenciadas(valor, handles)
+        imagenes = [tamano for tamano in map(tamano_imagen, handles) if tamano]
+        fila = {
+            'clave': str(clave),
+            'tipo': type(valor).__name__,
+            'bytes': 0,
+            'imagenes_bytes': sum(imagenes),
+            'nota': f"{len(imagenes)} imágenes" if imagenes else "",
+        }
+        if valor is not None and id(valor) in compartidos:
+            fila['nota'] = compartidos[id(valor)]
+        else:
+            fila['bytes'] = tamano_profundo(valor)
+        filas.append(fila)
+    return sorted(filas, key=lambda f: f['bytes'] + f['imagenes_bytes'], reverse=True)
+
+
+# ---------- Proceso ----------
+
+def memoria_proceso() -> dict:
+    """
+    Memoria residente del proceso.
+
+    Returns:
+        dict: {'rss_bytes' (actual, de /proc; None fuera de Linux), 'rss_pico_bytes' (None sin `resource`)}
+    """
+    rss = None
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linea in f:
+                if linea.startswith('VmRSS:'):
+                    rss = int(linea.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+
+    pico = None
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KB y macOS en bytes
+        pico = pico if sys.platform == 'darwin' else pico * 1024
+    except ImportError:
+        pass
+    return {'rss_bytes': rss, 'rss_pico_bytes': pico}
+
+
+# ---------- Informe completo ----------
+
+def informe_memoria(session_state=None, figuras: bool = True) -> dict:
+    """
+    Informe completo de memoria.
+
+    Args:
+        session_state: st.session_state de la sesión a desglosar (None = sin sesión)
+        figuras: Si False, las figuras en caché se cuentan pero no se miden
+
+    Returns:
+        dict: {'fecha', 'pid', 'proceso': {...}, 'dataset': [{'version', 'actual', 'filas', 'bytes',
+               'columnas': [...]}], 'caches': [...], 'sesion': [...], 'sesion_bytes'}
+    """
+    inicio = time.perf_counter()
+    almacen = get_almacen()
+    actual = almacen.estado()['version_actual']
+    datasets = []
+    for dataset in almacen.versiones():
+        desglose = memoria_dataset(dataset.df)
+        datasets.append({
+            'version': dataset.version,
+            'actual': dataset.version == actual,
+            'filas': len(dataset.df),
+            'bytes': int(desglose['bytes'].sum()),
+            'columnas': desglose.to_dict('records'),
+        })
+    sesion = memoria_sesion(session_state) if session_state is not None else []
+    return {
+        'fecha': time.time(),
+        'pid': os.getpid(),
+        'proceso': memoria_proceso(),
+        'dataset': datasets,
+        'caches': memoria_caches(figuras),
+        'sesion': sesion,
+        'sesion_bytes': sum(f['bytes'] + f['imagenes_bytes'] for f in sesion),
+        'duracion_ms': (time.perf_counter() - inicio) * 1000,
+    }
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def exportar_memoria(informe: dict) -> str:
+    """Informe de memoria en el formato de texto de Prometheus (gauges)."""
+    lineas = []
+
+    def gauge(nombre: str, ayuda: str, valores: List[tuple]) -> None:
+        valores = [(etiquetas, valor) for etiquetas, valor in valores if valor is not None]
+        if not valores:
+            return
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for etiquetas, valor in valores:
+            texto = ",".join(f'{clave}="{_escapar(str(v))}"' for clave, v in etiquetas.items())
+            lineas.append(f"{nombre}{{{texto}}} {valor}" if texto else f"{nombre} {valor}")
+
+    proceso = informe['proceso']
+    gauge("soccer_process_rss_bytes", "Memoria residente del proceso", [({}, proceso['rss_bytes'])])
+    gauge("soccer_process_peak_rss_bytes", "Pico de memoria residente del proceso", [({}, proceso['rss_pico_bytes'])])
+    gauge("soccer_dataset_column_bytes", "Memoria profunda de cada columna del dataset", [
+        ({'version': d['version'], 'column': c['columna']}, c['bytes'])
+        for d in informe['dataset'] for c in d['columnas']
+    ])
+    gauge("soccer_cache_bytes", "Bytes de cada caché del proceso", [
+        ({'cache': c['cache']}, c['bytes']) for c in informe['caches']
+    ])
+    gauge("soccer_cache_entries", "Entradas de cada caché del proceso", [
+        ({'cache': c['cache']}, c['entradas']) for c in informe['caches']
+    ])
+    if informe['sesion']:
+        gauge("soccer_session_state_bytes", "Memoria del session_state de la sesión que exporta",
+              [({}, informe['sesion_bytes'])])
+    return "\n".join(lineas) + "\n"
+
+
+def metricas_memoria() -> str:
+    """Métricas de memoria baratas de calcular (sin sesión y sin medir figuras) para escribir_metricas()."""
+    return exportar_memoria(informe_memoria(figuras=False))
@@ -0,0 +1,252 @@
+"""
+Búsqueda de jugadores por nombre, tolerante a tildes y a erratas.
+
+Los selectores de jugadores mostraban listas recortadas (los 100 mejores en IA
+Players) o la lista completa de nombres, que con un dataset grande es enorme.
+Este índice permite buscar mientras se escribe en cualquier página:
+
+  - Plegado de tildes: "Agüero", "Aguero" y "AGUERO" son lo mismo (también
+    ß, ø, ł y compañía, habituales en nombres de otras ligas).
+  - Autocompletado por prefijo: "cris ron" -> "Cristiano Ronaldo". El
+    vocabulario (las palabras distintas de todos los nombres) está ordenado,
+    así que cada prefijo es una búsqueda binaria.
+  - Trigramas: para las erratas ("mesi", "ronaldiño") se cuentan los trigramas
+    que comparte cada palabra del vocabulario con la buscada (listas invertidas
+    por trigrama) y se puntúa con el índice de Jaccard.
+
+Se compara palabra a palabra y no el nombre entero, para que "mesi" encuentre a
+"Lionel Messi" aunque el nombre completo tenga muchos más trigramas. Los nombres
+sintéticos a escala combinan nombres y apellidos reales, así que el vocabulario
+apenas crece con el dataset: la búsqueda trabaja sobre el vocabulario y solo al
+final reparte las puntuaciones entre los nombres, y con un millón de jugadores
+sigue por debajo de los 10 ms. El índice se construye con operaciones
+vectorizadas una vez por versión del dataset (ver Agregados.indice).
+
+API pública:
+  - plegar(texto) -> str
+  - ResultadoBusqueda
+  - IndiceNombres
+  - get_indice_nombres(df) -> IndiceNombres
+  - mejores_jugadores(df, limite) -> List[str] (sin construir el índice)
+"""
+
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .const import BUSQUEDA_LIMITE_POR_DEFECTO, BUSQUEDA_SIMILITUD_MINIMA
+
+# Letras que NFKD no descompone en letra base + tilde
+_SIN_DESCOMPONER = str.maketrans({
+    'ß': 'ss', 'ø': 'o', 'Ø': 'o', 'ł': 'l', 'Ł': 'l', 'đ': 'd', 'Đ': 'd',
+    'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe', 'ı': 'i', 'þ': 'th', 'ð': 'd',
+})
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+# Alfabeto de los trigramas tras el plegado: espacio, a-z y 0-9
+_BASE = 37
+_CODIGOS = np.zeros(128, dtype=np.int32)
+_CODIGOS[ord('a'):ord('z') + 1] = np.arange(1, 27)
+_CODIGOS[ord('0'):ord('9') + 1] = np.arange(27, 37)
+
+
+def plegar(texto: str) -> str:
+    """Minúsculas, sin tildes y con las palabras separadas por un solo espacio ("Agüero Jr." -> "aguero jr")."""
+    texto = unicodedata.normalize('NFKD', str(texto).translate(_SIN_DESCOMPONER))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return _NO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+def _trigramas(plegados: np.ndarray):
+    """
+    Trigramas (sin repetir) de cada texto plegado, con un espacio delante y otro detrás.
+
+    Returns:
+        (dueño, trigrama): arrays paralelos con la posición del texto y el código del trigrama
+    """
+    relleno = np.char.add(np.char.add(' ', plegados.astype(str)), ' ')
+    longitudes = np.char.str_len(relleno)
+    ancho = max(int(longitudes.max()) if len(relleno) else 0, 3)
+    caracteres = np.asarray(relleno, dtype=f'U{ancho}').view(np.uint32).reshape(len(relleno), ancho)
+    codigos = _CODIGOS[np.minimum(caracteres, 127)]
+    trigramas = (codigos[:, :-2] * _BASE + codigos[:, 1:-1]) * _BASE + codigos[:, 2:]
+    validos = np.arange(ancho - 2) < (longitudes - 2)[:, None]
+    dueno = np.broadcast_to(np.arange(len(relleno))[:, None], trigramas.shape)[validos]
+    claves = np.unique(dueno.astype(np.int64) * _BASE ** 3 + trigramas[validos])
+    return claves // _BASE ** 3, claves % _BASE ** 3
+
+
+def _rangos(inicio: np.ndarray, fin: np.ndarray) -> np.ndarray:
+    """Concatenación de arange(inicio[i], fin[i]) para todos los i, sin bucles."""
+    longitudes = fin - inicio
+    desplazamiento = np.repeat(inicio - np.concatenate(([0], np.cumsum(longitudes)[:-1])), longitudes)
+    return desplazamiento + np.arange(longitudes.sum())
+
+
+@dataclass(frozen=True)
+class ResultadoBusqueda:
+    """Jugadores que coinciden con un texto, del más al menos relevante."""
+
+    nombres: List[str]
+    filas: np.ndarray       # Posición (iloc) del primer jugador con cada nombre
+    puntuacion: np.ndarray  # 0-1 (1 = todas las palabras buscadas están enteras en el nombre)
+    tiempo_ms: float
+
+
+class IndiceNombres:
+    """Índice de nombres de jugador (por palabras, prefijos y trigramas) de una versión del dataset."""
+
+    def __init__(self, nombres: List[str], filas: np.ndarray, rating: np.ndarray):
+        self.nombres = list(nombres)
+        self.filas = np.asarray(filas, dtype=np.int64)
+        self.rating = np.asarray(rating, dtype=np.float32)
+
+        # Palabras de cada nombre. Se pliega cada palabra distinta una sola vez: los nombres
+        # se repiten mucho menos que las palabras ("Sergio", "Ramos"...)
+        duenos, crudas = [], []
+        for i, nombre in enumerate(self.nombres):
+            for palabra in str(nombre).split():
+                duenos.append(i)
+                crudas.append(palabra)
+        codigos, distintas = pd.factorize(pd.Series(crudas, dtype=object))
+        # Una palabra plegada puede dar varias ("Ron-Robert" -> "ron robert") o ninguna
+        plegadas = [plegar(palabra).split() for palabra in distintas]
+        cuantas = np.array([len(p) for p in plegadas], dtype=np.int64)
+        primera = np.concatenate(([0], np.cumsum(cuantas)[:-1]))
+        todas = np.array([palabra for p in plegadas for palabra in p], dtype=str)
+
+        # Vocabulario (palabras plegadas distintas, ordenadas) y, por cada palabra, el tramo
+        # de palabra_dueno con los nombres que la contienen
+        self.vocabulario, de_vocabulario = np.unique(todas, return_inverse=True)
+        repeticiones = cuantas[codigos]
+        palabra = de_vocabulario[_rangos(primera[codigos], primera[codigos] + repeticiones)]
+        dueno = np.repeat(np.asarray(duenos, dtype=np.int64), repeticiones)
+        orden = np.argsort(palabra, kind='stable')
+        self.palabra_dueno = dueno[orden]
+        self.fin_palabra = np.cumsum(np.bincount(palabra, minlength=len(self.vocabulario)))
+        self.inicio_palabra = self.fin_palabra - np.bincount(palabra, minlength=len(self.vocabulario))
+
+        # Listas invertidas de trigramas del vocabulario (trigrama -> palabras que lo contienen)
+        dueno, trigramas = _trigramas(self.vocabulario)
+        orden = np.argsort(trigramas, kind='stable')
+        self.trigrama_palabra = dueno[orden]
+        self.trigramas, self.inicio_trigrama = np.unique(trigramas[orden], return_index=True)
+        self.fin_trigrama = np.append(self.inicio_trigrama[1:], len(orden))
+        self.trigramas_por_palabra = np.bincount(dueno, minlength=len(self.vocabulario))
+
+    def mejores(self, limite: int = BUSQUEDA_LIMITE_POR_DEFECTO) -> List[str]:
+        """Nombres de los jugadores con más rating (sugerencias antes de escribir nada)."""
+        limite = min(limite, len(self.nombres))
+        if not limite:
+            return []
+        elegidos = np.argpartition(-self.rating, limite - 1)[:limite]
+        elegidos = elegidos[np.argsort(-self.rating[elegidos], kind='stable')]
+        return [self.nombres[i] for i in elegidos.tolist()]
+
+    def _puntuar_vocabulario(self, palabra: str) -> np.ndarray:
+        """
+        Parecido de `palabra` con cada palabra del vocabulario: 1 si es igual, 0.9 si es
+        su principio (autocompletado) y, si no, 0.8 x la similitud de trigramas.
+        """
+        puntos = np.zeros(len(self.vocabulario), dtype=np.float32)
+
+        _, trigramas = _trigramas(np.array([palabra]))
+        presentes = trigramas[np.isin(trigramas, self.trigramas, assume_unique=True)]
+        if len(presentes):
+            posiciones = np.searchsorted(self.trigramas, presentes)
+            palabras = self.trigrama_palabra[_rangos(self.inicio_trigrama[posiciones], self.fin_trigrama[posiciones])]
+            compartidos = np.bincount(palabras, minlength=len(self.vocabulario))
+            similitud = compartidos / (len(trigramas) + self.trigramas_por_palabra - compartidos)
+            puntos = np.where(similitud >= BUSQUEDA_SIMILITUD_MINIMA, 0.8 * similitud, 0).astype(np.float32)
+
+        desde = np.searchsorted(self.vocabulario, palabra, side='left')
+        hasta_exacta = np.searchsorted(self.vocabulario, palabra, side='right')
+        hasta = np.searchsorted(self.vocabulario, palabra + '\uffff', side='left')
+        puntos[desde:hasta] = 0.9
+        puntos[desde:hasta_exacta] = 1.0
+        return puntos
+
+    def buscar(self, texto: str, limite: int = BUSQUEDA_LIMITE_POR_DEFECTO) -> ResultadoBusqueda:
+        """
+        Jugadores cuyo nombre coincide con `texto`, ordenados por relevancia.
+
+        Cada palabra buscada puntúa con la palabra del nombre que más se le parece
+        y la puntuación del nombre es la media; a igualdad, va antes el de más rating.
+
+        Args:
+            texto: Texto buscado (con o sin tildes, mayúsculas, nombre parcial o con erratas)
+            limite: Máximo de resultados
+
+        Returns:
+            ResultadoBusqueda
+        """
+        inicio = time.perf_counter()
+        buscadas = plegar(texto).split()
+        total = np.zeros(len(self.nombres), dtype=np.float32)
+        for palabra in buscadas:
+            puntos_vocabulario = self._puntuar_vocabulario(palabra)
+            # De menor a mayor puntuación: al asignar, la última (la mejor) palabra de cada nombre gana
+            relevantes = np.flatnonzero(puntos_vocabulario)
+            relevantes = relevantes[np.argsort(puntos_vocabulario[relevantes], kind='stable')]
+            tramos = _rangos(self.inicio_palabra[relevantes], self.fin_palabra[relevantes])
+            mejor = np.zeros(len(self.nombres), dtype=np.float32)
+            mejor[self.palabra_dueno[tramos]] = np.repeat(
+                puntos_vocabulario[relevantes], self.fin_palabra[relevantes] - self.inicio_palabra[relevantes])
+            total += mejor
+
+        candidatos = np.empty(0, dtype=np.int64)
+        if buscadas:
+            total /= len(buscadas)
+            candidatos = np.flatnonzero(total >= BUSQUEDA_SIMILITUD_MINIMA)
+        # Puntuación redondeada a centésimas y, a igualdad, el rating (clave única: rating < 100)
+        clave = np.round(total[candidatos].astype(np.float64), 2) * 1e4 + self.rating[candidatos]
+        if len(candidatos) > limite:
+            elegidos = np.argpartition(-clave, limite - 1)[:limite]
+            candidatos, clave = candidatos[elegidos], clave[elegidos]
+        candidatos = candidatos[np.argsort(-clave, kind='stable')]
+        return ResultadoBusqueda(
+            nombres=[self.nombres[i] for i in candidatos.tolist()],
+            filas=self.filas[candidatos],
+            puntuacion=total[candidatos],
+            tiempo_ms=(time.perf_counter() - inicio) * 1000,
+        )
+
+
+def _nombres_filas_y_rating(df: pd.DataFrame):
+    """Nombres distintos, fila (iloc) del primer jugador con cada uno y su rating (0 si falta)."""
+    agregados = get_agregados(df)
+    nombres = list(agregados.fila_de_jugador)
+    filas = np.fromiter(agregados.fila_de_jugador.values(), dtype=np.int64, count=len(nombres))
+    if 'overall_rating' in df.columns:
+        rating = pd.to_numeric(df['overall_rating'], errors='coerce').to_numpy(dtype=np.float32, na_value=0)[filas]
+    else:
+        rating = np.zeros(len(filas), dtype=np.float32)
+    return nombres, filas, rating
+
+
+def get_indice_nombres(df: pd.DataFrame) -> IndiceNombres:
+    """Índice de nombres de `df` (se construye una vez por versión del dataset)."""
+    return get_agregados(df).indice('nombres', lambda: IndiceNombres(*_nombres_filas_y_rating(df)))
+
+
+def mejores_jugadores(df: pd.DataFrame, limite: int = BUSQUEDA_LIMITE_POR_DEFECTO) -> List[str]:
+    """
+    Jugadores con más rating, como IndiceNombres.mejores(), sin construir el índice
+    (a igualdad de rating, el que va antes en el DataFrame).
+
+    Los selectores los ofrecen mientras no se escribe nada, así que la primera
+    visita a una página no paga el índice completo (vocabulario y trigramas)
+    hasta que alguien busca.
+    """
+    def construir():
+        nombres, _, rating = _nombres_filas_y_rating(df)
+        return np.array(nombres, dtype=object), np.argsort(-rating, kind='stable')
+
+    nombres, orden = get_agregados(df).indice('nombres_por_rating', construir)
+    return nombres[orden[:limite]].tolist()
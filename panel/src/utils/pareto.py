@@ -0,0 +1,210 @@
+"""
+Frontera de Pareto entre dos o tres atributos ("finalización frente a
+velocidad").
+
+Un jugador está en la frontera si ningún otro le iguala o supera en todos los
+atributos elegidos y le supera en alguno: son los mejores compromisos posibles
+entre esos atributos. Comparar cada pareja de jugadores es O(n²); aquí la
+frontera sale de un barrido en O(n log n):
+
+  - Antes se descartan los dominados por unos pocos pivotes (el jugador de
+    mayor suma y el mejor de cada atributo), que suelen ser casi todos: la
+    ordenación se hace sobre los que quedan.
+  - Se ordenan los puntos de mayor a menor (primer atributo, luego el segundo
+    y el tercero) y se agrupan los repetidos, que comparten destino. Así todo
+    jugador que domina a otro va antes que él en el orden.
+  - 2 atributos: un punto está en la frontera si su segundo atributo supera al
+    máximo de todos los anteriores (un máximo acumulado, vectorizado).
+  - 3 atributos: de cada pareja (primer, segundo atributo) solo puede estar en
+    la frontera el de mayor tercer atributo. Los que quedan se recorren con una
+    "escalera" de los puntos de la frontera ya vistos (segundo atributo
+    creciente, tercero decreciente) en la que se busca con bisect. Con
+    atributos de 0 a 100 quedan como mucho 101² puntos que recorrer, tenga el
+    dataset los jugadores que tenga.
+
+Las fronteras se guardan por versión del dataset (LRU por atributos, liga y
+equipo), de modo que volver a una combinación ya vista no recalcula nada.
+
+API pública:
+  - ResultadoPareto
+  - frontera_pareto(valores) -> np.ndarray
+  - MotorPareto
+  - get_motor_pareto(df) -> MotorPareto
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .const import PARETO_CACHE_MAX
+
+
+@dataclass(frozen=True)
+class ResultadoPareto:
+    """Jugadores de la frontera de Pareto, ordenados por el primer atributo (de mayor a menor)."""
+
+    filas: np.ndarray       # Posiciones (iloc) en el DataFrame
+    candidatos: int         # Jugadores comparados (tras los filtros y sin valores que falten)
+    en_cache: bool          # Si la frontera ya estaba calculada
+    tiempo_ms: float
+
+
+def _frontera_2d(puntos: np.ndarray) -> np.ndarray:
+    """Máscara de la frontera de puntos únicos ordenados de mayor a menor."""
+    maximo_previo = np.maximum.accumulate(puntos[:, 1])
+    en_frontera = np.ones(len(puntos), dtype=bool)
+    en_frontera[1:] = puntos[1:, 1] > maximo_previo[:-1]
+    return en_frontera
+
+
+def _frontera_3d(puntos: np.ndarray) -> np.ndarray:
+    """Máscara de la frontera de puntos únicos ordenados de mayor a menor."""
+    en_frontera = np.zeros(len(puntos), dtype=bool)
+    # El primero de cada pareja (x, y) tiene el mayor z: los demás están dominados por él
+    primeros = np.ones(len(puntos), dtype=bool)
+    primeros[1:] = (puntos[1:, :2] != puntos[:-1, :2]).any(axis=1)
+
+    # Escalera de la frontera vista hasta ahora: y creciente, z decreciente
+    ys, zs = [], []
+    for i, y, z in zip(np.flatnonzero(primeros).tolist(),
+                       puntos[primeros, 1].tolist(), puntos[primeros, 2].tolist()):
+        # Todos los anteriores tienen x >= la del punto: lo domina alguno con y' >= y y z' >= z,
+        # y de esos el de mayor z es el primero de la escalera con y' >= y
+        j = bisect_left(ys, y)
+        if j < len(ys) and zs[j] >= z:
+            continue
+        en_frontera[i] = True
+        # Fuera de la escalera los que ahora quedan por debajo (y' <= y, z' <= z)
+        fin = bisect_right(ys, y)
+        inicio = fin
+        while inicio > 0 and zs[inicio - 1] <= z:
+            inicio -= 1
+        ys[inicio:fin] = [y]
+        zs[inicio:fin] = [z]
+    return en_frontera
+
+
+def frontera_pareto(valores: np.ndarray) -> np.ndarray:
+    """
+    Frontera de Pareto (maximizando todas las columnas) en O(n log n).
+
+    Args:
+        valores: Matriz (n, 2) o (n, 3), sin valores que falten
+
+    Returns:
+        np.ndarray: Posiciones de las filas no dominadas, ordenadas de mayor a menor
+        (primera columna, luego la segunda y la tercera)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if valores.ndim != 2 or valores.shape[1] not in (2, 3):
+        raise ValueError("la frontera de Pareto se calcula sobre 2 o 3 atributos")
+    posiciones, valores = _podar(valores)
+    if len(valores) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # De mayor a menor: lexsort ordena por la última clave, de menor a mayor
+    orden = np.lexsort(valores.T[::-1])[::-1]
+    ordenados = valores[orden]
+    nuevo = np.ones(len(ordenados), dtype=bool)
+    nuevo[1:] = (ordenados[1:] != ordenados[:-1]).any(axis=1)
+    grupo = np.cumsum(nuevo) - 1
+
+    unicos = ordenados[nuevo]
+    en_frontera = _frontera_2d(unicos) if valores.shape[1] == 2 else _frontera_3d(unicos)
+    return posiciones[orden[en_frontera[grupo]]]
+
+
+def _podar(valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Descarta, antes de ordenar, los puntos dominados por unos pocos pivotes: el de mayor
+    suma y el mejor de cada columna entre los que quedan. El de mayor suma domina por sí
+    solo a la gran mayoría, y la ordenación (lo caro) se hace sobre el resto.
+
+    Returns:
+        (posiciones, valores): filas que quedan y sus valores
+    """
+    posiciones = np.arange(len(valores))
+    columnas = [np.ascontiguousarray(valores[:, j]) for j in range(valores.shape[1])]
+    pivotes = [lambda columnas: np.argmax(sum(columnas))]
+    pivotes += [lambda columnas, j=j: np.argmax(columnas[j]) for j in range(len(columnas))]
+    for elegir in pivotes:
+        if len(posiciones) == 0:
+            break
+        i = elegir(columnas)
+        no_mayor = np.ones(len(posiciones), dtype=bool)
+        menor = np.zeros(len(posiciones), dtype=bool)
+        for columna in columnas:
+            no_mayor &= columna <= columna[i]
+            menor |= columna < columna[i]
+        quedan = ~(no_mayor & menor)
+        posiciones = posiciones[quedan]
+        columnas = [columna[quedan] for columna in columnas]
+    return posiciones, np.column_stack(columnas) if columnas else valores
+
+
+class MotorPareto:
+    """Fronteras de Pareto de una versión del dataset, con caché por atributos y filtros."""
+
+    def __init__(self, max_cache: int = PARETO_CACHE_MAX):
+        self.max_cache = max_cache
+        self._cache: "OrderedDict[Tuple, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def frontera(self, df: pd.DataFrame, atributos: Sequence[str],
+                 liga: Optional[str] = None, equipo: Optional[str] = None) -> ResultadoPareto:
+        """
+        Jugadores no dominados en los atributos elegidos.
+
+        Args:
+            df: DataFrame de la versión del motor
+            atributos: 2 o 3 columnas numéricas (más es mejor en todas)
+            liga, equipo: Filtros (None = sin filtro)
+
+        Returns:
+            ResultadoPareto
+        """
+        inicio = time.perf_counter()
+        clave = (tuple(atributos), liga, equipo)
+        with self._lock:
+            guardado = self._cache.get(clave)
+            if guardado is not None:
+                self._cache.move_to_end(clave)
+        if guardado is not None:
+            filas, candidatos = guardado
+            return ResultadoPareto(filas, candidatos, True, (time.perf_counter() - inicio) * 1000)
+
+        candidatas = get_agregados(df).filas_filtradas(liga, equipo)
+        filas = np.arange(len(df)) if candidatas is None else candidatas
+        columnas = []
+        for columna in atributos:
+            serie = df[columna] if candidatas is None else df[columna].iloc[candidatas]
+            columnas.append(pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan))
+        # Sin los jugadores a los que les falta alguno de los atributos
+        faltan = np.zeros(len(filas), dtype=bool)
+        for valores in columnas:
+            faltan |= np.isnan(valores)
+        if faltan.any():
+            filas = filas[~faltan]
+            columnas = [valores[~faltan] for valores in columnas]
+        valores = np.column_stack(columnas)
+
+        filas = filas[frontera_pareto(valores)]
+        filas.flags.writeable = False
+        with self._lock:
+            self._cache[clave] = (filas, len(valores))
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+        return ResultadoPareto(filas, len(valores), False, (time.perf_counter() - inicio) * 1000)
+
+
+def get_motor_pareto(df: pd.DataFrame) -> MotorPareto:
+    """Motor de fronteras de Pareto de `df` (uno por versión del dataset)."""
+    return get_agregados(df).indice('pareto', MotorPareto)
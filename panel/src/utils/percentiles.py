@@ -0,0 +1,106 @@
+"""
+Percentiles de cada atributo, en todo el dataset y dentro de la liga de cada
+jugador ("percentil 97 en regate en la Liga BBVA").
+
+Se calculan una vez por versión del dataset y quedan en un uint8 por jugador y
+atributo (0-100; SIN_VALOR si al jugador le falta el atributo), así que las
+tarjetas, los radares y los rankings consultan el percentil en O(1) en lugar de
+ordenar a todos los jugadores en cada vista. El percentil es el porcentaje de
+jugadores (del dataset o de su liga) con un valor igual o menor, redondeado
+hacia abajo: solo el mejor tiene el 100.
+
+Se construyen a partir de los códigos uint8 del índice de scouting
+(utils/scouting.py), con un histograma acumulado por atributo (y por liga y
+atributo): O(n) por atributo, sin ordenar nada.
+
+API pública:
+  - IndicePercentiles
+  - get_indice_percentiles(df) -> IndicePercentiles
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .const import ATRIBUTOS_JUGADOR
+from .scouting import SIN_VALOR, IndiceScouting, get_indice_scouting
+
+
+def _percentiles(codigos: np.ndarray, grupos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Percentil de cada fila dentro de su grupo (todas en el mismo si no hay grupos).
+
+    Args:
+        codigos: Códigos uint8 de un atributo (SIN_VALOR si falta)
+        grupos: Código de grupo de cada fila (-1 = sin grupo)
+
+    Returns:
+        np.ndarray: uint8 de 0 a 100 (SIN_VALOR si falta el valor o el grupo)
+    """
+    if grupos is None:
+        grupos = np.zeros(len(codigos), dtype=np.int32)
+    # Las filas sin grupo van a un grupo más, cuyo percentil es SIN_VALOR
+    num_grupos = int(grupos.max(initial=-1)) + 2
+    grupos = np.where(grupos >= 0, grupos, num_grupos - 1).astype(np.int32)
+
+    # Histograma por (grupo, código) acumulado por código: jugadores con un valor igual o menor.
+    # Los que faltan (SIN_VALOR, el último código) no cuentan en el total del grupo
+    clave = grupos * 256 + codigos
+    acumulado = np.cumsum(np.bincount(clave, minlength=num_grupos * 256).reshape(num_grupos, 256), axis=1)
+    total = acumulado[:, SIN_VALOR - 1:SIN_VALOR]
+
+    # Tabla (grupo, código) -> percentil, y una sola consulta por fila
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tabla = np.where(total > 0, 100 * acumulado // np.maximum(total, 1), SIN_VALOR).astype(np.uint8)
+    tabla[:, SIN_VALOR] = SIN_VALOR
+    tabla[-1] = SIN_VALOR
+    return tabla.ravel()[clave]
+
+
+class IndicePercentiles:
+    """Percentil global y dentro de su liga de cada jugador en cada atributo (uint8)."""
+
+    def __init__(self, scouting: IndiceScouting):
+        self.atributos = [columna for columna in ATRIBUTOS_JUGADOR if columna in scouting.codigos]
+        ligas = scouting.codigos.get('league_name')
+        self.global_: Dict[str, np.ndarray] = {}
+        self.en_liga: Dict[str, np.ndarray] = {}
+        for atributo in self.atributos:
+            self.global_[atributo] = _percentiles(scouting.codigos[atributo])
+            if ligas is not None:
+                self.en_liga[atributo] = _percentiles(scouting.codigos[atributo], ligas)
+
+    def _tabla(self, por_liga: bool) -> Dict[str, np.ndarray]:
+        return self.en_liga if por_liga else self.global_
+
+    def percentil(self, fila: int, atributo: str, por_liga: bool = False) -> Optional[int]:
+        """Percentil de un jugador (posición iloc) en un atributo (None si no lo tiene)."""
+        tabla = self._tabla(por_liga)
+        if atributo not in tabla:
+            return None
+        valor = int(tabla[atributo][fila])
+        return None if valor == SIN_VALOR else valor
+
+    def percentiles(self, filas: Sequence[int], atributos: Sequence[str], por_liga: bool = False) -> np.ndarray:
+        """
+        Percentiles de varios jugadores en varios atributos.
+
+        Returns:
+            np.ndarray: float (len(filas), len(atributos)), NaN donde no hay percentil
+        """
+        tabla = self._tabla(por_liga)
+        filas = np.asarray(filas, dtype=np.intp)
+        resultado = np.full((len(filas), len(atributos)), np.nan)
+        for j, atributo in enumerate(atributos):
+            if atributo in tabla:
+                valores = tabla[atributo][filas]
+                resultado[:, j] = np.where(valores == SIN_VALOR, np.nan, valores)
+        return resultado
+
+
+def get_indice_percentiles(df: pd.DataFrame) -> IndicePercentiles:
+    """Percentiles de `df` (se calculan una vez por versión del dataset)."""
+    scouting = get_indice_scouting(df)
+    return get_agregados(df).indice('percentiles', lambda: IndicePercentiles(scouting))
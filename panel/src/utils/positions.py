@@ -0,0 +1,164 @@
+"""
+Posición de cada jugador (portero, defensa, centrocampista o delantero).
+
+El dataset no trae la posición. Antes los porteros se reconocían con la regla
+`gk_reflexes > 10`, repetida en varias páginas, y de los jugadores de campo no
+se sabía nada. Aquí la posición se calcula una sola vez al construir cada
+versión del dataset (utils/data_loader.py) y queda en la columna categórica
+COLUMNA_POSICION:
+
+  - Porteros: regla sobre la media de gk_diving y gk_reflexes, pero con el
+    umbral que separa los dos grupos del propio dataset (k-means de una
+    dimensión con dos centros) en lugar de un número fijo. Si los dos centros
+    no se separan al menos POSICIONES_SEPARACION_PORTEROS puntos, no hay
+    porteros que separar.
+  - Jugadores de campo: k-means con tres centros sobre el perfil de cada
+    jugador en ATRIBUTOS_CAMPO, estandarizados y sin el nivel medio del propio
+    jugador (importa en qué destaca, no lo bueno que es). Los centros de
+    partida salen de reglas (PERFILES: el defensa destaca en cabeceo y
+    agresividad, el delantero en finalización...), así que cada grupo conserva
+    su posición y el resultado es el mismo en cada carga. Se ajusta sobre una
+    muestra de como mucho POSICIONES_MUESTRA_MAX jugadores y después se asigna
+    a todos, por bloques vectorizados.
+
+Las páginas filtran por posición con la columna o con las filas por posición de
+los agregados (Agregados.filas_de_posicion), nunca con umbrales propios.
+
+API pública:
+  - COLUMNA_POSICION, POSICIONES, PORTERO
+  - clasificar_posiciones(df) -> pd.Categorical
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .const import (POSICIONES_ITERACIONES_MAX, POSICIONES_MUESTRA_MAX,
+                    POSICIONES_SEPARACION_PORTEROS)
+
+COLUMNA_POSICION = 'posicion'
+PORTERO = 'Portero'
+POSICIONES = [PORTERO, 'Defensa', 'Centrocampista', 'Delantero']
+
+ATRIBUTOS_PORTERO = ['gk_diving', 'gk_reflexes']
+ATRIBUTOS_CAMPO = ['finishing', 'short_passing', 'heading_accuracy', 'aggression', 'ball_control', 'stamina']
+
+# Perfil de partida de cada posición de campo: en qué destaca (+1) y en qué no (-1)
+PERFILES = {
+    'Defensa': {'heading_accuracy': 1.0, 'aggression': 1.0, 'finishing': -1.0},
+    'Centrocampista': {'short_passing': 1.0, 'stamina': 1.0, 'ball_control': 1.0, 'heading_accuracy': -1.0},
+    'Delantero': {'finishing': 1.0, 'aggression': -1.0},
+}
+
+# Filas por bloque al asignar cada jugador a su centro más cercano
+_FILAS_POR_BLOQUE = 262144
+
+
+def _columnas(df: pd.DataFrame, columnas) -> np.ndarray:
+    """Columnas presentes como matriz float64 (NaN si falta el valor)."""
+    # data_loader ya convierte los atributos a números: solo hace falta to_numeric si no
+    if all(pd.api.types.is_numeric_dtype(df[columna]) for columna in columnas):
+        return df[columnas].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.column_stack([
+        pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        for columna in columnas
+    ])
+
+
+def _porteros(df: pd.DataFrame) -> np.ndarray:
+    """Máscara de los porteros (ninguno si faltan los atributos o no hay dos grupos)."""
+    columnas = [columna for columna in ATRIBUTOS_PORTERO if columna in df.columns]
+    if not columnas or len(df) == 0:
+        return np.zeros(len(df), dtype=bool)
+    valores = _columnas(df, columnas)
+    presentes = (~np.isnan(valores)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        puntuacion = np.nansum(valores, axis=1) / presentes  # NaN si le faltan todos
+    validos = puntuacion[~np.isnan(puntuacion)]
+    if len(validos) < 2:
+        return np.zeros(len(df), dtype=bool)
+
+    # k-means de una dimensión con dos centros: empiezan en los extremos y el umbral es el punto medio
+    centros = np.array([validos.min(), validos.max()])
+    for _ in range(POSICIONES_ITERACIONES_MAX):
+        umbral = centros.mean()
+        altos = validos > umbral
+        if altos.all() or not altos.any():
+            break
+        nuevos = np.array([validos[~altos].mean(), validos[altos].mean()])
+        if np.array_equal(nuevos, centros):
+            break
+        centros = nuevos
+    if centros[1] - centros[0] < POSICIONES_SEPARACION_PORTEROS:
+        return np.zeros(len(df), dtype=bool)
+    return np.nan_to_num(puntuacion, nan=-np.inf) > centros.mean()
+
+
+def _cercanos(perfiles: np.ndarray, centros: np.ndarray) -> np.ndarray:
+    """Centro más cercano de cada perfil, por bloques."""
+    etiquetas = np.empty(len(perfiles), dtype=np.int8)
+    normas = (centros ** 2).sum(axis=1)
+    for inicio in range(0, len(perfiles), _FILAS_POR_BLOQUE):
+        bloque = perfiles[inicio:inicio + _FILAS_POR_BLOQUE]
+        # |x - c|² = |x|² - 2x·c + |c|²; |x|² no cambia el más cercano
+        etiquetas[inicio:inicio + len(bloque)] = np.argmin(normas - 2 * bloque @ centros.T, axis=1)
+    return etiquetas
+
+
+def _campo(valores: np.ndarray, columnas) -> np.ndarray:
+    """Posición de campo (índice en PERFILES) de cada fila, con k-means sembrado por las reglas."""
+    # Valores que faltan -> media de la columna; estandarizar y quitar el nivel medio de cada jugador
+    with np.errstate(invalid='ignore', divide='ignore'):
+        medias = np.nansum(valores, axis=0) / (~np.isnan(valores)).sum(axis=0)
+    medias = np.nan_to_num(medias)
+    valores = np.where(np.isnan(valores), medias, valores)
+    desviaciones = valores.std(axis=0)
+    perfiles = (valores - medias) / np.where(desviaciones > 0, desviaciones, 1.0)
+    perfiles -= perfiles.mean(axis=1, keepdims=True)
+
+    centros = np.zeros((len(PERFILES), len(columnas)))
+    for k, pesos in enumerate(PERFILES.values()):
+        for columna, peso in pesos.items():
+            if columna in columnas:
+                centros[k, columnas.index(columna)] = peso
+    centros -= centros.mean(axis=1, keepdims=True)
+
+    # Ajuste sobre una muestra fija (filas equiespaciadas), asignación a todos
+    paso = max(1, -(-len(perfiles) // POSICIONES_MUESTRA_MAX))
+    muestra = perfiles[::paso]
+    for _ in range(POSICIONES_ITERACIONES_MAX):
+        etiquetas = _cercanos(muestra, centros)
+        cuantos = np.bincount(etiquetas, minlength=len(centros))
+        sumas = np.column_stack([np.bincount(etiquetas, weights=muestra[:, j], minlength=len(centros))
+                                 for j in range(muestra.shape[1])])
+        # Un centro sin jugadores se queda donde estaba
+        nuevos = np.where(cuantos[:, None] > 0, sumas / np.maximum(cuantos, 1)[:, None], centros)
+        if np.allclose(nuevos, centros):
+            break
+        centros = nuevos
+    return _cercanos(perfiles, centros)
+
+
+def clasificar_posiciones(df: pd.DataFrame) -> Optional[pd.Categorical]:
+    """
+    Posición de cada jugador de `df`.
+
+    Returns:
+        pd.Categorical con categorías POSICIONES (NaN si no hay atributos con los
+        que decidir), o None si el DataFrame no tiene ninguno de los atributos
+    """
+    campo = [columna for columna in ATRIBUTOS_CAMPO if columna in df.columns]
+    if not campo and not any(columna in df.columns for columna in ATRIBUTOS_PORTERO):
+        return None
+
+    codigos = np.full(len(df), -1, dtype=np.int8)
+    porteros = _porteros(df)
+    codigos[porteros] = POSICIONES.index(PORTERO)
+
+    if campo:
+        valores = _columnas(df, campo)
+        de_campo = ~porteros & ~np.isnan(valores).all(axis=1)
+        if de_campo.any():
+            codigos[de_campo] = 1 + _campo(valores[de_campo], campo)
+    return pd.Categorical.from_codes(codigos, categories=POSICIONES)
@@ -0,0 +1,287 @@
+"""
+Medición de tiempos de render por sección de página.
+
+Cada página está organizada en bloques "SECCIÓN N"; este módulo mide cuánto
+tarda cada uno, además de la carga de datos y la construcción de cada gráfico,
+y agrega los tiempos por página para todas las sesiones del proceso.
+
+Uso:
+    with medir_pagina("👕 Análisis por Equipo"):      # en app.py, alrededor de la página
+        with medir("Sección 4: Scatter 3D"):         # en la página
+            with medir("gráfico"):                   # anidado: "Sección 4: Scatter 3D › gráfico"
+                ...
+
+    @medir("ranking")                                # también como decorador
+    def display_ranking(...): ...
+
+La página en curso y las secciones abiertas se guardan por hilo (Streamlit
+ejecuta cada re-ejecución de una sesión en su propio hilo), así que las
+sesiones concurrentes no se mezclan. Medir cuesta dos llamadas a
+`time.perf_counter()` y un acceso a un diccionario protegido por un lock.
+
+API pública:
+  - SectionProfiler
+  - get_profiler() -> SectionProfiler (instancia compartida del proceso)
+  - medir(seccion), medir_pagina(pagina)
+  - iniciar_registro_rerun(), terminar_registro_rerun() -> [(sección, ms)]
+  - exportar_metricas() -> str (formato de texto de Prometheus)
+  - escribir_metricas(ruta) (fichero para el textfile collector de node_exporter)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .const import PROFILER_MAX_SAMPLES, ENV_METRICS_FILE, METRICS_FILE_MIN_INTERVAL
+
+# Nombre de la "sección" que recoge el tiempo total de la página
+SECCION_TOTAL = "total"
+
+# Separador entre una sección y sus subsecciones
+SEPARADOR = " › "
+
+
+class _Estadistica:
+    """Acumulado de una sección: contadores totales y las últimas muestras para los percentiles."""
+
+    __slots__ = ('llamadas', 'total', 'maximo', 'ultima', 'muestras')
+
+    def __init__(self, max_muestras: int):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.ultima = 0.0
+        self.muestras = deque(maxlen=max_muestras)
+
+    def registrar(self, segundos: float) -> None:
+        self.llamadas += 1
+        self.total += segundos
+        self.maximo = max(self.maximo, segundos)
+        self.ultima = segundos
+        self.muestras.append(segundos)
+
+
+class SectionProfiler:
+    """Agregador de tiempos por (página, sección), compartido por todas las sesiones."""
+
+    def __init__(self, max_muestras: int = PROFILER_MAX_SAMPLES):
+        self.max_muestras = max_muestras
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _Estadistica] = {}
+        self._desde = time.time()
+
+    def registrar(self, pagina: str, seccion: str, segundos: float) -> None:
+        clave = (pagina, seccion)
+        with self._lock:
+            stats = self._stats.get(clave)
+            if stats is None:
+                stats = self._stats[clave] = _Estadistica(self.max_muestras)
+            stats.registrar(segundos)
+
+    def resumen(self, pagina: Optional[str] = None) -> List[dict]:
+        """
+        Tiempos agregados (en ms) por sección, en el orden en que se midieron por primera vez.
+
+        Args:
+            pagina: Limitar el resumen a esta página (por defecto, todas)
+
+        Returns:
+            list: [{'pagina', 'seccion', 'llamadas', 'media_ms', 'p50_ms', 'p95_ms', 'max_ms', 'ultima_ms', 'total_ms'}]
+        """
+        with self._lock:
+            copia = [(clave, s.llamadas, s.total, s.maximo, s.ultima, list(s.muestras))
+                     for clave, s in self._stats.items() if pagina is None or clave[0] == pagina]
+
+        filas = []
+        for (pag, seccion), llamadas, total, maximo, ultima, muestras in copia:
+            p50, p95 = np.percentile(muestras, [50, 95]) if muestras else (0.0, 0.0)
+            filas.append({
+                'pagina': pag,
+                'seccion': seccion,
+                'llamadas': llamadas,
+                'media_ms': total / llamadas * 1000,
+                'p50_ms': p50 * 1000,
+                'p95_ms': p95 * 1000,
+                'max_ms': maximo * 1000,
+                'ultima_ms': ultima * 1000,
+                'total_ms': total * 1000,
+            })
+        return filas
+
+    def paginas(self) -> List[str]:
+        with self._lock:
+            return list(dict.fromkeys(pagina for pagina, _ in self._stats))
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._desde = time.time()
+
+    @property
+    def desde(self) -> float:
+        """Momento (epoch) desde el que se acumulan los tiempos."""
+        return self._desde
+
+
+# Instancia compartida por todas las sesiones del proceso
+_profiler: Optional[SectionProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SectionProfiler:
+    """Devuelve el profiler compartido del proceso (se crea la primera vez)."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SectionProfiler()
+    return _profiler
+
+
+# Página en curso y pila de secciones abiertas de cada hilo
+_local = threading.local()
+
+
+def _pila() -> list:
+    pila = getattr(_local, 'pila', None)
+    if pila is None:
+        pila = _local.pila = []
+    return pila
+
+
+def pagina_actual() -> str:
+    return getattr(_local, 'pagina', None) or "(sin página)"
+
+
+def _registrar(pagina: str, seccion: str, segundos: float) -> None:
+    get_profiler().registrar(pagina, seccion, segundos)
+    registro = getattr(_local, 'rerun', None)
+    if registro is not None:
+        registro.append((seccion, segundos * 1000))
+
+
+def iniciar_registro_rerun() -> None:
+    """Empieza a guardar también los tiempos de cada sección de esta re-ejecución (ver utils/slow_reruns.py)."""
+    _local.rerun = []
+
+
+def terminar_registro_rerun() -> List[Tuple[str, float]]:
+    """Devuelve [(sección, ms)] de la re-ejecución en curso y deja de registrarlos."""
+    registro = getattr(_local, 'rerun', None) or []
+    _local.rerun = None
+    return registro
+
+
+class medir(ContextDecorator):
+    """
+    Mide una sección de la página en curso (context manager o decorador).
+
+    Las secciones anidadas se registran con el nombre completo
+    ("Sección 2 › radar técnico"). Se registra también el tiempo de las secciones
+    que terminan con una excepción (por ejemplo, el `st.rerun()` de la paginación).
+    """
+
+    def __init__(self, seccion: str):
+        self.seccion = seccion
+
+    def __enter__(self):
+        _pila().append((self.seccion, time.perf_counter()))
+        return self
+
+    def __exit__(self, *exc):
+        pila = _pila()
+        fin = time.perf_counter()
+        nombre = SEPARADOR.join(seccion for seccion, _ in pila)
+        _, inicio = pila.pop()
+        _registrar(pagina_actual(), nombre, fin - inicio)
+        return False
+
+
+class medir_pagina(ContextDecorator):
+    """Fija la página en curso del hilo y mide su tiempo total (sección `total`)."""
+
+    def __init__(self, pagina: str):
+        self.pagina = pagina
+
+    def __enter__(self):
+        self._anterior = getattr(_local, 'pagina', None)
+        self._pila_anterior = getattr(_local, 'pila', None)
+        _local.pagina = self.pagina
+        _local.pila = []
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _registrar(self.pagina, SECCION_TOTAL, time.perf_counter() - self._inicio)
+        _local.pagina = self._anterior
+        _local.pila = self._pila_anterior
+        return False
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def exportar_metricas(profiler: Optional[SectionProfiler] = None) -> str:
+    """
+    Tiempos por sección en el formato de texto de Prometheus (un `summary` por sección).
+
+    Streamlit no permite añadir rutas HTTP propias, así que el texto se ofrece como
+    descarga en la página de inicio y, si se define la variable de entorno
+    SOCCER_METRICS_FILE, se escribe en ese fichero para el textfile collector.
+    """
+    profiler = profiler or get_profiler()
+    lineas = [
+        "# HELP soccer_section_seconds Tiempo de render de cada sección de página",
+        "# TYPE soccer_section_seconds summary",
+    ]
+    for fila in profiler.resumen():
+        etiquetas = f'page="{_escapar(fila["pagina"])}",section="{_escapar(fila["seccion"])}"'
+        lineas.append(f'soccer_section_seconds{{{etiquetas},quantile="0.5"}} {fila["p50_ms"] / 1000:.6f}')
+        lineas.append(f'soccer_section_seconds{{{etiquetas},quantile="0.95"}} {fila["p95_ms"] / 1000:.6f}')
+        lineas.append(f'soccer_section_seconds_sum{{{etiquetas}}} {fila["total_ms"] / 1000:.6f}')
+        lineas.append(f'soccer_section_seconds_count{{{etiquetas}}} {fila["llamadas"]}')
+    return "\n".join(lineas) + "\n"
+
+
+_ultima_escritura = 0.0
+
+
+def escribir_metricas(ruta: Optional[str] = None, forzar: bool = False,
+                      extra: Optional[Callable[[], str]] = None) -> bool:
+    """
+    Escribe las métricas en `ruta` (por defecto, la de SOCCER_METRICS_FILE).
+
+    La escritura es atómica (fichero temporal + rename) y, salvo `forzar`, como
+    mucho una vez cada METRICS_FILE_MIN_INTERVAL segundos. `extra` devuelve más
+    métricas en el mismo formato (ej: utils.memory.metricas_memoria) y solo se
+    llama cuando de verdad se escribe.
+
+    Returns:
+        bool: True si se ha escrito el fichero
+    """
+    global _ultima_escritura
+    ruta = ruta or os.getenv(ENV_METRICS_FILE)
+    if not ruta:
+        return False
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_escritura < METRICS_FILE_MIN_INTERVAL:
+        return False
+    _ultima_escritura = ahora
+
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(exportar_metricas())
+            if extra is not None:
+                f.write(extra())
+        os.replace(temporal, ruta)
+        return True
+    except OSError as e:
+        print(f"⚠️ No se pudieron escribir las métricas en {ruta}: {e}")
+        return False
@@ -0,0 +1,242 @@
+"""
+Limitador global de peticiones a la API de inferencia (token bucket) con
+contabilidad de cuota.
+
+Todas las sesiones del proceso comparten un único cubo de tokens: cada llamada a
+la API consume un token y los tokens se recargan a un ritmo fijo. Las peticiones
+que no pueden salir inmediatamente esperan en una cola con prioridad:
+
+  - Prioridad: las generaciones interactivas (un clic) van antes que los lotes.
+  - Equidad por sesión: dentro de la misma prioridad, las peticiones se
+    intercalan por turnos entre sesiones, de forma que una sesión con un lote
+    grande no bloquea a las demás.
+
+La cola expone su profundidad y el tiempo de espera estimado para que la página
+lo muestre en lugar de agotar el timeout. Los contadores por sesión solo se
+guardan para las HUGGINGFACE_RATE_LIMIT_MAX_SESSIONS sesiones usadas más
+recientemente: las sesiones cerradas no dejan memoria ocupada para siempre.
+
+API pública:
+  - RateLimiter
+  - get_rate_limiter() -> RateLimiter (instancia compartida del proceso)
+  - PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Optional
+
+from .const import (
+    HUGGINGFACE_RATE_LIMIT_PER_MINUTE,
+    HUGGINGFACE_RATE_LIMIT_BURST,
+    HUGGINGFACE_DAILY_QUOTA,
+    HUGGINGFACE_RATE_LIMIT_MAX_SESSIONS,
+)
+
+# Menor número = mayor prioridad
+PRIORIDAD_INTERACTIVA = 0
+PRIORIDAD_LOTE = 1
+
+
+class RateLimiter:
+    """Token bucket global con cola de prioridad y turnos equitativos por sesión."""
+
+    def __init__(self, tasa_por_minuto: float, rafaga: int, cuota_diaria: int = 0, reloj=time.monotonic,
+                 max_sesiones: int = HUGGINGFACE_RATE_LIMIT_MAX_SESSIONS):
+        """
+        Args:
+            tasa_por_minuto: Tokens que se recargan por minuto
+            rafaga: Capacidad del cubo (peticiones que pueden salir de golpe)
+            cuota_diaria: Máximo de peticiones por día natural (0 = sin límite)
+            reloj: Función de tiempo monotónico (inyectable para pruebas)
+            max_sesiones: Sesiones de las que se guardan contadores (las menos recientes se olvidan)
+        """
+        self.tasa = tasa_por_minuto / 60.0
+        self.capacidad = float(rafaga)
+        self.cuota_diaria = cuota_diaria
+        self.max_sesiones = max_sesiones
+        self._reloj = reloj
+
+        self._cond = threading.Condition()
+        self._tokens = float(rafaga)
+        self._ultima_recarga = reloj()
+        self._pausa_hasta = 0.0
+
+        # Cola: tuplas (prioridad, turno, secuencia, sesion)
+        self._cola = []
+        self._secuencia = itertools.count()
+        self._turno_actual = 0
+        self._ultimo_turno_sesion: Dict[str, int] = {}
+
+        # Contabilidad
+        self._dia = date.today()
+        self._usadas_hoy = 0
+        self._concedidas = 0
+        self._rechazadas_cuota = 0
+        self._expiradas = 0
+        # sesion -> peticiones concedidas (orden = recencia de uso, acotado a max_sesiones)
+        self._por_sesion: "OrderedDict[str, int]" = OrderedDict()
+        self._respuestas: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def acquire(self, sesion: str, prioridad: int = PRIORIDAD_INTERACTIVA, timeout: Optional[float] = None) -> bool:
+        """
+        Espera turno y consume un token.
+
+        Args:
+            sesion: Identificador de la sesión que hace la petición
+            prioridad: PRIORIDAD_INTERACTIVA o PRIORIDAD_LOTE
+            timeout: Espera máxima en segundos (None = sin límite)
+
+        Returns:
+            bool: True si se concedió el token; False si se agotó la cuota diaria
+                  o el tiempo de espera.
+        """
+        with self._cond:
+            self._renovar_dia()
+            if self.cuota_diaria and self._usadas_hoy >= self.cuota_diaria:
+                self._rechazadas_cuota += 1
+                return False
+
+            # Turno equitativo: cada petición de una sesión va detrás de la anterior de esa misma sesión
+            turno = max(self._turno_actual, self._ultimo_turno_sesion.get(sesion, 0)) + 1
+            self._ultimo_turno_sesion[sesion] = turno
+            ticket = (prioridad, turno, next(self._secuencia), sesion)
+            heapq.heappush(self._cola, ticket)
+
+            limite = None if timeout is None else self._reloj() + timeout
+            while True:
+                ahora = self._recargar()
+                es_primero = self._cola[0] is ticket
+                if es_primero and self._tokens >= 1 and ahora >= self._pausa_hasta:
+                    heapq.heappop(self._cola)
+                    self._conceder(ticket)
+                    return True
+
+                espera = self._espera_token(ahora) if es_primero else None
+                if limite is not None:
+                    restante = limite - ahora
+                    if restante <= 0:
+                        self._cola.remove(ticket)
+                        heapq.heapify(self._cola)
+                        self._expiradas += 1
+                        self._cond.notify_all()
+                        return False
+                    espera = restante if espera is None else min(espera, restante)
+                self._cond.wait(espera)
+
+    def record_response(self, status_code: int) -> None:
+        """Contabiliza el código de estado devuelto por la API."""
+        with self._cond:
+            self._respuestas[status_code] = self._respuestas.get(status_code, 0) + 1
+
+    def pause(self, segundos: float) -> None:
+        """Detiene la salida de peticiones (ej: tras un 429 de la API)."""
+        with self._cond:
+            self._pausa_hasta = max(self._pausa_hasta, self._reloj() + segundos)
+            self._tokens = min(self._tokens, 0.0)
+
+    def estimated_wait(self, por_delante: Optional[int] = None) -> float:
+        """
+        Segundos estimados hasta que saldría una petición nueva.
+
+        Args:
+            por_delante: Peticiones en cola por delante (por defecto, toda la cola actual)
+        """
+        with self._cond:
+            ahora = self._recargar()
+            return self._espera_estimada(ahora, len(self._cola) if por_delante is None else por_delante)
+
+    def stats(self, sesion: Optional[str] = None) -> dict:
+        """
+        Estado de la cola y contabilidad de cuota.
+
+        Returns:
+            dict: en_cola, en_cola_sesion, espera_estimada, tokens, concedidas,
+                  usadas_hoy, cuota_diaria, cuota_restante, rechazadas_cuota,
+                  expiradas, respuestas (por código HTTP)
+        """
+        with self._cond:
+            self._renovar_dia()
+            ahora = self._recargar()
+            en_cola = len(self._cola)
+            return {
+                'en_cola': en_cola,
+                'en_cola_sesion': sum(1 for t in self._cola if t[3] == sesion) if sesion else 0,
+                'espera_estimada': self._espera_estimada(ahora, en_cola),
+                'tokens': self._tokens,
+                'concedidas': self._concedidas,
+                'concedidas_sesion': self._por_sesion.get(sesion, 0) if sesion else 0,
+                'usadas_hoy': self._usadas_hoy,
+                'cuota_diaria': self.cuota_diaria,
+                'cuota_restante': (self.cuota_diaria - self._usadas_hoy) if self.cuota_diaria else None,
+                'rechazadas_cuota': self._rechazadas_cuota,
+                'expiradas': self._expiradas,
+                'respuestas': dict(self._respuestas),
+            }
+
+    # ------------------------------------------------------------------
+    # Internos (llamar siempre con el lock adquirido)
+    # ------------------------------------------------------------------
+    def _recargar(self) -> float:
+        ahora = self._reloj()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultima_recarga) * self.tasa)
+        self._ultima_recarga = ahora
+        return ahora
+
+    def _espera_estimada(self, ahora: float, por_delante: int) -> float:
+        # Tiempo hasta que haya token para las peticiones por delante y una más
+        return max(0.0, (por_delante + 1 - self._tokens) / self.tasa, self._pausa_hasta - ahora)
+
+    def _espera_token(self, ahora: float) -> float:
+        return max((1 - self._tokens) / self.tasa, self._pausa_hasta - ahora, 0.001)
+
+    def _conceder(self, ticket) -> None:
+        _, turno, _, sesion = ticket
+        self._tokens -= 1
+        self._turno_actual = max(self._turno_actual, turno)
+        self._concedidas += 1
+        self._usadas_hoy += 1
+        self._por_sesion[sesion] = self._por_sesion.get(sesion, 0) + 1
+        self._por_sesion.move_to_end(sesion)
+        while len(self._por_sesion) > self.max_sesiones:
+            self._por_sesion.popitem(last=False)
+
+        # Olvidar sesiones sin peticiones pendientes para que el diccionario no crezca sin límite
+        if len(self._ultimo_turno_sesion) > self.max_sesiones:
+            self._ultimo_turno_sesion = {
+                s: t for s, t in self._ultimo_turno_sesion.items() if t > self._turno_actual
+            }
+        # El siguiente de la cola puede tener ya su token
+        self._cond.notify_all()
+
+    def _renovar_dia(self) -> None:
+        hoy = date.today()
+        if hoy != self._dia:
+            self._dia = hoy
+            self._usadas_hoy = 0
+
+
+# Instancia compartida por todas las sesiones del proceso
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Devuelve el limitador compartido del proceso (se crea la primera vez)."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    tasa_por_minuto=HUGGINGFACE_RATE_LIMIT_PER_MINUTE,
+                    rafaga=HUGGINGFACE_RATE_LIMIT_BURST,
+                    cuota_diaria=HUGGINGFACE_DAILY_QUOTA,
+                )
+    return _limiter
@@ -0,0 +1,191 @@
+"""
+Búsqueda de jugadores por rangos de atributos ("menos de 23 años, velocidad
+≥ 85, finalización ≥ 75, en la Liga BBVA").
+
+Filtrar el DataFrame predicado a predicado recorre y copia todas las filas una
+vez por condición. Este índice, construido una vez por versión del dataset,
+responde a cualquier conjunción de rangos sin recorrer el DataFrame:
+
+  - Cada atributo se guarda como un código uint8 por jugador: los atributos de
+    0 a 100 tal cual, la altura en cm, el peso en libras y la edad en años
+    cumplidos (SIN_VALOR para los que faltan). La liga, el equipo y la
+    posición (utils/positions.py), como códigos de categoría.
+  - Índice ordenado por columna (se construye la primera vez que una consulta
+    usa la columna): las filas ordenadas por código y dónde empieza cada código.
+    Cuántos jugadores cumplen un rango se sabe en O(1) y cuáles son, en un tramo
+    contiguo de ese orden.
+  - Consulta: el predicado más selectivo da los candidatos y los demás se
+    comprueban solo sobre esos candidatos (en orden de selectividad), mirando
+    su código en cada columna. Cada paso reduce el conjunto; ninguno toca las
+    filas ya descartadas.
+
+API pública:
+  - SIN_VALOR
+  - ResultadoScouting
+  - IndiceScouting
+  - get_indice_scouting(df) -> IndiceScouting
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .const import ATRIBUTOS_JUGADOR, FECHA_REFERENCIA_EDAD
+from .positions import COLUMNA_POSICION
+
+# Código de los valores que faltan (ningún rango lo incluye)
+SIN_VALOR = 255
+
+# Columnas categóricas por las que se puede filtrar
+CATEGORIAS = ('league_name', 'team_long_name', COLUMNA_POSICION)
+
+
+@dataclass(frozen=True)
+class ResultadoScouting:
+    """Jugadores que cumplen todos los predicados."""
+
+    filas: np.ndarray       # Posiciones (iloc) en el DataFrame, ordenadas
+    tiempo_ms: float
+    # (predicado, candidatos que quedan tras aplicarlo), en el orden en que se aplicaron
+    pasos: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def _edad(df: pd.DataFrame) -> pd.Series:
+    """Años cumplidos a FECHA_REFERENCIA_EDAD."""
+    nacimientos = pd.to_datetime(df['birthday'], errors='coerce')
+    return (pd.Timestamp(FECHA_REFERENCIA_EDAD) - nacimientos).dt.days // 365.25
+
+
+def _codigos_uint8(valores: pd.Series) -> np.ndarray:
+    """Valores numéricos redondeados a enteros de 0 a 254 (SIN_VALOR si faltan)."""
+    numeros = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    codigos = np.full(len(numeros), SIN_VALOR, dtype=np.uint8)
+    validos = ~np.isnan(numeros)
+    codigos[validos] = np.clip(np.rint(numeros[validos]), 0, SIN_VALOR - 1)
+    return codigos
+
+
+class IndiceScouting:
+    """Códigos por columna e índices ordenados para consultas conjuntivas de rangos."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.filas = len(df)
+        self.codigos: Dict[str, np.ndarray] = {}
+        for columna in ATRIBUTOS_JUGADOR:
+            if columna in df.columns:
+                self.codigos[columna] = _codigos_uint8(df[columna])
+        if 'birthday' in df.columns:
+            self.codigos['edad'] = _codigos_uint8(_edad(df))
+
+        # Categorías: código por fila y nombre -> código
+        self.categorias: Dict[str, Dict[str, int]] = {}
+        for columna in CATEGORIAS:
+            if columna in df.columns:
+                codigos, nombres = pd.factorize(df[columna])
+                self.codigos[columna] = codigos.astype(np.int32)
+                self.categorias[columna] = {nombre: i for i, nombre in enumerate(nombres)}
+
+        self._ordenes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def columnas(self) -> List[str]:
+        """Columnas numéricas por las que se puede filtrar por rango."""
+        return [columna for columna in self.codigos if columna not in self.categorias]
+
+    def limites(self, columna: str) -> Tuple[int, int]:
+        """Menor y mayor valor (sin contar los que faltan) de una columna numérica."""
+        _, inicio = self._orden(columna)
+        presentes = np.flatnonzero(np.diff(inicio[:SIN_VALOR + 1]))
+        return (int(presentes[0]), int(presentes[-1])) if len(presentes) else (0, 0)
+
+    def _orden(self, columna: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Índice ordenado de una columna (se construye la primera vez).
+
+        Returns:
+            (orden, inicio): filas ordenadas por código y, para cada código c, el tramo
+            orden[inicio[c]:inicio[c + 1]] con las filas que lo tienen
+        """
+        indice = self._ordenes.get(columna)
+        if indice is None:
+            codigos = self.codigos[columna]
+            orden = np.argsort(codigos, kind='stable').astype(np.int32)
+            maximo = SIN_VALOR + 1 if codigos.dtype == np.uint8 else len(self.categorias[columna])
+            inicio = np.concatenate(([0], np.cumsum(np.bincount(codigos, minlength=maximo))))
+            with self._lock:
+                indice = self._ordenes.setdefault(columna, (orden, inicio))
+        return indice
+
+    def _rango(self, columna: str, minimo: Optional[float], maximo: Optional[float]) -> Tuple[int, int]:
+        """Códigos [desde, hasta] de un rango de valores (enteros, ambos incluidos)."""
+        if columna in self.categorias:
+            raise ValueError(f"'{columna}' es una categoría, no admite rangos")
+        desde = 0 if minimo is None else max(0, int(np.ceil(minimo)))
+        hasta = SIN_VALOR - 1 if maximo is None else min(SIN_VALOR - 1, int(np.floor(maximo)))
+        return desde, hasta
+
+    def consultar(self, rangos: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+                  categorias: Optional[Dict[str, str]] = None) -> ResultadoScouting:
+        """
+        Jugadores que cumplen todos los predicados.
+
+        Args:
+            rangos: Columna -> (mínimo, máximo), ambos incluidos (None = sin límite).
+                    La edad va en la columna 'edad' (años cumplidos)
+            categorias: Columna -> valor ('league_name', 'team_long_name' o 'posicion')
+
+        Returns:
+            ResultadoScouting
+        """
+        inicio_consulta = time.perf_counter()
+
+        # Cada predicado como (nombre, columna, código mínimo, código máximo, cuántos lo cumplen)
+        predicados = []
+        for columna, (minimo, maximo) in (rangos or {}).items():
+            desde, hasta = self._rango(columna, minimo, maximo)
+            _, inicio = self._orden(columna)
+            cuantos = int(inicio[hasta + 1] - inicio[desde]) if desde <= hasta else 0
+            predicados.append((f"{columna} ∈ [{desde}, {hasta}]", columna, desde, hasta, cuantos))
+        for columna, valor in (categorias or {}).items():
+            codigo = self.categorias[columna].get(valor)
+            if codigo is None:
+                predicados.append((f"{columna} = {valor}", columna, 0, -1, 0))
+                continue
+            _, inicio = self._orden(columna)
+            predicados.append((f"{columna} = {valor}", columna, codigo, codigo, int(inicio[codigo + 1] - inicio[codigo])))
+
+        if not predicados:
+            filas = np.arange(self.filas)
+            return ResultadoScouting(filas, (time.perf_counter() - inicio_consulta) * 1000, [])
+
+        # El más selectivo da los candidatos; los demás se comprueban sobre ellos
+        predicados.sort(key=lambda p: p[4])
+        nombre, columna, desde, hasta, cuantos = predicados[0]
+        if cuantos:
+            orden, inicio = self._orden(columna)
+            candidatos = orden[inicio[desde]:inicio[hasta + 1]]
+        else:
+            candidatos = np.empty(0, dtype=np.int32)
+        pasos = [(nombre, len(candidatos))]
+
+        for nombre, columna, desde, hasta, _ in predicados[1:]:
+            if len(candidatos):
+                codigos = self.codigos[columna][candidatos]
+                candidatos = candidatos[(codigos >= desde) & (codigos <= hasta)]
+            pasos.append((nombre, len(candidatos)))
+
+        return ResultadoScouting(
+            filas=np.sort(candidatos).astype(np.int64),
+            tiempo_ms=(time.perf_counter() - inicio_consulta) * 1000,
+            pasos=pasos,
+        )
+
+
+def get_indice_scouting(df: pd.DataFrame) -> IndiceScouting:
+    """Índice de scouting de `df` (se construye una vez por versión del dataset)."""
+    return get_agregados(df).indice('scouting', lambda: IndiceScouting(df))
@@ -0,0 +1,125 @@
+"""
+Búsqueda de jugadores similares ("¿quién juega como este jugador?").
+
+Cada jugador es un vector con sus atributos estandarizados (z-scores de la
+matriz de atributos, utils/attribute_matrix.py) y los más parecidos son sus
+vecinos más cercanos por distancia euclídea. Con tan pocas dimensiones y
+consultas de un solo jugador no compensa un KD-tree: la distancia a todos los
+candidatos se calcula por bloques con un producto matriz-vector,
+
+    ||x - q||² = ||x||² - 2·x·q + ||q||²
+
+usando las normas ya calculadas de cada fila, y de cada bloque solo se quedan
+los k mejores con argpartition. Un millón de jugadores se recorre en unos pocos
+milisegundos y la memoria temporal queda acotada por el tamaño del bloque.
+
+Los filtros de liga y equipo usan las filas de cada liga y equipo que ya tienen
+los agregados, así que filtrar no recorre el DataFrame.
+
+API pública:
+  - ResultadoSimilares
+  - BuscadorSimilares
+  - get_buscador_similares(df) -> BuscadorSimilares
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import get_agregados
+from .attribute_matrix import MatrizAtributos, get_matriz_atributos
+from .const import SIMILARES_K_POR_DEFECTO, SIMILARES_FILAS_POR_BLOQUE
+
+
+@dataclass(frozen=True)
+class ResultadoSimilares:
+    """Jugadores más parecidos a uno dado, del más al menos parecido."""
+
+    filas: np.ndarray        # Posiciones (iloc) en el DataFrame
+    distancias: np.ndarray   # Distancia euclídea entre z-scores
+    similitud: np.ndarray    # 0-100 (100 = atributos idénticos)
+    candidatos: int          # Jugadores comparados tras aplicar los filtros
+    tiempo_ms: float
+
+
+class BuscadorSimilares:
+    """Vecinos más cercanos sobre la matriz de atributos estandarizada de una versión del dataset."""
+
+    def __init__(self, matriz: MatrizAtributos, filas_por_bloque: int = SIMILARES_FILAS_POR_BLOQUE):
+        self.matriz = matriz
+        self.filas_por_bloque = filas_por_bloque
+
+    def similares(self, fila: int, k: int = SIMILARES_K_POR_DEFECTO,
+                  candidatas: Optional[np.ndarray] = None) -> ResultadoSimilares:
+        """
+        Los k jugadores más parecidos al de la posición `fila` (él mismo excluido).
+
+        Args:
+            fila: Posición (iloc) del jugador de referencia
+            k: Número de jugadores a devolver
+            candidatas: Posiciones entre las que buscar, ordenadas (None = todos)
+
+        Returns:
+            ResultadoSimilares
+        """
+        inicio = time.perf_counter()
+        z, norma2 = self.matriz.z, self.matriz.norma2
+        consulta = z[fila]
+        norma_consulta = float(norma2[fila])
+        total = z.shape[0] if candidatas is None else len(candidatas)
+
+        mejores_d = np.empty(0, dtype=np.float32)
+        mejores_i = np.empty(0, dtype=np.int64)
+        incluida = False  # Si el propio jugador estaba entre los candidatos
+        for desde in range(0, total, self.filas_por_bloque):
+            hasta = min(desde + self.filas_por_bloque, total)
+            if candidatas is None:
+                # Sin filtros el bloque es un trozo de la matriz (sin copias)
+                bloque, normas = z[desde:hasta], norma2[desde:hasta]
+                propia = fila - desde if desde <= fila < hasta else None
+            else:
+                posiciones = candidatas[desde:hasta]
+                bloque, normas = z[posiciones], norma2[posiciones]
+                propia = np.flatnonzero(posiciones == fila)
+                propia = propia[0] if len(propia) else None
+
+            d2 = normas - 2.0 * (bloque @ consulta) + norma_consulta
+            if propia is not None:
+                d2[propia] = np.inf
+                incluida = True
+
+            elegidas = np.argpartition(d2, k - 1)[:k] if len(d2) > k else np.arange(len(d2))
+            d2 = d2[elegidas]
+            posiciones = desde + elegidas if candidatas is None else posiciones[elegidas]
+            mejores_d = np.concatenate([mejores_d, d2])
+            mejores_i = np.concatenate([mejores_i, posiciones])
+            if len(mejores_d) > k:
+                elegidas = np.argpartition(mejores_d, k - 1)[:k]
+                mejores_d, mejores_i = mejores_d[elegidas], mejores_i[elegidas]
+
+        orden = np.argsort(mejores_d, kind='stable')
+        mejores_d, mejores_i = mejores_d[orden], mejores_i[orden]
+        validos = np.isfinite(mejores_d)
+        distancias = np.sqrt(np.maximum(mejores_d[validos], 0.0))
+        similitud = 100.0 * np.exp(-distancias / np.sqrt(z.shape[1]))
+        return ResultadoSimilares(
+            filas=mejores_i[validos],
+            distancias=distancias,
+            similitud=similitud,
+            candidatos=total - int(incluida),
+            tiempo_ms=(time.perf_counter() - inicio) * 1000,
+        )
+
+    def similares_filtrados(self, df: pd.DataFrame, fila: int, k: int = SIMILARES_K_POR_DEFECTO,
+                            liga: Optional[str] = None, equipo: Optional[str] = None) -> ResultadoSimilares:
+        """Como similares(), buscando solo en una liga y/o un equipo (None = sin filtro)."""
+        return self.similares(fila, k, get_agregados(df).filas_filtradas(liga, equipo))
+
+
+def get_buscador_similares(df: pd.DataFrame) -> BuscadorSimilares:
+    """Buscador de jugadores similares de `df` (se construye una vez por versión del dataset)."""
+    matriz = get_matriz_atributos(df)
+    return get_agregados(df).indice('similares', lambda: BuscadorSimilares(matriz))
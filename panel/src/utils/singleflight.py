@@ -0,0 +1,108 @@
+"""
+Coalescencia "single-flight" de llamadas idénticas concurrentes.
+
+Si varias sesiones piden a la vez exactamente lo mismo (mismo modelo, prompt y
+parámetros), solo la primera llamada (la "líder") llega a ejecutarse; el resto
+espera y recibe el mismo resultado (o la misma excepción). En cuanto la llamada
+termina la clave se libera: no es una caché, las peticiones posteriores vuelven
+a ejecutarse.
+
+API pública:
+  - SingleFlight
+  - request_key(*partes) -> str
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Llamada:
+    """Llamada en curso para una clave."""
+
+    def __init__(self):
+        self.terminada = threading.Event()
+        self.resultado = None
+        self.excepcion = None
+        self.esperando = 0
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una sola ejecución."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_curso: Dict[str, _Llamada] = {}
+        self._ejecutadas = 0
+        self._compartidas = 0
+
+    def do(self, clave: str, funcion: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Ejecuta `funcion` una sola vez por clave entre todas las llamadas concurrentes.
+
+        Args:
+            clave: Identificador normalizado de la petición
+            funcion: Función sin argumentos que realiza el trabajo
+
+        Returns:
+            tuple: (resultado, compartido) donde `compartido` es True si el resultado
+                   viene de la llamada de otro hilo
+        """
+        with self._lock:
+            llamada = self._en_curso.get(clave)
+            if llamada is not None:
+                llamada.esperando += 1
+                self._compartidas += 1
+                lider = False
+            else:
+                llamada = _Llamada()
+                self._en_curso[clave] = llamada
+                self._ejecutadas += 1
+                lider = True
+
+        if not lider:
+            llamada.terminada.wait()
+            if llamada.excepcion is not None:
+                raise llamada.excepcion
+            return llamada.resultado, True
+
+        try:
+            llamada.resultado = funcion()
+        except BaseException as e:
+            llamada.excepcion = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            llamada.terminada.set()
+        return llamada.resultado, False
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores: llamadas ejecutadas, llamadas que compartieron resultado y claves en curso."""
+        with self._lock:
+            return {
+                'ejecutadas': self._ejecutadas,
+                'compartidas': self._compartidas,
+                'en_curso': len(self._en_curso),
+            }
+
+
+def request_key(*partes) -> str:
+    """
+    Clave estable a partir de partes serializables en JSON.
+
+    Los textos se normalizan (espacios colapsados) para que prompts equivalentes
+    generen la misma clave.
+    """
+    def _normalizar(valor):
+        if isinstance(valor, str):
+            return " ".join(valor.split())
+        if isinstance(valor, dict):
+            return {k: _normalizar(v) for k, v in valor.items()}
+        if isinstance(valor, (list, tuple)):
+            return [_normalizar(v) for v in valor]
+        return valor
+
+    serializado = json.dumps(_normalizar(list(partes)), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
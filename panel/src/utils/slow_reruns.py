@@ -0,0 +1,299 @@
+"""
+Captura de re-ejecuciones lentas con su perfil de ejecución.
+
+Cuando una re-ejecución de la app supera el umbral de latencia, se guarda qué
+la hizo lenta: la página, las selecciones de la sesión (todos los widgets y
+valores simples de session_state: equipo, liga, jugadores, filtros, página del
+ranking de cada pestaña...), la versión del dataset, los tiempos de cada sección
+(ver utils/profiler.py) y un perfil de la ejecución.
+
+Dos modos de perfil (variable de entorno SOCCER_SLOW_RERUN_MODE):
+  - 'muestreo' (por defecto): un único hilo del proceso toma muestras de la pila
+    de cada re-ejecución en curso cada SLOW_RERUN_SAMPLE_INTERVAL segundos. El
+    coste es muy bajo y puede quedarse activo en producción. Las pilas se guardan
+    en formato "folded" (una línea `raíz;...;hoja N`), el que leen flamegraph.pl
+    y speedscope.
+  - 'cprofile': cada re-ejecución corre bajo cProfile y, si es lenta, se guarda
+    el .prof (`python -m pstats fichero.prof` o snakeviz). Más preciso pero
+    ralentiza la app; pensado para diagnosticar en un entorno de pruebas.
+  - 'off': desactivado.
+
+Las capturas se guardan en SOCCER_SLOW_RERUN_DIR (por defecto, en el directorio
+temporal del sistema): un índice `capturas.jsonl` con una línea por captura y un
+fichero de perfil por captura. Se conservan las SLOW_RERUN_MAX_CAPTURES últimas.
+
+API pública:
+  - vigilar_rerun(pagina, selecciones, version_datos) (context manager)
+  - selecciones_sesion(session_state) -> dict
+  - leer_capturas(limite) -> list
+  - directorio_capturas() -> str
+"""
+
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .const import (
+    ENV_SLOW_RERUN_DIR,
+    ENV_SLOW_RERUN_MODE,
+    ENV_SLOW_RERUN_THRESHOLD_MS,
+    SLOW_RERUN_THRESHOLD_MS,
+    SLOW_RERUN_SAMPLE_INTERVAL,
+    SLOW_RERUN_MAX_CAPTURES,
+    SLOW_RERUN_MAX_DEPTH,
+)
+from . import profiler
+
+FICHERO_INDICE = 'capturas.jsonl'
+
+# Claves de session_state que no describen lo que está viendo la sesión: datos,
+# resultados de la página de IA y botones (solo valen True en el clic)
+CLAVES_EXCLUIDAS = {
+    'df', 'version_datos', 'informe_carga',
+    'ultima_escena_handle', 'ultimo_prompt_usado', 'ultima_descripcion_escena',
+    'ultimos_jugadores_escena', 'show_regen_msg', 'galeria_lote',
+    'generar_lote', 'actualizar_memoria',
+}
+PREFIJOS_EXCLUIDOS = ('download_', 'next_', 'prev_', 'next2_', 'prev2_', 'FormSubmitter:', '$$')
+# Se guardan valores simples y listas cortas de valores simples (multiselects, rangos)
+MAX_ELEMENTOS_SELECCION = 20
+MAX_LONGITUD_TEXTO = 200
+
+
+def directorio_capturas() -> str:
+    return os.getenv(ENV_SLOW_RERUN_DIR) or os.path.join(tempfile.gettempdir(), 'soccer_slow_reruns')
+
+
+def _modo() -> str:
+    return os.getenv(ENV_SLOW_RERUN_MODE, 'muestreo').lower()
+
+
+def _umbral_ms() -> float:
+    try:
+        return float(os.getenv(ENV_SLOW_RERUN_THRESHOLD_MS, SLOW_RERUN_THRESHOLD_MS))
+    except ValueError:
+        return SLOW_RERUN_THRESHOLD_MS
+
+
+def _valor_simple(valor) -> bool:
+    if isinstance(valor, str):
+        return len(valor) <= MAX_LONGITUD_TEXTO
+    return isinstance(valor, (int, float, bool)) or valor is None
+
+
+def selecciones_sesion(session_state) -> Dict[str, object]:
+    """
+    Selecciones de la sesión que influyen en el coste de la página.
+
+    Recorre todo session_state en lugar de una lista de claves, así que los
+    widgets nuevos de cualquier página se capturan sin registrarlos aquí. Solo
+    se guardan valores simples y listas cortas de valores simples; se omiten
+    CLAVES_EXCLUIDAS y las claves con PREFIJOS_EXCLUIDOS.
+    """
+    selecciones = {}
+    for clave in list(session_state.keys()):
+        clave = str(clave)
+        if clave in CLAVES_EXCLUIDAS or clave.startswith(PREFIJOS_EXCLUIDOS):
+            continue
+        valor = session_state[clave]
+        if _valor_simple(valor):
+            selecciones[clave] = valor
+        elif isinstance(valor, (list, tuple)) and len(valor) <= MAX_ELEMENTOS_SELECCION \
+                and all(_valor_simple(elemento) for elemento in valor):
+            selecciones[clave] = list(valor)
+    return dict(sorted(selecciones.items()))
+
+
+# ----------------------------------------------------------------------
+# Muestreo de pilas
+# ----------------------------------------------------------------------
+def _pila_plegada(frame) -> str:
+    """Pila de llamadas de `frame` como "raíz;...;hoja" (función y fichero de cada nivel)."""
+    niveles = []
+    while frame is not None and len(niveles) < SLOW_RERUN_MAX_DEPTH:
+        codigo = frame.f_code
+        niveles.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(niveles))
+
+
+class _Muestreador:
+    """Hilo único que toma muestras de la pila de los hilos registrados."""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._cond = threading.Condition()
+        self._activos: Dict[int, Counter] = {}
+        self._hilo: Optional[threading.Thread] = None
+
+    def registrar(self, ident: int) -> Counter:
+        muestras = Counter()
+        with self._cond:
+            self._activos[ident] = muestras
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name='slow-rerun-sampler', daemon=True)
+                self._hilo.start()
+            self._cond.notify()
+        return muestras
+
+    def liberar(self, ident: int) -> None:
+        with self._cond:
+            self._activos.pop(ident, None)
+
+    def _bucle(self) -> None:
+        while True:
+            with self._cond:
+                # Sin re-ejecuciones en curso no se despierta
+                while not self._activos:
+                    self._cond.wait()
+                activos = dict(self._activos)
+            frames = sys._current_frames()
+            for ident, muestras in activos.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    muestras[_pila_plegada(frame)] += 1
+            del frames
+            time.sleep(self.intervalo)
+
+
+_muestreador: Optional[_Muestreador] = None
+_muestreador_lock = threading.Lock()
+
+
+def _get_muestreador() -> _Muestreador:
+    global _muestreador
+    if _muestreador is None:
+        with _muestreador_lock:
+            if _muestreador is None:
+                _muestreador = _Muestreador(SLOW_RERUN_SAMPLE_INTERVAL)
+    return _muestreador
+
+
+# ----------------------------------------------------------------------
+# Persistencia
+# ----------------------------------------------------------------------
+_escritura_lock = threading.Lock()
+
+
+def _guardar_captura(registro: dict, perfil: Optional[cProfile.Profile], muestras: Optional[Counter]) -> None:
+    directorio = directorio_capturas()
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, registro['id'])
+        if perfil is not None:
+            perfil.dump_stats(base + '.prof')
+            registro['perfil'] = os.path.basename(base + '.prof')
+        elif muestras:
+            with open(base + '.folded', 'w', encoding='utf-8') as f:
+                for pila, n in muestras.most_common():
+                    f.write(f"{pila} {n}\n")
+            registro['perfil'] = os.path.basename(base + '.folded')
+
+        with _escritura_lock:
+            ruta_indice = os.path.join(directorio, FICHERO_INDICE)
+            with open(ruta_indice, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            _recortar(directorio, ruta_indice)
+        print(f"🐢 Re-ejecución lenta ({registro['duracion_ms']:.0f} ms) en {registro['pagina']}: {base}")
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar la captura de la re-ejecución lenta: {e}")
+
+
+def _recortar(directorio: str, ruta_indice: str) -> None:
+    """Conserva solo las SLOW_RERUN_MAX_CAPTURES capturas más recientes."""
+    with open(ruta_indice, 'r', encoding='utf-8') as f:
+        lineas = f.readlines()
+    if len(lineas) <= SLOW_RERUN_MAX_CAPTURES:
+        return
+    sobrantes, lineas = lineas[:-SLOW_RERUN_MAX_CAPTURES], lineas[-SLOW_RERUN_MAX_CAPTURES:]
+    for linea in sobrantes:
+        perfil = json.loads(linea).get('perfil')
+        if perfil and os.path.exists(os.path.join(directorio, perfil)):
+            os.remove(os.path.join(directorio, perfil))
+    temporal = ruta_indice + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.writelines(lineas)
+    os.replace(temporal, ruta_indice)
+
+
+def leer_capturas(limite: int = 50) -> List[dict]:
+    """Últimas capturas guardadas, de la más reciente a la más antigua."""
+    ruta_indice = os.path.join(directorio_capturas(), FICHERO_INDICE)
+    if not os.path.exists(ruta_indice):
+        return []
+    with open(ruta_indice, 'r', encoding='utf-8') as f:
+        lineas = f.readlines()[-limite:]
+    return [json.loads(linea) for linea in reversed(lineas)]
+
+
+# ----------------------------------------------------------------------
+# Vigilancia de una re-ejecución
+# ----------------------------------------------------------------------
+@contextmanager
+def vigilar_rerun(pagina: str, selecciones: Callable[[], dict], version_datos: Callable[[], Optional[str]]):
+    """
+    Vigila una re-ejecución y guarda su captura si supera el umbral.
+
+    Args:
+        pagina: Página que se está renderizando
+        selecciones: Devuelve las selecciones de la sesión (se llama solo si la re-ejecución es lenta)
+        version_datos: Devuelve la versión del dataset en uso (ídem)
+    """
+    modo = _modo()
+    if modo == 'off':
+        yield
+        return
+
+    perfil = muestras = None
+    ident = threading.get_ident()
+    if modo == 'cprofile':
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Ya hay otro profiler activo en este hilo: se usa el muestreo
+            perfil = None
+    if perfil is None:
+        muestras = _get_muestreador().registrar(ident)
+
+    profiler.iniciar_registro_rerun()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        if perfil is not None:
+            perfil.disable()
+        else:
+            _get_muestreador().liberar(ident)
+        secciones = profiler.terminar_registro_rerun()
+
+        if duracion_ms >= _umbral_ms():
+            registro = {
+                'id': f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}",
+                'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'pagina': pagina,
+                'duracion_ms': round(duracion_ms, 1),
+                'umbral_ms': _umbral_ms(),
+                'modo': 'cprofile' if perfil is not None else 'muestreo',
+                'selecciones': _sin_fallar(selecciones, {}),
+                'version_datos': _sin_fallar(version_datos, None),
+                'secciones': [[nombre, round(ms, 1)] for nombre, ms in secciones],
+            }
+            _guardar_captura(registro, perfil, muestras)
+
+
+def _sin_fallar(funcion: Callable, por_defecto):
+    # La captura nunca debe romper la página
+    try:
+        return funcion()
+    except Exception:
+        return por_defecto
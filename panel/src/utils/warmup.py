@@ -0,0 +1,192 @@
+"""
+Calentamiento de cachés al arrancar el proceso.
+
+Sin calentamiento, el primer visitante tras un despliegue o un reinicio paga la
+carga del CSV, el cálculo de los agregados por liga y equipo y la construcción
+de las figuras de la página que abra. Este módulo hace ese trabajo en un hilo
+en segundo plano:
+
+  1. carga de datos      -> utils/dataset.py
+  2. agregados           -> utils/aggregates.py
+  3. índices             -> matriz de atributos, jugadores similares, búsqueda por nombre, scouting, percentiles
+                            y mejor once de cada equipo en la formación por defecto
+  4. figuras de ligas    -> ui.leagues.precalentar (overview y la liga por defecto)
+  5. figuras de equipos  -> ui.teams.precalentar (FC Barcelona frente al Real Madrid)
+
+Streamlit no ofrece un gancho de arranque del servidor: app.py llama a
+`iniciar_calentamiento()` en cada ejecución y solo la primera del proceso lanza
+el hilo. Mientras tanto las sesiones funcionan con normalidad: si piden algo que
+aún se está calculando, esperan a ese mismo cálculo en lugar de repetirlo (el
+dataset) o lo calculan ellas mismas (las figuras).
+
+Los tiempos de cada paso se registran también en el profiler de secciones
+(página "🔥 Calentamiento"). Con SOCCER_WARMUP=0 no se calienta nada.
+
+API pública:
+  - calentar() -> dict (síncrono, devuelve el estado final)
+  - preparar_version(dataset) -> int (agregados y figuras de una versión, sin cargarla)
+  - iniciar_calentamiento() -> bool (en segundo plano, una vez por proceso)
+  - estado_calentamiento() -> dict
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from .aggregates import get_agregados
+from .const import ENV_WARMUP, ATRIBUTOS_JUGADOR, FORMACION_POR_DEFECTO
+from .dataset import get_dataset
+from .lineups import get_motor_alineaciones
+from .name_search import get_indice_nombres
+from .percentiles import get_indice_percentiles
+from .scouting import get_indice_scouting
+from .similarity import get_buscador_similares
+from .profiler import get_profiler, SECCION_TOTAL
+
+# Página con la que se registran los pasos en el profiler de secciones
+PAGINA_CALENTAMIENTO = "🔥 Calentamiento"
+
+
+def _alineaciones_por_defecto(df):
+    """Motor de alineaciones y mejor once de todos los equipos en la formación por defecto."""
+    get_motor_alineaciones(df).calcular(FORMACION_POR_DEFECTO)
+
+
+# Índices de cada versión del dataset que se construyen antes de servirla: función que
+# recibe el DataFrame y construye el índice una vez por versión, y columnas de las que
+# necesita al menos una
+INDICES = (
+    (get_buscador_similares, ATRIBUTOS_JUGADOR),  # Construye también la matriz de atributos
+    (get_indice_nombres, ['player_name']),
+    (get_indice_percentiles, ATRIBUTOS_JUGADOR),  # Construye también el índice de scouting
+    (_alineaciones_por_defecto, ['team_long_name']),
+)
+
+# Páginas con figuras por defecto que precalentar (módulo con una función precalentar(df))
+PAGINAS = (
+    ("figuras de ligas", 'ui.leagues'),
+    ("figuras de equipos", 'ui.teams'),
+)
+
+
+def _nuevo_estado() -> dict:
+    return {
+        'estado': 'pendiente',  # pendiente | calentando | listo | error | desactivado
+        'inicio': None,
+        'duracion_s': None,
+        'pasos': [],            # [(paso, ms)]
+        'figuras': 0,
+        'version_datos': None,
+        'error': None,
+    }
+
+
+_estado = _nuevo_estado()
+_estado_lock = threading.Lock()
+_lanzado = False
+
+
+def _actualizar(**valores) -> None:
+    with _estado_lock:
+        _estado.update(valores)
+
+
+def preparar_version(dataset, pasos: Optional[List[Tuple[str, float]]] = None) -> int:
+    """
+    Calcula los agregados y construye los índices y las figuras por defecto de una versión del dataset.
+
+    La recarga sin cortes (utils/dataset.py) lo usa antes de publicar una versión
+    nueva, para que las sesiones la reciban ya caliente.
+
+    Args:
+        dataset: Versión del dataset (utils.dataset.Dataset)
+        pasos: Lista donde añadir (paso, ms) de cada paso
+
+    Returns:
+        int: Número de figuras construidas
+    """
+    pasos = pasos if pasos is not None else []
+
+    inicio = time.perf_counter()
+    get_agregados(dataset.df).calcular_todo()
+    pasos.append(("agregados", (time.perf_counter() - inicio) * 1000))
+
+    inicio = time.perf_counter()
+    for construir, columnas in INDICES:
+        if any(columna in dataset.df.columns for columna in columnas):
+            construir(dataset.df)
+    pasos.append(("índices", (time.perf_counter() - inicio) * 1000))
+
+    figuras = 0
+    for paso, modulo in PAGINAS:
+        inicio = time.perf_counter()
+        figuras += len(importlib.import_module(modulo).precalentar(dataset.df))
+        pasos.append((paso, (time.perf_counter() - inicio) * 1000))
+    return figuras
+
+
+def calentar() -> dict:
+    """
+    Carga el dataset, calcula los agregados y construye las figuras por defecto.
+
+    Returns:
+        dict: Estado final (ver estado_calentamiento())
+    """
+    inicio_total = time.perf_counter()
+    _actualizar(estado='calentando', inicio=time.time(), pasos=[], error=None)
+    print("🔥 Precalentando cachés (datos, agregados y figuras por defecto)...")
+    pasos = []
+    try:
+        inicio = time.perf_counter()
+        dataset = get_dataset()
+        pasos.append(("carga de datos", (time.perf_counter() - inicio) * 1000))
+        figuras = preparar_version(dataset, pasos)
+
+        duracion = time.perf_counter() - inicio_total
+        _actualizar(estado='listo', duracion_s=duracion, pasos=pasos, figuras=figuras, version_datos=dataset.version)
+        print(f"🔥 Cachés precalentadas en {duracion:.2f}s ({figuras} figuras)")
+    except Exception as e:
+        duracion = time.perf_counter() - inicio_total
+        _actualizar(estado='error', duracion_s=duracion, pasos=pasos, error=str(e))
+        print(f"❌ Error al precalentar las cachés: {e}")
+
+    # Los pasos se ven también en el profiler de secciones
+    profiler = get_profiler()
+    for paso, ms in pasos:
+        profiler.registrar(PAGINA_CALENTAMIENTO, paso, ms / 1000)
+    profiler.registrar(PAGINA_CALENTAMIENTO, SECCION_TOTAL, duracion)
+    return estado_calentamiento()
+
+
+def iniciar_calentamiento() -> bool:
+    """
+    Lanza el calentamiento en un hilo en segundo plano si aún no se ha lanzado en este proceso.
+
+    Returns:
+        bool: True si se ha lanzado ahora
+    """
+    global _lanzado
+    if _lanzado:
+        return False
+    with _estado_lock:
+        if _lanzado:
+            return False
+        _lanzado = True
+        if os.getenv(ENV_WARMUP, '1').strip() == '0':
+            _estado['estado'] = 'desactivado'
+            return False
+    threading.Thread(target=calentar, name="soccer-warmup", daemon=True).start()
+    return True
+
+
+def estado_calentamiento() -> dict:
+    """
+    Estado del calentamiento.
+
+    Returns:
+        dict: {'estado', 'inicio', 'duracion_s', 'pasos': [(paso, ms)], 'figuras', 'version_datos', 'error'}
+    """
+    with _estado_lock:
+        return dict(_estado)
@@ -0,0 +1,239 @@
+"""
+Pruebas de los motores que trabajan sobre la matriz de atributos de los
+jugadores (panel/src/utils/attribute_matrix.py, similarity.py, composite.py...).
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q test_attributes.py
+"""
+
+import os
+import sys
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+
+from utils.attribute_matrix import get_matriz_atributos
+from utils.composite import get_motor_puntuaciones
+from utils.correlation import get_motor_correlaciones
+from utils.lineups import asignar, get_motor_alineaciones
+from utils.pareto import frontera_pareto, get_motor_pareto
+from utils.percentiles import get_indice_percentiles
+from utils.scouting import get_indice_scouting
+from utils.similarity import BuscadorSimilares, get_buscador_similares
+
+
+def _jugadores(n=500, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'player_name': [f"Jugador {i}" for i in range(n)],
+        'team_long_name': [f"T{i % 10}" for i in range(n)],
+        'league_name': [f"L{i % 2}" for i in range(n)],
+        'country_name': [f"P{i % 2}" for i in range(n)],
+        'overall_rating': rng.integers(40, 95, n),
+        'dribbling': rng.integers(20, 99, n),
+        'sprint_speed': rng.integers(20, 99, n),
+        'height': rng.normal(182, 7, n),
+        'birthday': pd.Timestamp('1985-01-01') + pd.to_timedelta(rng.integers(0, 6000, n), unit='D'),
+    })
+
+
+def test_similares_coinciden_con_la_fuerza_bruta_y_respetan_los_filtros():
+    df = _jugadores()
+    df.loc[3, 'dribbling'] = np.nan  # Un valor que falta se trata como la media
+
+    matriz = get_matriz_atributos(df)
+    assert matriz.columnas == ['overall_rating', 'dribbling', 'sprint_speed', 'height']
+    assert matriz.z.dtype == np.float32 and not np.isnan(matriz.z).any()
+    assert get_buscador_similares(df) is get_buscador_similares(df)
+
+    # Bloques pequeños para recorrer varios y fusionar sus mejores candidatos
+    buscador = BuscadorSimilares(matriz, filas_por_bloque=37)
+    distancias = np.linalg.norm(matriz.z.astype(np.float64) - matriz.z[7], axis=1)
+    distancias[7] = np.inf
+    esperadas = np.argsort(distancias, kind='stable')[:5]
+
+    resultado = buscador.similares(7, k=5)
+    assert 7 not in resultado.filas
+    assert list(resultado.filas) == list(esperadas)
+    assert np.allclose(resultado.distancias, distancias[esperadas], atol=1e-3)
+    assert resultado.candidatos == len(df) - 1
+    assert np.all(np.diff(resultado.similitud) <= 0)
+
+    filtrado = buscador.similares_filtrados(df, 7, k=50, liga='L0', equipo='T2')
+    assert set(df.iloc[filtrado.filas]['team_long_name']) == {'T2'}
+    assert filtrado.candidatos == 50  # Jugadores del T2 (el 7 es del T7)
+
+    assert len(buscador.similares_filtrados(df, 7, liga='L1', equipo='T2').filas) == 0
+
+
+def test_ranking_compuesto_coincide_con_pandas_y_reutiliza_las_puntuaciones():
+    df = _jugadores()
+    motor = get_motor_puntuaciones(df)
+    pesos = {'sprint_speed': 2, 'dribbling': 1, 'height': 0}
+
+    resultado = motor.top(pesos, k=10)
+    esperado = ((2 * df['sprint_speed'] + df['dribbling']) / 3).nlargest(10)
+    assert list(resultado.filas) == list(esperado.index)
+    assert np.allclose(resultado.puntuacion, esperado.to_numpy(), atol=1e-3)
+    assert not resultado.en_cache
+
+    # Los mismos pesos en otra escala son la misma puntuación: no se recalcula
+    filas_l1 = np.flatnonzero(df['league_name'] == 'L1')
+    filtrado = motor.top({'sprint_speed': 4, 'dribbling': 2}, k=5, candidatas=filas_l1)
+    assert filtrado.en_cache and filtrado.candidatos == len(filas_l1)
+    puntuacion_l1 = ((2 * df['sprint_speed'] + df['dribbling']) / 3)[df['league_name'] == 'L1']
+    assert set(df.iloc[filtrado.filas]['league_name']) == {'L1'}
+    assert np.allclose(filtrado.puntuacion, puntuacion_l1.nlargest(5).to_numpy(), atol=1e-3)
+
+
+def test_scouting_coincide_con_el_filtrado_de_pandas():
+    df = _jugadores()
+    df.loc[5, 'sprint_speed'] = np.nan  # Un valor que falta no cumple ningún rango
+    indice = get_indice_scouting(df)
+    edad = (pd.Timestamp('2016-12-31') - df['birthday']).dt.days // 365.25
+
+    resultado = indice.consultar({'edad': (None, 22), 'sprint_speed': (60, None), 'dribbling': (50, 90)},
+                                 {'league_name': 'L1'})
+    esperado = df.index[(edad <= 22) & (df['sprint_speed'] >= 60) & df['dribbling'].between(50, 90)
+                        & (df['league_name'] == 'L1')]
+    assert list(resultado.filas) == list(esperado)
+    # Los predicados se aplican de más a menos selectivo y cada paso solo reduce los candidatos
+    candidatos = [n for _, n in resultado.pasos]
+    assert candidatos == sorted(candidatos, reverse=True) and candidatos[-1] == len(esperado)
+
+    assert 5 not in indice.consultar({'sprint_speed': (0, 100)}).filas
+    assert len(indice.consultar(categorias={'team_long_name': 'No existe'}).filas) == 0
+
+
+def _no_dominados(valores):
+    return [i for i in range(len(valores))
+            if not ((valores >= valores[i]).all(axis=1) & (valores > valores[i]).any(axis=1)).any()]
+
+
+def test_frontera_de_pareto_coincide_con_la_comparacion_por_parejas():
+    rng = np.random.default_rng(1)
+    for dimensiones in (2, 3):
+        for _ in range(100):
+            # Pocos valores distintos: muchos empates y puntos repetidos
+            valores = rng.integers(0, rng.integers(2, 12), (rng.integers(0, 60), dimensiones)).astype(float)
+            assert sorted(frontera_pareto(valores)) == _no_dominados(valores)
+        valores = rng.normal(size=(500, dimensiones))
+        assert sorted(frontera_pareto(valores)) == _no_dominados(valores)
+
+    df = _jugadores()
+    df.loc[0, 'dribbling'] = np.nan  # Sin el atributo no se compara
+    motor = get_motor_pareto(df)
+    resultado = motor.frontera(df, ['dribbling', 'sprint_speed'], liga='L1')
+    en_l1 = df[(df['league_name'] == 'L1')].dropna(subset=['dribbling'])
+    esperado = en_l1.index[_no_dominados(en_l1[['dribbling', 'sprint_speed']].to_numpy(dtype=float))]
+    assert sorted(resultado.filas) == list(esperado) and resultado.candidatos == len(en_l1)
+    assert motor.frontera(df, ['dribbling', 'sprint_speed'], liga='L1').en_cache
+
+
+def test_percentiles_coinciden_con_el_rank_de_pandas():
+    df = _jugadores()
+    df.loc[4, 'dribbling'] = np.nan
+    indice = get_indice_percentiles(df)
+
+    # Porcentaje de jugadores (del dataset o de la liga) con un valor igual o menor, hacia abajo
+    global_ = np.floor(df['dribbling'].rank(method='max', pct=True) * 100 + 1e-9)
+    en_liga = np.floor(df.groupby('league_name')['dribbling'].rank(method='max', pct=True) * 100 + 1e-9)
+    filas = np.arange(len(df))
+    assert np.array_equal(indice.percentiles(filas, ['dribbling'])[:, 0], global_.to_numpy(), equal_nan=True)
+    assert np.array_equal(indice.percentiles(filas, ['dribbling'], por_liga=True)[:, 0], en_liga.to_numpy(), equal_nan=True)
+
+    mejor = int(df['sprint_speed'].idxmax())
+    assert indice.percentil(mejor, 'sprint_speed') == 100
+    assert indice.percentil(4, 'dribbling') is None
+
+
+def test_correlaciones_coinciden_con_pandas_y_el_lru_de_equipos():
+    df = _jugadores()
+    motor = get_motor_correlaciones(df)
+    motor.max_equipos = 2
+    columnas = ['overall_rating', 'dribbling', 'sprint_speed', 'height']
+
+    resultado = motor.correlaciones(df)
+    assert resultado.columnas == columnas and resultado.jugadores == len(df)
+    assert np.allclose(resultado.correlacion, df[columnas].corr().to_numpy(), atol=1e-6)
+    assert np.allclose(resultado.covarianza, df[columnas].cov().to_numpy(), rtol=1e-5)
+
+    en_l1 = df[df['league_name'] == 'L1'][columnas]
+    assert np.allclose(motor.correlaciones(df, liga='L1').correlacion, en_l1.corr().to_numpy(), atol=1e-6)
+    assert motor.correlaciones(df, liga='L1').en_cache
+
+    for equipo in ('T1', 'T3', 'T5'):
+        motor.correlaciones(df, equipo=equipo)
+    assert motor.en_cache() == {'grupos': 2, 'equipos': 2}
+    assert not motor.correlaciones(df, equipo='T1').en_cache  # El más antiguo salió del LRU
+
+
+def test_asignacion_optima_coincide_con_la_fuerza_bruta():
+    rng = np.random.default_rng(3)
+    beneficio = rng.integers(0, 5, (40, 4, 6)).astype(float)  # Con muchos empates
+    beneficio[:, :, 4:][rng.random((40, 4, 2)) < 0.5] = -np.inf  # Relleno de plantillas cortas
+
+    elegidos = asignar(beneficio)
+    puestos = np.arange(4)
+    for equipo, filas in zip(beneficio, elegidos):
+        assert len(set(filas.tolist())) == 4 and np.isfinite(equipo[puestos, filas]).all()
+        mejor = max(equipo[puestos, list(p)].sum() for p in permutations(range(6), 4))
+        assert equipo[puestos, filas].sum() == mejor
+
+
+def test_mejor_once_por_equipo_y_puestos_vacios():
+    df = _jugadores()
+    df = df[(df['team_long_name'] != 'T8') | (np.arange(len(df)) < 80)].reset_index(drop=True)  # T8 con 8 jugadores
+    motor = get_motor_alineaciones(df)
+
+    individual = motor.alineacion('T1', '4-4-2')
+    assert not individual.en_cache and len(individual.roles) == 11
+    assert len(set(individual.filas.tolist())) == 11 and (df['team_long_name'].iloc[individual.filas] == 'T1').all()
+
+    motor.calcular('4-4-2')
+    precalculada = motor.alineacion('T1', '4-4-2')
+    assert precalculada.en_cache and np.isclose(precalculada.puntuacion.sum(), individual.puntuacion.sum())
+
+    corto = motor.alineacion('T8', '4-4-2')
+    assert (corto.filas >= 0).sum() == 8 and np.isnan(corto.puntuacion).sum() == 3
+    assert motor.alineacion('No existe') is None
+
+
+def test_rol_natural_depende_del_perfil_y_no_del_nivel():
+    rng = np.random.default_rng(4)
+    n = 300
+    porteros = np.arange(n) < 30
+    rapidos = {attr: np.where(porteros, rng.uniform(30, 50, n), rng.uniform(65, 90, n))
+               for attr in ('sprint_speed', 'acceleration', 'agility', 'dribbling')}
+    df = pd.DataFrame({
+        'team_long_name': [f"T{i % 10}" for i in range(n)],
+        **rapidos,
+        'finishing': rng.uniform(30, 60, n),
+        'shot_power': rng.uniform(30, 60, n),
+        'gk_diving': np.where(porteros, rng.uniform(70, 85, n), rng.uniform(5, 15, n)),
+        'gk_reflexes': np.where(porteros, rng.uniform(70, 85, n), rng.uniform(5, 15, n)),
+    })
+    # Más lento que casi todos pero el mejor rematador: en bruto su media de extremo (70) supera a la de delantero (68)
+    df.loc[n - 1, ['sprint_speed', 'acceleration', 'agility', 'dribbling', 'finishing', 'shot_power']] = [70] * 4 + [68] * 2
+
+    motor = get_motor_alineaciones(df)
+    roles = np.array(motor.roles)[motor.rol_natural]
+    assert roles[n - 1] == 'DC'
+    assert ((roles == 'POR') == porteros).all()
+
+
+def test_mejor_once_respeta_la_posicion_de_cada_jugador():
+    from utils.lineups import POSICION_DE_ROL
+    from utils.positions import POSICIONES
+
+    df = _jugadores()
+    df['posicion'] = pd.Categorical([POSICIONES[i // 10 % 4] for i in range(len(df))], categories=POSICIONES)
+    motor = get_motor_alineaciones(df)
+    assert (np.array([POSICION_DE_ROL[motor.roles[r]] for r in motor.rol_natural]) == df['posicion'].to_numpy()).all()
+
+    # 12-13 jugadores por posición en cada equipo: todos los puestos se cubren con su posición
+    once = motor.alineacion('T1', '4-4-2')
+    assert (df['posicion'].iloc[once.filas].to_numpy() == [POSICION_DE_ROL[rol] for rol in once.roles]).all()
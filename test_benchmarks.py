@@ -0,0 +1,105 @@
+"""
+Pruebas de las herramientas de rendimiento (bench/): benchmark de páginas,
+datasets sintéticos, informe de importaciones y prueba de carga.
+
+La comparación completa con el baseline depende de la máquina, así que solo se
+ejecuta si se pide explícitamente:
+    SOCCER_BENCH=1 python -m pytest -q test_benchmarks.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench.bench_pages import RUTA_BASELINE, comparar_con_baseline, ejecutar_benchmark, escenarios_sin_referencia
+
+
+def _resultado(**medianas):
+    return {'escenarios': {nombre: {'mediana_ms': ms} for nombre, ms in medianas.items()}}
+
+
+def test_comparar_detecta_solo_regresiones_relevantes():
+    baseline = _resultado(a=100.0, b=100.0, c=10.0)
+    actual = _resultado(a=200.0, b=120.0, c=30.0, nuevo=500.0)
+
+    regresiones = comparar_con_baseline(actual, baseline, umbral=0.3, margen_minimo_ms=25)
+
+    # 'b' no supera el umbral, 'c' no supera el margen absoluto y 'nuevo' no tiene referencia
+    assert [r['escenario'] for r in regresiones] == ['a']
+    assert regresiones[0]['cambio'] == pytest.approx(1.0)
+    # ... pero se informa de los escenarios que no se han podido comparar
+    assert escenarios_sin_referencia(actual, _resultado(a=100.0, b=100.0, d=5.0)) == {
+        'nuevos': ['c', 'nuevo'], 'ausentes': ['d']}
+
+
+def test_benchmark_mide_todas_las_paginas_sin_errores():
+    resultados = ejecutar_benchmark(repeticiones=1, interacciones=False, progreso=lambda _: None)
+
+    for pagina in ('inicio', 'jugadores', 'equipos', 'ligas', 'ia_players'):
+        assert resultados['escenarios'][f'{pagina}.frio']['mediana_ms'] > 0
+        assert resultados['escenarios'][f'{pagina}.caliente']['n'] == 1
+
+
+@pytest.mark.skipif(not os.getenv('SOCCER_BENCH'), reason="Benchmark completo: definir SOCCER_BENCH=1")
+def test_sin_regresiones_frente_al_baseline():
+    import json
+
+    with open(RUTA_BASELINE, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    resultados = ejecutar_benchmark(repeticiones=3, progreso=lambda _: None)
+    assert comparar_con_baseline(resultados, baseline) == []
+    assert escenarios_sin_referencia(resultados, baseline) == {'nuevos': [], 'ausentes': []}
+
+
+def test_dataset_sintetico_conserva_esquema_y_correlaciones(tmp_path, monkeypatch):
+    import pandas as pd
+    from bench.synthetic_data import RUTA_BASE, escribir_dataset, generar_dataset
+
+    base = pd.read_csv(RUTA_BASE)
+    sintetico = generar_dataset(len(base) * 3, base, semilla=1)
+
+    assert sintetico.dtypes.equals(base.dtypes)
+    assert sintetico['player_api_id'].is_unique
+    # Tres réplicas de cada liga con los mismos equipos por liga
+    assert sintetico['league_name'].nunique() == 3 * base['league_name'].nunique()
+    assert sintetico.groupby('team_long_name').size().mean() == pytest.approx(
+        base.groupby('team_long_name').size().mean(), rel=0.1)
+    atributos = ['overall_rating', 'sprint_speed', 'acceleration', 'finishing', 'gk_reflexes']
+    assert (sintetico[atributos].corr() - base[atributos].corr()).abs().to_numpy().max() < 0.05
+
+    # El cargador de la app lee el formato binario indicado en SOCCER_DATA_FILE
+    escritos = escribir_dataset(sintetico, str(tmp_path / 'data_x3'), ['pickle'])
+    monkeypatch.setenv('SOCCER_DATA_FILE', escritos['pickle']['ruta'])
+    from utils.data_loader import load_data
+    df, _ = load_data()
+    assert len(df) == len(sintetico)
+
+
+def test_arranque_no_importa_dependencias_de_otras_paginas():
+    from bench.import_report import medir_pagina
+
+    fases = medir_pagina('inicio')
+    modulos_inicio = {m['modulo'] for m in fases['app'] + fases['inicio']}
+    assert not any(m.split('.')[0] in ('plotly', 'requests', 'dotenv') for m in modulos_inicio)
+
+    # La página de IA se muestra sin requests: solo se carga al generar la primera imagen
+    fases = medir_pagina('ia_players')
+    assert not any(m['modulo'].split('.')[0] == 'requests' for m in fases['ia_players'])
+
+
+def test_prueba_de_carga_con_sesiones_concurrentes():
+    pytest.importorskip('websockets')
+    from bench.load_test import ejecutar_prueba
+
+    resultados = ejecutar_prueba([2], duracion=3, pausa=0.2, progreso=lambda _: None)
+
+    nivel = resultados['niveles'][0]
+    assert resultados['primera_carga_ms'] > 0
+    assert nivel['usuarios'] == 2 and nivel['reruns'] >= 2
+    assert nivel['errores'] == 0 and nivel['excepciones'] == 0, nivel['detalle_errores']
+    assert nivel['p50_ms'] <= nivel['p95_ms'] <= nivel['p99_ms'] <= nivel['max_ms']
+    assert 'abrir' in nivel['por_accion']
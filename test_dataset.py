@@ -0,0 +1,167 @@
+"""
+Pruebas del dataset compartido, los agregados y el calentamiento de cachés
+(panel/src/utils/dataset.py, aggregates.py y warmup.py), incluida la recarga
+sin cortes.
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q test_dataset.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+
+import utils.dataset as dataset
+import utils.warmup as warmup
+from utils.aggregates import get_agregados
+from utils.positions import COLUMNA_POSICION, POSICIONES, clasificar_posiciones
+
+
+def test_agregados_coinciden_con_el_calculo_de_las_paginas():
+    df = pd.DataFrame({
+        'player_name': ['A', 'B', 'C', 'D', 'E'],
+        'team_long_name': ['T1', 'T1', 'T2', 'T3', 'T3'],
+        'league_name': ['L1', 'L1', 'L1', 'L2', 'L2'],
+        'country_name': ['P1', 'P1', 'P1', 'P2', 'P2'],
+        'overall_rating': [70, 85, 80, 60, 60],
+    })
+    agregados = get_agregados(df)
+    assert get_agregados(df) is agregados
+
+    ligas = agregados.ligas.set_index('league_name')
+    assert ligas.loc['L1', 'jugadores_elite'] == 2
+    assert list(agregados.ligas['league_name']) == ['L1', 'L2']
+
+    equipos = agregados.equipos_de_liga('L1')
+    assert list(equipos['team_long_name']) == ['T2', 'T1']
+    assert list(equipos['mejor_jugador']) == ['C', 'B']
+    # Empate de rating: el primero del DataFrame, como nlargest(1)
+    assert agregados.equipos_de_liga('L2')['mejor_jugador'].iloc[0] == 'D'
+
+    assert agregados.liga_por_display['P2 - L2'] == 'L2'
+    assert agregados.equipo_por_display['T3 (L2)'] == 'T3'
+    assert list(agregados.jugadores_equipo('T1')['player_name']) == ['A', 'B']
+    assert agregados.jugadores_liga('otra').empty
+
+
+def test_calentamiento_deja_listas_las_figuras_por_defecto(monkeypatch):
+    monkeypatch.setattr(warmup, '_estado', warmup._nuevo_estado())
+    cargas = []
+    carga_original = dataset.data_loader.load_data
+    monkeypatch.setattr(dataset, '_almacen', dataset.AlmacenDatos(
+        cargar=lambda: cargas.append(1) or carga_original()))
+
+    estado = warmup.calentar()
+
+    assert estado['estado'] == 'listo', estado['error']
+    assert [paso for paso, _ in estado['pasos']] == [
+        "carga de datos", "agregados", "índices", "figuras de ligas", "figuras de equipos"]
+    assert estado['duracion_s'] > 0
+
+    # Las sesiones reciben el mismo dataset y las figuras ya construidas
+    df = dataset.get_dataset().df
+    figuras = get_agregados(df).figuras_en_cache()
+    assert ('radar', 'FC Barcelona', 'Real Madrid CF') in figuras
+    assert ('equipos_liga', 'Spain LIGA BBVA') in figuras
+    assert ('ligas',) in figuras
+    assert len(cargas) == 1
+
+
+def test_recarga_sin_cortes_publica_y_retira_versiones():
+    df_1 = pd.DataFrame({'player_name': ['A', 'B'], 'overall_rating': [70, 80]})
+    df_2 = pd.DataFrame({'player_name': ['A', 'B', 'C'], 'overall_rating': [70, 80, 90]})
+    cargas = [df_1, df_2, pd.DataFrame(), df_2[['player_name']]]
+    almacen = dataset.AlmacenDatos(cargar=lambda: (cargas.pop(0), None))
+    agregados_1 = get_agregados(df_1)
+
+    with almacen.usar() as en_uso:
+        assert en_uso.version == 1
+        preparadas = []
+        assert almacen.recargar(preparar=preparadas.append, en_segundo_plano=False)
+
+        # La versión nueva se prepara antes de publicarse y la antigua sigue viva mientras se use
+        assert [d.version for d in preparadas] == [2]
+        assert almacen.actual().df is df_2
+        assert en_uso.df is df_1
+        versiones = {v['version']: v for v in almacen.estado()['versiones']}
+        assert versiones[1]['referencias'] == 1 and not versiones[1]['actual']
+
+    # Al soltarla se retira, y con ella sus agregados
+    assert [v['version'] for v in almacen.estado()['versiones']] == [2]
+    assert get_agregados(df_1) is not agregados_1
+
+    # Una carga vacía o sin columnas de la versión actual no se publica
+    for _ in range(2):
+        assert almacen.recargar(en_segundo_plano=False)
+        assert not almacen.estado()['ultima_recarga']['ok']
+        assert almacen.actual().df is df_2
+
+
+def test_cada_carga_devuelve_su_propio_informe():
+    df_1, informe_1 = dataset.data_loader.load_data()
+    df_2, informe_2 = dataset.data_loader.load_data()
+
+    assert informe_1 is not informe_2
+    assert informe_1.fichero_existia and informe_1.origen == 'csv'
+    assert informe_1.filas == len(df_1) and informe_1.columnas == len(df_1.columns)
+    assert informe_1.bytes_leidos > 0 and informe_1.memoria_bytes > 0
+    assert informe_1.tiempo_total_s >= informe_1.tiempo_lectura_s + informe_1.tiempo_tipos_s
+    assert pd.api.types.is_datetime64_any_dtype(df_1['birthday'])
+    try:
+        informe_1.filas = 0
+        assert False, "el informe debería ser inmutable"
+    except AttributeError:
+        pass
+
+
+def test_posiciones_se_calculan_al_cargar_y_se_filtran_por_indice():
+    # Perfiles claros: porteros, defensas (cabeceo y agresividad), centrocampistas (pase) y delanteros
+    rng = np.random.default_rng(0)
+    base = {'Portero': (35, 35, 25, 35, 35, 40, 80), 'Defensa': (40, 60, 80, 80, 60, 70, 10),
+            'Centrocampista': (55, 82, 50, 55, 80, 82, 10), 'Delantero': (85, 60, 60, 45, 75, 60, 10)}
+    columnas = ['finishing', 'short_passing', 'heading_accuracy', 'aggression', 'ball_control', 'stamina', 'gk_reflexes']
+    esperado = np.repeat(list(base), 50)
+    valores = np.vstack([np.array(base[p]) + rng.normal(0, 3, (50, 7)) for p in base])
+    df = pd.DataFrame(valores, columns=columnas).assign(gk_diving=lambda d: d['gk_reflexes'])
+    df.loc[3, 'finishing'] = np.nan
+
+    posiciones = clasificar_posiciones(df)
+    assert list(posiciones.categories) == POSICIONES
+    assert (np.asarray(posiciones) == esperado).all()
+    # Sin dos grupos en los atributos de portero no hay porteros
+    assert 'Portero' not in set(clasificar_posiciones(df.iloc[50:]))
+    assert clasificar_posiciones(pd.DataFrame({'player_name': ['A']})) is None
+
+    df_cargado, _ = dataset.data_loader.load_data()
+    assert isinstance(df_cargado[COLUMNA_POSICION].dtype, pd.CategoricalDtype)
+    agregados = get_agregados(df_cargado)
+    porteros = agregados.filas_de_posicion('Portero')
+    assert (df_cargado[COLUMNA_POSICION] == 'Portero').sum() == len(porteros) > 0
+    assert df_cargado['gk_reflexes'].iloc[porteros].min() > df_cargado['gk_reflexes'].drop(
+        df_cargado.index[porteros]).max()
+    liga = df_cargado['league_name'].iloc[porteros[0]]
+    filas = agregados.filas_filtradas(liga=liga, posicion='Portero')
+    mascara = (df_cargado['league_name'] == liga) & (df_cargado[COLUMNA_POSICION] == 'Portero')
+    assert list(filas) == list(np.flatnonzero(mascara))
+
+
+def test_memoria_no_cuenta_el_dataset_compartido_en_la_sesion(monkeypatch):
+    from utils.memory import exportar_memoria, informe_memoria
+
+    df = pd.DataFrame({'player_name': [f'Jugador número {i}' for i in range(100)], 'overall_rating': range(100)})
+    monkeypatch.setattr(dataset, '_almacen', dataset.AlmacenDatos(cargar=lambda: (df, None)))
+    sesion = {'df': dataset.get_dataset().df, 'seleccion': ['A'] * 100}
+
+    informe = informe_memoria(sesion)
+
+    assert informe['dataset'][0]['bytes'] == df.memory_usage(deep=True).sum()
+    assert [c['columna'] for c in informe['dataset'][0]['columnas']][0] == 'player_name'
+    filas = {f['clave']: f for f in informe['sesion']}
+    assert filas['df']['bytes'] == 0 and 'compartido' in filas['df']['nota']
+    assert filas['seleccion']['bytes'] > 800
+    assert informe['sesion_bytes'] == filas['seleccion']['bytes']
+    assert 'soccer_dataset_column_bytes{version="1",column="player_name"}' in exportar_memoria(informe)
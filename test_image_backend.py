@@ -0,0 +1,241 @@
+"""
+Pruebas del flujo de generación de imágenes contra el servidor local simulado
+(bench/fake_hf_server.py), sin conexión a la API de Hugging Face.
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q test_image_backend.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench.fake_hf_server import PerfilServidor, start_fake_server
+from utils.image_backend import HTTPBackend, RecordingBackend, ReplayBackend
+from ui.iaPlayers import SceneImageGenerator
+from utils.rate_limiter import RateLimiter
+
+
+def _generador(backend):
+    # Limitador propio y sin restricciones: el global (20/min) ralentizaría las pruebas
+    generador = SceneImageGenerator(backend=backend, sesion_id='test', limiter=RateLimiter(60000, 100))
+    generador.api_key = 'hf_test'
+    return generador
+
+
+def test_genera_imagen_reproducible_por_semilla():
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.0, latencia_jitter=0.0))
+    try:
+        generador = _generador(HTTPBackend(base_url))
+        a, error_a = generador._solicitar_imagen("prompt", seed=7)
+        b, error_b = generador._solicitar_imagen("prompt", seed=7)
+        c, _ = generador._solicitar_imagen("prompt", seed=8)
+        assert error_a is None and error_b is None
+        assert a.size == (768, 768)
+        assert a.tobytes() == b.tobytes()
+        assert a.tobytes() != c.tobytes()
+    finally:
+        servidor.shutdown()
+
+
+def test_reintenta_503_y_usa_respaldo_tras_404():
+    perfil = PerfilServidor(
+        latencia_media=0.0, latencia_jitter=0.0, arranque_en_frio=1, estimated_time=0.05,
+        modelos_404=['black-forest-labs/FLUX.1-schnell'],
+    )
+    servidor, base_url = start_fake_server(perfil)
+    try:
+        imagen, error = _generador(HTTPBackend(base_url))._generar_con_respaldo("prompt")
+        assert imagen is not None and error is None
+        respuestas = servidor.estado.stats()['respuestas']
+        assert respuestas == {'404': 1, '503': 1, '200': 1}
+    finally:
+        servidor.shutdown()
+
+
+def test_token_invalido_devuelve_error_de_autenticacion():
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.0, token_valido='otro'))
+    try:
+        imagen, error = _generador(HTTPBackend(base_url))._solicitar_imagen("prompt")
+        assert imagen is None
+        assert 'autenticación' in error
+    finally:
+        servidor.shutdown()
+
+
+def test_grabacion_y_reproduccion(tmp_path):
+    ruta = str(tmp_path / 'cassette.jsonl')
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.0, arranque_en_frio=1, estimated_time=0.0))
+    try:
+        grabado, _ = _generador(RecordingBackend(HTTPBackend(base_url), ruta))._solicitar_imagen("prompt", seed=1)
+    finally:
+        servidor.shutdown()
+
+    # Sin servidor: la reproducción sirve el mismo 503 + 200 grabados
+    reproducido, error = _generador(ReplayBackend(ruta, velocidad=0))._solicitar_imagen("prompt", seed=1)
+    assert error is None
+    assert reproducido.tobytes() == grabado.tobytes()
+
+
+def test_lote_respeta_el_limite_de_concurrencia():
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.3, latencia_jitter=0.0))
+    try:
+        generador = _generador(HTTPBackend(base_url))
+        trabajos = [("escena", semilla) for semilla in range(6)]
+        inicio = time.time()
+        resultados = list(generador.generar_escenas_en_lote(["Jugador"], trabajos, max_concurrencia=3))
+        duracion = time.time() - inicio
+
+        assert sorted(r['indice'] for r in resultados) == list(range(6))
+        assert all(r['handle'] for r in resultados)
+        assert servidor.estado.stats()['max_en_curso'] <= 3
+        # 6 trabajos de 0.3s con 3 hilos: ~0.6s, muy por debajo de la suma (1.8s)
+        assert duracion < 1.5
+    finally:
+        servidor.shutdown()
+
+
+def test_lote_no_se_bloquea_si_el_modelo_nunca_termina_de_cargar():
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.0, prob_503=1.0, estimated_time=0.0))
+    try:
+        generador = _generador(HTTPBackend(base_url))
+        resultados = list(generador.generar_escenas_en_lote(["Jugador"], [("escena", 1), ("escena", 2)]))
+
+        assert all(r['handle'] is None and 'cargando' in r['error'] for r in resultados)
+    finally:
+        servidor.shutdown()
+
+
+def test_lote_interrumpido_no_espera_a_los_trabajos_pendientes():
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.3, latencia_jitter=0.0))
+    try:
+        generador = _generador(HTTPBackend(base_url))
+        lote = generador.generar_escenas_en_lote(["Jugador"], [("escena", s) for s in range(6)], max_concurrencia=2)
+        next(lote)
+        inicio = time.time()
+        lote.close()
+        # Los trabajos en cola se cancelan: cerrar no espera a las 4-5 escenas restantes
+        assert time.time() - inicio < 0.2
+    finally:
+        servidor.shutdown()
+
+
+def test_peticiones_identicas_concurrentes_se_agrupan():
+    from concurrent.futures import ThreadPoolExecutor
+
+    servidor, base_url = start_fake_server(PerfilServidor(latencia_media=0.3, latencia_jitter=0.0))
+    try:
+        generador = _generador(HTTPBackend(base_url))
+        prompt = generador.construir_prompt(["B", "A"], "escena")
+        assert prompt == generador.construir_prompt(["A", "B"], "escena")
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            resultados = list(pool.map(lambda _: generador._solicitar_imagen(prompt, seed=3), range(5)))
+
+        assert all(imagen is not None and error is None for imagen, error in resultados)
+        assert servidor.estado.stats()['peticiones_por_modelo'] == {'black-forest-labs/FLUX.1-schnell': 1}
+    finally:
+        servidor.shutdown()
+
+
+def test_limitador_reparte_turnos_entre_sesiones_y_prioridades():
+    from utils.rate_limiter import PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE
+    import threading
+
+    class Reloj:
+        """Reloj detenido mientras se llena la cola; después avanza en tiempo real."""
+        def __init__(self):
+            self.congelado = True
+            self.inicio = time.monotonic()
+
+        def __call__(self):
+            return self.inicio if self.congelado else time.monotonic()
+
+    def esperar_en_cola(n):
+        limite = time.time() + 5
+        while limitador.stats()['en_cola'] < n:
+            assert time.time() < limite
+            time.sleep(0.001)
+
+    # 1 token y 20 tokens/s: con el reloj detenido no se recarga ninguno
+    reloj = Reloj()
+    limitador = RateLimiter(tasa_por_minuto=1200, rafaga=1, reloj=reloj)
+    assert limitador.acquire('a')
+    orden = []
+
+    def pedir(sesion, prioridad):
+        assert limitador.acquire(sesion, prioridad, timeout=5)
+        orden.append(sesion)
+
+    hilos = [threading.Thread(target=pedir, args=('lote', PRIORIDAD_LOTE)) for _ in range(4)]
+    hilos.append(threading.Thread(target=pedir, args=('b', PRIORIDAD_LOTE)))
+    hilos.append(threading.Thread(target=pedir, args=('c', PRIORIDAD_INTERACTIVA)))
+    for n, hilo in enumerate(hilos, 1):
+        hilo.start()
+        esperar_en_cola(n)
+
+    assert limitador.estimated_wait() > 0
+    reloj.congelado = False
+    for hilo in hilos:
+        hilo.join()
+
+    # La petición interactiva sale antes y 'b' no espera a que termine todo el lote
+    assert orden.index('c') == 0
+    assert orden.index('b') <= 2
+    assert limitador.stats()['concedidas'] == 7
+
+
+def test_backend_compartido_entre_reejecuciones(monkeypatch):
+    import utils.image_backend as image_backend
+
+    monkeypatch.setattr(image_backend, '_backend', None)
+    monkeypatch.setenv('IMAGE_BACKEND', 'local')
+    assert SceneImageGenerator().backend is SceneImageGenerator().backend
+
+
+def test_almacen_no_bloquea_mientras_vuelca_a_disco(tmp_path, monkeypatch):
+    import threading
+    from utils.image_store import ImageStore
+
+    almacen = ImageStore(max_memoria_bytes=10, max_disco_bytes=1000, directorio=str(tmp_path))
+    escribir = almacen._escribir_en_disco
+    escribiendo, seguir = threading.Event(), threading.Event()
+
+    def escribir_lento(handle, escena):
+        # Solo el primer volcado se queda esperando
+        if not escribiendo.is_set():
+            escribiendo.set()
+            assert seguir.wait(5)
+        return escribir(handle, escena)
+
+    monkeypatch.setattr(almacen, '_escribir_en_disco', escribir_lento)
+    primera = almacen.put({'png': b'1' * 8, 'preview': b''})
+    hilo = threading.Thread(target=almacen.put, args=({'png': b'2' * 8, 'preview': b''},))
+    hilo.start()
+    assert escribiendo.wait(5)
+
+    # Con la primera imagen a medio volcar, el almacén sigue respondiendo y la sirve desde memoria
+    inicio = time.time()
+    assert almacen.get(primera)['png'] == b'1' * 8
+    tercera = almacen.put({'png': b'3' * 8, 'preview': b''})
+    almacen.release(tercera)
+    assert time.time() - inicio < 1
+    seguir.set()
+    hilo.join()
+
+    assert almacen.stats()['entradas_disco'] >= 1
+    assert almacen.get(primera)['png'] == b'1' * 8
+
+
+def test_limitador_olvida_las_sesiones_menos_recientes():
+    limitador = RateLimiter(tasa_por_minuto=6000, rafaga=10, max_sesiones=2)
+    for sesion in ('a', 'b', 'a', 'c'):
+        assert limitador.acquire(sesion)
+
+    assert limitador.stats('a')['concedidas_sesion'] == 2
+    assert limitador.stats('c')['concedidas_sesion'] == 1
+    assert limitador.stats('b')['concedidas_sesion'] == 0
+    assert limitador.stats()['concedidas'] == 4
@@ -0,0 +1,60 @@
+"""
+Pruebas de la búsqueda de jugadores por nombre (panel/src/utils/name_search.py).
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q test_name_search.py
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+
+from utils.aggregates import get_agregados
+from utils.name_search import get_indice_nombres, mejores_jugadores, plegar
+
+
+def test_busqueda_con_tildes_prefijos_y_erratas():
+    df = pd.DataFrame({
+        'player_name': ['Sergio Agüero', 'Sergio Ramos', 'Lionel Messi', 'Thomas Müller',
+                        'Ron-Robert Zieler', 'Sergio Ramos', 'Łukasz Piszczek'],
+        'overall_rating': [88, 87, 94, 86, 78, 60, 82],
+    })
+    assert plegar(" Łukasz  PISZCZEK! ") == "lukasz piszczek"
+
+    indice = get_indice_nombres(df)
+    assert get_indice_nombres(df) is indice
+
+    # Sin tildes y por prefijo; a igualdad de puntuación, antes el de más rating
+    resultado = indice.buscar("sergio")
+    assert resultado.nombres == ['Sergio Agüero', 'Sergio Ramos']
+    assert list(resultado.filas) == [0, 1]  # Nombres repetidos: el primer jugador con ese nombre
+    assert indice.buscar("AGUERO").nombres[0] == 'Sergio Agüero'
+    assert indice.buscar("ser ra").nombres[0] == 'Sergio Ramos'
+    assert indice.buscar("robert").nombres == ['Ron-Robert Zieler']
+    assert indice.buscar("lukasz").nombres == ['Łukasz Piszczek']
+
+    # Erratas: por trigramas, con menos puntuación que una coincidencia exacta
+    errata = indice.buscar("mesi")
+    assert errata.nombres == ['Lionel Messi']
+    assert errata.puntuacion[0] < indice.buscar("messi").puntuacion[0] == 1.0
+    assert indice.buscar("muler").nombres == ['Thomas Müller']
+
+    assert indice.buscar("   ").nombres == []
+    assert indice.buscar("zzzz").nombres == []
+    assert indice.mejores(2) == ['Lionel Messi', 'Sergio Agüero']
+
+
+def test_sugerencias_iniciales_sin_construir_el_indice():
+    df = pd.DataFrame({
+        'player_name': ['Sergio Agüero', 'Sergio Ramos', 'Lionel Messi', 'Thomas Müller', 'Lionel Messi'],
+        'overall_rating': [88, 86, 94, 85, 70],
+    })
+
+    assert mejores_jugadores(df, 3) == ['Lionel Messi', 'Sergio Agüero', 'Sergio Ramos']
+    # Solo el orden por rating: el índice (vocabulario y trigramas) espera a la primera búsqueda
+    calculados, _ = get_agregados(df).contenido()
+    assert 'índice nombres_por_rating' in calculados and 'índice nombres' not in calculados
+    assert mejores_jugadores(df, 3) == get_indice_nombres(df).mejores(3)
@@ -0,0 +1,113 @@
+"""
+Pruebas de la medición de tiempos por sección (panel/src/utils/profiler.py).
+
+Ejecutar desde la raíz del proyecto:
+    python -m pytest -q test_profiler.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'panel', 'src'))
+
+import utils.profiler as profiler
+from utils.profiler import SectionProfiler, exportar_metricas, medir, medir_pagina
+
+
+def test_secciones_anidadas_se_agregan_por_pagina(monkeypatch):
+    monkeypatch.setattr(profiler, '_profiler', SectionProfiler())
+
+    @medir("tabla")
+    def tabla():
+        time.sleep(0.01)
+
+    for _ in range(3):
+        with medir_pagina("Equipos"):
+            with medir("Sección 1"):
+                with medir("gráfico"):
+                    pass
+                tabla()
+
+    filas = {f['seccion']: f for f in profiler.get_profiler().resumen("Equipos")}
+    assert set(filas) == {"total", "Sección 1", "Sección 1 › gráfico", "Sección 1 › tabla"}
+    assert all(f['llamadas'] == 3 for f in filas.values())
+    assert filas["Sección 1 › tabla"]['p50_ms'] >= 10
+    assert filas["total"]['total_ms'] >= filas["Sección 1"]['total_ms']
+
+    texto = exportar_metricas()
+    assert '# TYPE soccer_section_seconds summary' in texto
+    assert 'soccer_section_seconds_count{page="Equipos",section="Sección 1 › tabla"} 3' in texto
+
+
+def test_sesiones_concurrentes_no_mezclan_paginas(monkeypatch):
+    monkeypatch.setattr(profiler, '_profiler', SectionProfiler())
+    barrera = threading.Barrier(2)
+
+    def sesion(pagina):
+        with medir_pagina(pagina):
+            with medir("sección"):
+                barrera.wait(timeout=5)
+
+    hilos = [threading.Thread(target=sesion, args=(p,)) for p in ("Ligas", "Jugadores")]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    filas = profiler.get_profiler().resumen()
+    assert sorted((f['pagina'], f['seccion']) for f in filas) == [
+        ("Jugadores", "sección"), ("Jugadores", "total"), ("Ligas", "sección"), ("Ligas", "total"),
+    ]
+
+
+def test_rerun_lenta_se_guarda_con_su_perfil(tmp_path, monkeypatch):
+    import pstats
+    from utils.slow_reruns import leer_capturas, vigilar_rerun
+
+    monkeypatch.setattr(profiler, '_profiler', SectionProfiler())
+    monkeypatch.setenv('SOCCER_SLOW_RERUN_DIR', str(tmp_path))
+    monkeypatch.setenv('SOCCER_SLOW_RERUN_THRESHOLD_MS', '50')
+
+    def grafico_lento():
+        fin = time.perf_counter() + 0.1
+        while time.perf_counter() < fin:
+            pass
+
+    def rerun(pagina, lenta):
+        with vigilar_rerun(pagina, lambda: {'equipo_selector': 'FC Barcelona'}, lambda: 'v1'), medir_pagina(pagina):
+            with medir("Sección 4"):
+                if lenta:
+                    grafico_lento()
+
+    for modo in ('muestreo', 'cprofile'):
+        monkeypatch.setenv('SOCCER_SLOW_RERUN_MODE', modo)
+        rerun("Equipos", lenta=True)
+        rerun("Ligas", lenta=False)  # Rápida: no se captura
+
+    capturas = leer_capturas()
+    assert [(c['pagina'], c['modo']) for c in capturas] == [("Equipos", 'cprofile'), ("Equipos", 'muestreo')]
+    assert capturas[0]['selecciones'] == {'equipo_selector': 'FC Barcelona'}
+    assert capturas[0]['version_datos'] == 'v1'
+    assert [s[0] for s in capturas[0]['secciones']] == ["Sección 4", "total"]
+
+    with open(tmp_path / capturas[1]['perfil'], encoding='utf-8') as f:
+        assert 'grafico_lento' in f.read()
+    estadisticas = pstats.Stats(str(tmp_path / capturas[0]['perfil']))
+    assert any(funcion[2] == 'grafico_lento' for funcion in estadisticas.stats)
+
+
+def test_selecciones_incluyen_los_widgets_de_todas_las_paginas():
+    from utils.slow_reruns import selecciones_sesion
+
+    sesion = {
+        'posicion_ranking': 'Defensa', 'alineacion_formacion': '4-4-2', 'similar_k': 10,
+        'pareto_atributos': ['finishing', 'dribbling'], 'scouting_rango_finishing': (60, 99),
+        'df': object(), 'galeria_lote': [{'handle': 'x'}], 'next_overall': True,
+        'ultimo_prompt_usado': 'x' * 1000, 'muchos': list(range(100)),
+    }
+    assert selecciones_sesion(sesion) == {
+        'alineacion_formacion': '4-4-2', 'pareto_atributos': ['finishing', 'dribbling'],
+        'posicion_ranking': 'Defensa', 'scouting_rango_finishing': [60, 99], 'similar_k': 10,
+    }